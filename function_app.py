@@ -1,9 +1,7 @@
-import asyncio
 import json
 import logging
 import sys
 from pathlib import Path
-from typing import Any
 
 import azure.functions as func
 
@@ -34,99 +32,25 @@ except Exception as import_exc:
 # Create the function app
 app_func = func.FunctionApp()
 
-async def create_asgi_scope(req: func.HttpRequest) -> dict[str, Any]:
-    """Convert Azure Functions HttpRequest to ASGI scope."""
-    from urllib.parse import unquote, urlparse
-    
-    parsed_url = urlparse(req.url)
-    
-    # Extract headers - ensure they're lowercase
-    headers = []
-    for name, value in req.headers.items():
-        headers.append((name.lower().encode(), value.encode()))
-    
-    # Parse query string
-    query_string = parsed_url.query.encode() if parsed_url.query else b""
-    
-    # Create ASGI scope following ASGI spec exactly
-    scope = {
-        "type": "http",
-        "asgi": {"version": "3.0", "spec_version": "2.3"},
-        "http_version": "1.1",
-        "method": req.method.upper(),
-        "scheme": parsed_url.scheme or "https",
-        "path": unquote(parsed_url.path) or "/",
-        "query_string": query_string,
-        "root_path": "",
-        "headers": headers,
-        "server": (parsed_url.hostname or "localhost", parsed_url.port or 443),
-        "client": ("127.0.0.1", 0),
-        "azure_functions_request": req
-    }
-    
-    return scope
+from src.core.asgi_bridge import ASGIBridge  # noqa: E402
+
+try:
+    from src.core.config import settings
+    startup_timeout = settings.lifespan_startup_timeout
+except Exception:
+    startup_timeout = 30.0
+
+# One bridge per worker: the app lifespan runs once, on the first invocation
+bridge = ASGIBridge(app, startup_timeout=startup_timeout)
+
+
+def _track_bridge_overhead(overhead_ms: float) -> None:
+    try:
+        from src.core.monitoring_service import monitoring_service
+        monitoring_service.track_metric("BridgeOverheadMs", overhead_ms)
+    except Exception:
+        pass
 
-class ASGIHandler:
-    """Handler for ASGI communication with proper state management."""
-    
-    def __init__(self, req: func.HttpRequest):
-        self.req = req
-        self.body = req.get_body()
-        self.body_sent = False
-        self.response_started = False
-        self.response_complete = False
-        self.response_status = 200
-        self.response_headers: list[tuple[bytes, bytes]] = []
-        self.response_body_parts: list[bytes] = []
-        
-    async def receive(self):
-        """ASGI receive callable."""
-        if not self.body_sent:
-            self.body_sent = True
-            return {
-                "type": "http.request",
-                "body": self.body,
-                "more_body": False
-            }
-        
-        # Don't send disconnect immediately - wait for response to complete
-        # This is important for ASGI apps that might call receive() multiple times
-        await asyncio.sleep(0)  # Yield control
-        return {
-            "type": "http.request",
-            "body": b"",
-            "more_body": False
-        }
-    
-    async def send(self, message):
-        """ASGI send callable."""
-        if message["type"] == "http.response.start":
-            self.response_started = True
-            self.response_status = message["status"]
-            self.response_headers = message.get("headers", [])
-            
-        elif message["type"] == "http.response.body":
-            body = message.get("body", b"")
-            if body:
-                self.response_body_parts.append(body)
-            
-            # Check if response is complete
-            if not message.get("more_body", False):
-                self.response_complete = True
-    
-    def get_response(self) -> func.HttpResponse:
-        """Build Azure Functions HTTP response."""
-        headers_dict = {}
-        for name, value in self.response_headers:
-            headers_dict[name.decode()] = value.decode()
-        
-        body = b"".join(self.response_body_parts)
-        
-        return func.HttpResponse(
-            body,
-            status_code=self.response_status,
-            headers=headers_dict
-        )
 
 async def process_http_request_asgi(req: func.HttpRequest) -> func.HttpResponse:
     """
@@ -155,25 +79,16 @@ async def process_http_request_asgi(req: func.HttpRequest) -> func.HttpResponse:
         )
     
     try:
-        # Create ASGI scope
-        scope = await create_asgi_scope(req)
-        
-        # Create handler
-        handler = ASGIHandler(req)
-        
-        # Call the ASGI app
-        await app(scope, handler.receive, handler.send)
-        
-        # Wait a bit for any final sends
-        await asyncio.sleep(0.01)
-        
-        # Get response
-        response = handler.get_response()
+        result = await bridge.handle(
+            req.method, req.url, req.headers, req.get_body(),
+            extra_scope={"azure_functions_request": req}
+        )
+        result.headers["X-Bridge-Overhead-Ms"] = f"{result.overhead_ms:.2f}"
+        _track_bridge_overhead(result.overhead_ms)
         
-        # Log telemetry info
-        logger.info(f"Response status: {response.status_code}")
+        logger.info(f"Response status: {result.status}")
         
-        return response
+        return func.HttpResponse(result.body, status_code=result.status, headers=result.headers)
         
     except Exception as e:
         logger.error(f"Error in ASGI processing: {str(e)}", exc_info=True)
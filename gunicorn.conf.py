@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for the standalone serving mode.
+
+    gunicorn --config gunicorn.conf.py "src.main:create_app()"
+    python -m src.serve --server gunicorn        # same, with CLI overrides
+
+Values come from src.core.config settings (SERVER_* environment variables);
+WEB_CONCURRENCY overrides the worker count.
+"""
+import importlib.util
+
+from src.core.config import settings
+from src.serve import default_workers
+
+bind = f"{settings.server_host}:{settings.server_port}"
+workers = default_workers()
+
+# uvicorn's worker (the standalone uvicorn-worker package when installed); it
+# picks uvloop / httptools automatically and runs the app lifespan per worker
+worker_class = (
+    "uvicorn_worker.UvicornWorker" if importlib.util.find_spec("uvicorn_worker")
+    else "uvicorn.workers.UvicornWorker"
+)
+
+# Import the app once in the master and fork: shared pages, fast worker boot.
+# Pools and background tasks are created per worker by the app lifespan.
+preload_app = True
+
+timeout = settings.server_timeout
+graceful_timeout = settings.server_graceful_timeout
+keepalive = settings.server_keepalive
+
+max_requests = settings.server_max_requests
+max_requests_jitter = settings.server_max_requests // 10
+
+accesslog = None
+errorlog = "-"
@@ -3,6 +3,9 @@ from fastapi import APIRouter
 
 from src.core.monitoring_service import monitoring_service
 from src.models.course_search import (
+    CourseBatchSearchData,
+    CourseBatchSearchRequest,
+    CourseBatchSearchResponse,
     CourseSearchData,
     CourseSearchRequest,
     CourseSearchResponse,
@@ -53,6 +56,42 @@ async def search_courses(request: CourseSearchRequest) -> CourseSearchResponse:
             )
         )
 
+@router.post("/search/batch", response_model=CourseBatchSearchResponse)
+async def search_courses_batch(request: CourseBatchSearchRequest) -> CourseBatchSearchResponse:
+    """
+    批次搜尋相關課程
+    
+    一次搜尋多個技能（例如 gap analysis 回傳的 SkillSearchQueries）：
+    所有查詢共用一次 embedding 呼叫與一次向量查詢，可選擇跨技能去除重複課程。
+    """
+    try:
+        search_service = await get_course_search_service()
+        
+        return await search_service.search_courses_batch(
+            queries=[(q.skill_name, q.search_context) for q in request.queries],
+            limit=request.limit,
+            similarity_threshold=request.similarity_threshold,
+            dedupe=request.dedupe
+        )
+        
+    except Exception as e:
+        monitoring_service.track_event("CourseSearchError", {
+            "error": str(e),
+            "skill_name": ",".join(q.skill_name for q in request.queries)[:200],
+            "search_context": "batch"
+        })
+        
+        # Bubble.io 相容：總是回傳 200 狀態碼
+        return CourseBatchSearchResponse(
+            success=False,
+            data=CourseBatchSearchData(),
+            error=ErrorModel(
+                code="SEARCH_ERROR",
+                message="Batch course search failed",
+                details=str(e)
+            )
+        )
+
 @router.get("/health")
 async def health_check():
     """
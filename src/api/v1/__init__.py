@@ -131,6 +131,12 @@ async def v1_root():
                     "description": "Search for courses using vector similarity",
                     "status": "implemented"
                 },
+                "find_courses_batch": {
+                    "path": "/api/v1/courses/search/batch",
+                    "method": "POST",
+                    "description": "Search courses for several skills in one embedding call and one vector query",
+                    "status": "implemented"
+                },
                 "find_similar_courses": {
                     "path": "/api/v1/courses/similar",
                     "method": "POST",
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 
 from src.core.config import get_settings
 from src.core.monitoring_service import monitoring_service
+from src.core.tracing import span
 from src.models.response import (
     UnifiedResponse,
     create_error_response,
@@ -117,14 +118,13 @@ async def calculate_index_and_analyze_gap(
         )
         
         # Step 1: Calculate index
-        index_start_time = time.time()
-        index_service = IndexCalculationService()
-        index_result = await index_service.calculate_index(
-            resume=request.resume,
-            job_description=request.job_description,
-            keywords=request.keywords
-        )
-        index_end_time = time.time()
+        with span("index_calculation") as index_span:
+            index_service = IndexCalculationService()
+            index_result = await index_service.calculate_index(
+                resume=request.resume,
+                job_description=request.job_description,
+                keywords=request.keywords
+            )
         
         # Extract keyword coverage data
         keyword_coverage = index_result["keyword_coverage"]
@@ -136,21 +136,19 @@ async def calculate_index_and_analyze_gap(
         )
         
         # Step 2: Perform gap analysis
-        gap_service = GapAnalysisService()
-        gap_result = await gap_service.analyze_gap(
-            job_description=request.job_description,
-            resume=request.resume,
-            job_keywords=keywords_list,
-            matched_keywords=keyword_coverage["covered_keywords"],
-            missing_keywords=keyword_coverage["missed_keywords"],
-            language=request.language
-        )
-        gap_end_time = time.time()
+        with span("gap_analysis") as gap_span:
+            gap_service = GapAnalysisService()
+            gap_result = await gap_service.analyze_gap(
+                job_description=request.job_description,
+                resume=request.resume,
+                job_keywords=keywords_list,
+                matched_keywords=keyword_coverage["covered_keywords"],
+                missing_keywords=keyword_coverage["missed_keywords"],
+                language=request.language
+            )
         
         # Track metrics
         processing_time = time.time() - start_time
-        index_time = index_end_time - index_start_time
-        gap_time = gap_end_time - index_end_time
         
         monitoring_service.track_event(
             "IndexCalAndGapAnalysisCompleted",
@@ -164,8 +162,8 @@ async def calculate_index_and_analyze_gap(
                 
                 # Time metrics
                 "total_time_ms": round(processing_time * 1000, 2),
-                "index_calc_time_ms": round(index_time * 1000, 2),
-                "gap_analysis_time_ms": round(gap_time * 1000, 2),
+                "index_calc_time_ms": round(index_span.duration_ms, 2),
+                "gap_analysis_time_ms": round(gap_span.duration_ms, 2),
                 
                 # Data size metrics
                 "resume_length": len(request.resume),
@@ -18,6 +18,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from src.core.config import get_settings
 from src.core.monitoring.storage.failure_storage import failure_storage
 from src.core.monitoring_service import monitoring_service
+from src.core.tracing import current_trace, span, stage_ms
 from src.models.keyword_extraction import (
     KeywordExtractionData,
     KeywordExtractionRequest,
@@ -213,16 +214,22 @@ async def extract_jd_keywords(
     
     try:
         # Validate request using Work Item #346 validator
-        validation_start = time.time()
-        validated_data = await service.validate_input(request.dict())
-        timing_breakdown["validation_ms"] = (time.time() - validation_start) * 1000
+        with span("validation") as validation:
+            validated_data = await service.validate_input(request.dict())
+        timing_breakdown["validation_ms"] = validation.duration_ms
         
         logger.info(f"Request validation passed in {timing_breakdown['validation_ms']:.2f}ms")
         
         # Process keyword extraction using Work Item #343 core logic
-        extraction_start = time.time()
-        result = await service.process(validated_data)
-        timing_breakdown["keyword_extraction_ms"] = (time.time() - extraction_start) * 1000
+        with span("keyword_extraction") as extraction:
+            result = await service.process(validated_data)
+        timing_breakdown["keyword_extraction_ms"] = extraction.duration_ms
+        timing_breakdown["language_detection_ms"] = stage_ms("language_detection")
+        # 服務內部各階段（cache_lookup、prompt_render、llm、parse、standardize…）來自請求 trace
+        trace = current_trace()
+        if trace is not None:
+            for stage, total in trace.stage_totals().items():
+                timing_breakdown.setdefault(f"{stage}_ms", round(total["ms"], 2))
         
         # Calculate total processing time
         timing_breakdown["total_ms"] = (time.time() - request_start) * 1000
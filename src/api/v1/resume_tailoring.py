@@ -3,6 +3,7 @@ Resume Tailoring API endpoints.
 """
 
 import logging
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
@@ -11,14 +12,26 @@ from ...models.api.resume_tailoring import (
     TailoringResponse,
     TailorResumeRequest,
 )
-from ...services.resume_tailoring import ResumeTailoringService
+
+if TYPE_CHECKING:
+    from ...services.resume_tailoring import ResumeTailoringService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tailor-resume")
 
-# Initialize service
-tailoring_service = ResumeTailoringService()
+# Service instance (created on first request, not at app import)
+tailoring_service: "ResumeTailoringService | None" = None
+
+
+def get_tailoring_service() -> "ResumeTailoringService":
+    """Get the shared ResumeTailoringService, creating it on first use."""
+    global tailoring_service
+    if tailoring_service is None:
+        # bs4-based HTML processing is loaded with the service
+        from ...services.resume_tailoring import ResumeTailoringService
+        tailoring_service = ResumeTailoringService()
+    return tailoring_service
 
 
 @router.post(
@@ -61,7 +74,7 @@ async def tailor_resume(
         logger.info(f"Resume tailoring request received for language: {request.options.language}")
         
         # Call service (validation already handled by Pydantic field_validators)
-        result = await tailoring_service.tailor_resume(
+        result = await get_tailoring_service().tailor_resume(
             job_description=request.job_description,
             original_resume=request.original_resume,
             gap_analysis=request.gap_analysis,
@@ -114,13 +127,11 @@ async def tailor_resume(
 async def health_check():
     """Check service health"""
     try:
-        # Check if service is initialized
-        if not tailoring_service:
-            raise Exception("Service not initialized")
+        service = get_tailoring_service()
         
         # Check standardizers
-        en_available = tailoring_service.en_standardizer.is_standardization_available()
-        zh_available = tailoring_service.zh_tw_standardizer.is_standardization_available()
+        en_available = service.en_standardizer.is_standardization_available()
+        zh_available = service.zh_tw_standardizer.is_standardization_available()
         
         return {
             "success": True,
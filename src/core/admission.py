@@ -0,0 +1,217 @@
+"""
+Per-endpoint admission control and load shedding.
+
+Slow endpoints (``/tailor-resume``, ``/index-cal-and-gap-analysis``: several
+seconds of LLM time each) get a concurrency limit per worker from
+``settings.admission_limits``; endpoints without one (course search, cached
+keyword extraction, health) are never queued, so a spike of heavy calls
+cannot crowd them out.
+
+A request over its endpoint's limit waits in that endpoint's queue,
+high-priority requests ahead of low-priority ones (the priority class from
+``rate_limit.priority_scope``: low for ``llm_low_priority_paths`` and for
+requests sent with ``X-Priority: low``, so interactive and background calls
+to the same endpoint compete in one queue).  Before queueing, the expected wait is
+estimated from the queue length and the endpoint's recent service time;
+if the wait plus the service time would not fit the client's deadline
+(``X-Client-Timeout-Ms``) or the wait exceeds the priority's queue timeout,
+the request is rejected at once with 503 and ``Retry-After`` rather than
+timing out after holding a connection.
+"""
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from src.core.config import get_settings
+
+_PRIORITY_RANK = {"high": 0, "low": 1}
+
+
+class OverloadedError(Exception):
+    """The endpoint cannot admit the request within its wait budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """Concurrency limit with a priority-ordered FIFO queue for one endpoint."""
+
+    def __init__(self, name: str, limit: int, default_service_seconds: float = 6.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.limit = max(1, limit)
+        self.default_service_seconds = default_service_seconds
+        self._clock = clock
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        self.service_seconds: float | None = None  # EWMA
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queued_seconds = 0.0
+        self.max_queued_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def expected_service(self) -> float:
+        return self.service_seconds if self.service_seconds is not None else self.default_service_seconds
+
+    def estimated_wait(self, priority: str = "high") -> float:
+        """Expected queueing time for a new request of ``priority``."""
+        if self.in_flight < self.limit and not self._waiters:
+            return 0.0
+        rank = _PRIORITY_RANK.get(priority, 0)
+        ahead = sum(1 for r, _, _ in self._waiters if r <= rank)
+        return (ahead + 1) / self.limit * self.expected_service
+
+    async def acquire(self, priority: str = "high", max_wait: float = 10.0) -> float:
+        """
+        Take a slot, queueing up to ``max_wait`` seconds.
+
+        Returns:
+            Seconds spent queued
+
+        Raises:
+            OverloadedError: The expected or actual wait exceeds ``max_wait``
+        """
+        expected = self.estimated_wait(priority)
+        if expected > max_wait:
+            self.rejected += 1
+            raise OverloadedError(
+                f"{self.name} is at capacity (expected wait {expected:.1f}s, budget {max_wait:.1f}s)",
+                retry_after=expected,
+            )
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        started = self._clock()
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        entry = (_PRIORITY_RANK.get(priority, 0), self._seq, future)
+        self._waiters.append(entry)
+        self._waiters.sort(key=lambda w: (w[0], w[1]))
+        try:
+            done, _ = await asyncio.wait({future}, timeout=max_wait)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not done:
+            self._abandon(entry)
+            self.timed_out += 1
+            raise OverloadedError(f"{self.name} queue timeout after {max_wait:.1f}s",
+                                  retry_after=self.estimated_wait(priority))
+        waited = self._clock() - started
+        self.admitted += 1
+        self.queued_seconds += waited
+        self.max_queued_seconds = max(self.max_queued_seconds, waited)
+        return waited
+
+    def _abandon(self, entry: tuple[int, int, asyncio.Future]) -> None:
+        future = entry[2]
+        if future.done() and not future.cancelled():
+            # 放棄的瞬間剛好被分配到名額：交給下一位
+            self._hand_off()
+            return
+        future.cancel()
+        with contextlib.suppress(ValueError):
+            self._waiters.remove(entry)
+
+    def release(self, service_seconds: float | None = None) -> None:
+        """Free a slot (handing it to the next waiter) and learn the service time."""
+        if service_seconds is not None:
+            self.service_seconds = (service_seconds if self.service_seconds is None
+                                    else 0.8 * self.service_seconds + 0.2 * service_seconds)
+        self._hand_off()
+
+    def _hand_off(self) -> None:
+        while self._waiters:
+            _, _, future = self._waiters.pop(0)
+            if not future.done():
+                future.set_result(None)  # 名額直接轉移，in_flight 不變
+                return
+        self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: str = "high", max_wait: float = 10.0) -> AsyncIterator[float]:
+        """``acquire`` / ``release`` around a request, timing its service."""
+        waited = await self.acquire(priority, max_wait)
+        started = self._clock()
+        try:
+            yield waited
+        finally:
+            self.release(self._clock() - started)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "service_ms": round(self.expected_service * 1000, 1),
+            "avg_queue_ms": round(self.queued_seconds / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "max_queue_ms": round(self.max_queued_seconds * 1000, 1),
+        }
+
+
+def parse_limits(spec: str) -> dict[str, int]:
+    """``"/api/v1/tailor-resume=4,/api/v1/format-resume=6"`` -> ``{prefix: limit}``."""
+    limits = {}
+    for item in spec.split(","):
+        prefix, _, limit = item.strip().partition("=")
+        if prefix and limit.strip().isdigit() and int(limit) > 0:
+            limits[prefix.strip()] = int(limit)
+    return limits
+
+
+class AdmissionController:
+    """Gates per configured path prefix (rebuilt when ``admission_limits`` changes)."""
+
+    def __init__(self):
+        self._spec: str | None = None
+        self._gates: dict[str, AdmissionGate] = {}
+
+    def gate_for(self, path: str) -> AdmissionGate | None:
+        settings = get_settings()
+        if settings.admission_limits != self._spec:
+            self._spec = settings.admission_limits
+            self._gates = {
+                prefix: AdmissionGate(prefix, limit, settings.admission_default_service_seconds)
+                for prefix, limit in parse_limits(self._spec).items()
+            }
+        matches = [prefix for prefix in self._gates if path.startswith(prefix)]
+        return self._gates[max(matches, key=len)] if matches else None
+
+    @staticmethod
+    def wait_budget(gate: AdmissionGate, priority: str, client_timeout: float | None) -> float:
+        """Longest useful queueing time: the priority's timeout, less if the client gives up sooner."""
+        settings = get_settings()
+        budget = (settings.admission_queue_timeout_seconds if priority == "high"
+                  else settings.admission_low_priority_queue_timeout_seconds)
+        if client_timeout is not None:
+            budget = min(budget, client_timeout - gate.expected_service)
+        return max(0.0, budget)
+
+    def stats(self) -> dict[str, Any]:
+        return {prefix: gate.stats() for prefix, gate in self._gates.items()}
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
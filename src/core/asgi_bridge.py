@@ -0,0 +1,256 @@
+"""
+Azure Functions → ASGI bridge.
+
+Runs the ASGI app's ``lifespan`` once per worker (on the first invocation,
+in the worker's event loop) so pools, caches and registries are created at
+startup, then serves each invocation with a minimal scope and no
+post-response sleep.  Response bodies are passed through without copying
+when the app sends a single chunk.
+
+Per-invocation bridge overhead (time spent outside the app: scope and
+response building) is returned with each response and aggregated in
+``stats()``.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_ASGI = {"version": "3.0", "spec_version": "2.3"}
+_CLIENT = ("127.0.0.1", 0)
+
+
+@dataclass
+class BridgeResponse:
+    """HTTP response collected from the ASGI app."""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    app_ms: float = 0.0
+    overhead_ms: float = 0.0
+
+
+@dataclass
+class _BridgeStats:
+    requests: int = 0
+    overhead_ms_total: float = 0.0
+    overhead_ms_max: float = 0.0
+    startup_ms: float | None = None
+    lifespan: str = "pending"  # pending | started | unsupported | failed | stopped
+    errors: list[str] = field(default_factory=list)
+
+
+class _Exchange:
+    """receive/send callables for one HTTP request."""
+
+    __slots__ = ("body", "body_sent", "status", "headers", "parts", "complete")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.body_sent = False
+        self.status = 500
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.parts: list[bytes] = []
+        self.complete = asyncio.Event()
+
+    async def receive(self) -> dict[str, Any]:
+        if not self.body_sent:
+            self.body_sent = True
+            return {"type": "http.request", "body": self.body, "more_body": False}
+        # The whole body was delivered; the "client" goes away once the response is done
+        await self.complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body:
+                self.parts.append(body)
+            if not message.get("more_body", False):
+                self.complete.set()
+
+    def body_bytes(self) -> bytes:
+        if len(self.parts) == 1:
+            return self.parts[0]
+        return b"".join(self.parts)
+
+
+class ASGIBridge:
+    """Serves Azure Functions HTTP invocations through an ASGI app."""
+
+    def __init__(self, app, lifespan: bool = True, startup_timeout: float = 30.0):
+        self.app = app
+        self.lifespan_enabled = lifespan
+        self.startup_timeout = startup_timeout
+        self.state: dict[str, Any] = {}
+        self._stats = _BridgeStats(lifespan="pending" if lifespan else "unsupported")
+        self._startup_lock: asyncio.Lock | None = None
+        self._started = not lifespan
+        self._lifespan_task: asyncio.Task | None = None
+        self._lifespan_queue: asyncio.Queue | None = None
+        self._startup_event: asyncio.Event | None = None
+        self._shutdown_event: asyncio.Event | None = None
+
+    # ------------------------------------------------------------------
+    # Lifespan
+    # ------------------------------------------------------------------
+
+    async def startup(self) -> None:
+        """Run the app's lifespan startup once (no-op when done or unsupported)."""
+        if self._started:
+            return
+        if self._startup_lock is None:
+            self._startup_lock = asyncio.Lock()
+        async with self._startup_lock:
+            if self._started:
+                return
+            start = time.perf_counter()
+            self._lifespan_queue = asyncio.Queue()
+            self._startup_event = asyncio.Event()
+            self._shutdown_event = asyncio.Event()
+            self._lifespan_task = asyncio.create_task(self._run_lifespan())
+            await self._lifespan_queue.put({"type": "lifespan.startup"})
+            try:
+                await asyncio.wait_for(self._startup_event.wait(), self.startup_timeout)
+            except TimeoutError:
+                self._stats.lifespan = "failed"
+                self._stats.errors.append(f"startup timed out after {self.startup_timeout}s")
+                logger.error(f"[ASGIBridge] Lifespan startup timed out after {self.startup_timeout}s")
+            self._stats.startup_ms = (time.perf_counter() - start) * 1000
+            self._started = True
+            logger.info(f"[ASGIBridge] Lifespan {self._stats.lifespan} in {self._stats.startup_ms:.0f}ms")
+
+    async def shutdown(self) -> None:
+        """Run the app's lifespan shutdown (when startup succeeded)."""
+        task = self._lifespan_task
+        if task is None or task.done() or self._stats.lifespan != "started":
+            return
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        try:
+            await asyncio.wait_for(self._shutdown_event.wait(), self.startup_timeout)
+        except TimeoutError:
+            task.cancel()
+        self._stats.lifespan = "stopped"
+
+    async def _run_lifespan(self) -> None:
+        scope = {"type": "lifespan", "asgi": _ASGI, "state": self.state}
+        try:
+            await self.app(scope, self._lifespan_queue.get, self._lifespan_send)
+        except Exception as e:
+            # Apps without lifespan support raise on the unknown scope type
+            if not self._startup_event.is_set():
+                self._stats.lifespan = "unsupported"
+                logger.info(f"[ASGIBridge] App does not support lifespan: {e}")
+            else:
+                logger.error(f"[ASGIBridge] Lifespan error: {e}")
+        finally:
+            self._startup_event.set()
+            self._shutdown_event.set()
+
+    async def _lifespan_send(self, message: dict[str, Any]) -> None:
+        kind = message["type"]
+        if kind == "lifespan.startup.complete":
+            self._stats.lifespan = "started"
+            self._startup_event.set()
+        elif kind == "lifespan.startup.failed":
+            self._stats.lifespan = "failed"
+            self._stats.errors.append(message.get("message", ""))
+            logger.error(f"[ASGIBridge] Lifespan startup failed: {message.get('message', '')}")
+            self._startup_event.set()
+        elif kind in ("lifespan.shutdown.complete", "lifespan.shutdown.failed"):
+            self._shutdown_event.set()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _scope(self, method: str, url: str, headers: Mapping[str, str],
+               extra: Mapping[str, Any] | None) -> dict[str, Any]:
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": _ASGI,
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": parts.scheme or "https",
+            "path": unquote(parts.path) or "/",
+            "raw_path": parts.path.encode() or b"/",
+            "query_string": parts.query.encode(),
+            "root_path": "",
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in headers.items()],
+            "server": (parts.hostname or "localhost", parts.port or (443 if parts.scheme != "http" else 80)),
+            "client": _CLIENT,
+            "state": self.state.copy(),
+        }
+        if extra:
+            scope.update(extra)
+        return scope
+
+    async def handle(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        body: bytes,
+        extra_scope: Mapping[str, Any] | None = None
+    ) -> BridgeResponse:
+        """
+        Serve one request through the app.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            headers: Request headers
+            body: Request body
+            extra_scope: Extra scope keys (e.g. the original Functions request)
+
+        Returns:
+            The collected response with app time and bridge overhead
+        """
+        await self.startup()
+
+        start = time.perf_counter()
+        exchange = _Exchange(body)
+        scope = self._scope(method, url, headers, extra_scope)
+
+        app_start = time.perf_counter()
+        try:
+            await self.app(scope, exchange.receive, exchange.send)
+        finally:
+            exchange.complete.set()
+        app_end = time.perf_counter()
+
+        response = BridgeResponse(
+            status=exchange.status,
+            headers={name.decode("latin-1"): value.decode("latin-1") for name, value in exchange.headers},
+            body=exchange.body_bytes(),
+        )
+        end = time.perf_counter()
+
+        response.app_ms = (app_end - app_start) * 1000
+        response.overhead_ms = ((app_start - start) + (end - app_end)) * 1000
+        self._stats.requests += 1
+        self._stats.overhead_ms_total += response.overhead_ms
+        self._stats.overhead_ms_max = max(self._stats.overhead_ms_max, response.overhead_ms)
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        stats = self._stats
+        return {
+            "requests": stats.requests,
+            "overhead_ms_avg": round(stats.overhead_ms_total / stats.requests, 3) if stats.requests else 0.0,
+            "overhead_ms_max": round(stats.overhead_ms_max, 3),
+            "startup_ms": round(stats.startup_ms, 1) if stats.startup_ms is not None else None,
+            "lifespan": stats.lifespan,
+            "errors": list(stats.errors),
+        }
@@ -0,0 +1,204 @@
+"""
+Cold-start benchmark: app import time, per-module import costs and
+first-request latency, each measured in a fresh interpreter.
+
+    python -m src.core.cold_start                 # report
+    python -m src.core.cold_start --check         # exit 1 when over budget (CI)
+    python -m src.core.cold_start --json out.json --top 30
+
+The child process runs with ``-X importtime``; its stderr is parsed into
+per-module self / cumulative times.  The first request goes through the
+Functions ASGI bridge, so it includes the app lifespan startup exactly as
+the first invocation on a new worker does.
+
+The budget guards against import-time regressions: ``import src.main`` must
+stay under ``max_import_ms`` and must not load any ``forbidden`` module
+(heavy dependencies that are imported lazily on first use, or not at all).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Regression budget (CI runners are slower than a dev machine; keep headroom)
+DEFAULT_BUDGET = {
+    "max_import_ms": 2500.0,
+    "max_first_request_ms": 1500.0,
+    # Must not be loaded by ``import src.main``
+    "forbidden": ["sklearn", "scipy", "asyncpg", "pgvector", "bs4", "opencensus", "applicationinsights"],
+}
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import {target} as target_module
+import_ms = (time.perf_counter() - t0) * 1000
+loaded = sorted({{name.partition(".")[0] for name in sys.modules}})
+
+import asyncio
+from src.core.asgi_bridge import ASGIBridge
+
+async def requests():
+    bridge = ASGIBridge(target_module.app)
+    timings = []
+    for _ in range(2):
+        t = time.perf_counter()
+        response = await bridge.handle("GET", "http://cold-start{path}", {{}}, b"")
+        timings.append(((time.perf_counter() - t) * 1000, response.status))
+    stats = bridge.stats()
+    await bridge.shutdown()
+    return timings, stats
+
+timings, stats = asyncio.run(requests())
+print(json.dumps({{
+    "import_ms": import_ms,
+    "startup_ms": stats["startup_ms"],
+    "first_request_ms": timings[0][0],
+    "first_request_status": timings[0][1],
+    "second_request_ms": timings[1][0],
+    "loaded_modules": loaded,
+}}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ColdStartReport:
+    import_ms: float
+    startup_ms: float | None
+    first_request_ms: float
+    first_request_status: int
+    second_request_ms: float
+    loaded_modules: list[str]
+    imports: list[ImportRecord] = field(default_factory=list)
+
+    def top_imports(self, count: int = 20, by: str = "cumulative_us") -> list[ImportRecord]:
+        return sorted(self.imports, key=lambda record: getattr(record, by), reverse=True)[:count]
+
+    def to_dict(self, top: int = 30) -> dict[str, Any]:
+        data = asdict(self)
+        data["imports"] = [asdict(record) for record in self.top_imports(top)]
+        return data
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parse ``-X importtime`` stderr (``import time: self | cumulative | module``)."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        records.append(ImportRecord(
+            module=stripped,
+            self_us=int(parts[0]),
+            cumulative_us=int(parts[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return records
+
+
+def measure_cold_start(
+    target: str = "src.main",
+    path: str = "/health",
+    env: dict[str, str] | None = None,
+    python: str = sys.executable,
+    timeout: float = 120.0,
+) -> ColdStartReport:
+    """
+    Import ``target`` and serve two requests in a fresh interpreter.
+
+    Args:
+        target: Module exposing the ASGI ``app``
+        path: Request path for the first / second request
+        env: Extra environment variables for the child process
+        python: Interpreter to run
+        timeout: Seconds before the child is killed
+
+    Returns:
+        The cold-start report
+    """
+    child_env = {**os.environ, "MONITORING_ENABLED": "false", **(env or {})}
+    child_env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), child_env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", _CHILD.format(target=target, path=path)],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, env=child_env, timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold-start child failed ({result.returncode}): {result.stderr[-2000:]}")
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return ColdStartReport(**data, imports=parse_importtime(result.stderr))
+
+
+def check_budget(report: ColdStartReport, budget: dict[str, Any] | None = None) -> list[str]:
+    """Budget violations (empty when within budget)."""
+    budget = {**DEFAULT_BUDGET, **(budget or {})}
+    violations = []
+    if report.import_ms > budget["max_import_ms"]:
+        violations.append(f"import took {report.import_ms:.0f}ms (budget {budget['max_import_ms']:.0f}ms)")
+    if report.first_request_ms > budget["max_first_request_ms"]:
+        violations.append(
+            f"first request took {report.first_request_ms:.0f}ms (budget {budget['max_first_request_ms']:.0f}ms)"
+        )
+    loaded = set(report.loaded_modules)
+    for module in budget["forbidden"]:
+        if module in loaded:
+            violations.append(f"{module} is imported at app import")
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure app import time and first-request latency")
+    parser.add_argument("--target", default="src.main", help="Module exposing the ASGI app")
+    parser.add_argument("--path", default="/health", help="Path for the first request")
+    parser.add_argument("--top", type=int, default=20, help="Slowest imports to show")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when over budget")
+    parser.add_argument("--max-import-ms", type=float, default=DEFAULT_BUDGET["max_import_ms"])
+    parser.add_argument("--max-first-request-ms", type=float, default=DEFAULT_BUDGET["max_first_request_ms"])
+    args = parser.parse_args()
+
+    report = measure_cold_start(args.target, args.path)
+    print(f"import {args.target}: {report.import_ms:.0f}ms")
+    if report.startup_ms is not None:
+        print(f"lifespan startup:  {report.startup_ms:.0f}ms")
+    print(f"first request:     {report.first_request_ms:.0f}ms (status {report.first_request_status})")
+    print(f"second request:    {report.second_request_ms:.1f}ms")
+    print("\nSlowest imports (cumulative / self, ms):")
+    for record in report.top_imports(args.top):
+        print(f"  {record.cumulative_us / 1000:8.1f} {record.self_us / 1000:8.1f}  {'  ' * record.depth}{record.module}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report.to_dict(args.top), f, indent=2)
+
+    violations = check_budget(report, {
+        "max_import_ms": args.max_import_ms,
+        "max_first_request_ms": args.max_first_request_ms,
+    })
+    for violation in violations:
+        print(f"✗ {violation}")
+    if not violations:
+        print("✓ Within cold-start budget")
+    return 1 if violations and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,6 +36,10 @@ class Settings(BaseSettings):
         description="Embedding API key - supports both EMBEDDING_API_KEY and AZURE_OPENAI_EMBEDDING_API_KEY"
     )
     embedding_model: str = "text-embedding-3-large"
+    embedding_encoding_format: str = Field(
+        default="base64",
+        description="Embedding wire format: 'base64' (decoded with np.frombuffer) or 'float' (JSON numbers)"
+    )
     
     # Course embedding settings (for course search)
     course_embedding_endpoint: str = Field(
@@ -49,6 +53,10 @@ class Settings(BaseSettings):
         description="Course embedding API key - supports both COURSE_EMBEDDING_API_KEY and AZURE_OPENAI_COURSE_EMBEDDING_API_KEY"
     )
     course_embedding_model: str = "text-embedding-3-small"
+    course_embedding_dimensions: int = Field(
+        default=0,
+        description="Course query embedding dimensions (Matryoshka truncation, 0 = model default); must match the searched column"
+    )
     
     # Azure OpenAI settings (for GPT-4o-2 model)
     azure_openai_endpoint: str = Field(
@@ -71,6 +79,106 @@ class Settings(BaseSettings):
     # Gap Analysis settings
     gap_analysis_temperature: float = 0.7
     gap_analysis_max_tokens: int = 2000
+    gap_analysis_input_token_budget: int = Field(
+        default=12000,
+        description="Token budget for gap analysis prompt inputs (JD + resume + keywords, 0 = no trimming)"
+    )
+    gap_analysis_deadline_seconds: float = Field(
+        default=120.0,
+        description="Deadline shared by all gap analysis retry layers (0 = none)"
+    )
+    
+    # Resume tailoring settings
+    resume_tailoring_input_token_budget: int = Field(
+        default=16000,
+        description="Token budget for resume tailoring prompt inputs (0 = no trimming)"
+    )
+    
+    # Course search settings
+    course_search_deadline_seconds: float = Field(
+        default=20.0,
+        description="Deadline shared by all course search retry layers (0 = none)"
+    )
+    course_db_pool_min_size: int = Field(
+        default=1,
+        description="Minimum connections in the course search Postgres pool"
+    )
+    course_db_pool_max_size: int = Field(
+        default=5,
+        description="Maximum connections in the course search Postgres pool"
+    )
+    course_db_command_timeout: float = Field(
+        default=30.0,
+        description="Per-query timeout (seconds) for course search SQL"
+    )
+    course_db_statement_cache_size: int = Field(
+        default=100,
+        description="Prepared statements cached per pooled connection"
+    )
+    course_db_max_inactive_lifetime: float = Field(
+        default=300.0,
+        description="Seconds before an idle pooled connection is closed (0 = never)"
+    )
+    course_vector_column: str = Field(
+        default="embedding",
+        description="Courses column searched by pgvector (e.g. 'embedding_half' after migrate_vector_storage)"
+    )
+    course_vector_type: str = Field(
+        default="vector",
+        description="pgvector type of course_vector_column: 'vector' or 'halfvec'"
+    )
+    course_search_backend: str = Field(
+        default="pgvector",
+        description="Vector search engine: 'pgvector' (SQL scan) or 'memory' (in-process NumPy/HNSW index)"
+    )
+    course_index_quantization: str = Field(
+        default="float32",
+        description="In-process index storage: 'float32' or 'int8' (per-row scale, ~4x smaller)"
+    )
+    course_index_hnsw: bool = Field(
+        default=False,
+        description="Build an HNSW graph for the in-process index (requires hnswlib)"
+    )
+    course_index_refresh_interval: float = Field(
+        default=300.0,
+        description="Seconds between incremental index refreshes from Postgres (0 = load once)"
+    )
+    course_metadata_snapshot: bool = Field(
+        default=True,
+        description="Serve course display rows and popular categories from an in-memory snapshot"
+    )
+    course_metadata_refresh_interval: float = Field(
+        default=300.0,
+        description="Seconds between incremental metadata snapshot refreshes (0 = load once)"
+    )
+    course_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Seconds a cached course search result is served as fresh"
+    )
+    course_cache_stale_seconds: float = Field(
+        default=3600.0,
+        description="Seconds past the TTL a result is served immediately while refreshing in the background"
+    )
+    course_cache_stale_if_error_seconds: float = Field(
+        default=86400.0,
+        description="Seconds past the TTL a result is served when the refresh fails"
+    )
+    course_cache_warm_skills: str = Field(
+        default="",
+        description="Comma-separated skill names always pre-loaded into the cache, on top of the most-requested skills"
+    )
+    course_cache_warm_top_n: int = Field(
+        default=50,
+        description="Pre-load the cache with this many skills with the most recorded searches (0 = seed list only)"
+    )
+    course_cache_request_counts_path: str = Field(
+        default="",
+        description="JSON file keeping per-skill search counts across restarts (empty = src/data/course_cache/request_counts.json)"
+    )
+    course_cache_warm_concurrency: int = Field(
+        default=4,
+        description="Concurrent searches while warming the course search cache"
+    )
     
     # GPT-4.1 mini Japan East Configuration (High Performance)
     gpt41_mini_japaneast_endpoint: str = Field(
@@ -137,7 +245,227 @@ class Settings(BaseSettings):
         validation_alias="ENABLE_LLM_MODEL_HEADER",
         description="Allow HTTP header (X-LLM-Model) to override LLM model selection"
     )
+
+    # LLM routing across deployments (circuit breakers / hedging)
+    llm_router_enabled: bool = Field(
+        default=True,
+        description="Route LLM calls through the failover router (the selected model is the primary)"
+    )
+    llm_routing: str = Field(
+        default="primary",
+        description="'primary' (selected model first) or 'latency' (fastest healthy deployment first, for config defaults only)"
+    )
+    llm_hedge_apis: str = Field(
+        default="keywords",
+        description="Comma-separated api names whose LLM calls are hedged to the other deployment"
+    )
+    llm_hedge_percentile: float = Field(
+        default=95.0,
+        description="Hedge once the primary is slower than this percentile of its recent latency"
+    )
+    llm_hedge_min_delay_ms: float = Field(
+        default=300.0,
+        description="Lower bound of the hedge delay"
+    )
+    llm_hedge_max_delay_ms: float = Field(
+        default=4000.0,
+        description="Upper bound of the hedge delay (also used until enough latency samples exist)"
+    )
+    llm_breaker_error_rate: float = Field(
+        default=0.5,
+        description="Open a deployment's circuit when this share of calls in the window fails"
+    )
+    llm_breaker_slow_call_ms: float = Field(
+        default=15000.0,
+        description="Calls slower than this count as slow; the circuit also opens when half the window is slow"
+    )
+    llm_breaker_min_calls: int = Field(
+        default=10,
+        description="Calls in the window before the breaker evaluates its rates"
+    )
+    llm_breaker_window_seconds: float = Field(
+        default=60.0,
+        description="Sliding window of the circuit breaker"
+    )
+    llm_breaker_open_seconds: float = Field(
+        default=30.0,
+        description="How long an open circuit rejects calls before letting a probe through"
+    )
+
+    # Client-side Azure OpenAI quota (per worker: divide the deployment quota by the worker count)
+    gpt4o_quota_tpm: int = Field(default=0, description="GPT-4o-2 tokens per minute (0 = no client-side limit)")
+    gpt4o_quota_rpm: int = Field(default=0, description="GPT-4o-2 requests per minute (0 = no client-side limit)")
+    gpt41_mini_quota_tpm: int = Field(default=0, description="GPT-4.1 mini tokens per minute (0 = no client-side limit)")
+    gpt41_mini_quota_rpm: int = Field(default=0, description="GPT-4.1 mini requests per minute (0 = no client-side limit)")
+    embedding_quota_tpm: int = Field(default=0, description="Embedding deployment tokens per minute (0 = no client-side limit)")
+    embedding_quota_rpm: int = Field(default=0, description="Embedding deployment requests per minute (0 = no client-side limit)")
+    course_embedding_quota_tpm: int = Field(default=0, description="Course embedding tokens per minute (0 = no client-side limit)")
+    course_embedding_quota_rpm: int = Field(default=0, description="Course embedding requests per minute (0 = no client-side limit)")
+    llm_quota_max_wait_seconds: float = Field(
+        default=10.0,
+        description="Longest a high-priority call queues for quota before failing with 429"
+    )
+    llm_quota_low_priority_max_wait_seconds: float = Field(
+        default=0.5,
+        description="Longest a low-priority call queues for quota before failing fast"
+    )
+    llm_low_priority_paths: str = Field(
+        default="/api/v1/courses/search/batch",
+        description="Comma-separated path prefixes whose upstream calls are low priority under quota pressure"
+    )
+
+    # Standardization dictionary snapshot
+    standardization_snapshot_path: str = Field(
+        default="",
+        description="Compiled dictionary snapshot (empty = src/data/standardization/standardization.snapshot)"
+    )
+    standardization_reload_interval: float = Field(
+        default=5.0,
+        description="Seconds between checks for changed dictionary files (hot reload)"
+    )
+    
+    # Prompt registry
+    prompt_reload_interval: float = Field(
+        default=0.0,
+        description="Seconds between checks for changed prompt files (0 = scan once at startup)"
+    )
     
+    # Prompt token counting (tiktoken, offline cache)
+    token_encoding: str = Field(
+        default="o200k_base",
+        description="tiktoken encoding used for prompt token counting"
+    )
+    tiktoken_cache_dir: str = Field(
+        default="",
+        description="tiktoken encoding cache (empty = src/data/tiktoken, filled by python -m src.core.token_budget)"
+    )
+    
+    # Worker lifespan (startup / shutdown)
+    startup_warm_course_search: bool = Field(
+        default=True,
+        description="Create the course search pool in the background at worker startup"
+    )
+    startup_warm_llm_endpoints: bool = Field(
+        default=True,
+        description="Resolve and TLS-handshake the LLM / embedding endpoints in the background at startup"
+    )
+    readiness_check_timeout: float = Field(
+        default=2.0,
+        description="Seconds each /health/ready check may take before it counts as failed"
+    )
+    lifespan_startup_timeout: float = Field(
+        default=30.0,
+        description="Seconds the Functions bridge waits for app startup before serving anyway"
+    )
+
+    # Standalone server (python -m src.serve)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = Field(
+        default=0,
+        description="Worker processes (0 = one per available CPU; WEB_CONCURRENCY also works)"
+    )
+    server_timeout: int = Field(
+        default=180,
+        description="Seconds a gunicorn worker may be silent before it is restarted"
+    )
+    server_graceful_timeout: int = Field(
+        default=30,
+        description="Seconds in-flight requests get to finish on shutdown / reload"
+    )
+    server_drain_seconds: float = Field(
+        default=5.0,
+        description="Seconds a worker reports draining on /health/ready after SIGTERM before it stops accepting connections"
+    )
+    server_keepalive: int = Field(
+        default=75,
+        description="Seconds to keep idle client connections open (above the load balancer's idle timeout)"
+    )
+    server_max_requests: int = Field(
+        default=0,
+        description="Recycle a worker after this many requests (0 = never; jittered by 10%)"
+    )
+
+    # Per-request stage tracing (X-Server-Timing header, /debug/traces)
+    tracing_enabled: bool = Field(
+        default=True,
+        description="Time pipeline stages per request and return them in X-Server-Timing"
+    )
+    trace_buffer_size: int = Field(
+        default=200,
+        description="Finished traces kept in memory for /debug/traces"
+    )
+    trace_slow_request_ms: float = Field(
+        default=10000.0,
+        description="Export the full trace as a RequestTrace monitoring event above this duration (0 = never)"
+    )
+
+    # Sampling profiler (/debug/profile, X-Profile request header)
+    profiler_token: str = Field(
+        default="",
+        description="Shared secret for the profiler (X-Profiler-Token header); empty disables profiling"
+    )
+    profiler_max_seconds: float = Field(
+        default=60.0,
+        description="Longest profiling session /debug/profile accepts"
+    )
+    profiler_interval_ms: float = Field(
+        default=5.0,
+        description="Default stack sampling interval"
+    )
+    profiler_slow_callback_ms: float = Field(
+        default=100.0,
+        description="Event loop stalls at least this long are reported as slow callbacks with their stacks"
+    )
+
+    # CPU-bound stages off the event loop / loop lag monitoring
+    cpu_offload_mode: str = Field(
+        default="thread",
+        description="Pool for CPU-bound stages (HTML parsing, marker fixing, language analysis): 'thread', 'process' or 'off'"
+    )
+    cpu_offload_workers: int = Field(
+        default=0,
+        description="CPU offload pool size (0 = min(4, CPU count))"
+    )
+    cpu_offload_min_chars: int = Field(
+        default=5000,
+        description="Inputs shorter than this run inline (the pool hand-off costs more)"
+    )
+    loop_monitor_enabled: bool = Field(
+        default=True,
+        description="Measure event loop lag and report callbacks that block it"
+    )
+    loop_monitor_interval_ms: float = Field(
+        default=50.0,
+        description="Event loop heartbeat interval"
+    )
+    loop_block_threshold_ms: float = Field(
+        default=100.0,
+        description="Loop stalls at least this long are logged with the blocking stack"
+    )
+
+    # Admission control / load shedding (per worker)
+    admission_enabled: bool = Field(
+        default=True,
+        description="Queue or shed POST requests to endpoints listed in admission_limits"
+    )
+    admission_limits: str = Field(
+        default="/api/v1/tailor-resume=4,/api/v1/index-cal-and-gap-analysis=4,/api/v1/format-resume=6,/api/v1/courses/search/batch=4",
+        description="Comma-separated path prefix=max concurrent requests; other endpoints are not limited"
+    )
+    admission_queue_timeout_seconds: float = Field(
+        default=10.0,
+        description="Longest a high-priority request queues before 503"
+    )
+    admission_low_priority_queue_timeout_seconds: float = Field(
+        default=2.0,
+        description="Longest a low-priority request (llm_low_priority_paths or X-Priority: low) queues before 503"
+    )
+    admission_default_service_seconds: float = Field(
+        default=6.0,
+        description="Assumed service time of a limited endpoint until one has completed (wait estimate)"
+    )
+
     # Security settings
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
@@ -170,6 +498,11 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in self.cors_origins.split(",")]
         return ["*"]
     
+    @property
+    def course_cache_warm_skills_list(self) -> list[str]:
+        """Skill names to warm the course search cache with."""
+        return [skill.strip() for skill in self.course_cache_warm_skills.split(",") if skill.strip()]
+    
     @property 
     def cors_allow_methods_list(self):
         """Convert CORS methods string to list for FastAPI."""
@@ -0,0 +1,54 @@
+"""
+Deferred imports for heavy modules.
+
+Package ``__init__`` files and modules with import-time singletons export
+names through a PEP 562 ``__getattr__`` so the import (and any
+construction) happens on first access instead of at app import::
+
+    __getattr__, __dir__ = lazy_exports(__name__, globals(), {
+        "KeywordExtractionService": ".keyword_extraction",
+    })
+
+The resolved value is cached in the module globals, so later accesses are
+plain attribute lookups.  ``python -m src.core.cold_start`` measures the
+effect.
+"""
+import importlib
+from collections.abc import Callable
+from typing import Any
+
+
+def lazy_exports(
+    module_name: str,
+    module_globals: dict[str, Any],
+    exports: dict[str, str | Callable[[], Any]],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Build ``__getattr__`` / ``__dir__`` for a module with lazy attributes.
+
+    Args:
+        module_name: ``__name__`` of the exporting module
+        module_globals: ``globals()`` of the exporting module (resolved values are cached here)
+        exports: name -> module path (relative to ``module_name``'s package) to
+            import the name from, or a zero-argument factory
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    package = module_name if module_globals.get("__path__") is not None else module_name.rpartition(".")[0]
+
+    def _getattr(name: str) -> Any:
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        if callable(target):
+            value = target()
+        else:
+            value = getattr(importlib.import_module(target, package), name)
+        module_globals[name] = value
+        return value
+
+    def _dir() -> list[str]:
+        return sorted(set(module_globals) | set(exports))
+
+    return _getattr, _dir
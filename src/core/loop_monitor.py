@@ -0,0 +1,133 @@
+"""
+Always-on event loop lag monitor.
+
+A heartbeat coroutine wakes every ``interval`` and records how late it woke
+(loop lag).  A watchdog thread checks the heartbeat; when the loop has not
+come back for ``block_threshold_ms`` it captures the loop thread's Python
+stack while the blocking callback is still running.  When the loop recovers
+the stall is logged and exported as an ``EventLoopBlocked`` event with its
+duration and that stack, so the report says which code blocked and for how
+long.
+
+Unlike ``POST /debug/profile`` this costs one stack capture per stall and
+runs for the worker's lifetime (started in the app lifespan).
+"""
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+from types import CodeType
+from typing import Any
+
+from src.core.profiler import IDLE_FRAME, sample_stack
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Heartbeat on the loop plus a watchdog thread that names the blocking code."""
+
+    def __init__(self, interval: float = 0.05, block_threshold_ms: float = 100.0, keep: int = 50):
+        self.interval = interval
+        self.block_threshold_ms = block_threshold_ms
+        self.lags_ms: deque[float] = deque(maxlen=1200)
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=keep)
+        self.blocked_count = 0
+        self._labels: dict[CodeType, str] = {}
+        self._loop_thread: int | None = None
+        self._beat_ns = 0
+        self._stall_stack: tuple[str, ...] | None = None
+        self._stop = threading.Event()
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start on the running loop (no-op when already running)."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat_ns = time.perf_counter_ns()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _heartbeat(self) -> None:
+        interval_ns = int(self.interval * 1e9)
+        while True:
+            expected = time.perf_counter_ns() + interval_ns
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter_ns()
+            self._beat_ns = now
+            lag_ms = max(0.0, (now - expected) / 1e6)
+            self.lags_ms.append(lag_ms)
+            stack, self._stall_stack = self._stall_stack, None
+            if lag_ms >= self.block_threshold_ms:
+                self._report(lag_ms, stack)
+
+    def _watch(self) -> None:
+        # 心跳逾時時擷取迴圈執行緒的堆疊（阻塞的程式碼仍在執行中）
+        limit_ns = int((self.interval * 1000 + self.block_threshold_ms) * 1e6)
+        check = max(self.block_threshold_ms / 2000, 0.005)
+        while not self._stop.wait(check):
+            if self._stall_stack is None and time.perf_counter_ns() - self._beat_ns > limit_ns:
+                stack = sample_stack(self._loop_thread, self._labels)
+                if stack and stack != (IDLE_FRAME,):
+                    self._stall_stack = stack
+
+    def _report(self, lag_ms: float, stack: tuple[str, ...] | None) -> None:
+        self.blocked_count += 1
+        blocked_in = stack[-1] if stack else "unknown"
+        stall = {
+            "at": time.time(),
+            "lag_ms": round(lag_ms, 1),
+            "blocked_in": blocked_in,
+            "stack": ";".join(stack[-12:]) if stack else None,
+        }
+        self.stalls.append(stall)
+        logger.warning(f"[LoopMonitor] Event loop blocked for {lag_ms:.0f}ms in {blocked_in}")
+        from src.core.monitoring_service import monitoring_service
+
+        monitoring_service.track_event("EventLoopBlocked", stall)
+
+    def stats(self) -> dict[str, Any]:
+        lags = sorted(self.lags_ms)
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 1),
+            "block_threshold_ms": self.block_threshold_ms,
+            "lag_ms": {
+                "p50": round(lags[len(lags) // 2], 2) if lags else None,
+                "p99": round(lags[int(len(lags) * 0.99)], 2) if lags else None,
+                "max": round(lags[-1], 2) if lags else None,
+            },
+            "blocked_count": self.blocked_count,
+            "recent_stalls": list(self.stalls)[-10:],
+        }
+
+
+_monitor: LoopLagMonitor | None = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    global _monitor
+    if _monitor is None:
+        from src.core.config import get_settings
+
+        settings = get_settings()
+        _monitor = LoopLagMonitor(settings.loop_monitor_interval_ms / 1000, settings.loop_block_threshold_ms)
+    return _monitor
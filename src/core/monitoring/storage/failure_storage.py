@@ -10,6 +10,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from src.core.offload import run_cpu
+
+
+def _write_record(file_path: Path, record: dict[str, Any]) -> None:
+    file_path.parent.mkdir(exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+
 
 class FailureStorage:
     """
@@ -50,8 +58,8 @@ class FailureStorage:
             "common_failure_patterns": {}
         }
         
-        # Load existing failures if any
-        self._load_existing_failures()
+        # Existing failures are loaded from disk on first use (not at import)
+        self._loaded = False
     
     async def store_failure(
         self,
@@ -74,6 +82,7 @@ class FailureStorage:
         Returns:
             Failure ID for reference
         """
+        self._ensure_loaded()
         # Truncate JD to 500 characters
         truncated_jd = job_description[:500] if len(job_description) > 500 else job_description
         
@@ -112,12 +121,10 @@ class FailureStorage:
         try:
             # Create daily directory
             date_dir = self.storage_path / datetime.now(timezone.utc).strftime("%Y%m%d")
-            date_dir.mkdir(exist_ok=True)
             
-            # Save failure record
+            # Save failure record (serialization and file I/O off the event loop)
             file_path = date_dir / f"{failure_record['id']}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(failure_record, f, ensure_ascii=False, indent=2)
+            await run_cpu(_write_record, file_path, failure_record, isolated=True)
         except Exception as e:
             # Log error but don't fail the main process
             from src.core.monitoring_service import monitoring_service
@@ -157,6 +164,7 @@ class FailureStorage:
         Returns:
             List of recent failure records
         """
+        self._ensure_loaded()
         if category and category in self.failure_categories:
             failures = list(self.failure_categories[category])
         else:
@@ -172,6 +180,7 @@ class FailureStorage:
         Returns:
             Dictionary containing pattern analysis
         """
+        self._ensure_loaded()
         patterns = {
             "by_category": {},
             "by_language": {},
@@ -227,6 +236,7 @@ class FailureStorage:
         Args:
             days: Number of days to keep
         """
+        self._ensure_loaded()
         cutoff_date = datetime.now(timezone.utc).timestamp() - (days * 86400)
         
         # Clear from memory
@@ -249,8 +259,13 @@ class FailureStorage:
                     # Skip non-date directories
                     pass
     
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._load_existing_failures()
+    
     def _load_existing_failures(self):
-        """Load existing failures from disk on startup."""
+        """Load recent failures from disk (once, on first use)."""
         try:
             # Load only recent failures (last 2 days)
             cutoff_date = datetime.now(timezone.utc).timestamp() - (2 * 86400)
@@ -295,6 +310,7 @@ class FailureStorage:
         Returns:
             Dictionary containing full analysis
         """
+        self._ensure_loaded()
         return {
             "summary": {
                 "total_failures": self.stats["total_failures"],
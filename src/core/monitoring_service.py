@@ -7,17 +7,6 @@ import sys
 from datetime import datetime, timezone
 from typing import Any
 
-from opencensus.ext.azure import metrics_exporter
-from opencensus.ext.azure.log_exporter import AzureLogHandler
-from opencensus.ext.azure.trace_exporter import AzureExporter
-from opencensus.stats import aggregation as aggregation_module
-from opencensus.stats import measure as measure_module
-from opencensus.stats import stats as stats_module
-from opencensus.stats import view as view_module
-from opencensus.tags import tag_key as tag_key_module
-from opencensus.trace import tracer as tracer_module
-from opencensus.trace.samplers import ProbabilitySampler
-
 logger = logging.getLogger(__name__)
 
 
@@ -172,6 +161,9 @@ class MonitoringService:
 
     def _setup_logging(self):
         """Setup Azure logging handler."""
+        # opencensus is only imported when monitoring is enabled
+        from opencensus.ext.azure.log_exporter import AzureLogHandler
+
         handler = AzureLogHandler(
             connection_string=f"InstrumentationKey={self.instrumentation_key}"
         )
@@ -184,6 +176,10 @@ class MonitoringService:
     
     def _setup_tracing(self):
         """Setup distributed tracing."""
+        from opencensus.ext.azure.trace_exporter import AzureExporter
+        from opencensus.trace import tracer as tracer_module
+        from opencensus.trace.samplers import ProbabilitySampler
+
         self.tracer = tracer_module.Tracer(
             exporter=AzureExporter(
                 connection_string=f"InstrumentationKey={self.instrumentation_key}"
@@ -193,6 +189,11 @@ class MonitoringService:
     
     def _setup_metrics(self):
         """Setup custom metrics exporter."""
+        from opencensus.ext.azure import metrics_exporter
+        from opencensus.stats import measure as measure_module
+        from opencensus.stats import stats as stats_module
+        from opencensus.tags import tag_key as tag_key_module
+
         self.stats = stats_module.stats
         self.view_manager = self.stats.view_manager
         self.stats_recorder = self.stats.stats_recorder
@@ -227,6 +228,9 @@ class MonitoringService:
     
     def _create_views(self):
         """Create and register metric views."""
+        from opencensus.stats import aggregation as aggregation_module
+        from opencensus.stats import view as view_module
+
         # Request duration view
         duration_view = view_module.View(
             "request_duration_distribution",
@@ -0,0 +1,98 @@
+"""
+Run CPU-bound stages off the event loop.
+
+HTML parsing (BeautifulSoup), marker fixing, character-level language
+analysis and OCR text clean-up are synchronous; on a large resume they hold
+the loop for tens of milliseconds and every other request on the worker
+waits.  ``run_cpu`` hands such a call to a worker pool once the input is
+larger than ``settings.cpu_offload_min_chars`` and runs it inline below
+that (the hand-off costs more than the work)::
+
+    html = await run_cpu(self.html_processor.normalize_to_html, text, size=len(text))
+
+``settings.cpu_offload_mode``:
+
+- ``thread`` (default): a thread pool.  The GIL is still shared, but the
+  interpreter switches threads every few milliseconds, so the loop keeps
+  serving while the stage runs.  Context variables (tracing spans) carry
+  over.
+- ``process``: calls marked ``isolated=True`` (picklable, and the result is
+  all the caller needs) run in a process pool for real parallelism; the
+  rest still use the thread pool.
+- ``off``: always inline.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from src.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_thread_pool: ThreadPoolExecutor | None = None
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def _workers() -> int:
+    workers = get_settings().cpu_offload_workers
+    return workers if workers > 0 else min(4, os.cpu_count() or 1)
+
+
+def _get_pool(isolated: bool) -> Executor:
+    global _thread_pool, _process_pool
+    if isolated and get_settings().cpu_offload_mode == "process":
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=_workers())
+        return _process_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="cpu-offload")
+    return _thread_pool
+
+
+def should_offload(size: int | None) -> bool:
+    """True when a call of this input size goes to the pool (``None`` = always, when enabled)."""
+    settings = get_settings()
+    if settings.cpu_offload_mode == "off":
+        return False
+    return size is None or size >= settings.cpu_offload_min_chars
+
+
+async def run_cpu(
+    func: Callable[..., T],
+    *args: Any,
+    size: int | None = None,
+    isolated: bool = False,
+    **kwargs: Any,
+) -> T:
+    """
+    Run ``func(*args, **kwargs)`` in the CPU pool when ``size`` is over the threshold.
+
+    Args:
+        size: Input size in characters (``None`` always offloads)
+        isolated: ``func`` and its arguments are picklable and it has no side
+            effects the caller relies on (eligible for the process pool)
+    """
+    if not should_offload(size):
+        return func(*args, **kwargs)
+    pool = _get_pool(isolated)
+    loop = asyncio.get_running_loop()
+    if isinstance(pool, ProcessPoolExecutor):
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(pool, functools.partial(ctx.run, func, *args, **kwargs))
+
+
+def shutdown_cpu_pools() -> None:
+    """Release the pools (app shutdown); they are recreated on next use."""
+    global _thread_pool, _process_pool
+    for pool in (_thread_pool, _process_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _thread_pool = _process_pool = None
@@ -0,0 +1,53 @@
+"""
+Background periodic tasks for in-process snapshots.
+
+Snapshot owners (course vector index, course metadata) refresh from the
+database on a fixed interval; a failed run is logged and the previous
+snapshot keeps serving.
+"""
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs ``func`` every ``interval`` seconds on the event loop until stopped."""
+
+    def __init__(self, func: Callable[[], Awaitable], interval: float, name: str):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self.runs = 0
+        self.last_error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the loop (no-op when already running or ``interval <= 0``)."""
+        if self.interval <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+                self.runs += 1
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"[{self.name}] Refresh failed, keeping previous snapshot: {e}")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
@@ -0,0 +1,301 @@
+"""
+Statistical profiler for a live worker.
+
+A daemon thread samples the event loop thread's Python stack every
+``interval`` seconds with ``sys._current_frames()`` (no signals, nothing
+installed in the profiled thread, safe to run in production), while a
+coroutine on the loop measures event loop lag.  Loop stalls at least
+``slow_callback_ms`` long are reported as slow callbacks together with the
+stacks sampled during the stall, which is how blocking code running on the
+loop (a synchronous telemetry flush, a large ``json.dumps``) is caught in
+the act.
+
+Sessions are started by ``POST /debug/profile`` (time-boxed) or by a single
+request sent with ``X-Profile: 1``; both require the ``X-Profiler-Token``
+header to match ``settings.profiler_token``.  Only one session runs per
+worker at a time.  The sampler sees the whole loop thread, so concurrent
+requests on the same worker show up in a request-scoped profile too.
+
+Output formats: a JSON report (top functions, loop lag, slow callbacks),
+collapsed stacks (``flamegraph.pl`` / speedscope import) and the speedscope
+file format.
+"""
+import asyncio
+import contextlib
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from types import CodeType, FrameType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+IDLE_FRAME = "(idle)"
+_MAX_DEPTH = 128
+# Timeline kept for attributing loop stalls (about 50 s at 5 ms)
+_TIMELINE_SIZE = 10_000
+
+
+def _frame_label(code: CodeType, cache: dict[CodeType, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        path = code.co_filename
+        for prefix in sorted((p for p in sys.path if p), key=len, reverse=True):
+            if path.startswith(prefix + os.sep):
+                path = path[len(prefix) + 1:]
+                break
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({path}:{code.co_firstlineno})".replace(";", ":")
+        cache[code] = label
+    return label
+
+
+# 啟動事件迴圈的 frame：uvloop 的迴圈以 C 實作，閒置時（沒有協程或 callback
+# 在執行）取樣到的最上層 frame 就是這些
+_LOOP_RUNNER_FRAMES = (
+    ("run", os.path.join("asyncio", "runners.py")),          # asyncio.run / Runner.run
+    ("run_forever", os.path.join("asyncio", "base_events.py")),
+    ("run_until_complete", os.path.join("asyncio", "base_events.py")),
+    ("run", os.path.join("uvloop", "__init__.py")),          # uvloop.run
+)
+
+
+def _is_idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    # asyncio 等待 I/O（selector.select）時迴圈閒置
+    if code.co_name in ("select", "poll", "_poll") and code.co_filename.endswith("selectors.py"):
+        return True
+    return any(
+        code.co_name == name and code.co_filename.endswith(path) for name, path in _LOOP_RUNNER_FRAMES
+    )
+
+
+def sample_stack(thread_id: int, labels: dict[CodeType, str]) -> tuple[str, ...] | None:
+    """Current Python stack of ``thread_id``, root first (``(IDLE_FRAME,)`` while waiting for I/O)."""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    if _is_idle(frame):
+        return (IDLE_FRAME,)
+    stack = []
+    while frame is not None and len(stack) < _MAX_DEPTH:
+        stack.append(_frame_label(frame.f_code, labels))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class Profile:
+    """Samples and loop lag from one finished session."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.lags_ms: list[float] = []
+        self.slow_callbacks: list[dict[str, Any]] = []
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    @property
+    def idle_ratio(self) -> float:
+        total = self.samples
+        return self.stacks.get((IDLE_FRAME,), 0) / total if total else 0.0
+
+    def collapsed(self) -> str:
+        """``frame;frame;leaf count`` lines, busiest first."""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name: str = "worker") -> dict[str, Any]:
+        """Speedscope ``sampled`` profile (one weighted sample per distinct stack)."""
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.most_common():
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "airesumeadvisor-profiler",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def top_functions(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Busiest leaf (self) and inclusive functions, idle excluded."""
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            if stack == (IDLE_FRAME,):
+                continue
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        busy = sum(total for stack, total in self.stacks.items() if stack != (IDLE_FRAME,)) or 1
+        return [
+            {"function": label, "self_samples": count, "self_pct": round(100 * count / busy, 1),
+             "total_pct": round(100 * total_counts[label] / busy, 1)}
+            for label, count in self_counts.most_common(limit)
+        ]
+
+    def report(self, limit: int = 20) -> dict[str, Any]:
+        lags = sorted(self.lags_ms)
+        return {
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "idle_ratio": round(self.idle_ratio, 3),
+            "loop_lag_ms": {
+                "count": len(lags),
+                "p50": round(lags[len(lags) // 2], 2) if lags else None,
+                "p95": round(lags[int(len(lags) * 0.95)], 2) if lags else None,
+                "max": round(lags[-1], 2) if lags else None,
+            },
+            "slow_callbacks": self.slow_callbacks,
+            "top_functions": self.top_functions(limit),
+        }
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread and measures loop lag."""
+
+    def __init__(self, interval: float = 0.005, slow_callback_ms: float = 100.0,
+                 thread_id: int | None = None):
+        self.interval = interval
+        self.slow_callback_ms = slow_callback_ms
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.profile = Profile(interval)
+        self._timeline: deque[tuple[int, tuple[str, ...]]] = deque(maxlen=_TIMELINE_SIZE)
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lag_task: asyncio.Task | None = None
+        self._started = 0.0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            stack = sample_stack(self.thread_id, self._labels)
+            if stack is not None:
+                self.profile.stacks[stack] += 1
+                self._timeline.append((time.perf_counter_ns(), stack))
+
+    async def _measure_lag(self) -> None:
+        interval = max(self.interval, 0.01)
+        while True:
+            expected = time.perf_counter_ns() + int(interval * 1e9)
+            await asyncio.sleep(interval)
+            now = time.perf_counter_ns()
+            lag_ms = max(0.0, (now - expected) / 1e6)
+            self.profile.lags_ms.append(lag_ms)
+            if lag_ms >= self.slow_callback_ms:
+                self._record_stall(expected, now, lag_ms)
+
+    def _record_stall(self, start_ns: int, end_ns: int, lag_ms: float) -> None:
+        # 取樣執行緒同時在 append：先複製（單一 C 層級操作，不會遇到 deque mutated during iteration）
+        timeline = list(self._timeline)
+        stacks = Counter(stack for t, stack in timeline if start_ns <= t <= end_ns and stack != (IDLE_FRAME,))
+        logger.warning(f"[Profiler] Event loop blocked for {lag_ms:.0f}ms")
+        self.profile.slow_callbacks.append({
+            "at_s": round((start_ns / 1e9) - self._started, 3),
+            "lag_ms": round(lag_ms, 1),
+            "stacks": [{"stack": ";".join(stack), "samples": count} for stack, count in stacks.most_common(3)],
+        })
+
+    def start(self) -> None:
+        """Start sampling; call from the event loop thread to also measure loop lag."""
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        with contextlib.suppress(RuntimeError):
+            self._lag_task = asyncio.get_running_loop().create_task(self._measure_lag(), name="profiler-loop-lag")
+
+    async def stop(self) -> Profile:
+        self._stop.set()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._lag_task
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+        self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another profiling session is already running on this worker."""
+
+
+class ProfilerService:
+    """One session at a time per worker; request-scoped profiles kept by correlation ID."""
+
+    def __init__(self, keep: int = 20):
+        self._active = False
+        self._profiles: dict[str, Profile] = {}
+        self._keep = keep
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @contextlib.asynccontextmanager
+    async def session(self, interval: float, slow_callback_ms: float) -> AsyncIterator[SamplingProfiler]:
+        if self._active:
+            raise ProfilerBusyError("A profiling session is already running")
+        self._active = True
+        profiler = SamplingProfiler(interval, slow_callback_ms)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            await profiler.stop()
+            self._active = False
+
+    async def profile_for(self, seconds: float, interval: float, slow_callback_ms: float) -> Profile:
+        """Time-boxed session over whatever the worker is doing."""
+        async with self.session(interval, slow_callback_ms) as profiler:
+            await asyncio.sleep(seconds)
+        return profiler.profile
+
+    def keep(self, profile_id: str, profile: Profile) -> None:
+        self._profiles[profile_id] = profile
+        while len(self._profiles) > self._keep:
+            self._profiles.pop(next(iter(self._profiles)))
+
+    def get(self, profile_id: str) -> Profile | None:
+        return self._profiles.get(profile_id)
+
+
+def is_authorized(token: str | None) -> bool:
+    """Constant-time check of the X-Profiler-Token header (always False when profiling is disabled)."""
+    from src.core.config import get_settings
+
+    expected = get_settings().profiler_token
+    return bool(expected) and token is not None and hmac.compare_digest(token.encode(), expected.encode())
+
+
+_service: ProfilerService | None = None
+
+
+def get_profiler_service() -> ProfilerService:
+    global _service
+    if _service is None:
+        _service = ProfilerService()
+    return _service
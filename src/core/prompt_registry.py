@@ -0,0 +1,253 @@
+"""
+Process-wide prompt registry.
+
+Scans ``src/prompts/<task>/v<version>[-<language>].yaml`` once, parses every
+file into a PromptConfig (with its user template pre-split) and indexes them
+by task × language × version, with the latest version per (task, language)
+precomputed.  Prompt lookups on the request path are then dictionary reads;
+no filesystem access happens unless file watching is enabled, in which case
+the directory is re-stat'ed at most every ``check_interval`` seconds and a
+changed tree is rescanned and swapped in atomically.
+"""
+import logging
+import re
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+import yaml
+
+from src.core.config import get_settings
+from src.models.prompt_config import PromptConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPTS_DIR = "src/prompts"
+
+# v1.3.0-zh-TW.yaml -> ("1.3.0", "zh-TW"); v1.0.0.yaml -> ("1.0.0", None)
+_FILENAME_RE = re.compile(r"^v(?P<version>\d+(?:\.\d+)*)(?:-(?P<language>[A-Za-z]{2}(?:-[A-Za-z]+)?))?\.yaml$")
+
+
+def normalize_version(version: str) -> str:
+    """Strip the optional 'v' prefix (v1.2.0 -> 1.2.0)."""
+    return version[1:] if version.startswith("v") else version
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+@dataclass(frozen=True, slots=True)
+class PromptEntry:
+    """One parsed prompt file."""
+
+    task: str
+    filename: str
+    version: str
+    language: str | None
+    config: PromptConfig
+
+
+@dataclass(frozen=True)
+class PromptCatalog:
+    """Immutable index of every prompt file under the prompts directory."""
+
+    entries: Mapping[tuple[str, str], PromptEntry]
+    versions: Mapping[tuple[str, str | None], tuple[str, ...]]
+    fingerprint: tuple
+
+    def get(self, task: str, filename: str) -> PromptEntry | None:
+        return self.entries.get((task, filename))
+
+    def list_versions(self, task: str, language: str | None = None) -> tuple[str, ...]:
+        """Versions for (task, language), newest first."""
+        return self.versions.get((task, language), ())
+
+    def latest(self, task: str, language: str | None = None) -> str | None:
+        versions = self.versions.get((task, language))
+        return versions[0] if versions else None
+
+    @property
+    def tasks(self) -> list[str]:
+        return sorted({task for task, _ in self.entries})
+
+
+def filename_for(version: str, language: str | None = None) -> str:
+    """Build the prompt filename for a version and optional language."""
+    version_str = f"v{normalize_version(version)}"
+    return f"{version_str}-{language}.yaml" if language else f"{version_str}.yaml"
+
+
+def _iter_prompt_files(prompts_dir: Path):
+    if not prompts_dir.is_dir():
+        return
+    for task_dir in sorted(prompts_dir.iterdir()):
+        if task_dir.is_dir() and not task_dir.name.startswith((".", "_")):
+            for path in sorted(task_dir.glob("v*.yaml")):
+                yield task_dir.name, path
+
+
+def scan_prompts(prompts_dir: Path | str) -> PromptCatalog:
+    """Parse every prompt file under ``prompts_dir`` into a catalog."""
+    prompts_dir = Path(prompts_dir)
+    entries: dict[tuple[str, str], PromptEntry] = {}
+    versions: dict[tuple[str, str | None], list[str]] = {}
+
+    for task, path in _iter_prompt_files(prompts_dir):
+        match = _FILENAME_RE.match(path.name)
+        if not match:
+            logger.warning(f"Skipping prompt file with unrecognized name: {path}")
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                config = PromptConfig(**yaml.safe_load(f))
+        except Exception as e:
+            logger.error(f"Failed to load prompt file {path}: {e}")
+            continue
+
+        config.get_user_template()  # pre-split the template
+        version, language = match.group("version"), match.group("language")
+        entries[(task, path.name)] = PromptEntry(task, path.name, version, language, config)
+        versions.setdefault((task, language), []).append(version)
+
+    return PromptCatalog(
+        entries=MappingProxyType(entries),
+        versions=MappingProxyType({
+            key: tuple(sorted(values, key=_version_key, reverse=True))
+            for key, values in versions.items()
+        }),
+        fingerprint=_files_fingerprint(prompts_dir),
+    )
+
+
+def _files_fingerprint(prompts_dir: Path) -> tuple:
+    """Cheap change detector: (name, mtime, size) of every prompt file."""
+    fingerprint = []
+    for task, path in _iter_prompt_files(prompts_dir):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        fingerprint.append((task, path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class PromptRegistry:
+    """
+    Shared, lazily scanned prompt catalog for one prompts directory.
+
+    With ``check_interval=None`` the directory is scanned once; otherwise it is
+    re-stat'ed at most every ``check_interval`` seconds and rescanned on change.
+    """
+
+    def __init__(self, prompts_dir: Path | str = DEFAULT_PROMPTS_DIR,
+                 check_interval: float | None = None):
+        self.prompts_dir = Path(prompts_dir)
+        self.check_interval = check_interval
+        self._catalog: PromptCatalog | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload_count = 0
+
+    def catalog(self) -> PromptCatalog:
+        """Get the current catalog, picking up file changes when due."""
+        catalog = self._catalog
+        if catalog is not None and (
+            self.check_interval is None or time.monotonic() < self._next_check
+        ):
+            return catalog
+        return self._refresh(force=False)
+
+    def reload(self) -> PromptCatalog:
+        """Force a rescan of the prompts directory."""
+        return self._refresh(force=True)
+
+    def _refresh(self, force: bool) -> PromptCatalog:
+        with self._lock:
+            if self.check_interval is not None:
+                self._next_check = time.monotonic() + self.check_interval
+            if not force and self._catalog is not None:
+                if self.check_interval is None:
+                    return self._catalog
+                if _files_fingerprint(self.prompts_dir) == self._catalog.fingerprint:
+                    return self._catalog
+
+            start = time.perf_counter()
+            catalog = scan_prompts(self.prompts_dir)
+            if self._catalog is not None:
+                self.reload_count += 1
+            self._catalog = catalog
+
+            logger.info(
+                f"Loaded {len(catalog.entries)} prompt configs from {self.prompts_dir} "
+                f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+            return catalog
+
+    def get_config(self, task: str, filename: str) -> PromptConfig:
+        """
+        Get a prompt config by filename.
+
+        Raises:
+            FileNotFoundError: If no such prompt file was loaded
+        """
+        entry = self.catalog().get(task, filename)
+        if entry is None:
+            raise FileNotFoundError(f"Prompt file not found: {self.prompts_dir / task / filename}")
+        return entry.config
+
+    def resolve(self, task: str, version: str = "latest", language: str | None = None) -> PromptConfig:
+        """
+        Get the prompt config for a task, version ('latest' allowed) and language.
+
+        Raises:
+            FileNotFoundError: If the version does not exist
+        """
+        catalog = self.catalog()
+        if version == "latest":
+            version = catalog.latest(task, language)
+            if version is None:
+                raise FileNotFoundError(
+                    f"No prompt versions found for task: {task}"
+                    + (f", language: {language}" if language else "")
+                )
+        return self.get_config(task, filename_for(version, language))
+
+    def list_versions(self, task: str, language: str | None = None) -> list[str]:
+        """Versions for (task, language), newest first."""
+        return list(self.catalog().list_versions(task, language))
+
+    def latest_version(self, task: str, language: str | None = None) -> str | None:
+        return self.catalog().latest(task, language)
+
+    def stats(self) -> dict:
+        catalog = self.catalog()
+        return {
+            "prompts_dir": str(self.prompts_dir),
+            "prompt_count": len(catalog.entries),
+            "tasks": catalog.tasks,
+            "reload_count": self.reload_count,
+        }
+
+
+_registries: dict[str, PromptRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_prompt_registry(prompts_dir: Path | str | None = None) -> PromptRegistry:
+    """Get the process-wide registry for a prompts directory."""
+    key = str(prompts_dir or DEFAULT_PROMPTS_DIR)
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            resolved = str(Path(key).resolve())
+            registry = _registries.get(resolved)
+            if registry is None:
+                interval = get_settings().prompt_reload_interval
+                registry = PromptRegistry(resolved, check_interval=interval if interval > 0 else None)
+                _registries[resolved] = registry
+            _registries[key] = registry
+    return registry
@@ -0,0 +1,71 @@
+"""
+Pre-split prompt templates.
+
+Prompt texts use plain ``str.format`` placeholders (``{job_description}``).
+Parsing the template on every request is wasted work, so the template is split
+once into ``(literal, field)`` segments and formatting becomes a join.
+Templates using features beyond simple named fields (format specs,
+conversions, attribute/index access, positional fields) fall back to
+``str.format`` so the output is always identical.
+"""
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any
+
+_FORMATTER = Formatter()
+
+
+def _split_template(template: str) -> tuple[tuple[str, str | None], ...] | None:
+    """Split a template into segments, or None if it needs full str.format."""
+    segments = []
+    try:
+        parsed = list(_FORMATTER.parse(template))
+    except ValueError:
+        return None
+
+    for literal, field_name, format_spec, conversion in parsed:
+        if field_name is not None and (
+            format_spec or conversion or not field_name.isidentifier()
+        ):
+            return None
+        segments.append((literal, field_name))
+    return tuple(segments)
+
+
+@dataclass(frozen=True, slots=True)
+class PromptTemplate:
+    """A prompt template split into literal and variable segments."""
+
+    source: str
+    segments: tuple[tuple[str, str | None], ...] | None
+    variables: frozenset[str]
+
+    @classmethod
+    def compile(cls, template: str) -> "PromptTemplate":
+        """Parse the template once."""
+        segments = _split_template(template)
+        variables = frozenset(
+            name for _, name in segments or () if name is not None
+        )
+        return cls(source=template, segments=segments, variables=variables)
+
+    def format(self, variables: dict[str, Any]) -> str:
+        """
+        Substitute variables, matching ``str.format`` output.
+
+        Raises:
+            ValueError: If a required variable is missing
+        """
+        try:
+            if self.segments is None:
+                return self.source.format(**variables)
+
+            parts = []
+            for literal, name in self.segments:
+                if literal:
+                    parts.append(literal)
+                if name is not None:
+                    parts.append(format(variables[name], ""))
+            return "".join(parts)
+        except KeyError as e:
+            raise ValueError(f"Missing required variable in prompt: {e}")
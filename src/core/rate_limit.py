@@ -0,0 +1,302 @@
+"""
+Async token-bucket rate limiting.
+
+A bucket refills ``rate`` tokens per second up to ``capacity``.  Callers
+``await acquire(cost)`` before a request; waiters are served in FIFO order
+so a large request is not starved by a stream of small ones.  Sized from an
+Azure OpenAI quota with ``TokenBucket.per_minute(tpm)``.
+
+``DeploymentLimiter`` applies a deployment's TPM / RPM quota on the client
+side, shared by every client of that deployment in the worker: a call
+reserves its estimated tokens (prompt estimate + ``max_tokens``, which is
+how Azure counts against TPM), waits in FIFO order, and is reconciled with
+the actual ``usage`` and ``x-ratelimit-remaining-*`` headers afterwards;
+attempts that fail without using quota (5xx, timeouts) give it back.
+Requests whose expected wait exceeds what their priority allows (see
+``priority_scope``) fail fast instead of queueing.
+"""
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from src.core.config import get_settings
+from src.core.retry import remaining_time
+from src.core.tracing import record_span
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens/second up to ``capacity`` (starts full)."""
+
+    def __init__(self, rate: float, capacity: float | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    @classmethod
+    def per_minute(cls, limit: float, **kwargs) -> "TokenBucket":
+        """Bucket for a per-minute quota (TPM / RPM): one minute of burst."""
+        return cls(limit / 60.0, capacity=limit, **kwargs)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def adjust(self, tokens: float) -> None:
+        """Give back (positive) or charge (negative) tokens; the balance may go negative."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def limit_to(self, tokens: float) -> None:
+        """Never hold more than ``tokens`` (e.g. the server's remaining quota)."""
+        self._refill()
+        self._tokens = min(self._tokens, tokens)
+
+    def cost(self, tokens: float) -> float:
+        """Tokens ``acquire(tokens)`` takes: a cost above ``capacity`` is capped."""
+        return min(tokens, self.capacity)
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` would be available (ignoring other waiters)."""
+        return max(0.0, (self.cost(tokens) - self.available) / self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take ``tokens`` if available now (never waits)."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until ``tokens`` are available and take them.
+
+        A cost above ``capacity`` is capped so it can still be served.
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = self.cost(tokens)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                delay = (tokens - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+        self.waited_seconds += waited
+        return waited
+
+
+# ---------------------------------------------------------------------------
+# Per-deployment quota (Azure OpenAI TPM / RPM)
+# ---------------------------------------------------------------------------
+
+_priority: ContextVar[str] = ContextVar("rate_limit_priority", default="high")
+
+# Azure 以 1-10 秒的視窗評估配額，一整分鐘的突發量仍會被 429
+_BURST_SECONDS = 10.0
+
+
+@contextlib.contextmanager
+def priority_scope(priority: str) -> Iterator[str]:
+    """Quota priority (``high`` queues, ``low`` fails fast) for calls in this context."""
+    token = _priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class QuotaExceededError(Exception):
+    """The deployment quota cannot serve the call within its allowed wait."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 Latin characters per token, one per CJK character."""
+    return int(sum(1.0 if ord(ch) > 0x2E7F else 0.25 for ch in text)) + 1
+
+
+def estimate_chat_tokens(messages: list[dict[str, Any]], max_tokens: int) -> int:
+    """Tokens Azure reserves for a chat call: prompt estimate plus ``max_tokens``."""
+    prompt = sum(estimate_tokens(str(m.get("content", ""))) + 4 for m in messages)
+    return prompt + max_tokens
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """What ``DeploymentLimiter.acquire`` took from the buckets."""
+    tokens: float   # tokens actually charged (capped at the bucket capacity)
+    waited: float   # seconds spent queueing
+
+
+class DeploymentLimiter:
+    """TPM and RPM buckets of one deployment (0 = no limit)."""
+
+    def __init__(self, name: str, tpm: int = 0, rpm: int = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.tpm = tpm
+        self.rpm = rpm
+        self.tokens = TokenBucket(tpm / 60.0, capacity=tpm * _BURST_SECONDS / 60.0, clock=clock) if tpm > 0 else None
+        self.requests = TokenBucket(rpm / 60.0, capacity=max(1.0, rpm * _BURST_SECONDS / 60.0),
+                                    clock=clock) if rpm > 0 else None
+        self.queued = 0
+        self._queued_tokens = 0.0
+        self.max_queued = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def estimated_wait(self, tokens: float) -> float:
+        """Expected wait for ``tokens`` behind the calls already queued."""
+        wait = 0.0
+        if self.tokens is not None:
+            wait = self.tokens.wait_time(min(self.tokens.capacity, tokens + self._queued_tokens))
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1 + self.queued))
+        return wait
+
+    def _max_wait(self, priority: str) -> float:
+        settings = get_settings()
+        max_wait = (settings.llm_quota_max_wait_seconds if priority == "high"
+                    else settings.llm_quota_low_priority_max_wait_seconds)
+        remaining = remaining_time()
+        return max_wait if remaining is None else min(max_wait, remaining)
+
+    async def acquire(self, tokens: float, priority: str | None = None) -> Reservation:
+        """
+        Reserve ``tokens`` and one request, queueing up to the priority's wait budget.
+
+        Returns:
+            Tokens charged (pass to ``reconcile`` / ``release``) and seconds spent waiting
+
+        Raises:
+            QuotaExceededError: The expected wait is longer than allowed
+        """
+        if self.tokens is None and self.requests is None:
+            return Reservation(0.0, 0.0)
+        priority = priority or current_priority()
+        expected = self.estimated_wait(tokens)
+        if expected > self._max_wait(priority):
+            self.rejected += 1
+            raise QuotaExceededError(
+                f"{self.name} quota exhausted ({priority} priority, expected wait {expected:.1f}s)",
+                retry_after=expected,
+            )
+
+        started_ns = time.perf_counter_ns()
+        self.queued += 1
+        self._queued_tokens += tokens
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            waited = 0.0
+            if self.requests is not None:
+                waited += await self.requests.acquire(1)
+            if self.tokens is not None:
+                waited += await self.tokens.acquire(tokens)
+        finally:
+            self.queued -= 1
+            self._queued_tokens -= tokens
+        self.acquired += 1
+        self.waited_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited > 0:
+            record_span("quota_wait", started_ns, deployment=self.name)
+        return Reservation(self.tokens.cost(tokens) if self.tokens is not None else 0.0, waited)
+
+    def reconcile(self, reserved: float, used: float | None = None,
+                  headers: Mapping[str, str] | None = None) -> None:
+        """
+        Correct the reservation with the actual usage and the server's remaining quota.
+
+        ``reserved`` is the amount charged (``Reservation.tokens``), not the estimate.
+        """
+        if self.tokens is not None:
+            if used is not None:
+                self.tokens.adjust(reserved - used)
+            remaining = _header_number(headers or {}, "x-ratelimit-remaining-tokens")
+            if remaining is not None:
+                self.tokens.limit_to(remaining)
+        if self.requests is not None:
+            remaining = _header_number(headers or {}, "x-ratelimit-remaining-requests")
+            if remaining is not None:
+                self.requests.limit_to(remaining)
+
+    def release(self, reserved: float) -> None:
+        """Give back the tokens of an attempt that failed without using quota (5xx, timeout)."""
+        if self.tokens is not None and reserved > 0:
+            self.tokens.adjust(reserved)
+
+    def on_throttled(self, retry_after: float | None) -> None:
+        """After a 429: empty the buckets so queued calls wait out ``retry_after``."""
+        self.throttled += 1
+        for bucket in (self.tokens, self.requests):
+            if bucket is not None:
+                bucket.limit_to(-(retry_after or 1.0) * bucket.rate)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tpm": self.tpm,
+            "rpm": self.rpm,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.waited_seconds / self.acquired * 1000, 1) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "tokens_available": round(self.tokens.available) if self.tokens is not None else None,
+        }
+
+
+_limiters: dict[str, DeploymentLimiter] = {}
+
+
+def get_deployment_limiter(name: str, tpm: int = 0, rpm: int = 0) -> DeploymentLimiter:
+    """Limiter shared by all clients of deployment ``name`` in this worker."""
+    limiter = _limiters.get(name)
+    if limiter is None or (limiter.tpm, limiter.rpm) != (tpm, rpm):
+        limiter = _limiters[name] = DeploymentLimiter(name, tpm, rpm)
+    return limiter
+
+
+def limiter_stats() -> dict[str, dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
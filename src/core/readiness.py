@@ -0,0 +1,226 @@
+"""
+Startup warm-up, readiness and liveness state for a serving process.
+
+The app lifespan runs each warm-up step through ``Readiness.run_step``.
+Critical steps, such as the prompt registry and the standardization
+snapshot, must succeed before the process reports ready. Non-critical
+steps, such as the course search pool and the LLM endpoint handshake, run
+in the background. A failed non-critical step marks the process degraded
+but keeps it ready.
+
+``/health/live`` only answers whether the event loop is responsive.
+``/health/ready`` also runs the registered checks (pool ping, cache and
+snapshot state) with a timeout. Load balancers use it to decide when a
+worker may receive traffic. On SIGTERM the worker reports draining (503)
+for ``server_drain_seconds`` before the server stops accepting
+connections (``drain_on_signal``).
+"""
+import asyncio
+import inspect
+import logging
+import signal
+import ssl
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+CheckResult = dict[str, Any]
+
+
+@dataclass
+class WarmupStep:
+    """Result of one startup warm-up step."""
+    name: str
+    critical: bool
+    status: str = "pending"  # pending | ok | error
+    duration_ms: float | None = None
+    error: str | None = None
+
+
+class Readiness:
+    """Warm-up results plus readiness checks for this process."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.startup_complete = False
+        self.draining = False
+        self.steps: dict[str, WarmupStep] = {}
+        self._checks: dict[str, tuple[Callable[[], Any], bool]] = {}
+
+    async def run_step(self, name: str, func: Callable[[], Any], critical: bool = True) -> WarmupStep:
+        """Run a warm-up step (sync or async) and record its outcome; never raises."""
+        step = self.steps[name] = WarmupStep(name, critical)
+        start = time.perf_counter()
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+            step.status = "ok"
+        except asyncio.CancelledError:
+            step.status, step.error = "error", "cancelled"
+            raise
+        except Exception as e:
+            step.status, step.error = "error", str(e)
+            log = logger.error if critical else logger.warning
+            log(f"[Readiness] Warm-up step {name} failed: {e}")
+        finally:
+            step.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        return step
+
+    def register_check(self, name: str, func: Callable[[], CheckResult | Awaitable[CheckResult]],
+                       critical: bool = False) -> None:
+        """
+        Register a readiness check.
+
+        ``func`` returns a dict with at least ``status`` ("ok", "pending",
+        "disabled" or "error"). Raising counts as "error".
+        """
+        self._checks[name] = (func, critical)
+
+    async def _run_check(self, func: Callable[[], Any], timeout: float) -> CheckResult:
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, timeout)
+            return result
+        except TimeoutError:
+            return {"status": "error", "error": f"timed out after {timeout}s"}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    async def check(self, timeout: float = 2.0) -> tuple[bool, dict[str, Any]]:
+        """
+        Evaluate readiness.
+
+        Returns:
+            (ready, details)
+        """
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._run_check(self._checks[name][0], timeout) for name in names))
+        checks = dict(zip(names, results, strict=True))
+
+        failed_steps = [s.name for s in self.steps.values() if s.critical and s.status != "ok"]
+        failed_checks = [name for name in names if self._checks[name][1] and checks[name].get("status") != "ok"]
+        ready = self.startup_complete and not self.draining and not failed_steps and not failed_checks
+        degraded = any(s.status == "error" for s in self.steps.values()) or any(
+            result.get("status") == "error" for result in checks.values()
+        )
+        return ready, {
+            "status": "ready" if ready else ("draining" if self.draining else "not_ready"),
+            "degraded": degraded,
+            "startup_complete": self.startup_complete,
+            "warmup": {name: asdict(step) for name, step in self.steps.items()},
+            "checks": checks,
+        }
+
+    async def liveness(self) -> dict[str, Any]:
+        """Process is up and the event loop is responsive."""
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "loop_latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+
+async def warm_endpoints(urls: Iterable[str], timeout: float = 5.0) -> dict[str, float]:
+    """
+    Resolve and TLS-handshake each distinct HTTPS host once.
+
+    Primes DNS and surfaces unreachable endpoints at startup instead of on
+    the first user request.
+
+    Returns:
+        Handshake time in ms per host
+
+    Raises:
+        ConnectionError: When any host is unreachable (after trying all)
+    """
+    hosts = sorted({urlsplit(url).hostname for url in urls if url and urlsplit(url).hostname})
+    context = ssl.create_default_context()
+    timings: dict[str, float] = {}
+    errors = []
+
+    async def _handshake(host: str) -> None:
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, 443, ssl=context), timeout)
+        except (OSError, TimeoutError) as e:
+            errors.append(f"{host}: {e or type(e).__name__}")
+            return
+        timings[host] = round((time.perf_counter() - start) * 1000, 1)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    await asyncio.gather(*(_handshake(host) for host in hosts))
+    if errors:
+        raise ConnectionError("; ".join(errors))
+    return timings
+
+
+def drain_on_signal(readiness: Readiness, delay: float,
+                    signals: Iterable[int] = (signal.SIGTERM,)) -> Callable[[], None]:
+    """
+    Mark the process draining as soon as a shutdown signal arrives.
+
+    The server's own handler (which stops accepting connections) runs
+    ``delay`` seconds later, so ``/health/ready`` answers 503 while the load
+    balancer takes the worker out of rotation. A second signal forwards at
+    once. Signal handlers can only be set on the main thread; elsewhere this
+    does nothing.
+
+    Returns:
+        Callable that restores the previous handlers
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    loop = asyncio.get_running_loop()
+    originals = {sig: signal.getsignal(sig) for sig in signals}
+
+    def _forward(signum, frame) -> None:
+        previous = originals[signum]
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            signal.signal(signum, previous)
+            signal.raise_signal(signum)
+
+    def _handle(signum, frame) -> None:
+        if readiness.draining or delay <= 0:
+            readiness.draining = True
+            _forward(signum, frame)
+            return
+        readiness.draining = True
+        logger.info(f"[Readiness] Signal {signum}: draining for {delay}s before shutdown")
+        loop.call_soon_threadsafe(loop.call_later, delay, _forward, signum, frame)
+
+    for sig in originals:
+        signal.signal(sig, _handle)
+
+    def restore() -> None:
+        for sig, previous in originals.items():
+            if signal.getsignal(sig) is _handle:
+                signal.signal(sig, previous)
+
+    return restore
+
+
+_readiness: Readiness | None = None
+
+
+def get_readiness() -> Readiness:
+    """Process-wide readiness state."""
+    global _readiness
+    if _readiness is None:
+        _readiness = Readiness()
+    return _readiness
@@ -0,0 +1,306 @@
+"""
+Shared retry/backoff engine for LLM, embedding and search calls.
+
+Every layer that retries (HTTP clients, services) goes through the same
+policy so retries do not multiply under throttling:
+
+- ``Retry-After`` / ``retry-after-ms`` hints from 429/503 responses are
+  honored (and a hint longer than the policy allows fails fast instead);
+- delays use decorrelated jitter (``uniform(base, previous * 3)``, capped);
+- a per-request deadline, kept in a context variable, is shared by nested
+  layers: no layer sleeps past it;
+- an error that exhausted its retries in an inner layer is marked so outer
+  layers do not retry it again;
+- a caller with its own fallback (the LLM router failing over to another
+  deployment) can run the layers below with a single attempt
+  (``single_attempt_scope``);
+- per-operation counters are kept for monitoring (``get_retry_stats``).
+"""
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("retry_deadline", default=None)
+_single_attempt: ContextVar[bool] = ContextVar("retry_single_attempt", default=False)
+_EXHAUSTED_ATTR = "_retries_exhausted"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Backoff parameters for one kind of call."""
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    max_retry_after: float = 30.0  # longer server hints fail fast
+
+    def next_delay(self, previous: float | None, retry_after: float | None = None) -> float:
+        """Decorrelated jitter, never shorter than the server's Retry-After."""
+        previous = previous or self.base_delay
+        delay = min(self.max_delay, random.uniform(self.base_delay, previous * 3))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Read ``retry-after-ms`` or ``Retry-After`` (seconds or HTTP date) from headers."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Per-request deadline
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[float | None]:
+    """
+    Bound all retries in this context to ``seconds`` from now.
+
+    Nested scopes can only shorten an outer deadline, never extend it.
+    """
+    current = _deadline.get()
+    if seconds is None or seconds <= 0:
+        yield current
+        return
+    deadline = time.monotonic() + seconds
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+@contextlib.contextmanager
+def single_attempt_scope(enabled: bool = True) -> Iterator[None]:
+    """
+    Give every ``RetryState`` in this context a single attempt.
+
+    For callers that handle failure themselves (e.g. by failing over), so
+    inner layers do not back off or wait out ``Retry-After`` first.
+    """
+    token = _single_attempt.set(enabled)
+    try:
+        yield
+    finally:
+        _single_attempt.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the current deadline, or None without a deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def attempt_timeout(default: float) -> float:
+    """Timeout for one attempt: ``default`` clipped to the remaining deadline."""
+    remaining = remaining_time()
+    return default if remaining is None else max(0.1, min(default, remaining))
+
+
+# ---------------------------------------------------------------------------
+# Counters
+# ---------------------------------------------------------------------------
+
+class RetryStats:
+    """Thread-safe retry counters per operation."""
+
+    FIELDS = ("attempts", "retries", "retry_after_honored", "exhausted",
+              "deadline_exceeded", "retry_after_too_long", "sleep_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, float]] = {}
+
+    def incr(self, operation: str, field: str, amount: float = 1) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(operation, dict.fromkeys(self.FIELDS, 0))
+            counters[field] += amount
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {op: dict(counters) for op, counters in self._counters.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+_stats = RetryStats()
+
+
+def get_retry_stats() -> dict[str, dict[str, float]]:
+    """Retry counters per operation since process start."""
+    return _stats.snapshot()
+
+
+def reset_retry_stats() -> None:
+    _stats.reset()
+
+
+# ---------------------------------------------------------------------------
+# Retry state
+# ---------------------------------------------------------------------------
+
+def mark_exhausted(exc: BaseException) -> BaseException:
+    """Flag an error as already retried, so outer layers give up on it."""
+    with contextlib.suppress(AttributeError, TypeError):
+        setattr(exc, _EXHAUSTED_ATTR, True)
+    return exc
+
+
+def is_exhausted(exc: BaseException) -> bool:
+    return bool(getattr(exc, _EXHAUSTED_ATTR, False))
+
+
+class RetryState:
+    """
+    Tracks one retried call.  Use in a loop::
+
+        retry = RetryState(policy, "azure_openai.chat")
+        while True:
+            retry.start_attempt()
+            try:
+                return await call()
+            except RetryableError as e:
+                if not await retry.backoff(e):
+                    raise
+    """
+
+    def __init__(self, policy: RetryPolicy, operation: str):
+        self.policy = policy
+        self.operation = operation
+        self.attempt = 0
+        self.max_attempts = 1 if _single_attempt.get() else policy.max_attempts
+        self._previous_delay: float | None = None
+
+    @property
+    def attempts_left(self) -> int:
+        return self.max_attempts - self.attempt
+
+    def start_attempt(self) -> int:
+        self.attempt += 1
+        _stats.incr(self.operation, "attempts")
+        return self.attempt
+
+    def next_delay(self, exc: BaseException | None = None) -> float | None:
+        """
+        Delay before the next attempt, or None when the call must not be retried
+        (attempts used up, error already retried below, hint too long, deadline).
+        """
+        if self.attempt >= self.max_attempts or (exc is not None and is_exhausted(exc)):
+            _stats.incr(self.operation, "exhausted")
+            return None
+
+        retry_after = getattr(exc, "retry_after", None) if exc is not None else None
+        if retry_after is not None and retry_after > self.policy.max_retry_after:
+            _stats.incr(self.operation, "retry_after_too_long")
+            return None
+
+        delay = self.policy.next_delay(self._previous_delay, retry_after)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            _stats.incr(self.operation, "deadline_exceeded")
+            return None
+
+        if retry_after is not None:
+            _stats.incr(self.operation, "retry_after_honored")
+        self._previous_delay = delay
+        return delay
+
+    async def backoff(self, exc: BaseException | None = None) -> bool:
+        """Sleep before the next attempt; False (and ``exc`` marked) when giving up."""
+        delay = self.next_delay(exc)
+        if delay is None:
+            if exc is not None:
+                mark_exhausted(exc)
+            return False
+
+        logger.warning(
+            f"[{self.operation}] attempt {self.attempt}/{self.max_attempts} failed"
+            f"{f': {exc}' if exc is not None else ''}. Retrying in {delay:.2f}s"
+        )
+        await self.sleep(delay)
+        return True
+
+    async def sleep(self, delay: float) -> None:
+        """Sleep for a delay obtained from ``next_delay`` and count the retry."""
+        _stats.incr(self.operation, "retries")
+        _stats.incr(self.operation, "sleep_seconds", delay)
+        await asyncio.sleep(delay)
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    operation: str,
+    retry_on: tuple[type[BaseException], ...] | Callable[[BaseException], bool] = (Exception,),
+) -> T:
+    """
+    Await ``func()`` until it succeeds or the policy gives up.
+
+    Args:
+        func: Zero-argument coroutine factory (called once per attempt)
+        policy: Backoff policy
+        operation: Counter/log name (e.g. "course_search.search")
+        retry_on: Exception types, or a predicate, that are worth retrying
+
+    Returns:
+        The first successful result
+
+    Raises:
+        The last error, marked as exhausted
+    """
+    should_retry: Callable[[BaseException], bool] = (
+        retry_on if not isinstance(retry_on, tuple) else (lambda e: isinstance(e, retry_on))
+    )
+    retry = RetryState(policy, operation)
+    while True:
+        retry.start_attempt()
+        try:
+            return await func()
+        except Exception as e:
+            if not should_retry(e) or not await retry.backoff(e):
+                raise
+
+
+def retry_stats_summary(stats: dict[str, dict[str, Any]] | None = None) -> dict[str, Any]:
+    """Totals across operations, for health/debug endpoints."""
+    stats = stats if stats is not None else get_retry_stats()
+    totals = dict.fromkeys(RetryStats.FIELDS, 0)
+    for counters in stats.values():
+        for field, value in counters.items():
+            totals[field] += value
+    return {"totals": totals, "operations": stats}
@@ -9,6 +9,7 @@ from typing import Any
 
 import yaml
 
+from src.core.prompt_registry import filename_for, get_prompt_registry
 from src.models.prompt_config import PromptConfig
 
 
@@ -16,16 +17,16 @@ class SimplePromptManager:
     """
     Simple prompt manager that loads YAML configurations.
     No complex templating - just basic string formatting.
+    
+    Prompt files are parsed once per process by the shared PromptRegistry,
+    so creating a manager is cheap and lookups do no file I/O.
     """
     
     def __init__(self, prompts_dir: str = "src/prompts"):
         """Initialize the prompt manager."""
         self.prompts_dir = Path(prompts_dir)
         self.logger = logging.getLogger(__name__)
-        self._cache: dict[str, PromptConfig] = {}
-        
-        # Ensure prompts directory exists
-        self.prompts_dir.mkdir(parents=True, exist_ok=True)
+        self.registry = get_prompt_registry(self.prompts_dir)
     
     def load_prompt_config(
         self,
@@ -42,36 +43,9 @@ class SimplePromptManager:
         Returns:
             PromptConfig instance
         """
-        # Resolve version
         if version == "latest":
             version = self._get_latest_version(task)
-        
-        # Check cache
-        cache_key = f"{task}:{version}"
-        if cache_key in self._cache:
-            self.logger.debug(f"Loading from cache: {cache_key}")
-            return self._cache[cache_key]
-        
-        # Load from file
-        # Handle version prefix - don't add 'v' if already present
-        version_str = version if version.startswith('v') else f"v{version}"
-        file_path = self.prompts_dir / task / f"{version_str}.yaml"
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
-        
-        with open(file_path, encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        
-        # Create config object
-        config = PromptConfig(**data)
-        
-        # Cache it
-        self._cache[cache_key] = config
-        
-        self.logger.info(f"Loaded prompt config: task={task}, version={version}")
-        
-        return config
+        return self.registry.get_config(task, filename_for(version))
     
     def load_prompt_config_by_filename(
         self,
@@ -88,30 +62,7 @@ class SimplePromptManager:
         Returns:
             PromptConfig instance
         """
-        # Check cache using filename
-        cache_key = f"{task}:{filename}"
-        if cache_key in self._cache:
-            self.logger.debug(f"Loading from cache: {cache_key}")
-            return self._cache[cache_key]
-        
-        # Load from file
-        file_path = self.prompts_dir / task / filename
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
-        
-        with open(file_path, encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        
-        # Create config object
-        config = PromptConfig(**data)
-        
-        # Cache it
-        self._cache[cache_key] = config
-        
-        self.logger.info(f"Loaded prompt config: task={task}, filename={filename}")
-        
-        return config
+        return self.registry.get_config(task, filename)
     
     def format_prompt(self, template: str, variables: dict[str, str]) -> str:
         """
@@ -130,21 +81,8 @@ class SimplePromptManager:
             raise ValueError(f"Missing required variable in prompt: {e}")
     
     def list_versions(self, task: str) -> list[str]:
-        """List all available versions for a task."""
-        task_dir = self.prompts_dir / task
-        if not task_dir.exists():
-            return []
-        
-        versions = []
-        for file in task_dir.glob("v*.yaml"):
-            # Extract version from filename (v1.0.0.yaml -> 1.0.0)
-            version = file.stem[1:]
-            versions.append(version)
-        
-        # Sort versions in descending order
-        versions.sort(reverse=True, key=lambda v: tuple(map(int, v.split('.'))))
-        
-        return versions
+        """List all available language-agnostic versions for a task (newest first)."""
+        return self.registry.list_versions(task)
     
     def get_active_version(self, task: str) -> str | None:
         """Get the currently active version for a task."""
@@ -179,8 +117,9 @@ class SimplePromptManager:
         
         self.logger.info(f"Saved prompt config to {file_path}")
         
-        # Clear cache for this task
-        self._clear_cache_for_task(task)
+        # Pick up the new file
+        self.registry.reload()
+        self.get_prompt_info.cache_clear()
         
         return file_path
     
@@ -191,15 +130,6 @@ class SimplePromptManager:
             raise FileNotFoundError(f"No prompt versions found for task: {task}")
         return versions[0]
     
-    def _clear_cache_for_task(self, task: str):
-        """Clear cache entries for a specific task."""
-        keys_to_remove = [
-            key for key in self._cache
-            if key.startswith(f"{task}:")
-        ]
-        for key in keys_to_remove:
-            del self._cache[key]
-    
     @lru_cache(maxsize=32)
     def get_prompt_info(self, task: str, version: str) -> dict[str, Any]:
         """Get summary information about a prompt configuration."""
@@ -0,0 +1,266 @@
+"""
+Precompiled standardization index.
+
+Standardizers used to rebuild their lookup tables and recompile regexes on
+every call. This module compiles a standardization config once into an
+immutable StandardizationIndex (one lookup dict, one combined exclusion regex
+and ordered compiled pattern rules with literal prefilters) and keeps a
+process-wide registry so instances built from the same source share it.
+"""
+
+import logging
+import re
+import threading
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+try:  # Python 3.11+
+    import re._constants as _sre_constants
+    import re._parser as _sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
+
+logger = logging.getLogger(__name__)
+
+
+def extract_literal_prefilter(pattern: str, flags: int = 0) -> str | None:
+    """
+    Extract a literal substring that every match of ``pattern`` must contain.
+
+    Only top-level literal runs are considered, so the result is conservative:
+    when it returns a string, text without that string can never match.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        Longest required ASCII literal (case-folded for case-insensitive
+        patterns), or None when no safe prefilter can be derived
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+
+    ignore_case = bool((flags | parsed.state.flags) & re.IGNORECASE)
+    literal_op = _sre_constants.LITERAL
+
+    best = ""
+    current: list[str] = []
+    for op, value in parsed:
+        if op == literal_op:
+            current.append(chr(value))
+            continue
+        if op == _sre_constants.BRANCH:
+            # Top-level alternation: no single literal is required
+            return None
+        candidate = "".join(current)
+        if len(candidate) > len(best):
+            best = candidate
+        current = []
+    candidate = "".join(current)
+    if len(candidate) > len(best):
+        best = candidate
+
+    if not best or not best.isascii():
+        return None
+    return best.casefold() if ignore_case else best
+
+
+@dataclass(frozen=True, slots=True)
+class PatternRule:
+    """A compiled pattern rule with an optional literal prefilter."""
+
+    regex: re.Pattern
+    replacement: str
+    rule_type: str = "unknown"
+    prefilter: str | None = None
+    ignore_case: bool = False
+
+    @classmethod
+    def compile(cls, pattern: str, replacement: str = "",
+                rule_type: str = "unknown", flags: int = 0) -> "PatternRule":
+        """Compile a raw pattern into a rule (raises re.error if invalid)."""
+        regex = re.compile(pattern, flags)
+        return cls(
+            regex=regex,
+            replacement=replacement,
+            rule_type=rule_type,
+            prefilter=extract_literal_prefilter(pattern, flags),
+            ignore_case=bool(regex.flags & re.IGNORECASE),
+        )
+
+    def could_match(self, text: str, folded: str | None = None) -> bool:
+        """
+        Cheap check whether the rule can possibly match ``text``.
+
+        Args:
+            text: Text to check
+            folded: Pre-computed ``text.casefold()`` to avoid repeated folding
+        """
+        if self.prefilter is None:
+            return True
+        if self.ignore_case:
+            return self.prefilter in (folded if folded is not None else text.casefold())
+        return self.prefilter in text
+
+    def apply(self, text: str, folded: str | None = None) -> str:
+        """Apply the rule, skipping the regex when the prefilter rules it out."""
+        if not self.could_match(text, folded):
+            return text
+        return self.regex.sub(self.replacement, text)
+
+
+@dataclass(frozen=True, slots=True)
+class StandardizationIndex:
+    """Immutable, precompiled view of a standardization config."""
+
+    mappings: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    exclusion_regex: re.Pattern | None = None
+    exclusion_patterns: tuple[re.Pattern, ...] = ()
+    pattern_rules: tuple[PatternRule, ...] = ()
+    version: str = "unknown"
+
+    def is_excluded(self, keyword: str) -> bool:
+        """Check a keyword against all exclusion rules."""
+        if self.exclusion_regex is not None:
+            return self.exclusion_regex.search(keyword) is not None
+        return any(pattern.search(keyword) for pattern in self.exclusion_patterns)
+
+    @property
+    def has_exclusions(self) -> bool:
+        """Whether any exclusion rule is configured."""
+        return self.exclusion_regex is not None or bool(self.exclusion_patterns)
+
+
+EMPTY_INDEX = StandardizationIndex()
+
+
+@dataclass(frozen=True)
+class KeywordIndex:
+    """Immutable, precompiled English dictionaries and pattern rules."""
+
+    skill_dictionary: Mapping[str, str]
+    position_dictionary: Mapping[str, str]
+    tool_dictionary: Mapping[str, str]
+    combined_dictionary: Mapping[str, str]
+    patterns: tuple[PatternRule, ...]
+
+
+def combine_patterns(patterns: Iterable[str], flags: int = 0) -> re.Pattern | None:
+    """
+    Combine patterns into a single alternation regex.
+
+    Returns None when the patterns cannot be safely combined (groups that
+    may be back-referenced, inline global flags, ...); callers then fall back
+    to testing the patterns one by one.
+    """
+    sources = list(patterns)
+    if not sources:
+        return None
+    try:
+        if any(re.compile(source, flags).groups for source in sources):
+            return None
+        return re.compile("|".join(f"(?:{source})" for source in sources), flags)
+    except re.error:
+        return None
+
+
+def compile_index(config: dict | None) -> StandardizationIndex:
+    """
+    Compile a BaseStandardizer config into a StandardizationIndex.
+
+    Args:
+        config: Config with optional ``categories``, ``exclusion_rules`` and
+            ``pattern_rules`` sections
+
+    Returns:
+        Compiled index (EMPTY_INDEX when config is empty)
+    """
+    if not config:
+        return EMPTY_INDEX
+
+    mapping_dict: dict[str, str] = {}
+    for category_data in config.get("categories", {}).values():
+        if isinstance(category_data, dict) and "mappings" in category_data:
+            mapping_dict.update(category_data["mappings"])
+
+    exclusion_sources = []
+    for rule in config.get("exclusion_rules", []):
+        try:
+            re.compile(rule["pattern"])
+            exclusion_sources.append(rule["pattern"])
+        except re.error as e:
+            logger.error(f"Invalid exclusion pattern '{rule['pattern']}': {e}")
+    exclusion_regex = combine_patterns(exclusion_sources)
+    exclusion_patterns = () if exclusion_regex is not None else tuple(
+        re.compile(source) for source in exclusion_sources
+    )
+
+    pattern_rules = []
+    for rule in config.get("pattern_rules", []):
+        try:
+            pattern_rules.append(PatternRule.compile(
+                rule["pattern"],
+                rule.get("replacement", ""),
+                rule.get("type", "unknown"),
+            ))
+        except re.error as e:
+            logger.error(f"Invalid pattern rule '{rule['pattern']}': {e}")
+
+    return StandardizationIndex(
+        mappings=MappingProxyType(mapping_dict),
+        exclusion_regex=exclusion_regex,
+        exclusion_patterns=exclusion_patterns,
+        pattern_rules=tuple(pattern_rules),
+        version=str(config.get("version", "unknown")),
+    )
+
+
+class IndexRegistry:
+    """
+    Process-wide registry of compiled indexes.
+
+    Indexes are keyed by their source (e.g. config path plus modification
+    time). Replacing an entry is a single dict assignment, so readers always
+    see either the old or the new index, never a partially built one.
+    """
+
+    def __init__(self):
+        self._indexes: dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], object]):
+        """Return the index for ``key``, building it once if missing."""
+        index = self._indexes.get(key)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = builder()
+                self._indexes[key] = index
+        return index
+
+    def replace(self, key: Hashable, index) -> None:
+        """Atomically swap the index stored for ``key``."""
+        self._indexes[key] = index
+
+    def clear(self) -> None:
+        """Drop all cached indexes."""
+        with self._lock:
+            self._indexes.clear()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+
+_registry = IndexRegistry()
+
+
+def get_index_registry() -> IndexRegistry:
+    """Get the process-wide index registry."""
+    return _registry
@@ -0,0 +1,475 @@
+"""
+Versioned binary snapshot of all standardization dictionaries.
+
+The YAML/JSON dictionaries under src/data/standardization are compiled by a
+build step (validate_dictionaries.py, import_from_csv.py or
+``python -m src.core.standardization_snapshot``) into a single snapshot file:
+
+    MAGIC (8 bytes) | format version (uint16, big endian) | SHA-256 of body | body
+
+The body is a pickled payload holding the flattened English dictionaries,
+the English pattern rules with their precomputed literal prefilters, the
+Traditional Chinese config and the SHA-256 of every source file. At runtime
+the file is memory-mapped, verified and loaded in milliseconds, shared
+process-wide through SnapshotStore and hot-reloaded when the snapshot or any
+source file changes. A missing, corrupt or stale snapshot falls back to
+compiling the sources directly, so a forgotten build step never changes
+behavior.
+
+Note: the body is a pickle, so only snapshots produced by this build step
+(shipped alongside the code) should ever be loaded.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import re
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+
+import yaml
+
+from .standardization_index import (
+    EMPTY_INDEX,
+    KeywordIndex,
+    PatternRule,
+    StandardizationIndex,
+    compile_index,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"STDSNAP\x00"
+SNAPSHOT_FORMAT_VERSION = 1
+_HEADER = struct.Struct(">8sH32s")
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data" / "standardization"
+SNAPSHOT_FILENAME = "standardization.snapshot"
+ZH_TW_CONFIG_FILENAME = "zh_tw_standard_terms.json"
+DICTIONARY_FILES = ("skills.yaml", "positions.yaml", "tools.yaml", "patterns.yaml")
+SOURCE_FILES = (*DICTIONARY_FILES, ZH_TW_CONFIG_FILENAME)
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or incompatible."""
+
+
+@dataclass(frozen=True)
+class StandardizationSnapshot:
+    """Runtime view of a loaded snapshot, shared by all standardizers."""
+
+    keyword_index: KeywordIndex
+    zh_tw_config: dict | None
+    zh_tw_index: StandardizationIndex
+    checksum: str
+    built_at: str
+    origin: str  # "snapshot" or "sources"
+
+
+def source_checksums(data_dir: Path) -> dict[str, str | None]:
+    """SHA-256 of every source dictionary file (None if missing)."""
+    checksums = {}
+    for filename in SOURCE_FILES:
+        try:
+            checksums[filename] = hashlib.sha256((data_dir / filename).read_bytes()).hexdigest()
+        except OSError:
+            checksums[filename] = None
+    return checksums
+
+
+def load_yaml_dictionary(filepath: Path) -> dict[str, str]:
+    """
+    Load a flattened, lower-cased dictionary from a YAML file.
+
+    Args:
+        filepath: YAML file with ``category: {original: standardized}`` entries
+
+    Returns:
+        Dictionary mapping original terms to standardized terms
+    """
+    filename = filepath.name
+
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+
+        # Flatten the nested structure
+        dictionary = {}
+        if isinstance(data, dict):
+            for _category, mappings in data.items():
+                if isinstance(mappings, dict):
+                    for original, standardized in mappings.items():
+                        # Convert to lowercase for case-insensitive matching
+                        dictionary[original.lower()] = standardized
+
+        logger.info(f"Loaded {len(dictionary)} entries from {filename}")
+        return dictionary
+
+    except FileNotFoundError:
+        logger.warning(f"Dictionary file not found: {filepath}")
+        return {}
+    except yaml.YAMLError as e:
+        logger.error(f"Error parsing YAML file {filename}: {e}")
+        return {}
+    except Exception as e:
+        logger.error(f"Unexpected error loading {filename}: {e}")
+        return {}
+
+
+def load_pattern_rules(filepath: Path) -> list[PatternRule]:
+    """
+    Load case-insensitive pattern rules from a YAML file.
+
+    Args:
+        filepath: YAML file with ``category: [{pattern, replacement, type}]`` entries
+
+    Returns:
+        List of compiled PatternRule objects
+    """
+    filename = filepath.name
+    patterns = []
+
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+
+        if isinstance(data, dict):
+            for _category, pattern_list in data.items():
+                if not isinstance(pattern_list, list):
+                    continue
+                for pattern_info in pattern_list:
+                    if isinstance(pattern_info, dict) and "pattern" in pattern_info:
+                        try:
+                            patterns.append(PatternRule.compile(
+                                pattern_info["pattern"],
+                                pattern_info.get("replacement", ""),
+                                pattern_info.get("type", "unknown"),
+                                re.IGNORECASE,
+                            ))
+                        except re.error as e:
+                            logger.error(
+                                f"Invalid regex pattern '{pattern_info['pattern']}': {e}"
+                            )
+
+        logger.info(f"Loaded {len(patterns)} patterns from {filename}")
+        return patterns
+
+    except FileNotFoundError:
+        logger.warning(f"Pattern file not found: {filepath}")
+        return []
+    except yaml.YAMLError as e:
+        logger.error(f"Error parsing YAML file {filename}: {e}")
+        return []
+    except Exception as e:
+        logger.error(f"Unexpected error loading {filename}: {e}")
+        return []
+
+
+def build_keyword_index(data_dir: Path) -> KeywordIndex:
+    """Load the English YAML dictionaries and compile them into a KeywordIndex."""
+    skill_dictionary = load_yaml_dictionary(data_dir / "skills.yaml")
+    position_dictionary = load_yaml_dictionary(data_dir / "positions.yaml")
+    tool_dictionary = load_yaml_dictionary(data_dir / "tools.yaml")
+    patterns = load_pattern_rules(data_dir / "patterns.yaml")
+    return _keyword_index(skill_dictionary, position_dictionary, tool_dictionary, tuple(patterns))
+
+
+def _keyword_index(skills: dict, positions: dict, tools: dict,
+                   patterns: tuple[PatternRule, ...]) -> KeywordIndex:
+    """Assemble a KeywordIndex from flattened dictionaries and compiled rules."""
+    # Combine all dictionaries for efficient lookup
+    combined_dictionary = {}
+    combined_dictionary.update(skills)
+    combined_dictionary.update(positions)
+    combined_dictionary.update(tools)
+
+    return KeywordIndex(
+        skill_dictionary=MappingProxyType(skills),
+        position_dictionary=MappingProxyType(positions),
+        tool_dictionary=MappingProxyType(tools),
+        combined_dictionary=MappingProxyType(combined_dictionary),
+        patterns=patterns,
+    )
+
+
+def _load_zh_tw_config(data_dir: Path) -> dict | None:
+    """Load the Traditional Chinese config as plain JSON."""
+    try:
+        with open(data_dir / ZH_TW_CONFIG_FILENAME, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"Config file not found: {data_dir / ZH_TW_CONFIG_FILENAME}")
+    except Exception as e:
+        logger.error(f"Failed to load Traditional Chinese config: {e}")
+    return None
+
+
+def build_snapshot_payload(data_dir: Path | str = DEFAULT_DATA_DIR) -> dict:
+    """
+    Parse all source dictionaries into a snapshot payload.
+
+    Args:
+        data_dir: Directory containing the YAML/JSON dictionaries
+
+    Returns:
+        Picklable payload made of builtin types only
+    """
+    data_dir = Path(data_dir)
+    keyword_index = build_keyword_index(data_dir)
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "sources": source_checksums(data_dir),
+        "en": {
+            "skills": dict(keyword_index.skill_dictionary),
+            "positions": dict(keyword_index.position_dictionary),
+            "tools": dict(keyword_index.tool_dictionary),
+            "patterns": [
+                (rule.regex.pattern, rule.replacement, rule.rule_type,
+                 rule.regex.flags, rule.prefilter)
+                for rule in keyword_index.patterns
+            ],
+        },
+        "zh-TW": _load_zh_tw_config(data_dir),
+    }
+
+
+def snapshot_from_payload(payload: dict, checksum: str, origin: str) -> StandardizationSnapshot:
+    """Compile a payload into the runtime StandardizationSnapshot."""
+    en = payload["en"]
+    patterns = tuple(
+        PatternRule(
+            regex=re.compile(pattern, flags),
+            replacement=replacement,
+            rule_type=rule_type,
+            prefilter=prefilter,
+            ignore_case=bool(flags & re.IGNORECASE),
+        )
+        for pattern, replacement, rule_type, flags, prefilter in en["patterns"]
+    )
+
+    keyword_index = _keyword_index(en["skills"], en["positions"], en["tools"], patterns)
+
+    zh_tw_config = payload.get("zh-TW")
+    return StandardizationSnapshot(
+        keyword_index=keyword_index,
+        zh_tw_config=zh_tw_config,
+        zh_tw_index=compile_index(zh_tw_config) if zh_tw_config else EMPTY_INDEX,
+        checksum=checksum,
+        built_at=payload.get("built_at", "unknown"),
+        origin=origin,
+    )
+
+
+def write_snapshot(payload: dict, path: Path | str) -> str:
+    """
+    Write a payload as a snapshot file (atomically, via rename).
+
+    Returns:
+        Hex SHA-256 checksum of the snapshot body
+    """
+    path = Path(path)
+    body = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    digest = hashlib.sha256(body).digest()
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, digest))
+        f.write(body)
+    os.replace(tmp_path, path)
+    return digest.hex()
+
+
+def read_snapshot(path: Path | str) -> tuple[dict, str]:
+    """
+    Memory-map and verify a snapshot file.
+
+    Returns:
+        Tuple of (payload, hex checksum)
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+        SnapshotError: If the file is corrupt or has an unsupported version
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= _HEADER.size:
+            raise SnapshotError(f"Snapshot too small: {path}")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, digest = _HEADER.unpack_from(mapped, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError(f"Not a standardization snapshot: {path}")
+            if version != SNAPSHOT_FORMAT_VERSION:
+                raise SnapshotError(
+                    f"Unsupported snapshot version {version} (expected {SNAPSHOT_FORMAT_VERSION})"
+                )
+
+            body = memoryview(mapped)[_HEADER.size:]
+            try:
+                if hashlib.sha256(body).digest() != digest:
+                    raise SnapshotError(f"Snapshot checksum mismatch: {path}")
+                payload = pickle.loads(body)
+            finally:
+                body.release()
+
+    return payload, digest.hex()
+
+
+def build_snapshot(data_dir: Path | str = DEFAULT_DATA_DIR,
+                   output_path: Path | str | None = None) -> tuple[Path, str]:
+    """
+    Build step: compile all dictionaries in ``data_dir`` into a snapshot.
+
+    Returns:
+        Tuple of (snapshot path, hex checksum)
+    """
+    data_dir = Path(data_dir)
+    output_path = Path(output_path) if output_path else data_dir / SNAPSHOT_FILENAME
+    checksum = write_snapshot(build_snapshot_payload(data_dir), output_path)
+    logger.info(f"Wrote standardization snapshot {output_path} ({checksum[:12]})")
+    return output_path, checksum
+
+
+class SnapshotStore:
+    """
+    Process-wide holder of the current StandardizationSnapshot.
+
+    ``get()`` is a couple of attribute reads on the hot path. At most once per
+    ``check_interval`` seconds it stats the snapshot and source files, and
+    when any of them changed, loads the new snapshot and swaps it in with a
+    single assignment; readers holding the previous snapshot are unaffected.
+    """
+
+    def __init__(self, data_dir: Path | str = DEFAULT_DATA_DIR,
+                 snapshot_path: Path | str | None = None,
+                 check_interval: float = 5.0):
+        self.data_dir = Path(data_dir)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else self.data_dir / SNAPSHOT_FILENAME
+        self.check_interval = check_interval
+        self._current: StandardizationSnapshot | None = None
+        self._fingerprint: tuple | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload_count = 0
+
+    def get(self) -> StandardizationSnapshot:
+        """Get the current snapshot, picking up file changes when due."""
+        current = self._current
+        if current is not None and time.monotonic() < self._next_check:
+            return current
+        return self._refresh(force=False)
+
+    def reload(self) -> StandardizationSnapshot:
+        """Force a reload regardless of file modification times."""
+        return self._refresh(force=True)
+
+    def _files_fingerprint(self) -> tuple:
+        """Cheap change detector: (mtime, size) of snapshot and source files."""
+        fingerprint = []
+        for path in (self.snapshot_path, *(self.data_dir / name for name in SOURCE_FILES)):
+            try:
+                stat = path.stat()
+                fingerprint.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
+
+    def _refresh(self, force: bool) -> StandardizationSnapshot:
+        with self._lock:
+            if not force and self._current is not None and time.monotonic() < self._next_check:
+                return self._current
+
+            self._next_check = time.monotonic() + self.check_interval
+            fingerprint = self._files_fingerprint()
+            if not force and self._current is not None and fingerprint == self._fingerprint:
+                return self._current
+
+            start = time.perf_counter()
+            snapshot = self._load()
+            self._fingerprint = fingerprint
+            if self._current is not None:
+                self.reload_count += 1
+            self._current = snapshot
+
+            logger.info(
+                f"Standardization snapshot {snapshot.checksum[:12]} loaded from "
+                f"{snapshot.origin} in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+            return snapshot
+
+    def _load(self) -> StandardizationSnapshot:
+        """Load the snapshot file, falling back to the sources if unusable."""
+        sources = source_checksums(self.data_dir)
+        try:
+            payload, checksum = read_snapshot(self.snapshot_path)
+            if payload.get("sources") == sources:
+                return snapshot_from_payload(payload, checksum, origin="snapshot")
+            logger.warning(
+                f"Standardization snapshot {self.snapshot_path} is stale; "
+                f"compiling dictionaries from sources"
+            )
+        except FileNotFoundError:
+            logger.info(f"No standardization snapshot at {self.snapshot_path}; compiling sources")
+        except Exception as e:
+            logger.warning(f"Ignoring unusable standardization snapshot: {e}")
+
+        payload = build_snapshot_payload(self.data_dir)
+        checksum = hashlib.sha256(
+            pickle.dumps(payload["sources"], protocol=pickle.HIGHEST_PROTOCOL)
+        ).hexdigest()
+        return snapshot_from_payload(payload, checksum, origin="sources")
+
+    def stats(self) -> dict:
+        """Current snapshot metadata."""
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "checksum": current.checksum if current else None,
+            "built_at": current.built_at if current else None,
+            "origin": current.origin if current else None,
+            "reload_count": self.reload_count,
+            "snapshot_path": str(self.snapshot_path),
+        }
+
+
+_store: SnapshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get the process-wide snapshot store (singleton)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .config import settings
+
+                _store = SnapshotStore(
+                    snapshot_path=settings.standardization_snapshot_path or None,
+                    check_interval=settings.standardization_reload_interval,
+                )
+    return _store
+
+
+def main() -> int:
+    """Build the default snapshot from the command line."""
+    logging.basicConfig(level=logging.INFO)
+    data_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    output_path, checksum = build_snapshot(data_dir)
+    print(f"✓ Snapshot written to {output_path} (sha256 {checksum})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Token-aware input budgeting for LLM prompts.
+
+Long job descriptions and resumes inflate prompt tokens and latency and can
+push completions into ``finish_reason=length``.  This module counts tokens
+per prompt section, strips HTML boilerplate, drops repeated bullets and, when
+the inputs still exceed the configured budget, trims the lowest-value
+sections first.
+
+Token counts use tiktoken when it is installed and its encoding file is
+available offline (``TIKTOKEN_CACHE_DIR``, pre-populated at build time with
+``python -m src.core.token_budget``); otherwise a character-based estimate is
+used so budgeting never needs network access on the request path.
+"""
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIKTOKEN_CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "tiktoken"
+TRUNCATION_MARKER = "\n[...]"
+
+# HTML boilerplate that carries no meaning for the LLM
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_NON_CONTENT_RE = re.compile(r"<(script|style|head|noscript|template)\b.*?</\1\s*>", re.S | re.I)
+_VOID_BOILERPLATE_RE = re.compile(r"<!DOCTYPE[^>]*>|<(?:meta|link)\b[^>]*>|</?(?:html|body)\b[^>]*>", re.I)
+_NOISE_ATTR_RE = re.compile(r"""\s(?:style|data-[\w-]+)\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+)""", re.I)
+_EMPTY_ELEMENT_RE = re.compile(r"<(p|span|div|li|ul|ol|strong|em|b|i)\b[^>]*>\s*</\1>", re.I)
+_INTER_TAG_WS_RE = re.compile(r">\s+<")
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_NBSP_RE = re.compile(r"&nbsp;|\xa0", re.I)
+
+# Bullets
+# Leaf items only: an item holding a nested list is never matched, so dedupe cannot cut it apart
+_LI_RE = re.compile(r"<li\b[^>]*>((?:(?!<li\b|</li>|</?[uo]l\b).)*)</li>", re.S | re.I)
+_TEXT_BULLET_RE = re.compile(r"^\s*(?:[-*•·●▪]|\d+[.)])\s+(.+?)\s*$")
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLOCK_END_RE = re.compile(r"</(?:p|li|h[1-6]|div|tr|section)>|<br\s*/?>", re.I)
+
+# tiktoken caches each encoding file under sha1(<blob url>) in TIKTOKEN_CACHE_DIR
+_TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+_CJK_RE = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def strip_html_boilerplate(html: str) -> str:
+    """Remove comments, scripts/styles, document wrappers, inline styles and empty tags."""
+    if "<" not in html and "&nbsp;" not in html:
+        return html.strip()
+    text = _COMMENT_RE.sub("", html)
+    text = _NON_CONTENT_RE.sub("", text)
+    text = _VOID_BOILERPLATE_RE.sub("", text)
+    text = _NOISE_ATTR_RE.sub("", text)
+    text = _NBSP_RE.sub(" ", text)
+    text = _INTER_TAG_WS_RE.sub("><", text)
+    for _ in range(2):  # nested empty wrappers
+        text = _EMPTY_ELEMENT_RE.sub("", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _bullet_key(text: str) -> str:
+    return " ".join(_TAG_RE.sub(" ", text).split()).casefold()
+
+
+def dedupe_bullets(text: str) -> str:
+    """Drop repeated ``<li>`` items and repeated plain-text bullet lines (first one wins)."""
+    seen: set[str] = set()
+
+    def _keep_first(match: re.Match) -> str:
+        key = _bullet_key(match.group(1))
+        if key and key in seen:
+            return ""
+        seen.add(key)
+        return match.group(0)
+
+    if "<li" in text:
+        text = _LI_RE.sub(_keep_first, text)
+
+    seen.clear()
+    lines = []
+    for line in text.split("\n"):
+        bullet = _TEXT_BULLET_RE.match(line)
+        if bullet:
+            key = _bullet_key(bullet.group(1))
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def html_to_text(html: str) -> str:
+    """Flatten HTML to text, keeping one line per block element."""
+    text = _BLOCK_END_RE.sub("\n", html)
+    text = _TAG_RE.sub(" ", text)
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when available offline, otherwise estimates."""
+
+    def __init__(self, encoding_name: str = "o200k_base", cache_dir: Path | str | None = None):
+        self.encoding_name = encoding_name
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_TIKTOKEN_CACHE_DIR
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return "tiktoken" if self._get_encoding() is not None else "estimate"
+
+    def _get_encoding(self):
+        if self._loaded:
+            return self._encoding
+        with self._lock:
+            if not self._loaded:
+                self._encoding = self._load_encoding()
+                self._loaded = True
+        return self._encoding
+
+    def _load_encoding(self):
+        try:
+            import tiktoken
+        except ImportError:
+            logger.info("tiktoken not installed; using estimated token counts")
+            return None
+
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(self.cache_dir))
+        cache_dir = Path(os.environ["TIKTOKEN_CACHE_DIR"])
+        cache_key = hashlib.sha1(_TIKTOKEN_BLOB_URL.format(self.encoding_name).encode()).hexdigest()
+        if not (cache_dir / cache_key).is_file():
+            # Loading would try to download the encoding on the request path
+            logger.info(f"No cached {self.encoding_name} in {cache_dir}; using estimated token counts")
+            return None
+        try:
+            return tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning(f"Failed to load tiktoken encoding {self.encoding_name}: {e}")
+            return None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        cjk = len(_CJK_RE.findall(text))
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most ``max_tokens`` tokens, preferring a line/word boundary."""
+        if max_tokens <= 0:
+            return ""
+        encoding = self._get_encoding()
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            cut = encoding.decode(tokens[:max_tokens])
+        else:
+            total = self.count(text)
+            if total <= max_tokens:
+                return text
+            cut = text[:len(text) * max_tokens // total]
+
+        boundary = max(cut.rfind("\n"), cut.rfind(" "))
+        if boundary > len(cut) * 0.8:
+            cut = cut[:boundary]
+        return cut.rstrip()
+
+
+@dataclass
+class PromptSection:
+    """One variable input of a prompt.
+
+    ``priority`` orders trimming (lower is trimmed first); sections with
+    ``trimmable=False`` are only cleaned, never cut.  ``clean=False`` keeps
+    the text verbatim (no boilerplate stripping or bullet dedupe), e.g. for
+    content the LLM rewrites and returns; it is only counted.
+    """
+
+    name: str
+    text: str
+    priority: int = 0
+    trimmable: bool = True
+    min_tokens: int = 256
+    html: bool = False
+    clean: bool = True
+
+
+@dataclass
+class BudgetResult:
+    """Budgeted section texts plus per-section token accounting."""
+
+    texts: dict[str, str]
+    tokens_before: dict[str, int]
+    tokens_after: dict[str, int]
+    budget: int
+    backend: str
+    trimmed: list[str] = field(default_factory=list)
+
+    @property
+    def total_before(self) -> int:
+        return sum(self.tokens_before.values())
+
+    @property
+    def total_after(self) -> int:
+        return sum(self.tokens_after.values())
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.total_before - self.total_after
+
+    def telemetry(self) -> dict:
+        return {
+            "input_tokens_before": self.total_before,
+            "input_tokens_after": self.total_after,
+            "input_tokens_saved": self.tokens_saved,
+            "input_token_budget": self.budget,
+            "trimmed_sections": ",".join(self.trimmed),
+            "token_counter": self.backend,
+        }
+
+
+class TokenBudgeter:
+    """Fits prompt sections into a token budget."""
+
+    def __init__(self, counter: TokenCounter):
+        self.counter = counter
+
+    def fit(self, sections: list[PromptSection], budget: int) -> BudgetResult:
+        """
+        Clean every section (unless ``clean=False``), then trim the lowest-priority sections until the
+        total fits ``budget`` (``budget <= 0`` disables trimming).
+        """
+        texts, before, after = {}, {}, {}
+        for section in sections:
+            before[section.name] = self.counter.count(section.text)
+            text = section.text
+            if section.clean:
+                text = strip_html_boilerplate(text) if section.html else text
+                text = dedupe_bullets(text)
+            texts[section.name] = text
+            after[section.name] = self.counter.count(text)
+
+        result = BudgetResult(texts, before, after, budget, self.counter.backend)
+        overflow = result.total_after - budget
+        if budget <= 0 or overflow <= 0:
+            return result
+
+        for section in sorted(sections, key=lambda s: s.priority):
+            if overflow <= 0:
+                break
+            if not section.trimmable:
+                continue
+            current = after[section.name]
+            target = max(section.min_tokens, current - overflow)
+            if target >= current:
+                continue
+            text = texts[section.name]
+            if section.html:
+                text = html_to_text(text)
+            text = self.counter.truncate(text, target) + TRUNCATION_MARKER
+            texts[section.name] = text
+            after[section.name] = self.counter.count(text)
+            overflow -= current - after[section.name]
+            result.trimmed.append(section.name)
+
+        if overflow > 0:
+            logger.warning(f"Prompt inputs exceed token budget by {overflow} tokens after trimming")
+        return result
+
+
+_budgeter: TokenBudgeter | None = None
+
+
+def get_token_budgeter() -> TokenBudgeter:
+    """Get the shared budgeter (the encoding is loaded once per process)."""
+    global _budgeter
+    if _budgeter is None:
+        settings = get_settings()
+        _budgeter = TokenBudgeter(
+            TokenCounter(settings.token_encoding, settings.tiktoken_cache_dir or None)
+        )
+    return _budgeter
+
+
+def main() -> int:
+    """Download the tiktoken encoding into the offline cache directory."""
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    cache_dir = Path(sys.argv[1] if len(sys.argv) > 1 else settings.tiktoken_cache_dir or DEFAULT_TIKTOKEN_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["TIKTOKEN_CACHE_DIR"] = str(cache_dir)
+    try:
+        import tiktoken
+    except ImportError:
+        print("✗ tiktoken is not installed")
+        return 1
+    tiktoken.get_encoding(settings.token_encoding)
+    print(f"✓ Cached tiktoken encoding {settings.token_encoding} in {cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
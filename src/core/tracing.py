@@ -0,0 +1,253 @@
+"""
+Lightweight per-request tracing: nested timing spans in context variables.
+
+The monitoring middleware starts a trace per request under its correlation
+ID; code anywhere below it marks stages with ``span``::
+
+    with span("prompt_render"):
+        prompt = template.format(...)
+
+    @traced("embedding")
+    async def create_embeddings(...): ...
+
+Spans use ``perf_counter_ns`` and nest through a context variable, so
+stages running concurrently (``asyncio.gather`` / ``create_task``) get the
+right parent: each task works on a copy of the context.  Outside a request
+(no active trace) a span only times its block.
+
+When the request finishes the middleware adds the per-stage totals as an
+``X-Server-Timing`` header (``Server-Timing`` syntax), and keeps the full
+trace in a bounded in-memory buffer (``GET /debug/traces``); traces slower
+than ``trace_slow_request_ms`` are also exported as a ``RequestTrace``
+monitoring event.
+
+Stage names used across the services:
+
+    validation, language_detection, cache_lookup, prompt_render, llm, parse,
+    standardize, embedding, similarity, vector_search, sql, html_postprocess
+"""
+import functools
+import inspect
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage; ``parent`` is the index of the enclosing span in the trace."""
+
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    parent: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+
+class Trace:
+    """All spans of one request."""
+
+    __slots__ = ("trace_id", "name", "started_at", "start_ns", "end_ns", "spans", "attributes")
+
+    def __init__(self, trace_id: str, name: str = ""):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = 0
+        self.spans: list[Span] = []
+        self.attributes: dict[str, Any] = {}
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def finish(self) -> None:
+        if not self.end_ns:
+            self.end_ns = time.perf_counter_ns()
+
+    def stage_totals(self) -> dict[str, dict[str, float]]:
+        """Total milliseconds and span count per stage name, in first-seen order."""
+        totals: dict[str, dict[str, float]] = {}
+        for s in self.spans:
+            if not s.end_ns:
+                continue
+            entry = totals.setdefault(s.name, {"ms": 0.0, "count": 0})
+            entry["ms"] += s.duration_ms
+            entry["count"] += 1
+        return totals
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` value: one entry per stage (summed) plus ``total``."""
+        entries = [
+            f'{name};dur={total["ms"]:.1f}' + (f';desc="x{total["count"]}"' if total["count"] > 1 else "")
+            for name, total in self.stage_totals().items()
+        ]
+        entries.append(f"total;dur={self.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Exportable form: span offsets relative to the request start."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "stages": {name: {"ms": round(t["ms"], 3), "count": t["count"]}
+                       for name, t in self.stage_totals().items()},
+            "spans": [
+                {
+                    "name": s.name,
+                    "start_ms": round((s.start_ns - self.start_ns) / 1e6, 3),
+                    "duration_ms": round(s.duration_ms, 3),
+                    "parent": s.parent,
+                    **({"attributes": s.attributes} if s.attributes else {}),
+                }
+                for s in self.spans
+            ],
+        }
+
+
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_parent: ContextVar[int | None] = ContextVar("trace_parent_span", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+def start_trace(trace_id: str, name: str = "") -> tuple[Trace, Token]:
+    """Start a trace for the current context; pass the token to ``end_trace``."""
+    trace = Trace(trace_id, name)
+    return trace, _trace.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.finish()
+    _trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a stage under the current span.
+
+    Without an active trace the span is still timed (``duration_ms`` can be
+    read after the block) but not recorded anywhere.
+    """
+    trace = _trace.get()
+    current = Span(name, time.perf_counter_ns(), parent=_parent.get(), attributes=attributes)
+    if trace is None:
+        try:
+            yield current
+        finally:
+            current.end_ns = time.perf_counter_ns()
+        return
+    trace.spans.append(current)
+    token = _parent.set(len(trace.spans) - 1)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _parent.reset(token)
+
+
+def record_span(name: str, start_ns: int, end_ns: int | None = None, **attributes: Any) -> None:
+    """Add an already-timed stage (e.g. a streamed response consumed across yields)."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.spans.append(Span(name, start_ns, end_ns or time.perf_counter_ns(),
+                                parent=_parent.get(), attributes=attributes))
+
+
+def stage_ms(name: str) -> float:
+    """Total milliseconds spent in ``name`` spans so far in this request (0 without a trace)."""
+    trace = _trace.get()
+    if trace is None:
+        return 0.0
+    return sum(s.duration_ms for s in trace.spans if s.name == name)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of ``span`` for sync and async functions."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TraceRecorder:
+    """Bounded buffer of finished traces for ``/debug/traces``."""
+
+    def __init__(self, size: int = 200):
+        self._traces: deque[Trace] = deque(maxlen=size)
+
+    def add(self, trace: Trace) -> None:
+        self._traces.append(trace)
+
+    def get(self, trace_id: str) -> Trace | None:
+        return next((t for t in reversed(self._traces) if t.trace_id == trace_id), None)
+
+    def recent(self, limit: int = 20, min_ms: float = 0.0) -> list[Trace]:
+        traces = [t for t in reversed(self._traces) if t.duration_ms >= min_ms]
+        return traces[:limit]
+
+    def summary(self) -> dict[str, Any]:
+        """Per-name, per-stage mean milliseconds over the buffered traces."""
+        by_name: dict[str, dict[str, Any]] = {}
+        for trace in self._traces:
+            entry = by_name.setdefault(trace.name, {"requests": 0, "total_ms": 0.0, "stages": {}})
+            entry["requests"] += 1
+            entry["total_ms"] += trace.duration_ms
+            for stage, total in trace.stage_totals().items():
+                entry["stages"][stage] = entry["stages"].get(stage, 0.0) + total["ms"]
+        return {
+            name: {
+                "requests": e["requests"],
+                "mean_ms": round(e["total_ms"] / e["requests"], 2),
+                "stages_mean_ms": {s: round(ms / e["requests"], 2) for s, ms in e["stages"].items()},
+            }
+            for name, e in by_name.items()
+        }
+
+
+_recorder: TraceRecorder | None = None
+
+
+def get_trace_recorder() -> TraceRecorder:
+    global _recorder
+    if _recorder is None:
+        from src.core.config import get_settings
+
+        _recorder = TraceRecorder(get_settings().trace_buffer_size)
+    return _recorder
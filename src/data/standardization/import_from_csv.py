@@ -19,6 +19,11 @@ from typing import Any
 
 import yaml
 
+# Allow running as a script: make the repository root importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.standardization_snapshot import build_snapshot  # noqa: E402
+
 
 def backup_existing_files(data_dir: Path) -> bool:
     """Create backup of existing YAML files."""
@@ -377,6 +382,10 @@ def main():
     if args.dry_run:
         print("\nThis was a DRY RUN. No files were modified.")
         print("To perform actual import, run without --dry-run flag.")
+    elif success_count > 0:
+        # Rebuild the runtime snapshot so services hot-reload the new mappings
+        snapshot_path, checksum = build_snapshot(script_dir)
+        print(f"✓ Snapshot written to {snapshot_path.name} (sha256 {checksum[:12]})")
     
     return 0 if success_count == len(results) else 1
 
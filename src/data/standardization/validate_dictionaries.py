@@ -9,6 +9,11 @@ from pathlib import Path
 
 import yaml
 
+# Allow running as a script: make the repository root importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.standardization_snapshot import build_snapshot  # noqa: E402
+
 
 def load_yaml_file(filepath: Path) -> dict:
     """Load and parse a YAML file."""
@@ -244,6 +249,11 @@ def main():
                 print(f"   - {issue}")
             all_issues.extend(pattern_issues)
     
+    # Rebuild the runtime snapshot from exactly what was validated
+    # (the services load these dictionaries whether or not issues exist)
+    snapshot_path, checksum = build_snapshot(data_dir)
+    print(f"\n✓ Snapshot written to {snapshot_path.name} (sha256 {checksum[:12]})")
+    
     # Summary
     print("\n" + "=" * 60)
     if all_issues:
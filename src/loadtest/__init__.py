@@ -0,0 +1,4 @@
+"""
+Offline load testing: mock Azure OpenAI chat / embeddings server, in-memory
+course catalog and per-endpoint scenario drivers (``python -m src.loadtest``).
+"""
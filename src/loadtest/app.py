@@ -0,0 +1,21 @@
+"""
+App factory for offline load tests: the real app with the course catalog
+served from memory (see ``course_store``).  LLM and embedding endpoints are
+pointed at the mock server through the usual settings environment variables.
+
+    uvicorn src.loadtest.app:create_app --factory
+"""
+import os
+
+from fastapi import FastAPI
+
+
+def create_app() -> FastAPI:
+    from src.loadtest.course_store import build_course_search_service
+    from src.main import create_app as create_main_app
+    from src.services.course_search_singleton import CourseSearchSingleton
+
+    CourseSearchSingleton._instance = build_course_search_service(
+        count=int(os.getenv("LOADTEST_COURSES", "2000"))
+    )
+    return create_main_app()
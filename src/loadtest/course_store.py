@@ -0,0 +1,117 @@
+"""
+In-memory stand-in for the pgvector course catalog.
+
+Builds a ``CourseSearchService`` whose vector index and metadata snapshot
+are pre-loaded with a synthetic catalog, so every search runs the same
+in-process path production uses with ``course_search_backend=memory`` —
+query embedding, index scan, snapshot hydration, cache — without Postgres.
+
+Course vectors come from the mock server's ``embed_text``, so a query for
+"Kubernetes" scores highest against courses that mention it.  The stand-in
+pool only answers the readiness ping; any SQL reaching it means a request
+fell back to the database path and fails loudly.
+"""
+import random
+from datetime import datetime, timezone
+from typing import Any
+
+from src.core.config import get_settings
+from src.loadtest.mock_openai import embed_text
+
+_TOPICS = [
+    "Python", "Machine Learning", "Data Analysis", "SQL", "Kubernetes", "Docker", "Azure", "AWS",
+    "Project Management", "Leadership", "Communication", "Excel", "Tableau", "JavaScript", "React",
+    "Cybersecurity", "Deep Learning", "Statistics", "Agile", "Product Management", "FastAPI", "Git",
+]
+_LEVELS = ["Introduction to", "Applied", "Advanced", "Practical", "Professional"]
+_PROVIDERS = ["Google", "IBM", "Microsoft", "DeepLearning.AI", "University of Michigan", "Meta"]
+_TYPES = ["course", "specialization", "professional-certificate", "project"]
+
+
+class OfflineCoursePool:
+    """Answers ``SELECT 1`` (readiness); every other query means a DB fallback."""
+
+    class _Connection:
+        async def fetchval(self, query: str, *args):
+            if query.strip() == "SELECT 1":
+                return 1
+            raise RuntimeError(f"Offline course store has no database; unexpected query: {query.strip()[:80]}")
+
+        async def fetch(self, query: str, *args):
+            raise RuntimeError(f"Offline course store has no database; unexpected query: {query.strip()[:80]}")
+
+    class _Acquire:
+        async def __aenter__(self):
+            return OfflineCoursePool._Connection()
+
+        async def __aexit__(self, *exc):
+            return False
+
+    def acquire(self):
+        return self._Acquire()
+
+    def get_size(self) -> int:
+        return 0
+
+    def get_idle_size(self) -> int:
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+def synthetic_courses(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Course rows shaped like ``COURSE_COLUMNS`` plus ``category``."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        topic = _TOPICS[i % len(_TOPICS)]
+        other = rng.choice(_TOPICS)
+        course_type = _TYPES[i % len(_TYPES)]
+        provider = rng.choice(_PROVIDERS)
+        name = f"{rng.choice(_LEVELS)} {topic} with {other}"
+        rows.append({
+            "id": f"offline-{i:06d}",
+            "name": name,
+            "description": f"Learn {topic} and {other} through hands-on projects. " * 6,
+            "provider": provider,
+            "provider_standardized": provider,
+            "provider_logo_url": "",
+            "current_price": float(rng.choice([0, 39, 49, 79])),
+            "currency": "USD",
+            "image_url": f"https://example.com/{i}.png",
+            "tracking_url": f"https://example.com/course/{i}",
+            "course_type": course_type,
+            "category": course_type,
+        })
+    return rows
+
+
+def build_course_search_service(count: int = 2000, seed: int = 0):
+    """A ``CourseSearchService`` backed by an in-memory synthetic catalog."""
+    from src.services.course_metadata import CourseMetadataStore
+    from src.services.course_search import CourseSearchService, vector_target
+    from src.services.course_vector_index import CourseVectorIndex
+
+    settings = get_settings()
+    dimensions = settings.course_embedding_dimensions or 1536
+    rows = synthetic_courses(count, seed)
+    watermark = datetime.now(timezone.utc)
+
+    service = CourseSearchService()
+    service._conn_info = {"host": "offline"}
+    service._connection_pool = OfflineCoursePool()
+
+    service.vector_index = CourseVectorIndex(
+        quantization=settings.course_index_quantization,
+        use_hnsw=settings.course_index_hnsw,
+        column=vector_target()[0],
+    )
+    service.vector_index.apply(
+        [(row["id"], embed_text(f"{row['name']} {row['description']}", dimensions), row["category"])
+         for row in rows],
+        watermark=watermark,
+    )
+    service.metadata_store = CourseMetadataStore()
+    service.metadata_store.apply(rows, watermark=watermark)
+    return service
@@ -0,0 +1,373 @@
+"""
+Local stand-in for Azure OpenAI chat completions and embeddings.
+
+Speaks the same wire format the app's clients use:
+
+    POST /openai/deployments/{deployment}/chat/completions?api-version=...
+    POST /openai/deployments/{deployment}/embeddings?api-version=...
+
+Each route draws its latency from a configurable distribution, can inject
+429s (at random or when a per-route concurrency capacity is exceeded, as
+Azure does when a deployment's quota is saturated) and streams chat
+completions as server-sent events when the request sets ``stream: true``.
+
+Chat content is chosen from the prompt so every endpoint gets a response its
+parser accepts (keyword JSON, gap-analysis tags, tailoring JSON, resume
+HTML).  Embeddings are deterministic bag-of-words hash vectors, so texts
+that share words are similar and course search returns realistic hits.
+
+    python -m src.loadtest.mock_openai --port 8765 --chat-latency lognormal:800:0.4
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from aiohttp import web
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_DEFAULT_DIMENSIONS = {"large": 3072, "small": 1536}
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Latency distribution in milliseconds.
+
+    Spec strings (CLI / env): ``fixed:MS``, ``uniform:LOW:HIGH``,
+    ``normal:MEAN:STD`` or ``lognormal:MEDIAN:SIGMA``.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, rest = spec.partition(":")
+        values = [float(v) for v in rest.split(":") if v]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"Invalid latency spec {spec!r} (e.g. fixed:50, uniform:50:200, lognormal:800:0.4)")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = self.a * rng.lognormvariate(0.0, self.b)
+        else:
+            value = self.a
+        return max(value, 0.0)
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"fixed:{self.a:g}"
+        return f"{self.kind}:{self.a:g}:{self.b:g}"
+
+
+@dataclass
+class RouteConfig:
+    """Behaviour of one mock route (chat or embeddings)."""
+
+    latency: LatencyModel = field(default_factory=lambda: LatencyModel("fixed", 0.0))
+    error_rate_429: float = 0.0
+    retry_after: float = 1.0
+    capacity: int = 0  # concurrent requests before returning 429 (0 = unlimited)
+    stream_chunk_ms: float = 0.0  # delay between streamed chunks
+
+
+@dataclass
+class RouteStats:
+    calls: int = 0
+    throttled: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def reset(self) -> None:
+        self.calls = self.throttled = self.peak_in_flight = 0
+        self.latencies_ms = []
+
+    def to_dict(self) -> dict[str, Any]:
+        latencies = self.latencies_ms
+        return {
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "peak_in_flight": self.peak_in_flight,
+            "latency_ms_total": round(sum(latencies), 1),
+            "latency_ms_mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        }
+
+
+@lru_cache(maxsize=8192)
+def _word_vector(word: str, dimensions: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dimensions, dtype=np.float32)
+
+
+def embed_text(text: str, dimensions: int) -> np.ndarray:
+    """Deterministic unit vector: sum of per-word hash vectors (shared words → similar texts)."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in _WORD_RE.findall(text.lower()) or [text]:
+        vector += _word_vector(word, dimensions)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def estimate_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def chat_content(messages: list[dict[str, Any]]) -> str:
+    """A response the calling service's parser accepts, chosen from its prompt."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    if "<skill_development_priorities>" in prompt:
+        return (
+            "<gap_analysis>\n"
+            "<core_strengths>\n1. Strong Python and FastAPI delivery experience\n"
+            "2. Production cloud deployments on Azure\n3. Clear technical communication\n</core_strengths>\n"
+            "<key_gaps>\n1. No Kubernetes operations experience\n2. Limited data pipeline ownership\n"
+            "3. No formal team leadership\n</key_gaps>\n"
+            "<quick_improvements>\n1. Quantify API latency improvements\n2. Add container orchestration work\n"
+            "3. Highlight mentoring activities\n</quick_improvements>\n"
+            "<overall_assessment>\nA solid backend candidate whose core skills match the role; closing the "
+            "orchestration and leadership gaps would make the application competitive.\n</overall_assessment>\n"
+            "<skill_development_priorities>\n"
+            "SKILL_1::Kubernetes::TECHNICAL::Operate containerized services in production clusters\n"
+            "SKILL_2::Data Engineering::TECHNICAL::Build reliable batch and streaming data pipelines\n"
+            "SKILL_3::Technical Leadership::NON_TECHNICAL::Lead small engineering teams and drive delivery\n"
+            "</skill_development_priorities>\n"
+            "</gap_analysis>"
+        )
+    if "optimized_resume" in prompt:
+        return json.dumps({
+            "optimized_resume": (
+                "<h1>Jane Doe</h1><h2>Summary</h2><p>Backend engineer with "
+                "<span class=\"opt-keyword\">Kubernetes</span> and Python experience.</p>"
+                "<h2>Experience</h2><ul><li>Cut API p95 latency by 40% with FastAPI and PostgreSQL.</li></ul>"
+            ),
+            "applied_improvements": [
+                "[Section: Summary] Added target keywords",
+                "[Section: Experience] Quantified latency improvements",
+            ],
+        })
+    if "keywords" in prompt.lower() and "json" in prompt.lower():
+        return json.dumps({"keywords": [
+            "Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "Azure", "REST APIs",
+            "CI/CD", "Microservices", "Redis", "Git", "Agile", "Communication", "Problem Solving",
+        ]})
+    return (
+        "<h1>Jane Doe</h1><p>jane@example.com</p><h2>Experience</h2>"
+        "<h3>Senior Backend Engineer</h3><ul><li>Built Python services on Azure.</li></ul>"
+        "<h2>Education</h2><p>B.Sc. Computer Science</p>"
+    )
+
+
+class MockAzureOpenAI:
+    """aiohttp application serving the Azure OpenAI routes used by the app."""
+
+    def __init__(
+        self,
+        chat: RouteConfig | None = None,
+        embeddings: RouteConfig | None = None,
+        seed: int = 0,
+    ):
+        self.routes = {"chat": chat or RouteConfig(), "embeddings": embeddings or RouteConfig()}
+        self.stats = {name: RouteStats() for name in self.routes}
+        self._rng = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+        self.app = web.Application(client_max_size=32 * 1024 * 1024)
+        self.app.router.add_post("/openai/deployments/{deployment}/chat/completions", self._chat)
+        self.app.router.add_post("/openai/deployments/{deployment}/embeddings", self._embeddings)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening; returns the base URL (``http://host:port``)."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.url = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_stats(self) -> None:
+        for stats in self.stats.values():
+            stats.reset()
+
+    def stats_dict(self) -> dict[str, dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def _throttle(self, route: str) -> web.Response | None:
+        config, stats = self.routes[route], self.stats[route]
+        over_capacity = config.capacity and stats.in_flight >= config.capacity
+        if over_capacity or (config.error_rate_429 and self._rng.random() < config.error_rate_429):
+            stats.throttled += 1
+            return web.json_response(
+                {"error": {
+                    "code": "429",
+                    "message": "Requests to the deployment have exceeded the rate limit of your current "
+                               f"pricing tier. Please retry after {config.retry_after:g} seconds.",
+                }},
+                status=429,
+                headers={"Retry-After": f"{config.retry_after:g}",
+                         "retry-after-ms": str(int(config.retry_after * 1000))},
+            )
+        return None
+
+    async def _serve(self, route: str, handler, request: web.Request) -> web.StreamResponse:
+        stats = self.stats[route]
+        stats.calls += 1
+        throttled = self._throttle(route)
+        if throttled is not None:
+            return throttled
+
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        started = time.perf_counter()
+        try:
+            return await handler(request, self.routes[route])
+        finally:
+            stats.in_flight -= 1
+            stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        return await self._serve("chat", self._chat_response, request)
+
+    async def _embeddings(self, request: web.Request) -> web.StreamResponse:
+        return await self._serve("embeddings", self._embeddings_response, request)
+
+    async def _chat_response(self, request: web.Request, config: RouteConfig) -> web.StreamResponse:
+        body = await request.json()
+        deployment = request.match_info["deployment"]
+        messages = body.get("messages", [])
+        content = chat_content(messages)
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        created = int(time.time())
+
+        await asyncio.sleep(config.latency.sample(self._rng) / 1000)
+
+        if not body.get("stream"):
+            return web.json_response({
+                "id": f"chatcmpl-mock-{created}",
+                "object": "chat.completion",
+                "created": created,
+                "model": deployment,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        # Server-sent events: first chunk after the sampled latency (time to first token)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        pieces = [content[i:i + 64] for i in range(0, len(content), 64)]
+        for index, piece in enumerate(pieces):
+            chunk = {
+                "id": f"chatcmpl-mock-{created}",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": deployment,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": piece} if index == 0 else {"content": piece},
+                    "finish_reason": "stop" if index == len(pieces) - 1 else None,
+                }],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if config.stream_chunk_ms:
+                await asyncio.sleep(config.stream_chunk_ms / 1000)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def _embeddings_response(self, request: web.Request, config: RouteConfig) -> web.StreamResponse:
+        body = await request.json()
+        deployment = request.match_info["deployment"]
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        dimensions = body.get("dimensions") or next(
+            (size for name, size in _DEFAULT_DIMENSIONS.items() if name in deployment), 1536
+        )
+        as_base64 = body.get("encoding_format") == "base64"
+
+        await asyncio.sleep(config.latency.sample(self._rng) / 1000)
+
+        data = []
+        for index, text in enumerate(texts):
+            vector = embed_text(text, dimensions)
+            embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode() if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(estimate_tokens(t) for t in texts)
+        return web.json_response({
+            "object": "list",
+            "data": data,
+            "model": deployment,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+def route_config(args: argparse.Namespace, prefix: str) -> RouteConfig:
+    return RouteConfig(
+        latency=LatencyModel.parse(getattr(args, f"{prefix}_latency")),
+        error_rate_429=getattr(args, f"{prefix}_429_rate"),
+        retry_after=args.retry_after,
+        capacity=getattr(args, f"{prefix}_capacity"),
+        stream_chunk_ms=args.stream_chunk_ms,
+    )
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Mock server options (shared with the load test runner)."""
+    group = parser.add_argument_group("mock Azure OpenAI")
+    group.add_argument("--chat-latency", default="lognormal:800:0.35", help="Chat latency distribution (ms)")
+    group.add_argument("--embeddings-latency", default="lognormal:60:0.3", help="Embeddings latency distribution (ms)")
+    group.add_argument("--chat-429-rate", type=float, default=0.0, help="Fraction of chat calls answered with 429")
+    group.add_argument("--embeddings-429-rate", type=float, default=0.0)
+    group.add_argument("--chat-capacity", type=int, default=0, help="Concurrent chat calls before 429 (0 = unlimited)")
+    group.add_argument("--embeddings-capacity", type=int, default=0)
+    group.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    group.add_argument("--stream-chunk-ms", type=float, default=0.0, help="Delay between streamed chunks")
+    group.add_argument("--seed", type=int, default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the mock Azure OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock = MockAzureOpenAI(route_config(args, "chat"), route_config(args, "embeddings"), seed=args.seed)
+    print(f"Mock Azure OpenAI on http://{args.host}:{args.port} "
+          f"(chat {mock.routes['chat'].latency}, embeddings {mock.routes['embeddings'].latency})")
+    web.run_app(mock.app, host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
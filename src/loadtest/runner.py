@@ -0,0 +1,468 @@
+"""
+Offline load test runner: the app against local Azure OpenAI / pgvector
+stand-ins, each endpoint driven at fixed concurrency levels.
+
+    python -m src.loadtest                                   # all scenarios, uvicorn subprocess
+    python -m src.loadtest --scenario course-search --concurrency 1,8,32 --requests 400
+    python -m src.loadtest --mode inprocess --chat-latency fixed:0   # app overhead only
+    python -m src.loadtest --json out.json --baseline baseline.json  # exit 1 on regression
+
+Modes:
+    server     the app under uvicorn (``--workers``, uvloop / httptools) in a
+               subprocess, driven over HTTP with aiohttp — the standalone
+               serving path
+    inprocess  requests go through the ASGI bridge in this process — no
+               sockets, isolates framework + service overhead
+
+Each scenario is closed-loop: ``concurrency`` virtual users send
+back-to-back requests until ``requests`` have completed (after ``warmup``
+discarded requests).  Requests carry a browser User-Agent, an allowed Origin
+and a distinct ``X-Forwarded-For`` so the security monitor runs its checks
+without rate-limiting the load generator.
+
+The JSON report has, per scenario and concurrency: throughput, client
+latency percentiles, per-stage breakdowns (server time from
+``X-Process-Time``, every ``X-Server-Timing`` stage the app reports, and
+time outside the app) and the upstream calls the mock served per request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from src.loadtest.mock_openai import MockAzureOpenAI, add_mock_arguments, route_config
+from src.loadtest.scenarios import SCENARIOS, Scenario
+
+API_KEY = "offline-loadtest"
+CLIENT_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) OfflineLoadTest/1.0",
+    "Origin": "https://airesumeadvisor.com",
+}
+
+# Regression thresholds for --baseline (relative change vs. the baseline run)
+DEFAULT_TOLERANCE = {"p95_ms": 0.20, "throughput_rps": 0.15}
+
+
+def mock_environment(base_url: str) -> dict[str, str]:
+    """Settings environment pointing every LLM / embedding client at the mock server."""
+    embeddings = f"{base_url}/openai/deployments/{{}}/embeddings?api-version=2023-05-15"
+    return {
+        "AZURE_OPENAI_ENDPOINT": base_url,
+        "AZURE_OPENAI_API_KEY": API_KEY,
+        "GPT41_MINI_JAPANEAST_ENDPOINT": base_url,
+        "GPT41_MINI_JAPANEAST_API_KEY": API_KEY,
+        "EMBEDDING_ENDPOINT": embeddings.format("text-embedding-3-large"),
+        "EMBEDDING_API_KEY": API_KEY,
+        "COURSE_EMBEDDING_ENDPOINT": embeddings.format("text-embedding-3-small"),
+        "COURSE_EMBEDDING_API_KEY": API_KEY,
+        "MONITORING_ENABLED": "false",
+        "STARTUP_WARM_LLM_ENDPOINTS": "false",
+        "COURSE_CACHE_WARM_SKILLS": "",
+    }
+
+
+def apply_environment(env: dict[str, str]) -> None:
+    """Set ``env`` for this process and reload the already-imported settings object from it."""
+    os.environ.update(env)
+    from src.core.config import Settings, settings
+
+    reloaded = Settings()
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(reloaded, name))
+
+
+# ----------------------------------------------------------------------
+# Statistics
+# ----------------------------------------------------------------------
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated percentile (``q`` in 0–100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values: list[float]) -> dict[str, float | None]:
+    def r(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "p50": r(percentile(values, 50)),
+        "p95": r(percentile(values, 95)),
+        "p99": r(percentile(values, 99)),
+        "mean": r(sum(values) / len(values)) if values else None,
+        "max": r(max(values)) if values else None,
+    }
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """``Server-Timing: db;dur=12.3, llm;desc="chat";dur=800`` → ``{"db": 12.3, "llm": 800.0}``"""
+    metrics = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, *params = (p.strip() for p in entry.split(";"))
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    metrics[name] = float(value.strip('"'))
+                except ValueError:
+                    pass
+    return metrics
+
+
+def parse_process_time(value: str | None) -> float | None:
+    """``X-Process-Time: 12.34ms`` → 12.34"""
+    if not value:
+        return None
+    try:
+        return float(value.removesuffix("ms"))
+    except ValueError:
+        return None
+
+
+@dataclass
+class Sample:
+    latency_ms: float
+    status: int
+    success: bool = True  # 2xx and the body does not report ``"success": false``
+    server_ms: float | None = None
+    stages: dict[str, float] = field(default_factory=dict)
+    error: str | None = None  # client-side exception (status 599)
+
+
+def summarize(
+    scenario: Scenario,
+    concurrency: int,
+    samples: list[Sample],
+    duration_s: float,
+    upstream: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """Report entry for one scenario at one concurrency level."""
+    status_codes: dict[str, int] = {}
+    exceptions: dict[str, int] = {}
+    for sample in samples:
+        status_codes[str(sample.status)] = status_codes.get(str(sample.status), 0) + 1
+        if sample.error:
+            exceptions[sample.error] = exceptions.get(sample.error, 0) + 1
+    ok = [s for s in samples if s.success]
+
+    stages = {"server": distribution([s.server_ms for s in ok if s.server_ms is not None])}
+    stages["outside_app"] = distribution(
+        [s.latency_ms - s.server_ms for s in ok if s.server_ms is not None]
+    )
+    for name in sorted({name for s in ok for name in s.stages}):
+        stages[name] = distribution([s.stages[name] for s in ok if name in s.stages])
+
+    count = len(samples) or 1
+    return {
+        "scenario": scenario.name,
+        "path": scenario.path,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "status_codes": status_codes,
+        "exceptions": exceptions,
+        "duration_s": round(duration_s, 3),
+        "throughput_rps": round(len(samples) / duration_s, 2) if duration_s else 0.0,
+        "latency_ms": distribution([s.latency_ms for s in samples]),
+        "stages": stages,
+        "upstream": {
+            route: {
+                **stats,
+                "calls_per_request": round(stats["calls"] / count, 2),
+                "latency_ms_per_request": round(stats["latency_ms_total"] / count, 2),
+            }
+            for route, stats in upstream.items()
+        },
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    tolerance: dict[str, float] | None = None,
+) -> list[str]:
+    """Regressions of ``current`` against ``baseline`` (matched by scenario and concurrency)."""
+    tolerance = tolerance or DEFAULT_TOLERANCE
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        key = (result["scenario"], result["concurrency"])
+        if key not in previous:
+            continue
+        before, after = previous[key], result
+        p95_before, p95_after = before["latency_ms"]["p95"], after["latency_ms"]["p95"]
+        if p95_before and p95_after and p95_after > p95_before * (1 + tolerance["p95_ms"]):
+            regressions.append(
+                f"{key[0]} @ {key[1]}: p95 {p95_before:.0f}ms → {p95_after:.0f}ms "
+                f"(+{(p95_after / p95_before - 1) * 100:.0f}%)"
+            )
+        rps_before, rps_after = before["throughput_rps"], after["throughput_rps"]
+        if rps_before and rps_after < rps_before * (1 - tolerance["throughput_rps"]):
+            regressions.append(
+                f"{key[0]} @ {key[1]}: throughput {rps_before:.1f} → {rps_after:.1f} rps "
+                f"(-{(1 - rps_after / rps_before) * 100:.0f}%)"
+            )
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{key[0]} @ {key[1]}: errors {before['errors']} → {after['errors']}")
+    return regressions
+
+
+# ----------------------------------------------------------------------
+# Targets
+# ----------------------------------------------------------------------
+
+class HttpTarget:
+    """The app behind a real HTTP server."""
+
+    def __init__(self, base_url: str, connections: int = 100):
+        import aiohttp
+
+        self.base_url = base_url.rstrip("/")
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=connections),
+            timeout=aiohttp.ClientTimeout(total=300),
+        )
+
+    async def request(self, method: str, path: str, headers: dict[str, str], body: bytes):
+        async with self._session.request(method, self.base_url + path, headers=headers, data=body) as response:
+            content = await response.read()
+            return response.status, {k.lower(): v for k, v in response.headers.items()}, content
+
+    async def close(self) -> None:
+        await self._session.close()
+
+
+class InProcessTarget:
+    """The app in this process, called through the ASGI bridge (no sockets)."""
+
+    def __init__(self, app):
+        from src.core.asgi_bridge import ASGIBridge
+
+        self.bridge = ASGIBridge(app)
+
+    async def request(self, method: str, path: str, headers: dict[str, str], body: bytes):
+        response = await self.bridge.handle(method, f"http://loadtest{path}", headers, body)
+        return response.status, {k.lower(): v for k, v in response.headers.items()}, response.body
+
+    async def close(self) -> None:
+        await self.bridge.shutdown()
+
+
+def _succeeded(content: bytes) -> bool:
+    try:
+        return json.loads(content).get("success") is not False
+    except (ValueError, AttributeError):
+        return True
+
+
+def _client_headers(n: int) -> dict[str, str]:
+    return {**CLIENT_HEADERS, "X-Forwarded-For": f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"}
+
+
+async def run_scenario(
+    target,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    warmup: int = 0,
+    mock: MockAzureOpenAI | None = None,
+    offset: int = 0,
+) -> dict[str, Any]:
+    """Drive one scenario closed-loop at ``concurrency`` and summarize it."""
+
+    async def drive(count: int, start: int, samples: list[Sample] | None) -> None:
+        next_index = iter(range(start, start + count))
+
+        async def user() -> None:
+            for i in next_index:
+                body = json.dumps(scenario.body(i)).encode()
+                error = None
+                began = time.perf_counter()
+                try:
+                    status, headers, content = await target.request(
+                        scenario.method, scenario.path, _client_headers(i), body
+                    )
+                except Exception as e:
+                    status, headers, content, error = 599, {}, b"", type(e).__name__
+                latency_ms = (time.perf_counter() - began) * 1000
+                if samples is not None:
+                    samples.append(Sample(
+                        latency_ms=latency_ms,
+                        status=status,
+                        success=status < 300 and _succeeded(content),
+                        server_ms=parse_process_time(headers.get("x-process-time")),
+                        stages=parse_server_timing(headers.get("x-server-timing") or headers.get("server-timing", "")),
+                        error=error,
+                    ))
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    if warmup:
+        await drive(warmup, offset, None)
+    if mock:
+        mock.reset_stats()
+
+    samples: list[Sample] = []
+    began = time.perf_counter()
+    await drive(requests, offset + warmup, samples)
+    duration = time.perf_counter() - began
+    upstream = mock.stats_dict() if mock else {}
+    return summarize(scenario, concurrency, samples, duration, upstream)
+
+
+# ----------------------------------------------------------------------
+# Server mode
+# ----------------------------------------------------------------------
+
+def start_server(env: dict[str, str], port: int, workers: int, log_path: str = os.devnull) -> subprocess.Popen:
+    """Start uvicorn serving ``src.loadtest.app:create_app`` with ``env`` (output to ``log_path``)."""
+    from src.serve import event_loop_impl, http_impl
+
+    command = [
+        sys.executable, "-m", "uvicorn", "src.loadtest.app:create_app", "--factory",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+        "--loop", event_loop_impl(), "--http", http_impl(), "--no-access-log", "--log-level", "warning",
+    ]
+    with open(log_path, "ab") as log:
+        return subprocess.Popen(command, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    import aiohttp
+
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"App server exited with code {process.returncode}")
+            try:
+                async with session.get(f"{base_url}/health/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"App server not ready after {timeout:.0f}s")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    mock = MockAzureOpenAI(route_config(args, "chat"), route_config(args, "embeddings"), seed=args.seed)
+    mock_url = await mock.start()
+    env = {**mock_environment(mock_url), "LOADTEST_COURSES": str(args.courses)}
+
+    process = None
+    try:
+        if args.mode == "server":
+            port = args.port
+            process = start_server(env, port, args.workers, args.server_log)
+            base_url = f"http://127.0.0.1:{port}"
+            await wait_ready(base_url, process)
+            target = HttpTarget(base_url, connections=max(args.concurrency))
+        else:
+            apply_environment(env)
+            from src.loadtest.app import create_app
+
+            target = InProcessTarget(create_app())
+
+        results = []
+        offset = 0
+        try:
+            for name in args.scenario:
+                for concurrency in args.concurrency:
+                    result = await run_scenario(
+                        target, SCENARIOS[name], concurrency, args.requests, args.warmup, mock, offset
+                    )
+                    offset += args.requests + args.warmup
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(f"{name:28s} c={concurrency:<4d} {result['throughput_rps']:8.1f} rps  "
+                          f"p50 {latency['p50']:8.1f}  p95 {latency['p95']:8.1f}  p99 {latency['p99']:8.1f} ms  "
+                          f"errors {result['errors']}")
+        finally:
+            await target.close()
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+        await mock.stop()
+
+    return {
+        "suite": "offline",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "mode": args.mode,
+        "workers": args.workers if args.mode == "server" else None,
+        "mock": {
+            route: {"latency": str(config.latency), "error_rate_429": config.error_rate_429,
+                    "capacity": config.capacity}
+            for route, config in mock.routes.items()
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test against local Azure OpenAI / pgvector stand-ins")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Discarded requests before each level")
+    parser.add_argument("--mode", choices=["server", "inprocess"], default="server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (server mode)")
+    parser.add_argument("--port", type=int, default=8011, help="App port (server mode)")
+    parser.add_argument("--server-log", default=os.devnull, help="App server output (server mode)")
+    parser.add_argument("--courses", type=int, default=2000, help="Synthetic catalog size")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Earlier JSON report; exit 1 on regression")
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(json.load(f), report)
+        for regression in regressions:
+            print(f"✗ {regression}")
+        if regressions:
+            return 1
+        print("✓ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
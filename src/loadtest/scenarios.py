@@ -0,0 +1,113 @@
+"""
+Load test scenarios: one per API endpoint, with request bodies that vary per
+request so the keyword and course search caches miss as they do for
+distinct real users (the numbers measure the full request path).
+"""
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+JOB_DESCRIPTION = (
+    "We are looking for a Senior Backend Engineer to design, build and operate Python services "
+    "on Azure. You will own FastAPI microservices backed by PostgreSQL and Redis, run them in "
+    "Docker and Kubernetes, and improve CI/CD pipelines. Requirements: 5+ years of Python, "
+    "experience with REST API design, cloud infrastructure, observability and performance tuning, "
+    "strong communication skills and experience mentoring engineers in an Agile team."
+)
+
+RESUME_HTML = (
+    "<h1>Jane Doe</h1><p>Senior Software Engineer, jane@example.com</p>"
+    "<h2>Summary</h2><p>Backend engineer with 7 years of Python experience building APIs and data "
+    "services on Azure and AWS.</p>"
+    "<h2>Experience</h2><h3>Backend Engineer, Contoso (2019-2025)</h3><ul>"
+    "<li>Built FastAPI services handling 2,000 requests per second with PostgreSQL and Redis.</li>"
+    "<li>Moved deployments to Docker containers and automated releases with GitHub Actions.</li>"
+    "<li>Mentored three junior engineers and led the API performance working group.</li></ul>"
+    "<h2>Education</h2><p>B.Sc. Computer Science, National Taiwan University</p>"
+    "<h2>Skills</h2><p>Python, FastAPI, PostgreSQL, Redis, Docker, Azure, Git</p>"
+)
+
+RESUME_TEXT = (
+    "Jane Doe\nSenior Software Engineer\njane@example.com\n\nEXPERIENCE\nBackend Engineer, Contoso "
+    "2019 - 2025\nBuilt FastAPI services handling 2,000 requests per second with PostgreSQL and Redis.\n"
+    "Moved deployments to Docker containers and automated releases with GitHub Actions.\n\n"
+    "EDUCATION\nB.Sc. Computer Science, National Taiwan University\n\nSKILLS\nPython, FastAPI, Docker"
+)
+
+KEYWORDS = ["Python", "FastAPI", "PostgreSQL", "Redis", "Docker", "Kubernetes", "Azure", "CI/CD",
+            "REST API", "Microservices", "Agile", "Communication"]
+
+SKILLS = ["Kubernetes", "Machine Learning", "Data Analysis", "SQL", "Project Management", "Docker",
+          "Azure", "Leadership", "Tableau", "Deep Learning", "Cybersecurity", "React"]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One endpoint under load: ``body(i)`` builds the JSON body for the i-th request."""
+
+    name: str
+    path: str
+    body: Callable[[int], dict[str, Any]]
+    method: str = "POST"
+
+
+def _variant(i: int) -> str:
+    # Distinct text per request defeats the keyword / course search result caches
+    return f" Team {i} works across {random.Random(i).choice(SKILLS)} projects."
+
+
+def _keywords(i: int) -> dict[str, Any]:
+    return {"job_description": JOB_DESCRIPTION + _variant(i), "max_keywords": 15}
+
+
+def _index(i: int) -> dict[str, Any]:
+    return {"resume": RESUME_HTML, "job_description": JOB_DESCRIPTION + _variant(i), "keywords": KEYWORDS}
+
+
+def _gap(i: int) -> dict[str, Any]:
+    return {**_index(i), "language": "en"}
+
+
+def _format(i: int) -> dict[str, Any]:
+    return {"ocr_text": RESUME_TEXT + f"\nReference {i}"}
+
+
+def _tailor(i: int) -> dict[str, Any]:
+    return {
+        "job_description": JOB_DESCRIPTION + _variant(i),
+        "original_resume": RESUME_HTML,
+        "gap_analysis": {
+            "core_strengths": ["Python API development", "Azure deployments", "Mentoring"],
+            "key_gaps": ["Kubernetes operations", "Data pipelines", "Team leadership"],
+            "quick_improvements": ["Quantify latency wins", "Add Kubernetes work", "Highlight mentoring"],
+            "covered_keywords": KEYWORDS[:6],
+            "missing_keywords": KEYWORDS[6:],
+        },
+    }
+
+
+def _course_search(i: int) -> dict[str, Any]:
+    return {"skill_name": SKILLS[i % len(SKILLS)], "search_context": f"backend engineer {i}", "limit": 5}
+
+
+def _course_batch(i: int) -> dict[str, Any]:
+    return {
+        "queries": [
+            {"skill_name": SKILLS[(i + k) % len(SKILLS)], "search_context": f"gap {i}"} for k in range(4)
+        ],
+        "limit": 5,
+    }
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario for scenario in (
+        Scenario("extract-jd-keywords", "/api/v1/extract-jd-keywords", _keywords),
+        Scenario("index-calculation", "/api/v1/index-calculation", _index),
+        Scenario("index-cal-and-gap-analysis", "/api/v1/index-cal-and-gap-analysis", _gap),
+        Scenario("format-resume", "/api/v1/format-resume", _format),
+        Scenario("tailor-resume", "/api/v1/tailor-resume", _tailor),
+        Scenario("course-search", "/api/v1/courses/search", _course_search),
+        Scenario("course-search-batch", "/api/v1/courses/search/batch", _course_batch),
+    )
+}
@@ -2,14 +2,20 @@
 Main FastAPI application entry point.
 Following FHS architecture principles.
 """
+import asyncio
+import contextlib
 import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Literal
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # Load environment variables from .env file
@@ -18,6 +24,7 @@ load_dotenv()
 from src.api.v1 import router as v1_router  # noqa: E402
 from src.core.config import settings  # noqa: E402
 from src.core.monitoring_service import monitoring_service  # noqa: E402
+from src.middleware.admission_middleware import AdmissionMiddleware  # noqa: E402
 from src.middleware.monitoring_middleware import MonitoringMiddleware  # noqa: E402
 
 # Configure logging
@@ -28,6 +35,112 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _llm_endpoints() -> list[str]:
+    return [
+        settings.azure_openai_endpoint,
+        settings.gpt41_mini_japaneast_endpoint,
+        settings.embedding_endpoint,
+        settings.course_embedding_endpoint,
+    ]
+
+
+def _register_readiness_checks(readiness) -> None:
+    """Readiness checks for shared pools, caches and snapshots."""
+    from src.core.prompt_registry import get_prompt_registry
+    from src.core.standardization_snapshot import get_snapshot_store
+    from src.services.course_search_singleton import CourseSearchSingleton
+
+    def prompts():
+        stats = get_prompt_registry().stats()
+        return {"status": "ok" if stats["prompt_count"] else "error", **stats}
+
+    def standardization():
+        stats = get_snapshot_store().stats()
+        return {"status": "ok" if stats["loaded"] else "pending", **stats}
+
+    async def course_search():
+        service = CourseSearchSingleton.current()
+        if service is not None:
+            return await service.health()
+        step = readiness.steps.get("course_search")
+        if step is None:
+            return {"status": "disabled"}
+        return {"status": "error" if step.status == "error" else "pending", "error": step.error}
+
+    readiness.register_check("prompts", prompts, critical=True)
+    readiness.register_check("standardization", standardization, critical=True)
+    readiness.register_check("course_search", course_search)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Per-worker startup and shutdown.
+
+    Startup loads the prompt registry and standardization snapshot (the
+    worker is not ready until both succeed), then creates the course search
+    pool, warms the course search cache with the most-requested skills and
+    handshakes the LLM endpoints in the background, and starts the event
+    loop lag monitor.  SIGTERM marks the worker as draining
+    (``/health/ready`` answers 503) for ``server_drain_seconds`` before the
+    server stops accepting connections; shutdown then saves the course cache
+    request counts and closes the pool and the CPU offload pools.
+    """
+    from src.core.loop_monitor import get_loop_monitor
+    from src.core.offload import shutdown_cpu_pools
+    from src.core.prompt_registry import get_prompt_registry
+    from src.core.readiness import drain_on_signal, get_readiness, warm_endpoints
+    from src.core.standardization_snapshot import get_snapshot_store
+    from src.services.course_search_singleton import (
+        CourseSearchSingleton,
+        get_course_search_service,
+    )
+
+    readiness = get_readiness()
+    readiness.draining = False
+    _register_readiness_checks(readiness)
+
+    await readiness.run_step("prompts", lambda: get_prompt_registry().catalog())
+    await readiness.run_step("standardization", lambda: get_snapshot_store().get())
+
+    background = []
+    if settings.startup_warm_course_search:
+        async def warm_course_search():
+            step = await readiness.run_step("course_search", get_course_search_service, critical=False)
+            if step.status == "ok":
+                service = await get_course_search_service()
+                await readiness.run_step("course_cache", service.warm_cache_from_requests, critical=False)
+
+        background.append(asyncio.create_task(warm_course_search()))
+    if settings.startup_warm_llm_endpoints:
+        background.append(asyncio.create_task(
+            readiness.run_step("llm_endpoints", lambda: warm_endpoints(_llm_endpoints()), critical=False)
+        ))
+    readiness.startup_complete = True
+    restore_signals = drain_on_signal(readiness, settings.server_drain_seconds)
+
+    loop_monitor = get_loop_monitor() if settings.loop_monitor_enabled else None
+    if loop_monitor is not None:
+        loop_monitor.start()
+
+    try:
+        yield
+    finally:
+        readiness.draining = True
+        for task in background:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        service = CourseSearchSingleton.current()
+        if service is not None:
+            await asyncio.to_thread(service.save_request_counts)
+        await CourseSearchSingleton.close()
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+        shutdown_cpu_pools()
+        restore_signals()
+
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application."""
     
@@ -51,8 +164,12 @@ def create_app() -> FastAPI:
         """,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
     
+    # Admission control (innermost: runs after monitoring sets priority, CORS headers apply to 503s)
+    app.add_middleware(AdmissionMiddleware)
+    
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -98,6 +215,27 @@ def create_app() -> FastAPI:
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    # Liveness: the process is up and its event loop responds
+    @app.get("/health/live")
+    async def liveness():
+        """Liveness probe (no dependency checks)."""
+        from src.core.readiness import get_readiness
+
+        return {"success": True, "data": await get_readiness().liveness(),
+                "timestamp": datetime.utcnow().isoformat()}
+    
+    # Readiness: warm-up finished and shared pools / caches are usable
+    @app.get("/health/ready")
+    async def readiness():
+        """Readiness probe (503 until warm-up succeeds or while draining)."""
+        from src.core.readiness import get_readiness
+
+        ready, details = await get_readiness().check(settings.readiness_check_timeout)
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={"success": ready, "data": details, "timestamp": datetime.utcnow().isoformat()}
+        )
+    
     # Debug endpoint for monitoring
     @app.get("/debug/monitoring")
     async def debug_monitoring():
@@ -105,7 +243,12 @@ def create_app() -> FastAPI:
         import contextlib
         import io
 
+        from src.core.admission import get_admission_controller
+        from src.core.loop_monitor import get_loop_monitor
+        from src.core.rate_limit import limiter_stats
+        from src.core.retry import retry_stats_summary
         from src.debug_monitoring import debug_monitoring as debug_func
+        from src.services.llm_router import router_stats
         
         # Capture output
         f = io.StringIO()
@@ -116,11 +259,95 @@ def create_app() -> FastAPI:
         return {
             "success": True,
             "data": {
-                "debug_output": output.split('\n')
+                "debug_output": output.split('\n'),
+                "retry_stats": retry_stats_summary(),
+                "event_loop": get_loop_monitor().stats(),
+                "llm_router": router_stats(),
+                "llm_quota": limiter_stats(),
+                "admission": get_admission_controller().stats()
             },
             "timestamp": datetime.utcnow().isoformat()
         }
-    
+
+    # Recent per-request stage traces (see src/core/tracing.py)
+    @app.get("/debug/traces")
+    async def debug_traces(limit: int = 20, min_ms: float = 0.0):
+        """Per-endpoint stage means plus the most recent traces (optionally only slow ones)."""
+        from src.core.tracing import get_trace_recorder
+
+        recorder = get_trace_recorder()
+        return {
+            "success": True,
+            "data": {
+                "summary": recorder.summary(),
+                "traces": [trace.to_dict() for trace in recorder.recent(limit, min_ms)]
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    @app.get("/debug/traces/{trace_id}")
+    async def debug_trace(trace_id: str):
+        """One buffered trace by correlation ID."""
+        from src.core.tracing import get_trace_recorder
+
+        trace = get_trace_recorder().get(trace_id)
+        if trace is None:
+            raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+        return {"success": True, "data": trace.to_dict(), "timestamp": datetime.utcnow().isoformat()}
+
+    # Sampling profiler for this worker (see src/core/profiler.py)
+    def _profile_response(profile, output: str):
+        if output == "collapsed":
+            return PlainTextResponse(profile.collapsed())
+        if output == "speedscope":
+            return JSONResponse(profile.speedscope(f"{settings.app_name} pid {os.getpid()}"))
+        return {"success": True, "data": profile.report(), "timestamp": datetime.utcnow().isoformat()}
+
+    def _check_profiler_token(token: str | None) -> None:
+        from src.core.profiler import is_authorized
+
+        if not settings.profiler_token:
+            raise HTTPException(status_code=404, detail="Profiling is disabled")
+        if not is_authorized(token):
+            raise HTTPException(status_code=403, detail="Invalid profiler token")
+
+    @app.post("/debug/profile")
+    async def debug_profile(
+        seconds: float = 10.0,
+        interval_ms: float | None = None,
+        output: Literal["json", "collapsed", "speedscope"] = "json",
+        x_profiler_token: str | None = Header(default=None),
+    ):
+        """Profile this worker for ``seconds`` (stack samples, loop lag, slow callbacks)."""
+        from src.core.profiler import ProfilerBusyError, get_profiler_service
+
+        _check_profiler_token(x_profiler_token)
+        if not 0 < seconds <= settings.profiler_max_seconds:
+            raise HTTPException(status_code=400, detail=f"seconds must be in (0, {settings.profiler_max_seconds}]")
+        interval = max(interval_ms or settings.profiler_interval_ms, 1.0) / 1000
+        try:
+            profile = await get_profiler_service().profile_for(
+                seconds, interval, settings.profiler_slow_callback_ms
+            )
+        except ProfilerBusyError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+        return _profile_response(profile, output)
+
+    @app.get("/debug/profile/{profile_id}")
+    async def debug_request_profile(
+        profile_id: str,
+        output: Literal["json", "collapsed", "speedscope"] = "json",
+        x_profiler_token: str | None = Header(default=None),
+    ):
+        """Profile of a request sent with ``X-Profile: 1`` (ID = its correlation ID)."""
+        from src.core.profiler import get_profiler_service
+
+        _check_profiler_token(x_profiler_token)
+        profile = get_profiler_service().get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+        return _profile_response(profile, output)
+
     # Starlette HTTP Exception handler (for method not allowed, etc.)
     @app.exception_handler(StarletteHTTPException)
     async def starlette_exception_handler(request, exc):
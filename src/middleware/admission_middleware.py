@@ -0,0 +1,81 @@
+"""
+Admission control middleware.
+Queues or sheds requests to endpoints with a concurrency limit (503 + Retry-After).
+"""
+import math
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.core.admission import OverloadedError, get_admission_controller
+from src.core.config import get_settings
+from src.core.monitoring_service import monitoring_service
+from src.core.rate_limit import current_priority
+from src.core.tracing import record_span
+
+
+def _client_timeout(request: Request) -> float | None:
+    """Seconds the client will wait for this response (``X-Client-Timeout-Ms``)."""
+    try:
+        return float(request.headers["X-Client-Timeout-Ms"]) / 1000
+    except (KeyError, ValueError):
+        return None
+
+
+class AdmissionMiddleware(BaseHTTPMiddleware):
+    """
+    Per-endpoint concurrency limits for POST requests.
+
+    Runs inside MonitoringMiddleware, so shed requests are still traced and
+    counted, and the request priority class is already set.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        if request.method != "POST" or not get_settings().admission_enabled:
+            return await call_next(request)
+        controller = get_admission_controller()
+        gate = controller.gate_for(request.url.path)
+        if gate is None:
+            return await call_next(request)
+
+        priority = current_priority()
+        started_ns = time.perf_counter_ns()
+        try:
+            async with gate.slot(priority, controller.wait_budget(gate, priority, _client_timeout(request))) as waited:
+                if waited > 0:
+                    record_span("admission_queue", started_ns, endpoint=gate.name)
+                return await call_next(request)
+        except OverloadedError as e:
+            return self._shed(request, gate.name, priority, e)
+
+    @staticmethod
+    def _shed(request: Request, gate: str, priority: str, error: OverloadedError) -> JSONResponse:
+        retry_after = max(1, math.ceil(error.retry_after))
+        monitoring_service.track_event(
+            "RequestShed",
+            {
+                "endpoint": gate,
+                "priority": priority,
+                "retry_after": retry_after,
+                "reason": str(error),
+                "correlation_id": getattr(request.state, "correlation_id", None),
+            }
+        )
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+            content={
+                "success": False,
+                "data": {},
+                "error": {
+                    "code": "SERVICE_UNAVAILABLE",
+                    "message": "Server is busy, please retry later",
+                    "details": str(error)
+                },
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+        )
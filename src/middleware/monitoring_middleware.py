@@ -12,9 +12,13 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from src.core.config import get_settings
 from src.core.metrics.endpoint_metrics import endpoint_metrics
 from src.core.monitoring.security_monitor import security_monitor
 from src.core.monitoring_service import monitoring_service
+from src.core.profiler import get_profiler_service, is_authorized
+from src.core.rate_limit import priority_scope
+from src.core.tracing import Trace, end_trace, get_trace_recorder, span, start_trace
 from src.utils.response_validator import validate_bubble_compatibility
 from src.utils.user_agent_parser import get_client_category, parse_user_agent
 
@@ -28,15 +32,85 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
     - Error rate monitoring by endpoint
     - Correlation ID generation
     - Custom properties tracking
+    - Per-stage trace under the correlation ID (X-Server-Timing header)
+    - Opt-in request-scoped sampling profile (X-Profile header)
+    - Request priority class: low for llm_low_priority_paths or ``X-Priority: low``
     """
     
     def __init__(self, app: ASGIApp):
         super().__init__(app)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request with monitoring."""
+        """Process request with monitoring; traced when enabled, profiled on request."""
+        # Generate or extract correlation ID
+        correlation_id = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
+        request.state.correlation_id = correlation_id
+
+        # Priority class for upstream quota and admission queues (low fails fast / queues last)
+        with priority_scope(self._quota_priority(request)):
+            # Request-scoped profiling (X-Profile + X-Profiler-Token), retrieved by correlation ID
+            profiler = get_profiler_service()
+            if (request.headers.get("X-Profile") and not profiler.active
+                    and is_authorized(request.headers.get("X-Profiler-Token"))):
+                settings = get_settings()
+                async with profiler.session(settings.profiler_interval_ms / 1000,
+                                            settings.profiler_slow_callback_ms) as session:
+                    response = await self._traced_dispatch(request, call_next)
+                profiler.keep(correlation_id, session.profile)
+                response.headers["X-Profile-ID"] = correlation_id
+                return response
+            return await self._traced_dispatch(request, call_next)
+
+    @staticmethod
+    def _quota_priority(request: Request) -> str:
+        """
+        Low for llm_low_priority_paths, or when the caller marks the request
+        ``X-Priority: low`` (background / prefetch calls); the header can only
+        lower the class, never raise it.
+        """
+        if request.headers.get("X-Priority", "").strip().lower() == "low":
+            return "low"
+        path = request.url.path
+        prefixes = [p.strip() for p in get_settings().llm_low_priority_paths.split(",") if p.strip()]
+        return "low" if any(path.startswith(prefix) for prefix in prefixes) else "high"
+
+    async def _traced_dispatch(self, request: Request, call_next: Callable) -> Response:
+        if not get_settings().tracing_enabled:
+            return await self._dispatch(request, call_next)
+
+        correlation_id = request.state.correlation_id
+
+        # call_next 在複製的 context 中執行，端點與服務內的 span 都會記到這個 trace
+        trace, token = start_trace(correlation_id, f"{request.method} {request.url.path}")
+        try:
+            response = await self._dispatch(request, call_next)
+            trace.attributes["status_code"] = response.status_code
+        finally:
+            end_trace(token)
+            self._record_trace(trace)
+        response.headers["X-Server-Timing"] = trace.server_timing()
+        return response
+
+    @staticmethod
+    def _record_trace(trace: Trace) -> None:
+        """Keep the trace for /debug/traces and export slow ones."""
+        get_trace_recorder().add(trace)
+        slow_ms = get_settings().trace_slow_request_ms
+        if slow_ms and trace.duration_ms >= slow_ms:
+            monitoring_service.track_event(
+                "RequestTrace",
+                {
+                    "correlation_id": trace.trace_id,
+                    "endpoint": trace.name,
+                    "duration_ms": round(trace.duration_ms, 2),
+                    "stages": json.dumps(trace.to_dict()["stages"]),
+                }
+            )
+
+    async def _dispatch(self, request: Request, call_next: Callable) -> Response:
         # Security check first
-        security_result = await security_monitor.check_request_security(request)
+        with span("security_check"):
+            security_result = await security_monitor.check_request_security(request)
         
         if security_result["is_blocked"]:
             # Return 403 for blocked requests
@@ -62,9 +136,7 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
                 }
             )
         
-        # Generate or extract correlation ID
-        correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
-        request.state.correlation_id = correlation_id
+        correlation_id = request.state.correlation_id
         request.state.security_result = security_result
         
         # Save request body for potential error tracking (especially for 422 errors)
@@ -44,6 +44,55 @@ class CourseSearchRequest(BaseModel):
             }
         }
 
+class CourseSearchQuery(BaseModel):
+    """批次搜尋中的單一技能查詢（對應 gap analysis 的 SkillSearchQueries）"""
+    skill_name: str
+    search_context: str = ""
+    
+    @validator('skill_name')
+    def validate_skill_name(cls, v):
+        return CourseSearchRequest.validate_skill_name(v)
+    
+    @validator('search_context')
+    def validate_search_context(cls, v):
+        return CourseSearchRequest.validate_search_context(v)
+
+class CourseBatchSearchRequest(BaseModel):
+    """批次課程搜尋請求模型"""
+    queries: list[CourseSearchQuery]
+    limit: int = 5
+    similarity_threshold: float = 0.3
+    dedupe: bool = False
+    
+    @validator('queries')
+    def validate_queries(cls, v):
+        if not v:
+            raise ValueError("queries cannot be empty")
+        if len(v) > 20:
+            raise ValueError("too many queries (max 20)")
+        return v
+    
+    @validator('limit')
+    def validate_limit(cls, v):
+        return max(1, min(v, 10))
+    
+    @validator('similarity_threshold')
+    def validate_threshold(cls, v):
+        return max(0.1, min(v, 1.0))
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "queries": [
+                    {"skill_name": "Python", "search_context": "for data analysis"},
+                    {"skill_name": "Docker", "search_context": "container deployment"}
+                ],
+                "limit": 5,
+                "similarity_threshold": 0.3,
+                "dedupe": True
+            }
+        }
+
 class CourseResult(BaseModel):
     """單一課程結果"""
     id: str = ""
@@ -87,4 +136,23 @@ class CourseSearchResponse(BaseModel):
     """課程搜尋回應（Bubble.io 相容）"""
     success: bool
     data: CourseSearchData
-    error: ErrorModel
\ No newline at end of file
+    error: ErrorModel
+
+
+class CourseBatchSearchItem(BaseModel):
+    """批次搜尋中單一技能的結果"""
+    skill_name: str = ""
+    data: CourseSearchData = CourseSearchData()
+
+class CourseBatchSearchData(BaseModel):
+    """批次搜尋結果資料"""
+    items: list[CourseBatchSearchItem] = []
+    total_count: int = 0
+    search_time_ms: int = 0
+    deduplicated: bool = False
+
+class CourseBatchSearchResponse(BaseModel):
+    """批次課程搜尋回應（Bubble.io 相容）"""
+    success: bool
+    data: CourseBatchSearchData
+    error: ErrorModel
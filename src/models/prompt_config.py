@@ -5,7 +5,9 @@ No template engine required - just basic configuration.
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from src.core.prompt_template import PromptTemplate
 
 
 class LLMConfig(BaseModel):
@@ -51,6 +53,7 @@ class PromptConfig(BaseModel):
         default_factory=dict,
         description="Configuration for multi-round extraction"
     )
+    _user_template: PromptTemplate | None = PrivateAttr(default=None)
     
     def get_system_prompt(self) -> str:
         """Get system prompt with fallback."""
@@ -60,13 +63,18 @@ class PromptConfig(BaseModel):
         """Get user prompt with fallback."""
         return self.prompts.get("user", "")
     
+    def get_user_template(self) -> PromptTemplate:
+        """Get the pre-split user prompt template (parsed once per config)."""
+        user_prompt = self.get_user_prompt()
+        template = self._user_template
+        if template is None or template.source != user_prompt:
+            template = PromptTemplate.compile(user_prompt)
+            self._user_template = template
+        return template
+    
     def format_user_prompt(self, **kwargs) -> str:
         """Simple string formatting for user prompt."""
-        user_prompt = self.get_user_prompt()
-        try:
-            return user_prompt.format(**kwargs)
-        except KeyError as e:
-            raise ValueError(f"Missing required variable in prompt: {e}")
+        return self.get_user_template().format(kwargs)
     
     class Config:
         json_schema_extra = {
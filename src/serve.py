@@ -0,0 +1,121 @@
+"""
+Standalone serving mode (no Azure Functions runtime).
+
+    python -m src.serve                              # multi-process uvicorn
+    python -m src.serve --server gunicorn            # gunicorn + UvicornWorker, preloaded app
+    python -m src.serve --workers 1 --reload         # development
+    python -m src.serve --no-monitoring --port 8080  # local load testing
+
+Both modes serve ``src.main:create_app`` with uvloop and httptools when
+installed (``uvicorn[standard]``).  Each worker runs the app lifespan:
+prompt registry and standardization snapshot are loaded before the worker
+reports ready on ``/health/ready``; the course search pool and LLM endpoint
+handshakes warm up in the background.
+
+Gunicorn mode reads ``gunicorn.conf.py``: the app is imported once in the
+master (``preload_app``) and forked, so workers share its memory pages and
+start in milliseconds.  ``kill -HUP <master>`` replaces workers gracefully
+(in-flight requests finish within ``server_graceful_timeout``).  On SIGTERM
+a worker first reports draining on ``/health/ready`` for
+``server_drain_seconds``, then stops accepting connections.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+APP_FACTORY = "src.main:create_app"
+
+
+def default_workers() -> int:
+    """Worker count: WEB_CONCURRENCY, then settings, then one per available CPU."""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(int(os.environ["WEB_CONCURRENCY"]), 1)
+    from src.core.config import settings
+    if settings.server_workers > 0:
+        return settings.server_workers
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return os.cpu_count() or 1
+
+
+def event_loop_impl() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_impl() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def uvicorn_options(args: argparse.Namespace) -> dict:
+    """Keyword arguments for ``uvicorn.run``."""
+    from src.core.config import settings
+
+    options = {
+        "factory": True,
+        "host": args.host or settings.server_host,
+        "port": args.port or settings.server_port,
+        "loop": event_loop_impl(),
+        "http": http_impl(),
+        "lifespan": "on",
+        "timeout_keep_alive": settings.server_keepalive,
+        "timeout_graceful_shutdown": settings.server_graceful_timeout,
+        "log_level": args.log_level,
+        "access_log": args.access_log,
+    }
+    if args.reload:
+        options["reload"] = True
+        options["reload_dirs"] = ["src"]
+    else:
+        options["workers"] = args.workers or default_workers()
+    return options
+
+
+def gunicorn_argv(args: argparse.Namespace) -> list[str]:
+    """Command line for gunicorn (settings come from gunicorn.conf.py)."""
+    argv = ["gunicorn", "--config", "gunicorn.conf.py"]
+    if args.host or args.port:
+        from src.core.config import settings
+        argv += ["--bind", f"{args.host or settings.server_host}:{args.port or settings.server_port}"]
+    if args.workers:
+        argv += ["--workers", str(args.workers)]
+    argv += ["--log-level", args.log_level]
+    if args.access_log:
+        argv += ["--access-logfile", "-"]
+    return [*argv, f"{APP_FACTORY}()"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the API without Azure Functions")
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--host", help="Bind address (default: settings.server_host)")
+    parser.add_argument("--port", type=int, help="Port (default: settings.server_port)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--reload", action="store_true", help="Reload on code changes (uvicorn, single worker)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    parser.add_argument("--no-monitoring", action="store_true", help="Disable Application Insights export")
+    args = parser.parse_args(argv)
+
+    if args.no_monitoring:
+        os.environ["MONITORING_ENABLED"] = "false"
+
+    if args.server == "gunicorn":
+        if args.reload:
+            parser.error("--reload is only supported with --server uvicorn (use kill -HUP with gunicorn)")
+        command = gunicorn_argv(args)
+        print(f"Starting: {' '.join(command)}")
+        os.execvp(command[0], command)
+
+    import uvicorn
+
+    options = uvicorn_options(args)
+    print(f"Starting uvicorn {APP_FACTORY} on {options['host']}:{options['port']} "
+          f"(workers={options.get('workers', 1)}, loop={options['loop']}, http={options['http']})")
+    uvicorn.run(APP_FACTORY, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,19 @@
 Services package for Azure FastAPI application.
 Contains all business logic services.
 """
+from src.core.lazy_import import lazy_exports
 
-# Import key services for easier access
-from .keyword_extraction import KeywordExtractionService
-from .keyword_extraction_v2 import KeywordExtractionServiceV2
-from .openai_client import AzureOpenAIClient
-from .unified_prompt_service import UnifiedPromptService
+# Key services for easier access (imported on first use, not at package import)
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    'KeywordExtractionService': '.keyword_extraction',
+    'KeywordExtractionServiceV2': '.keyword_extraction_v2',
+    'AzureOpenAIClient': '.openai_client',
+    'UnifiedPromptService': '.unified_prompt_service',
+})
 
 __all__ = [
     'KeywordExtractionService',
     'KeywordExtractionServiceV2', 
     'AzureOpenAIClient',
     'UnifiedPromptService'
-]
\ No newline at end of file
+]
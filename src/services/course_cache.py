@@ -1,53 +1,197 @@
 """Course Search Cache Service"""
+import asyncio
 import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_REQUEST_COUNTS_PATH = Path(__file__).resolve().parents[1] / "data" / "course_cache" / "request_counts.json"
+
+
+def default_request_counts_path() -> Path:
+    """技能查詢次數檔（course_cache_request_counts_path 未設定時；跨重新部署保留）"""
+    return DEFAULT_REQUEST_COUNTS_PATH
+
+
+def load_request_counts(path: Path | str) -> Counter:
+    """讀取先前記錄的技能查詢次數（檔案不存在或格式錯誤時回傳空的 Counter）"""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return Counter()
+    except (OSError, ValueError) as e:
+        logger.warning(f"[CourseCache] Ignoring unreadable hit counts {path}: {e}")
+        return Counter()
+    if not isinstance(data, dict):
+        return Counter()
+    return Counter({str(k): float(v) for k, v in data.items() if isinstance(v, int | float) and v > 0})
+
+
+def save_request_counts(path: Path | str, counts: Counter, keep: int = 1000) -> None:
+    """
+    將本次的查詢次數併入檔案（多個 worker 共用同一檔案）
+
+    既有次數減半後再加上本次次數，近期熱門的技能排在前面；只保留前 keep 個。
+    """
+    path = Path(path)
+    merged = Counter({skill: count / 2 for skill, count in load_request_counts(path).items()})
+    merged.update(counts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(dict(merged.most_common(keep)), ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
 
 class CourseSearchCache:
-    """記憶體快取服務"""
-    
-    def __init__(self, ttl_seconds: int = 300, max_size: int = 1000):
+    """
+    記憶體快取服務（stale-while-revalidate）
+
+    - 未過期（ttl 內）：直接回傳
+    - 過期但在 stale 視窗內：立即回傳舊結果，背景重新整理（同一鍵值只會有一個請求）
+    - 超過 stale 視窗：同步重新查詢；失敗時在 stale_if_error 視窗內回傳舊結果
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_size: int = 1000,
+                 stale_seconds: float = 0, stale_if_error_seconds: float = 0):
         self.cache = {}
         self.ttl = timedelta(seconds=ttl_seconds)
+        self.stale = timedelta(seconds=stale_seconds)
+        self.stale_if_error = timedelta(seconds=max(stale_if_error_seconds, stale_seconds))
         self.max_size = max_size
-    
-    def get_cache_key(self, skill_name: str, search_context: str, 
-                     category: str, threshold: float) -> str:
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.counters = {"hit": 0, "stale": 0, "miss": 0, "stale_error": 0}
+        # 各技能的查詢次數（決定下次啟動預熱哪些技能）
+        self.skill_requests: Counter = Counter()
+
+    def get_cache_key(self, skill_name: str, search_context: str,
+                     category: str, threshold: float, limit: int | None = None) -> str:
         """生成快取鍵值"""
         cache_str = f"{skill_name}|{search_context}|{category}|{threshold}"
+        if limit is not None:
+            cache_str += f"|{limit}"
         return hashlib.md5(cache_str.encode()).hexdigest()
-    
+
     def get(self, key: str) -> dict | None:
-        """從快取取得資料"""
+        """從快取取得資料（僅回傳未過期的資料）"""
         if key in self.cache:
             data, timestamp = self.cache[key]
-            if datetime.now() - timestamp < self.ttl:
+            age = datetime.now() - timestamp
+            if age < self.ttl:
                 return data
-            else:
-                # 過期，移除
+            elif age >= self.ttl + self.stale_if_error:
+                # 超過所有 stale 視窗，移除
                 del self.cache[key]
         return None
-    
+
     def set(self, key: str, data: Any):
         """存入快取"""
         # 檢查大小限制
-        if len(self.cache) >= self.max_size:
+        if key not in self.cache and len(self.cache) >= self.max_size:
             # 移除最舊的項目
-            oldest_key = min(self.cache.keys(), 
+            oldest_key = min(self.cache.keys(),
                            key=lambda k: self.cache[k][1])
             del self.cache[oldest_key]
-        
+
         self.cache[key] = (data, datetime.now())
-    
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, str]:
+        """
+        依 stale-while-revalidate 規則取得資料
+
+        Args:
+            key: 快取鍵值
+            fetch: 取得新資料的函數（失敗時拋出例外，結果不會被快取）
+
+        Returns:
+            (data, status)，status 為 "hit"、"stale"、"miss" 或 "stale_error"
+
+        Raises:
+            fetch 的例外（沒有可用的舊資料時）
+        """
+        entry = self.cache.get(key)
+        age = datetime.now() - entry[1] if entry else None
+
+        if entry and age < self.ttl:
+            self.counters["hit"] += 1
+            return entry[0], "hit"
+
+        if entry and age < self.ttl + self.stale:
+            self._revalidate(key, fetch)
+            self.counters["stale"] += 1
+            return entry[0], "stale"
+
+        try:
+            data = await self._fetch_once(key, fetch)
+            self.counters["miss"] += 1
+            return data, "miss"
+        except Exception as e:
+            if entry and age < self.ttl + self.stale_if_error:
+                logger.warning(f"[CourseCache] Refresh failed, serving stale result: {e}")
+                self.counters["stale_error"] += 1
+                return entry[0], "stale_error"
+            raise
+
+    async def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """同一鍵值的並行請求共用一次 fetch（single-flight）"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_fetch(key, fetch)
+        # shield：呼叫端取消時仍完成查詢並寫入快取
+        return await asyncio.shield(task)
+
+    def _revalidate(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """背景重新整理（已有進行中的請求時不重複發出）"""
+        if key not in self._inflight:
+            self._start_fetch(key, fetch)
+
+    def _start_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def _run():
+            data = await fetch()
+            self.set(key, data)
+            return data
+
+        task = asyncio.create_task(_run())
+        self._inflight[key] = task
+
+        def _done(t: asyncio.Task):
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled() and t.exception() is not None:
+                logger.debug(f"[CourseCache] Fetch failed for {key}: {t.exception()}")
+
+        task.add_done_callback(_done)
+        return task
+
+    def record_request(self, skill_name: str):
+        """記錄一次技能查詢（不論快取是否命中）"""
+        skill_name = skill_name.strip()
+        if skill_name:
+            self.skill_requests[skill_name] += 1
+
     def clear(self):
         """清空快取"""
         self.cache.clear()
-    
+
     def stats(self) -> dict:
         """取得快取統計"""
         return {
             "size": len(self.cache),
             "max_size": self.max_size,
-            "ttl_seconds": self.ttl.total_seconds()
-        }
\ No newline at end of file
+            "ttl_seconds": self.ttl.total_seconds(),
+            "stale_seconds": self.stale.total_seconds(),
+            "stale_if_error_seconds": self.stale_if_error.total_seconds(),
+            "refreshing": len(self._inflight),
+            **self.counters
+        }
@@ -0,0 +1,225 @@
+"""
+Course display metadata snapshot
+課程顯示資料快照
+
+Keeps compact per-course display rows (description already cut to the
+preview length) and the popular-category counts in memory.  The snapshot is
+built at startup in the background and refreshed incrementally (rows whose
+``updated_at`` moved past the watermark, plus an id sweep for deletions), so
+vector queries only need to return ``(id, similarity)`` and the category
+endpoint never runs a ``GROUP BY`` on the request path.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any
+
+from src.core.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_PREVIEW_CHARS = 500
+POPULAR_CATEGORY_LIMIT = 20
+
+# Columns needed to build a course result (same shape as the pgvector path)
+COURSE_COLUMNS = """
+    c.id,
+    c.name,
+    c.description,
+    COALESCE(c.provider_standardized, c.provider) as provider,
+    c.provider_standardized,
+    c.provider_logo_url,
+    c.price as current_price,
+    c.currency,
+    c.image_url,
+    c.affiliate_url as tracking_url,
+    c.course_type_standard as course_type
+"""
+
+# Snapshot rows: description cut in SQL so only the preview crosses the wire
+_SNAPSHOT_COLUMNS = COURSE_COLUMNS.replace(
+    "c.description,", f"LEFT(c.description, {DESCRIPTION_PREVIEW_CHARS + 1}) as description,", 1
+) + ", c.category, c.updated_at"
+
+
+def course_from_row(row) -> dict[str, Any]:
+    """Build a course result (without similarity) from a ``COURSE_COLUMNS`` row."""
+    return {
+        "id": row['id'],
+        "name": row['name'],
+        "description": row['description'],
+        "provider": row['provider'],
+        "provider_standardized": row['provider_standardized'] or '',
+        "provider_logo_url": row['provider_logo_url'] or '',
+        "price": float(row['current_price']),
+        "currency": row['currency'],
+        "image_url": row['image_url'],
+        "affiliate_url": row['tracking_url'] or '',
+        "course_type": row.get('course_type', 'course'),
+    }
+
+
+def compact_course(row) -> dict[str, Any]:
+    """Display row with the description cut to the preview length (same as the API output)."""
+    course = course_from_row(row)
+    description = course["description"] or ""
+    if len(description) > DESCRIPTION_PREVIEW_CHARS:
+        description = description[:DESCRIPTION_PREVIEW_CHARS] + "..."
+    course["description"] = description
+    return course
+
+
+def _popular_categories(categories: Mapping[str, str | None], limit: int) -> tuple[dict[str, Any], ...]:
+    counts = Counter(category for category in categories.values() if category)
+    return tuple({"name": name, "course_count": count} for name, count in counts.most_common(limit))
+
+
+@dataclass(frozen=True)
+class MetadataSnapshot:
+    """One immutable version of the course metadata; replaced wholesale on refresh."""
+
+    courses: Mapping[str, dict[str, Any]] = field(default_factory=dict)
+    categories: Mapping[str, str | None] = field(default_factory=dict)
+    popular_categories: tuple[dict[str, Any], ...] = ()
+    watermark: datetime | None = None
+    built_at: float = 0.0
+
+
+class CourseMetadataStore:
+    """In-memory course display rows and category counts for Coursera courses."""
+
+    def __init__(self, category_limit: int = POPULAR_CATEGORY_LIMIT):
+        self.category_limit = category_limit
+        self._snapshot = MetadataSnapshot()
+        self._refresh_lock = asyncio.Lock()
+        self._refresher: PeriodicTask | None = None
+        self.loaded = False
+        self.refresh_count = 0
+
+    @property
+    def snapshot(self) -> MetadataSnapshot:
+        return self._snapshot
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded
+
+    def courses_for(self, hits: list[tuple[str, float]]) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        Build results for ``(course_id, similarity)`` hits from the snapshot.
+
+        Returns:
+            (courses in hit order, ids missing from the snapshot)
+        """
+        courses, missing = [], []
+        snapshot_courses = self._snapshot.courses
+        for course_id, score in hits:
+            course = snapshot_courses.get(course_id)
+            if course is None:
+                missing.append(course_id)
+            else:
+                courses.append({**course, "similarity_score": score})
+        return courses, missing
+
+    def popular_categories(self) -> list[dict[str, Any]]:
+        return [dict(category) for category in self._snapshot.popular_categories]
+
+    def apply(self, rows, deleted_ids=(), watermark: datetime | None = None) -> MetadataSnapshot:
+        """Build and swap in a new snapshot with ``rows`` upserted and ``deleted_ids`` removed."""
+        old = self._snapshot
+        deleted = set(deleted_ids)
+        courses = {k: v for k, v in old.courses.items() if k not in deleted}
+        categories = {k: v for k, v in old.categories.items() if k not in deleted}
+        for row in rows:
+            courses[row['id']] = compact_course(row)
+            categories[row['id']] = row['category']
+
+        snapshot = MetadataSnapshot(
+            courses=MappingProxyType(courses),
+            categories=MappingProxyType(categories),
+            popular_categories=_popular_categories(categories, self.category_limit),
+            watermark=max(filter(None, (old.watermark, watermark)), default=None),
+            built_at=time.time(),
+        )
+        self._snapshot = snapshot
+        self.loaded = True
+        return snapshot
+
+    async def refresh(self, pool) -> int:
+        """
+        Pull rows changed since the last watermark and drop deleted courses.
+
+        Returns:
+            Number of rows added or replaced
+        """
+        async with self._refresh_lock:
+            start = time.perf_counter()
+            watermark = self._snapshot.watermark if self.loaded else None
+            query = f"SELECT {_SNAPSHOT_COLUMNS} FROM courses c WHERE c.platform = 'coursera'"
+            params: list[Any] = []
+            if watermark is not None:
+                query += " AND c.updated_at > $1"
+                params.append(watermark)
+
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(query, *params)
+                deleted: set[str] = set()
+                if self.loaded:
+                    live = {r['id'] for r in await conn.fetch(
+                        "SELECT c.id FROM courses c WHERE c.platform = 'coursera'"
+                    )}
+                    deleted = set(self._snapshot.courses) - live
+
+            if self.loaded and not rows and not deleted:
+                return 0
+
+            new_watermark = max((row['updated_at'] for row in rows if row['updated_at']), default=None)
+            snapshot = self.apply(rows, deleted, new_watermark)
+            self.refresh_count += 1
+            logger.info(
+                f"[CourseMetadata] Refreshed: {len(rows)} upserted, {len(deleted)} removed, "
+                f"{len(snapshot.courses)} courses in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+            return len(rows)
+
+    def start_refresh(self, pool, interval: float) -> None:
+        """Refresh every ``interval`` seconds in the background (``<= 0`` disables)."""
+        if self._refresher is None:
+            self._refresher = PeriodicTask(lambda: self.refresh(pool), interval, "CourseMetadata")
+        self._refresher.start()
+
+    async def stop(self) -> None:
+        if self._refresher:
+            await self._refresher.stop()
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "loaded": self.loaded,
+            "courses": len(snapshot.courses),
+            "categories": len(snapshot.popular_categories),
+            "watermark": snapshot.watermark.isoformat() if snapshot.watermark else None,
+            "refresh_count": self.refresh_count,
+            "last_refresh_error": self._refresher.last_error if self._refresher else None,
+        }
+
+
+async def hydrate_courses(pool, hits: list[tuple[str, float]]) -> list[dict[str, Any]]:
+    """Fetch display rows for ``hits`` by primary key, preserving their order."""
+    if not hits:
+        return []
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            f"SELECT {COURSE_COLUMNS} FROM courses c WHERE c.id = ANY($1::varchar[])",
+            list(dict.fromkeys(course_id for course_id, _ in hits)),
+        )
+    by_id = {row['id']: course_from_row(row) for row in rows}
+    return [
+        {**by_id[course_id], "similarity_score": score}
+        for course_id, score in hits if course_id in by_id
+    ]
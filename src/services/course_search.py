@@ -3,19 +3,219 @@ Course Vector Search Service
 使用 pgvector 進行相似課程搜尋
 """
 import asyncio
+import functools
 import json
 import logging
+import re
 from datetime import datetime
 from typing import Any
 
 import asyncpg
+import numpy as np
 from pgvector.asyncpg import register_vector
 
+from src.core.config import get_settings
 from src.core.monitoring_service import monitoring_service
+from src.core.offload import run_cpu
+from src.core.retry import (
+    RetryPolicy,
+    RetryState,
+    deadline_scope,
+    mark_exhausted,
+    retry_async,
+)
+from src.core.tracing import span
+from src.services.course_cache import (
+    CourseSearchCache,
+    default_request_counts_path,
+    load_request_counts,
+    save_request_counts,
+)
+from src.services.course_metadata import (
+    COURSE_COLUMNS,
+    CourseMetadataStore,
+    course_from_row,
+    hydrate_courses,
+)
+from src.services.course_vector_index import CourseVectorIndex
 from src.services.embedding_client import get_course_embedding_client
 
 logger = logging.getLogger(__name__)
 
+# search_courses 支援的單值過濾條件（依此順序組成 SQL 參數）
+_SEARCH_FILTER_CONDITIONS = {
+    'provider': "COALESCE(c.provider_standardized, c.provider) = ${}",
+    'max_price': "c.price <= ${}",
+    'category': "c.category = ${}",
+}
+_SEARCH_FILTER_KEYS = tuple(_SEARCH_FILTER_CONDITIONS)
+
+# 搜尋的向量欄位與型別：(column, vector_type)，例如 ("embedding_half", "halfvec")
+_DEFAULT_TARGET = ("embedding", "vector")
+_VECTOR_TYPES = ("vector", "halfvec")
+_IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def vector_target() -> tuple[str, str]:
+    """目前設定的向量欄位與型別（course_vector_column / course_vector_type）"""
+    settings = get_settings()
+    column, vector_type = settings.course_vector_column, settings.course_vector_type
+    if not _IDENTIFIER_RE.match(column):
+        raise ValueError(f"Invalid course_vector_column: {column!r}")
+    if vector_type not in _VECTOR_TYPES:
+        raise ValueError(f"Invalid course_vector_type: {vector_type!r} (expected one of {_VECTOR_TYPES})")
+    return column, vector_type
+
+
+def _retarget(sql: str, target: tuple[str, str]) -> str:
+    """將 SQL 中的 c.embedding / ::vector 換成設定的欄位與型別"""
+    if target == _DEFAULT_TARGET:
+        return sql
+    column, vector_type = target
+    return sql.replace("c.embedding", f"c.{column}").replace("::vector", f"::{vector_type}")
+
+
+@functools.lru_cache(maxsize=64)
+def _search_courses_sql(filter_shape: tuple[str, ...], category_count: int,
+                        target: tuple[str, str] = _DEFAULT_TARGET) -> str:
+    """search_courses 的 SQL（每種過濾形狀只組一次，asyncpg 依文字重用 prepared statement）"""
+    query = """
+        SELECT 
+            c.id,
+            c.name,
+            c.description,
+            COALESCE(c.provider_standardized, c.provider) as provider,
+            c.provider_standardized,
+            c.provider_logo_url,
+            c.price as current_price,
+            c.currency,
+            c.image_url,
+            c.affiliate_url,
+            c.course_type_standard as course_type,
+            1 - (c.embedding <=> $1::vector) as similarity
+        FROM courses c
+        WHERE c.platform = 'coursera'
+        AND c.embedding IS NOT NULL
+        AND 1 - (c.embedding <=> $1::vector) >= $2
+    """
+    conditions = []
+    param_index = 3
+    for key in filter_shape:
+        conditions.append(_SEARCH_FILTER_CONDITIONS[key].format(param_index))
+        param_index += 1
+    if category_count:
+        placeholders = ','.join(f'${param_index + i}' for i in range(category_count))
+        conditions.append(f"c.category IN ({placeholders})")
+        param_index += category_count
+    if conditions:
+        query += " AND " + " AND ".join(conditions)
+    return _retarget(query + f"""
+        ORDER BY similarity DESC
+        LIMIT ${param_index}
+    """, target)
+
+
+@functools.lru_cache(maxsize=64)
+def _vector_search_v2_sql(category_count: int, target: tuple[str, str] = _DEFAULT_TARGET,
+                          ids_only: bool = False) -> str:
+    """_execute_vector_search_v2 的 SQL（依分類數量快取；ids_only 時課程資料由快照補齊）"""
+    columns = "c.id" if ids_only else COURSE_COLUMNS
+    query = f"""
+        SELECT {columns},
+            1 - (c.embedding <=> $1::vector) as similarity_score
+        FROM courses c
+        WHERE c.platform = 'coursera'
+        AND c.embedding IS NOT NULL
+        AND 1 - (c.embedding <=> $1::vector) >= $2
+    """
+    if category_count:
+        placeholders = ','.join(f'${i + 3}' for i in range(category_count))
+        query += f" AND c.category IN ({placeholders})"
+    return _retarget(query + f"""
+        ORDER BY c.embedding <=> $1::vector
+        LIMIT ${category_count + 3}
+    """, target)
+
+
+@functools.lru_cache(maxsize=8)
+def _target_embedding_sql(target: tuple[str, str] = _DEFAULT_TARGET) -> str:
+    return f"""
+        SELECT {target[0]}
+        FROM courses
+        WHERE id = $1
+    """
+
+
+_SIMILAR_COURSES_SQL = """
+    SELECT 
+        c.id,
+        c.name,
+        c.description,
+        COALESCE(c.provider_standardized, c.provider) as provider,
+        c.provider_standardized,
+        c.provider_logo_url,
+        c.price as current_price,
+        c.currency,
+        c.image_url,
+        c.affiliate_url,
+        c.course_type,
+        1 - (c.embedding <=> $1::vector) as similarity
+    FROM courses c
+    WHERE c.id != $2
+    AND c.platform = 'coursera'
+    AND c.embedding IS NOT NULL
+    ORDER BY c.embedding <=> $1::vector
+    LIMIT $3
+"""
+
+_POPULAR_CATEGORIES_SQL = """
+    SELECT 
+        category,
+        COUNT(*) as course_count
+    FROM courses
+    WHERE platform = 'coursera'
+    AND category IS NOT NULL
+    AND category != ''
+    GROUP BY category
+    ORDER BY course_count DESC
+    LIMIT 20
+"""
+
+
+# 批次搜尋：以 LATERAL 對每個查詢向量各取 top-k（單次往返）
+# 查詢向量在 CTE 中只轉型一次；LATERAL 內直接引用 q.embedding，不會每列重新解析文字
+_BATCH_SEARCH_TEMPLATE = """
+    WITH q AS MATERIALIZED (
+        SELECT t.embedding::vector AS embedding, t.ord
+        FROM unnest($1::text[]) WITH ORDINALITY AS t(embedding, ord)
+    )
+    SELECT q.ord, r.*
+    FROM q
+    CROSS JOIN LATERAL (
+        SELECT {columns},
+            1 - (c.embedding <=> q.embedding) as similarity_score
+        FROM courses c
+        WHERE c.platform = 'coursera'
+        AND c.embedding IS NOT NULL
+        AND 1 - (c.embedding <=> q.embedding) >= $2
+        ORDER BY c.embedding <=> q.embedding
+        LIMIT $3
+    ) r
+    ORDER BY q.ord, r.similarity_score DESC
+"""
+_BATCH_SEARCH_SQL = _BATCH_SEARCH_TEMPLATE.format(columns=COURSE_COLUMNS)
+_BATCH_SEARCH_IDS_SQL = _BATCH_SEARCH_TEMPLATE.format(columns="c.id")
+
+
+def _vector_literals(embeddings: list[np.ndarray]) -> list[str]:
+    """pgvector 文字格式（'[x,y,...]'），批次查詢的參數"""
+    return ["[" + ",".join(map(str, np.asarray(e, dtype=np.float32).tolist())) + "]" for e in embeddings]
+
+
+async def _init_connection(conn) -> None:
+    """連線建立時註冊一次 pgvector 型別（避免每次取用連線都查詢型別）"""
+    await register_vector(conn)
+
 
 class CourseSearchService:
     """課程向量搜尋服務"""
@@ -24,6 +224,16 @@ class CourseSearchService:
         self.embedding_client = None
         self._conn_info = None
         self._connection_pool = None
+        self.vector_index: CourseVectorIndex | None = None
+        self.metadata_store: CourseMetadataStore | None = None
+        self._metadata_load: asyncio.Task | None = None
+        
+        settings = get_settings()
+        self.cache = CourseSearchCache(
+            ttl_seconds=settings.course_cache_ttl_seconds,
+            stale_seconds=settings.course_cache_stale_seconds,
+            stale_if_error_seconds=settings.course_cache_stale_if_error_seconds
+        )
     
     async def initialize(self):
         """初始化服務"""
@@ -41,18 +251,59 @@ class CourseSearchService:
                 with open('temp/postgres_connection.json') as f:
                     self._conn_info = json.load(f)
         
-        # 建立連線池
+        # 建立連線池（每條連線建立時註冊 pgvector，所有查詢共用）
         if not self._connection_pool:
+            settings = get_settings()
             self._connection_pool = await asyncpg.create_pool(
                 host=self._conn_info['host'],
                 database=self._conn_info['database'],
                 user=self._conn_info['user'],
                 password=self._conn_info['password'],
                 ssl='require',
-                min_size=1,
-                max_size=5,
-                command_timeout=30
+                min_size=settings.course_db_pool_min_size,
+                max_size=settings.course_db_pool_max_size,
+                command_timeout=settings.course_db_command_timeout,
+                statement_cache_size=settings.course_db_statement_cache_size,
+                max_inactive_connection_lifetime=settings.course_db_max_inactive_lifetime,
+                init=_init_connection
             )
+        
+        # 記憶體內向量索引（course_search_backend=memory）
+        if self.vector_index is None and get_settings().course_search_backend == "memory":
+            await self._load_vector_index()
+        
+        # 課程資料與熱門分類快照（背景載入，就緒前沿用資料庫查詢）
+        if self.metadata_store is None and get_settings().course_metadata_snapshot:
+            self._start_metadata_store()
+    
+    def _start_metadata_store(self):
+        """建立課程資料快照，於背景完成首次載入後定期增量更新"""
+        settings = get_settings()
+        self.metadata_store = CourseMetadataStore()
+        
+        async def _initial_load():
+            try:
+                await self.metadata_store.refresh(self._connection_pool)
+            except Exception as e:
+                logger.error(f"[CourseSearch] Failed to build course metadata snapshot: {e}")
+            self.metadata_store.start_refresh(self._connection_pool, settings.course_metadata_refresh_interval)
+        
+        self._metadata_load = asyncio.create_task(_initial_load())
+    
+    async def _load_vector_index(self):
+        """載入記憶體內向量索引並啟動增量更新；失敗時沿用 pgvector 查詢"""
+        settings = get_settings()
+        self.vector_index = CourseVectorIndex(
+            quantization=settings.course_index_quantization,
+            use_hnsw=settings.course_index_hnsw,
+            column=vector_target()[0],
+        )
+        try:
+            await self.vector_index.refresh(self._connection_pool)
+        except Exception as e:
+            logger.error(f"[CourseSearch] Failed to load in-memory index, using pgvector: {e}")
+            self.vector_index.last_refresh_error = str(e)
+        self.vector_index.start_refresh(self._connection_pool, settings.course_index_refresh_interval)
     
     async def search_courses(
         self, 
@@ -89,70 +340,17 @@ class CourseSearchService:
             
             query_embedding = query_embeddings[0]
             
-            # 從連線池取得連線
+            # 依過濾條件組成參數（SQL 依過濾形狀快取，連線端重用 prepared statement）
+            filters = filters or {}
+            filter_shape = tuple(key for key in _SEARCH_FILTER_KEYS if key in filters)
+            category_list = list(filters.get('category_list') or [])
+            params = [query_embedding, similarity_threshold]
+            params.extend(filters[key] for key in filter_shape)
+            params.extend(category_list)
+            params.append(limit)
+            base_query = _search_courses_sql(filter_shape, len(category_list), vector_target())
+            
             async with self._connection_pool.acquire() as conn:
-                # 註冊 vector 類型
-                await register_vector(conn)
-                # 建立基本查詢
-                base_query = """
-                    SELECT 
-                        c.id,
-                        c.name,
-                        c.description,
-                        COALESCE(c.provider_standardized, c.provider) as provider,
-                        c.provider_standardized,
-                        c.provider_logo_url,
-                        c.price as current_price,
-                        c.currency,
-                        c.image_url,
-                        c.affiliate_url,
-                        c.course_type_standard as course_type,
-                        1 - (c.embedding <=> $1::vector) as similarity
-                    FROM courses c
-                    WHERE c.platform = 'coursera'
-                    AND c.embedding IS NOT NULL
-                    AND 1 - (c.embedding <=> $1::vector) >= $2
-                """
-                
-                params = [query_embedding, similarity_threshold]
-                
-                # 加入額外過濾條件
-                if filters:
-                    filter_conditions = []
-                    param_index = 3
-                    
-                    if 'provider' in filters:
-                        filter_conditions.append(f"COALESCE(c.provider_standardized, c.provider) = ${param_index}")
-                        params.append(filters['provider'])
-                        param_index += 1
-                    
-                    if 'max_price' in filters:
-                        filter_conditions.append(f"c.current_price <= ${param_index}")
-                        params.append(filters['max_price'])
-                        param_index += 1
-                    
-                    if 'category' in filters:
-                        filter_conditions.append(f"c.category = ${param_index}")
-                        params.append(filters['category'])
-                        param_index += 1
-                    
-                    # 支援 category_list 過濾（多個分類）
-                    if 'category_list' in filters:
-                        placeholders = ','.join([f'${param_index + i}' for i in range(len(filters['category_list']))])
-                        filter_conditions.append(f"c.category IN ({placeholders})")
-                        params.extend(filters['category_list'])
-                        param_index += len(filters['category_list'])
-                    
-                    if filter_conditions:
-                        base_query += " AND " + " AND ".join(filter_conditions)
-                
-                # 加入排序和限制
-                base_query += f"""
-                    ORDER BY similarity DESC
-                    LIMIT ${len(params) + 1}
-                """
-                params.append(limit)
-                
                 # 執行查詢
                 logger.debug(f"[CourseSearch] Executing vector search with threshold={similarity_threshold}, limit={limit}")
                 results = await conn.fetch(base_query, *params)
@@ -215,130 +413,76 @@ class CourseSearchService:
             相似課程列表
         """
         await self.initialize()
+        target = vector_target()
         
-        # 建立資料庫連線
-        conn = await asyncpg.connect(
-            host=self._conn_info['host'],
-            database=self._conn_info['database'],
-            user=self._conn_info['user'],
-            password=self._conn_info['password'],
-            ssl='require'
-        )
-        
-        # 註冊 vector 類型
-        await register_vector(conn)
-        
-        try:
+        async with self._connection_pool.acquire() as conn:
             # 取得目標課程的 embedding
-            target_embedding = await conn.fetchval("""
-                SELECT embedding
-                FROM courses
-                WHERE id = $1
-            """, course_id)
+            target_embedding = await conn.fetchval(_target_embedding_sql(target), course_id)
             
             if target_embedding is None:
                 return []
             
             # 搜尋相似課程（排除自己）
-            results = await conn.fetch("""
-                SELECT 
-                    c.id,
-                    c.name,
-                    c.description,
-                    COALESCE(c.provider_standardized, c.provider) as provider,
-                    c.provider_standardized,
-                    c.provider_logo_url,
-                    c.price as current_price,
-                    c.currency,
-                    c.image_url,
-                    c.affiliate_url,
-                    c.course_type,
-                    1 - (c.embedding <=> $1::vector) as similarity
-                FROM courses c
-                WHERE c.id != $2
-                AND c.platform = 'coursera'
-                AND c.embedding IS NOT NULL
-                ORDER BY c.embedding <=> $1::vector
-                LIMIT $3
-            """, target_embedding, course_id, limit)
-            
-            # 不再需要映射，直接使用 course_type_standard
-            
-            # 格式化結果
-            similar_courses = []
-            for row in results:
-                # 直接使用 course_type_standard
-                course_type = row.get('course_type', 'course')
-                
-                # 將 similarity 轉換為整數百分比
-                similarity_percentage = int(float(row['similarity']) * 100)
-                
-                course = {
-                    "id": row['id'],
-                    "name": row['name'],
-                    "description": row['description'][:300] + "..." if len(row['description']) > 300 else row['description'],
-                    "provider": row['provider'],
-                    "provider_standardized": row['provider_standardized'] or '',
-                    "provider_logo_url": row['provider_logo_url'] or '',
-                    "price": float(row['current_price']),
-                    "currency": row.get('currency', 'USD'),
-                    "image_url": row['image_url'],
-                    "affiliate_url": row.get('affiliate_url', ''),
-                    "course_type": course_type,
-                    "similarity_score": similarity_percentage
-                }
-                similar_courses.append(course)
+            results = await conn.fetch(
+                _retarget(_SIMILAR_COURSES_SQL, target), target_embedding, course_id, limit
+            )
+        
+        # 不再需要映射，直接使用 course_type_standard
+        
+        # 格式化結果
+        similar_courses = []
+        for row in results:
+            # 直接使用 course_type_standard
+            course_type = row.get('course_type', 'course')
             
-            return similar_courses
+            # 將 similarity 轉換為整數百分比
+            similarity_percentage = int(float(row['similarity']) * 100)
             
-        finally:
-            await conn.close()
+            course = {
+                "id": row['id'],
+                "name": row['name'],
+                "description": row['description'][:300] + "..." if len(row['description']) > 300 else row['description'],
+                "provider": row['provider'],
+                "provider_standardized": row['provider_standardized'] or '',
+                "provider_logo_url": row['provider_logo_url'] or '',
+                "price": float(row['current_price']),
+                "currency": row.get('currency', 'USD'),
+                "image_url": row['image_url'],
+                "affiliate_url": row.get('affiliate_url', ''),
+                "course_type": course_type,
+                "similarity_score": similarity_percentage
+            }
+            similar_courses.append(course)
+        
+        return similar_courses
     
     async def get_popular_categories(self) -> list[dict[str, Any]]:
         """取得熱門課程分類"""
         await self.initialize()
         
-        conn = await asyncpg.connect(
-            host=self._conn_info['host'],
-            database=self._conn_info['database'],
-            user=self._conn_info['user'],
-            password=self._conn_info['password'],
-            ssl='require'
-        )
+        if self.metadata_store is not None and self.metadata_store.ready:
+            return self.metadata_store.popular_categories()
         
-        try:
-            results = await conn.fetch("""
-                SELECT 
-                    category,
-                    COUNT(*) as course_count
-                FROM courses
-                WHERE platform = 'coursera'
-                AND category IS NOT NULL
-                AND category != ''
-                GROUP BY category
-                ORDER BY course_count DESC
-                LIMIT 20
-            """)
-            
-            categories = [
-                {
-                    "name": row['category'],
-                    "course_count": row['course_count']
-                }
-                for row in results
-            ]
-            
-            return categories
-            
-        finally:
-            await conn.close()
+        async with self._connection_pool.acquire() as conn:
+            results = await conn.fetch(_POPULAR_CATEGORIES_SQL)
+        
+        categories = [
+            {
+                "name": row['category'],
+                "course_count": row['course_count']
+            }
+            for row in results
+        ]
+        
+        return categories
     
     async def search_courses_v2(
         self,
         skill_name: str,
         search_context: str = "",
         limit: int = 5,
-        similarity_threshold: float = 0.3
+        similarity_threshold: float = 0.3,
+        record_request: bool = True
     ) -> dict[str, Any]:
         """
         改進版課程搜尋（第二版）
@@ -348,40 +492,25 @@ class CourseSearchService:
             search_context: 搜尋情境描述
             limit: 回傳結果數量（預設 5，最大 10）
             similarity_threshold: 相似度門檻（預設 0.3）
+            record_request: 是否計入技能查詢次數（預熱時為 False）
             
         Returns:
             CourseSearchResponse 格式的字典
         """
         from src.models.course_search import (
-            CourseResult,
             CourseSearchData,
             CourseSearchResponse,
-            CourseTypeCount,
             ErrorModel,
         )
-        from src.services.course_cache import CourseSearchCache
-        
-        start_time = datetime.now()
-        
-        # 初始化快取
-        if not hasattr(self, 'cache'):
-            self.cache = CourseSearchCache()
         
         # 建立快取鍵值
         cache_key = self.cache.get_cache_key(
-            skill_name, search_context, "", similarity_threshold
+            skill_name, search_context, "", similarity_threshold, limit=limit
         )
         
-        # 檢查快取
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            monitoring_service.track_event("CourseSearchCacheHit", {
-                "skill_name": skill_name,
-                "cache_key": cache_key
-            })
-            return CourseSearchResponse(**cached_result)
-        
-        try:
+        async def _fetch() -> dict[str, Any]:
+            start_time = datetime.now()
+            
             # 建立查詢文本
             query_text = f"{skill_name} {search_context}".strip()
             
@@ -395,69 +524,20 @@ class CourseSearchService:
             # 建立回應
             duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
             
-            # 格式化課程結果並統計類型
-            course_results = []
-            type_counts = {
-                'course': 0,
-                'certification': 0,
-                'specialization': 0,
-                'degree': 0,
-                'project': 0
-            }
-            
-            for course in courses:
-                # 將 similarity_score 轉換為整數百分比
-                similarity_percentage = int(float(course.get('similarity_score', 0)) * 100)
-                
-                # 取得課程類型
-                course_type = course.get('course_type', 'course')
-                
-                # 統計課程類型（直接使用 course_type_standard 的值）
-                if course_type in type_counts:
-                    type_counts[course_type] += 1
-                
-                course_result = CourseResult(
-                    id=course['id'],
-                    name=course['name'],
-                    description=course['description'][:500] + "..." 
-                               if len(course.get('description', '')) > 500 
-                               else course.get('description', ''),
-                    provider=course.get('provider', ''),
-                    provider_standardized=course.get('provider_standardized', ''),
-                    provider_logo_url=course.get('provider_logo_url', ''),
-                    price=float(course.get('price', 0)),
-                    currency=course.get('currency', 'USD'),
-                    image_url=course.get('image_url', ''),
-                    affiliate_url=course.get('affiliate_url', ''),
-                    course_type=course_type,
-                    similarity_score=similarity_percentage
-                )
-                course_results.append(course_result)
-            
             response = CourseSearchResponse(
                 success=True,
-                data=CourseSearchData(
-                    results=course_results,
-                    total_count=len(course_results),
-                    returned_count=len(course_results),
-                    query=query_text,
-                    search_time_ms=duration_ms,
-                    filters_applied={
-                        "similarity_threshold": similarity_threshold
-                    },
-                    type_counts=CourseTypeCount(**type_counts)
-                ),
+                data=self._build_search_data(courses, query_text, duration_ms, similarity_threshold),
                 error=ErrorModel()
             )
             
-            # 存入快取
-            self.cache.set(cache_key, response.model_dump())
-            
             # 記錄監控
             self._track_search_success(skill_name, search_context, courses, duration_ms)
             
-            return response
-            
+            return response.model_dump()
+        
+        try:
+            # 快取（stale-while-revalidate）：過期結果先回傳、背景更新
+            result, cache_status = await self.cache.get_or_fetch(cache_key, _fetch)
         except Exception as e:
             # 記錄錯誤
             self._track_search_error(e, skill_name, search_context)
@@ -472,6 +552,217 @@ class CourseSearchService:
                     details=str(e)
                 )
             )
+        
+        if record_request:
+            self.cache.record_request(skill_name)
+        if cache_status != "miss":
+            monitoring_service.track_event("CourseSearchCacheHit", {
+                "skill_name": skill_name,
+                "cache_key": cache_key,
+                "cache_status": cache_status
+            })
+        return CourseSearchResponse(**result)
+    
+    async def warm_cache(self, skill_names: list[str], concurrency: int = 4) -> int:
+        """
+        預先載入常見技能的搜尋結果（預設 limit / threshold）
+        
+        Args:
+            skill_names: 技能名稱（取自遙測中最常查詢的技能）
+            concurrency: 同時進行的搜尋數
+            
+        Returns:
+            成功載入的數量
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def _warm(skill_name: str) -> bool:
+            async with semaphore:
+                response = await self.search_courses_v2(skill_name, record_request=False)
+                return response.success
+        
+        results = await asyncio.gather(*(_warm(skill) for skill in dict.fromkeys(skill_names)))
+        warmed = sum(results)
+        logger.info(f"[CourseSearch] Cache warmed: {warmed}/{len(results)} skills")
+        return warmed
+    
+    def _request_counts_path(self):
+        return get_settings().course_cache_request_counts_path or default_request_counts_path()
+    
+    def warm_skills(self) -> list[str]:
+        """
+        預熱的技能：設定的技能（seed / override）加上先前記錄查詢次數最高的技能
+        """
+        settings = get_settings()
+        skills = list(settings.course_cache_warm_skills_list)
+        if settings.course_cache_warm_top_n > 0:
+            counts = load_request_counts(self._request_counts_path())
+            skills.extend(skill for skill, _ in counts.most_common(settings.course_cache_warm_top_n))
+        return list(dict.fromkeys(skills))
+    
+    async def warm_cache_from_requests(self) -> int:
+        """以 warm_skills() 預熱快取（由 app lifespan 於啟動時在背景呼叫）"""
+        skills = await asyncio.to_thread(self.warm_skills)
+        if not skills:
+            return 0
+        return await self.warm_cache(skills, get_settings().course_cache_warm_concurrency)
+    
+    def save_request_counts(self):
+        """將本次記錄的技能查詢次數併入查詢次數檔（失敗只記錄警告）"""
+        if not self.cache.skill_requests:
+            return
+        try:
+            save_request_counts(self._request_counts_path(), self.cache.skill_requests)
+            self.cache.skill_requests.clear()
+        except OSError as e:
+            logger.warning(f"[CourseSearch] Failed to save skill request counts: {e}")
+    
+    async def search_courses_batch(
+        self,
+        queries: list[tuple[str, str]],
+        limit: int = 5,
+        similarity_threshold: float = 0.3,
+        dedupe: bool = False
+    ):
+        """
+        批次課程搜尋：一次產生所有查詢的 embedding，並以單次查詢完成所有 top-k 搜尋
+        
+        Args:
+            queries: (skill_name, search_context) 列表，例如 gap analysis 的 SkillSearchQueries
+            limit: 每個技能回傳結果數量
+            similarity_threshold: 相似度門檻
+            dedupe: 是否跨技能去除重複課程（先出現的技能保留）
+            
+        Returns:
+            CourseBatchSearchResponse
+        """
+        from src.models.course_search import (
+            CourseBatchSearchData,
+            CourseBatchSearchItem,
+            CourseBatchSearchResponse,
+            ErrorModel,
+        )
+        
+        start_time = datetime.now()
+        query_texts = [f"{skill} {context}".strip() for skill, context in queries]
+        
+        try:
+            # 去重後多取一些結果，確保每個技能仍有 limit 筆
+            fetch_limit = min(limit * len(queries), 50) if dedupe else limit
+            unique_texts = list(dict.fromkeys(query_texts))
+            results = await self._search_batch_with_retry(unique_texts, fetch_limit, similarity_threshold)
+            by_text = dict(zip(unique_texts, results, strict=True))
+            
+            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            seen: set[str] = set()
+            items = []
+            for (skill_name, _), query_text in zip(queries, query_texts, strict=True):
+                courses = by_text[query_text]
+                if dedupe:
+                    courses = [c for c in courses if c['id'] not in seen]
+                    seen.update(c['id'] for c in courses[:limit])
+                courses = courses[:limit]
+                items.append(CourseBatchSearchItem(
+                    skill_name=skill_name,
+                    data=self._build_search_data(courses, query_text, duration_ms, similarity_threshold)
+                ))
+            
+            monitoring_service.track_event("CourseBatchSearchExecuted", {
+                "query_count": len(queries),
+                "unique_query_count": len(unique_texts),
+                "result_count": sum(item.data.returned_count for item in items),
+                "deduplicated": dedupe,
+                "search_duration_ms": duration_ms,
+                "success": True
+            })
+            
+            return CourseBatchSearchResponse(
+                success=True,
+                data=CourseBatchSearchData(
+                    items=items,
+                    total_count=sum(item.data.returned_count for item in items),
+                    search_time_ms=duration_ms,
+                    deduplicated=dedupe
+                ),
+                error=ErrorModel()
+            )
+            
+        except Exception as e:
+            self._track_search_error(e, ",".join(skill for skill, _ in queries)[:200], "batch")
+            return CourseBatchSearchResponse(
+                success=False,
+                data=CourseBatchSearchData(),
+                error=ErrorModel(
+                    code=self._get_error_code(e),
+                    message="Batch search failed",
+                    details=str(e)
+                )
+            )
+    
+    @staticmethod
+    def _build_search_data(
+        courses: list[dict[str, Any]],
+        query_text: str,
+        duration_ms: int,
+        similarity_threshold: float
+    ):
+        """將搜尋結果轉為 CourseSearchData（含類型統計）"""
+        from src.models.course_search import (
+            CourseResult,
+            CourseSearchData,
+            CourseTypeCount,
+        )
+        
+        # 格式化課程結果並統計類型
+        course_results = []
+        type_counts = {
+            'course': 0,
+            'certification': 0,
+            'specialization': 0,
+            'degree': 0,
+            'project': 0
+        }
+        
+        for course in courses:
+            # 將 similarity_score 轉換為整數百分比
+            similarity_percentage = int(float(course.get('similarity_score', 0)) * 100)
+            
+            # 取得課程類型
+            course_type = course.get('course_type', 'course')
+            
+            # 統計課程類型（直接使用 course_type_standard 的值）
+            if course_type in type_counts:
+                type_counts[course_type] += 1
+            
+            course_result = CourseResult(
+                id=course['id'],
+                name=course['name'],
+                description=course['description'][:500] + "..." 
+                           if len(course.get('description', '')) > 500 
+                           else course.get('description', ''),
+                provider=course.get('provider', ''),
+                provider_standardized=course.get('provider_standardized', ''),
+                provider_logo_url=course.get('provider_logo_url', ''),
+                price=float(course.get('price', 0)),
+                currency=course.get('currency', 'USD'),
+                image_url=course.get('image_url', ''),
+                affiliate_url=course.get('affiliate_url', ''),
+                course_type=course_type,
+                similarity_score=similarity_percentage
+            )
+            course_results.append(course_result)
+        
+        return CourseSearchData(
+            results=course_results,
+            total_count=len(course_results),
+            returned_count=len(course_results),
+            query=query_text,
+            search_time_ms=duration_ms,
+            filters_applied={
+                "similarity_threshold": similarity_threshold
+            },
+            type_counts=CourseTypeCount(**type_counts)
+        )
     
     async def _search_with_retry(
         self, 
@@ -480,119 +771,201 @@ class CourseSearchService:
         threshold: float,
         max_retries: int = 3
     ) -> list[dict]:
-        """含重試機制的搜尋"""
-        retry_delays = [1.0, 2.0, 4.0]
+        """含重試機制的搜尋（共用重試引擎，受請求期限限制）"""
+        policy = RetryPolicy(max_attempts=max_retries, base_delay=0.5, max_delay=4.0)
         
-        for attempt in range(max_retries):
-            try:
-                # 初始化服務
-                await self.initialize()
-                
-                # 產生 embedding
-                logger.debug(f"[CourseSearch] Generating embedding for: {query_text[:50]}...")
-                embeddings = await self.embedding_client.create_embeddings([query_text])
-                
-                if not embeddings or len(embeddings) == 0:
-                    raise Exception("Failed to generate embeddings")
-                
-                query_embedding = embeddings[0]
-                
-                # 執行向量搜尋
-                courses = await self._execute_vector_search_v2(
-                    embedding=query_embedding,
-                    filters={},
-                    limit=limit,
-                    threshold=threshold
+        async def _attempt() -> list[dict]:
+            # 初始化服務
+            await self.initialize()
+            
+            # 產生 embedding
+            logger.debug(f"[CourseSearch] Generating embedding for: {query_text[:50]}...")
+            embeddings = await self.embedding_client.create_embeddings([query_text])
+            
+            if not embeddings or len(embeddings) == 0:
+                raise Exception("Failed to generate embeddings")
+            
+            query_embedding = embeddings[0]
+            
+            # 執行向量搜尋
+            return await self._execute_vector_search_v2(
+                embedding=query_embedding,
+                filters={},
+                limit=limit,
+                threshold=threshold
+            )
+        
+        retry = RetryState(policy, "course_search.search")
+        with deadline_scope(get_settings().course_search_deadline_seconds):
+            while True:
+                retry.start_attempt()
+                try:
+                    return await _attempt()
+                except Exception as e:
+                    logger.warning(f"[CourseSearch] Attempt {retry.attempt} failed: {e}")
+                    if not await retry.backoff(e):
+                        raise mark_exhausted(
+                            Exception(f"Search failed after {retry.attempt} attempts: {str(e)}")
+                        ) from e
+    
+    async def _search_batch_with_retry(
+        self,
+        query_texts: list[str],
+        limit: int,
+        threshold: float
+    ) -> list[list[dict]]:
+        """批次搜尋（單次 embedding 呼叫 + 單次向量查詢，共用重試引擎）"""
+        policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0)
+        
+        async def _attempt() -> list[list[dict]]:
+            await self.initialize()
+            embeddings = await self.embedding_client.create_embeddings(query_texts)
+            if not embeddings or len(embeddings) != len(query_texts):
+                raise Exception("Failed to generate embeddings")
+            return await self._execute_vector_search_batch(embeddings, limit, threshold)
+        
+        with deadline_scope(get_settings().course_search_deadline_seconds):
+            return await retry_async(_attempt, policy, "course_search.batch")
+    
+    async def _execute_vector_search_batch(
+        self,
+        embeddings: list[np.ndarray],
+        limit: int,
+        threshold: float
+    ) -> list[list[dict[str, Any]]]:
+        """以單次查詢完成多個向量搜尋（記憶體索引：一次矩陣乘法；pgvector：LATERAL 查詢）"""
+        if self.vector_index is not None and self.vector_index.ready:
+            with span("vector_search", queries=len(embeddings)):
+                hits_per_query = self.vector_index.search_many(embeddings, limit, threshold)
+            return await self._hydrate_per_query(hits_per_query)
+        
+        use_snapshot = self.metadata_store is not None and self.metadata_store.ready
+        # 每個 float 約 10 個字元；大批次的格式化交給 CPU 工作池
+        vectors = await run_cpu(_vector_literals, embeddings, size=sum(np.size(e) for e in embeddings) * 10)
+        with span("sql", query="batch_vector_search"):
+            async with self._connection_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    _retarget(_BATCH_SEARCH_IDS_SQL if use_snapshot else _BATCH_SEARCH_SQL, vector_target()),
+                    vectors, threshold, limit
                 )
-                
-                return courses
-                
-            except Exception as e:
-                logger.warning(f"[CourseSearch] Attempt {attempt + 1} failed: {e}")
-                
-                if attempt == max_retries - 1:
-                    raise Exception(f"Search failed after {max_retries} attempts: {str(e)}")
-                
-                await asyncio.sleep(retry_delays[attempt])
+        
+        if use_snapshot:
+            hits_per_query: list[list[tuple[str, float]]] = [[] for _ in embeddings]
+            for row in rows:
+                hits_per_query[row['ord'] - 1].append((row['id'], float(row['similarity_score'])))
+            return await self._hydrate_per_query(hits_per_query)
+        
+        results: list[list[dict[str, Any]]] = [[] for _ in embeddings]
+        for row in rows:
+            results[row['ord'] - 1].append(
+                {**course_from_row(row), "similarity_score": float(row['similarity_score'])}
+            )
+        logger.info(f"[CourseSearch] Batch search: {len(embeddings)} queries, {len(rows)} courses")
+        return results
     
     async def _execute_vector_search_v2(
         self,
-        embedding: list[float],
+        embedding: np.ndarray,
         filters: dict[str, Any],
         limit: int,
         threshold: float
     ) -> list[dict[str, Any]]:
         """執行向量搜尋（第二版）"""
+        if self.vector_index is not None and self.vector_index.ready:
+            return await self._execute_index_search(embedding, filters, limit, threshold)
+        
+        category_list = list(filters.get('category_list') or [])
+        params = [embedding, threshold, *category_list, limit]
+        use_snapshot = self.metadata_store is not None and self.metadata_store.ready
+        base_query = _vector_search_v2_sql(len(category_list), vector_target(), ids_only=use_snapshot)
+        
         # 從連線池取得連線
-        async with self._connection_pool.acquire() as conn:
-            # 註冊 vector 類型
-            await register_vector(conn)
-            # 建立基本查詢
-            base_query = """
-                SELECT 
-                    c.id,
-                    c.name,
-                    c.description,
-                    COALESCE(c.provider_standardized, c.provider) as provider,
-                    c.provider_standardized,
-                    c.provider_logo_url,
-                    c.price as current_price,
-                    c.currency,
-                    c.image_url,
-                    c.affiliate_url as tracking_url,
-                    c.course_type_standard as course_type,
-                    1 - (c.embedding <=> $1::vector) as similarity_score
-                FROM courses c
-                WHERE c.platform = 'coursera'
-                AND c.embedding IS NOT NULL
-                AND 1 - (c.embedding <=> $1::vector) >= $2
-            """
-            
-            params = [embedding, threshold]
-            
-            # 加入分類過濾
-            if 'category_list' in filters:
-                placeholders = ','.join([f'${i+3}' for i in range(len(filters['category_list']))])
-                base_query += f" AND c.category IN ({placeholders})"
-                params.extend(filters['category_list'])
-            
-            # 加入排序和限制
-            base_query += f"""
-                ORDER BY c.embedding <=> $1::vector
-                LIMIT ${len(params) + 1}
-            """
-            params.append(limit)
-            
-            # 執行查詢
-            logger.debug(f"[CourseSearch] Executing vector search with threshold={threshold}, limit={limit}")
-            results = await conn.fetch(base_query, *params)
-            
-            # 不再需要映射，直接使用 course_type_standard
-            
-            # 格式化結果
-            courses = []
-            for row in results:
-                # 直接使用 course_type_standard
-                course_type = row.get('course_type', 'course')
-                
-                course = {
-                    "id": row['id'],
-                    "name": row['name'],
-                    "description": row['description'],
-                    "provider": row['provider'],
-                    "provider_standardized": row['provider_standardized'] or '',
-                    "provider_logo_url": row['provider_logo_url'] or '',
-                    "price": float(row['current_price']),
-                    "currency": row['currency'],
-                    "image_url": row['image_url'],
-                    "affiliate_url": row['tracking_url'] or '',
-                    "course_type": course_type,
-                    "similarity_score": float(row['similarity_score'])
-                }
-                courses.append(course)
-            
+        with span("sql", query="vector_search"):
+            async with self._connection_pool.acquire() as conn:
+                # 執行查詢
+                logger.debug(f"[CourseSearch] Executing vector search with threshold={threshold}, limit={limit}")
+                results = await conn.fetch(base_query, *params)
+        
+        if use_snapshot:
+            courses = await self._hydrate(
+                [(row['id'], float(row['similarity_score'])) for row in results]
+            )
             logger.info(f"[CourseSearch] Found {len(courses)} courses")
             return courses
+        
+        # 不再需要映射，直接使用 course_type_standard
+        
+        # 格式化結果
+        courses = []
+        for row in results:
+            # 直接使用 course_type_standard
+            course_type = row.get('course_type', 'course')
+            
+            course = {
+                "id": row['id'],
+                "name": row['name'],
+                "description": row['description'],
+                "provider": row['provider'],
+                "provider_standardized": row['provider_standardized'] or '',
+                "provider_logo_url": row['provider_logo_url'] or '',
+                "price": float(row['current_price']),
+                "currency": row['currency'],
+                "image_url": row['image_url'],
+                "affiliate_url": row['tracking_url'] or '',
+                "course_type": course_type,
+                "similarity_score": float(row['similarity_score'])
+            }
+            courses.append(course)
+        
+        logger.info(f"[CourseSearch] Found {len(courses)} courses")
+        return courses
+    
+    async def _execute_index_search(
+        self,
+        embedding: np.ndarray,
+        filters: dict[str, Any],
+        limit: int,
+        threshold: float
+    ) -> list[dict[str, Any]]:
+        """以記憶體內索引搜尋，Postgres 只用於補齊未快取的課程資料"""
+        with span("vector_search"):
+            hits = self.vector_index.search(
+                embedding, limit, threshold, categories=filters.get('category_list')
+            )
+        courses = await self._hydrate(hits)
+        
+        logger.info(f"[CourseSearch] Found {len(courses)} courses (in-memory index)")
+        return courses
+    
+    async def _hydrate(self, hits: list[tuple[str, float]]) -> list[dict[str, Any]]:
+        """將 (course_id, similarity) 轉為課程結果：優先使用快照，缺少的才查詢資料庫"""
+        if self.metadata_store is None or not self.metadata_store.ready:
+            with span("sql", query="hydrate"):
+                return await hydrate_courses(self._connection_pool, hits)
+        
+        courses, missing = self.metadata_store.courses_for(hits)
+        if not missing:
+            return courses
+        
+        # 快照尚未包含的課程（例如剛新增）：依主鍵補查並維持原排序
+        missing_ids = set(missing)
+        with span("sql", query="hydrate"):
+            fetched = await hydrate_courses(
+                self._connection_pool, [hit for hit in hits if hit[0] in missing_ids]
+            )
+        by_id = {c['id']: c for c in courses + fetched}
+        return [by_id[course_id] for course_id, _ in hits if course_id in by_id]
+    
+    async def _hydrate_per_query(
+        self, hits_per_query: list[list[tuple[str, float]]]
+    ) -> list[list[dict[str, Any]]]:
+        """批次查詢的課程資料補齊（各查詢共用一次 _hydrate）"""
+        courses = await self._hydrate([hit for hits in hits_per_query for hit in hits])
+        by_id = {c['id']: c for c in courses}
+        return [
+            [{**by_id[cid], "similarity_score": score} for cid, score in hits if cid in by_id]
+            for hits in hits_per_query
+        ]
     
     def _track_search_success(self, skill_name: str, search_context: str, 
                              courses: list, duration_ms: int):
@@ -634,8 +1007,29 @@ class CourseSearchService:
         else:
             return f"UNKNOWN_ERROR_{error_type.upper()}"
     
+    async def health(self) -> dict[str, Any]:
+        """就緒檢查：連線池 ping 與快取、記憶體索引、課程快照狀態"""
+        pool = self._connection_pool
+        if pool is None:
+            return {"status": "pending", "pool": None}
+        async with pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+        return {
+            "status": "ok",
+            "pool": {"size": pool.get_size(), "idle": pool.get_idle_size()},
+            "cache": self.cache.stats(),
+            "vector_index": self.vector_index.stats() if self.vector_index else None,
+            "metadata": self.metadata_store.stats() if self.metadata_store else None,
+        }
+
     async def close(self):
         """關閉服務"""
+        if self.vector_index:
+            await self.vector_index.stop()
+        if self._metadata_load and not self._metadata_load.done():
+            self._metadata_load.cancel()
+        if self.metadata_store:
+            await self.metadata_store.stop()
         if self.embedding_client:
             await self.embedding_client.close()
         if self._connection_pool:
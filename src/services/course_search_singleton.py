@@ -2,25 +2,35 @@
 Global singleton for CourseSearchService to avoid repeated initialization
 """
 import asyncio
+from typing import TYPE_CHECKING
 
-from src.services.course_search import CourseSearchService
+if TYPE_CHECKING:
+    from src.services.course_search import CourseSearchService
 
 
 class CourseSearchSingleton:
     """全域課程搜尋服務單例"""
-    _instance: CourseSearchService | None = None
+    _instance: "CourseSearchService | None" = None
     _lock = asyncio.Lock()
     
     @classmethod
-    async def get_instance(cls) -> CourseSearchService:
+    async def get_instance(cls) -> "CourseSearchService":
         """取得全域單例實例"""
         if cls._instance is None:
             async with cls._lock:
                 if cls._instance is None:
+                    # asyncpg / pgvector / numpy 在第一次使用時才載入
+                    from src.services.course_search import CourseSearchService
+
                     cls._instance = CourseSearchService()
                     await cls._instance.initialize()
         return cls._instance
     
+    @classmethod
+    def current(cls) -> "CourseSearchService | None":
+        """目前的實例（尚未建立時為 None，不會觸發初始化）"""
+        return cls._instance
+    
     @classmethod
     async def close(cls):
         """關閉單例"""
@@ -29,6 +39,6 @@ class CourseSearchSingleton:
             cls._instance = None
 
 # 便捷函數
-async def get_course_search_service() -> CourseSearchService:
+async def get_course_search_service() -> "CourseSearchService":
     """取得課程搜尋服務實例"""
-    return await CourseSearchSingleton.get_instance()
\ No newline at end of file
+    return await CourseSearchSingleton.get_instance()
@@ -0,0 +1,427 @@
+"""
+In-process course vector index
+記憶體內課程向量索引
+
+An alternative search engine for CourseSearchService.  All course embeddings
+are kept in one contiguous, L2-normalized NumPy matrix (float32, or int8 with
+a per-row scale to cut memory ~4x), so a top-k-with-threshold query is one
+matrix-vector product plus ``argpartition`` instead of a sequential pgvector
+scan (the ivfflat index is not built for ``vector(3072)``).  When ``hnswlib``
+is installed an HNSW graph can be built on top for sub-linear lookups; a
+refresh adds changed rows to the existing graph and marks removed ones
+deleted, and only rebuilds it when it is out of capacity or too many of its
+elements are deleted.
+
+The index is refreshed incrementally from Postgres (rows whose ``updated_at``
+moved past the last watermark, plus an id sweep for deletions) and every
+refresh swaps in a new immutable snapshot, so searches never see a
+half-applied update.  The index only returns ``(id, similarity)``; display
+rows come from the course metadata snapshot (``course_metadata``), so a
+search needs no database round trip at all.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from src.core.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = ("float32", "int8")
+
+_BASE_FILTER = "c.platform = 'coursera' AND c.{column} IS NOT NULL"
+
+# int8 rows dequantized per block when scoring (bounds the float32 temporary)
+_SCORE_CHUNK_ROWS = 4096
+# HNSW capacity reserved for rows added by later refreshes
+_HNSW_HEADROOM = 1.25
+# Rebuild the HNSW graph once deleted elements exceed this share of live rows
+_HNSW_MAX_DELETED_FRACTION = 0.2
+
+
+def as_float32(value) -> np.ndarray:
+    """Embedding from the DB driver (ndarray, list or pgvector Vector/HalfVector) as float32."""
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization of normalized vectors."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """One immutable version of the index; replaced wholesale on refresh."""
+
+    ids: tuple[str, ...] = ()
+    matrix: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+    scales: np.ndarray | None = None              # int8 only
+    categories: np.ndarray = field(default_factory=lambda: np.array([], dtype=object))
+    graph: Any = None                             # hnswlib.Index, shared across refreshes
+    labels: np.ndarray | None = None              # graph label of each row
+    label_rows: np.ndarray | None = None          # row of each graph label (-1: not in this snapshot)
+    watermark: datetime | None = None
+    built_at: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    def vectors(self) -> np.ndarray:
+        """Row vectors as float32 (dequantized for int8)."""
+        if self.scales is None:
+            return self.matrix
+        return self.matrix.astype(np.float32) * self.scales[:, None]
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of normalized queries (1-D or one per row) against every row."""
+        if self.scales is None:
+            return queries @ self.matrix.T
+        # int8 @ float32 would upcast a copy of the whole matrix on every call;
+        # one matrix-vector product per query keeps batched and single scores identical
+        rows = np.atleast_2d(queries)
+        scores = np.empty((len(rows), len(self.matrix)), dtype=np.float32)
+        for start in range(0, len(self.matrix), _SCORE_CHUNK_ROWS):
+            stop = start + _SCORE_CHUNK_ROWS
+            block = self.matrix[start:stop].astype(np.float32)
+            for i, query in enumerate(rows):
+                scores[i, start:stop] = (block @ query) * self.scales[start:stop]
+        return scores if queries.ndim > 1 else scores[0]
+
+
+class CourseVectorIndex:
+    """
+    Top-k cosine search over course embeddings held in memory.
+
+    Args:
+        quantization: "float32" or "int8"
+        use_hnsw: Build an HNSW graph when hnswlib is installed
+        hnsw_ef: HNSW search breadth (``ef``), raised to at least ``k``
+        column: Courses column holding the vectors (e.g. a truncated ``halfvec`` column)
+    """
+
+    def __init__(
+        self,
+        quantization: str = "float32",
+        use_hnsw: bool = False,
+        hnsw_ef: int = 64,
+        column: str = "embedding",
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization} (expected one of {QUANTIZATIONS})")
+        self.quantization = quantization
+        self.use_hnsw = use_hnsw
+        self.hnsw_ef = hnsw_ef
+        self.column = column
+        self._snapshot = IndexSnapshot()
+        self._refresh_lock = asyncio.Lock()
+        self._refresher: PeriodicTask | None = None
+        self.refresh_count = 0
+        self.last_refresh_error: str | None = None
+
+    @property
+    def snapshot(self) -> IndexSnapshot:
+        return self._snapshot
+
+    @property
+    def ready(self) -> bool:
+        return len(self._snapshot) > 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def apply(
+        self,
+        upserts: Sequence[tuple[str, Any, str | None]] = (),
+        deleted_ids: Iterable[str] = (),
+        watermark: datetime | None = None,
+    ) -> IndexSnapshot:
+        """
+        Build and swap in a new snapshot with rows added/replaced/removed.
+
+        Args:
+            upserts: ``(id, embedding, category)`` tuples
+            deleted_ids: Ids to drop
+            watermark: Latest ``updated_at`` covered by this snapshot
+
+        Returns:
+            The new snapshot
+        """
+        old = self._snapshot
+        deleted = set(deleted_ids)
+        replaced = {course_id for course_id, *_ in upserts}
+        keep = [i for i, course_id in enumerate(old.ids) if course_id not in deleted and course_id not in replaced]
+
+        ids = [old.ids[i] for i in keep]
+        parts = [old.vectors()[keep]] if keep else []
+        categories = [old.categories[keep]] if keep else []
+
+        new_rows = [u for u in upserts if u[0] not in deleted]
+        if new_rows:
+            ids.extend(course_id for course_id, *_ in new_rows)
+            parts.append(_normalize(np.stack([as_float32(u[1]) for u in new_rows])))
+            categories.append(np.array([u[2] for u in new_rows], dtype=object))
+
+        if ids:
+            vectors = np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+            category_array = np.concatenate(categories)
+        else:
+            vectors = np.zeros((0, old.dim), dtype=np.float32)
+            category_array = np.array([], dtype=object)
+
+        scales = None
+        matrix = vectors
+        if self.quantization == "int8" and len(ids):
+            matrix, scales = _quantize(vectors)
+
+        graph, labels, removed_labels = None, None, ()
+        if self.use_hnsw:
+            graph, labels, removed_labels = self._update_graph(old, keep, vectors)
+        label_rows = None
+        if graph is not None:
+            label_rows = np.full(graph.get_max_elements(), -1, dtype=np.int64)
+            label_rows[labels] = np.arange(len(labels))
+
+        snapshot = IndexSnapshot(
+            ids=tuple(ids),
+            matrix=matrix,
+            scales=scales,
+            categories=category_array,
+            graph=graph,
+            labels=labels,
+            label_rows=label_rows,
+            watermark=max(filter(None, (old.watermark, watermark)), default=None),
+            built_at=time.time(),
+        )
+        self._snapshot = snapshot
+        # Only after the swap, so searches on the old snapshot keep finding its rows
+        for label in removed_labels:
+            graph.mark_deleted(int(label))
+        return snapshot
+
+    def _update_graph(self, old: IndexSnapshot, keep: list[int], vectors: np.ndarray):
+        """
+        Reuse the old HNSW graph for the new rows when possible.
+
+        Kept rows come first in ``vectors`` and new rows are appended, so only
+        the new rows are inserted.  Rebuilds when there is no graph yet, the
+        dimension changed, capacity is exhausted or too many elements are
+        marked deleted.
+
+        Returns:
+            ``(graph, labels per row, labels to mark deleted)``
+        """
+        graph = old.graph
+        added = len(vectors) - len(keep)
+        if graph is not None and vectors.shape[1] == old.dim:
+            keep_array = np.asarray(keep, dtype=np.int64)
+            removed = np.ones(len(old), dtype=bool)
+            removed[keep_array] = False
+            count = graph.get_current_count()  # includes deleted elements
+            deleted = count - len(old) + int(removed.sum())
+            if count + added <= graph.get_max_elements() and \
+                    deleted <= _HNSW_MAX_DELETED_FRACTION * len(vectors):
+                new_labels = np.arange(count, count + added, dtype=np.int64)
+                if added:
+                    graph.add_items(vectors[len(keep):], new_labels)
+                labels = np.concatenate([old.labels[keep_array], new_labels])
+                return graph, labels, old.labels[removed]
+
+        graph = self._build_graph(vectors)
+        return graph, (np.arange(len(vectors), dtype=np.int64) if graph is not None else None), ()
+
+    @staticmethod
+    def _build_graph(vectors: np.ndarray):
+        if not len(vectors):
+            return None
+        try:
+            import hnswlib
+        except ImportError:
+            logger.info("[CourseIndex] hnswlib not installed; using exact search")
+            return None
+        graph = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        graph.init_index(max_elements=int(len(vectors) * _HNSW_HEADROOM) + 1, ef_construction=200, M=16)
+        graph.add_items(vectors, np.arange(len(vectors)))
+        return graph
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        embedding: Sequence[float] | np.ndarray,
+        limit: int,
+        threshold: float,
+        categories: Sequence[str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Courses with cosine similarity >= ``threshold``, best first.
+
+        Args:
+            embedding: Query embedding
+            limit: Maximum number of results
+            threshold: Minimum cosine similarity
+            categories: Optional category whitelist (exact search is used)
+
+        Returns:
+            ``(course_id, similarity)`` pairs
+        """
+        return self.search_many([embedding], limit, threshold, categories)[0]
+
+    def search_many(
+        self,
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+        limit: int,
+        threshold: float,
+        categories: Sequence[str] | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        ``search`` for several queries at once (one matrix multiply, or one
+        HNSW query; exact search when the graph cannot answer).
+
+        Returns:
+            One ``(course_id, similarity)`` list per query, in query order
+        """
+        snapshot = self._snapshot
+        if not len(snapshot) or limit <= 0 or not len(embeddings):
+            return [[] for _ in range(len(embeddings))]
+        queries = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1))
+        if queries.shape[1] != snapshot.dim:
+            raise ValueError(f"Query dimension {queries.shape[1]} does not match index dimension {snapshot.dim}")
+
+        if snapshot.graph is not None and not categories:
+            results = self._search_graph(snapshot, queries, limit, threshold)
+            if results is not None:
+                return results
+
+        scores = snapshot.scores(queries)
+        allowed = np.isin(snapshot.categories, list(categories)) if categories else None
+        results = []
+        for row in scores:
+            mask = row >= threshold
+            if allowed is not None:
+                mask &= allowed
+            candidates = np.flatnonzero(mask)
+            if len(candidates) > limit:
+                top = np.argpartition(-row[candidates], limit - 1)[:limit]
+                candidates = candidates[top]
+            order = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(snapshot.ids[i], float(row[i])) for i in order])
+        return results
+
+    def _search_graph(self, snapshot: IndexSnapshot, queries: np.ndarray,
+                      limit: int, threshold: float) -> list[list[tuple[str, float]]] | None:
+        k = min(limit, len(snapshot))
+        snapshot.graph.set_ef(max(self.hnsw_ef, k))
+        try:
+            labels, distances = snapshot.graph.knn_query(queries, k=k)
+        except RuntimeError:
+            # Fewer live elements than k while a refresh is marking rows deleted
+            return None
+        label_rows = snapshot.label_rows
+        results = []
+        for query_labels, query_distances in zip(labels, distances, strict=True):
+            hits = []
+            for label, distance in zip(query_labels, query_distances, strict=True):
+                row = label_rows[label] if label < len(label_rows) else -1
+                if row < 0:  # added by a newer snapshot
+                    continue
+                similarity = 1.0 - float(distance)  # hnswlib "ip" distance = 1 - dot
+                if similarity >= threshold:
+                    hits.append((snapshot.ids[row], similarity))
+            results.append(hits)
+        return results
+
+    # ------------------------------------------------------------------
+    # Refresh from Postgres
+    # ------------------------------------------------------------------
+
+    async def refresh(self, pool) -> int:
+        """
+        Pull changed rows since the last watermark and drop deleted courses.
+
+        Args:
+            pool: asyncpg pool whose connections register pgvector on creation
+
+        Returns:
+            Number of rows added or replaced
+        """
+        async with self._refresh_lock:
+            start = time.perf_counter()
+            watermark = self._snapshot.watermark
+            base_filter = _BASE_FILTER.format(column=self.column)
+            columns = f"c.id, c.{self.column} as embedding, c.category, c.updated_at"
+            query = f"SELECT {columns} FROM courses c WHERE {base_filter}"
+            params: list[Any] = []
+            if watermark is not None:
+                query += " AND c.updated_at > $1"
+                params.append(watermark)
+
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(query, *params)
+                deleted: set[str] = set()
+                if watermark is not None:
+                    live = {r['id'] for r in await conn.fetch(f"SELECT c.id FROM courses c WHERE {base_filter}")}
+                    deleted = set(self._snapshot.ids) - live
+
+            if not rows and not deleted:
+                return 0
+
+            upserts = [(row['id'], row['embedding'], row['category']) for row in rows]
+            new_watermark = max((row['updated_at'] for row in rows if row['updated_at']), default=None)
+            snapshot = await asyncio.to_thread(self.apply, upserts, deleted, new_watermark)
+            self.refresh_count += 1
+            logger.info(
+                f"[CourseIndex] Refreshed: {len(upserts)} upserted, {len(deleted)} removed, "
+                f"{len(snapshot)} courses in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+            return len(upserts)
+
+    def start_refresh(self, pool, interval: float) -> None:
+        """Refresh every ``interval`` seconds in the background (``<= 0`` disables)."""
+        if self._refresher is None:
+            self._refresher = PeriodicTask(lambda: self.refresh(pool), interval, "CourseIndex")
+        self._refresher.start()
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._refresher:
+            await self._refresher.stop()
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "courses": len(snapshot),
+            "dim": snapshot.dim,
+            "quantization": self.quantization,
+            "hnsw": snapshot.graph is not None,
+            "matrix_bytes": int(snapshot.matrix.nbytes),
+            "watermark": snapshot.watermark.isoformat() if snapshot.watermark else None,
+            "refresh_count": self.refresh_count,
+            "last_refresh_error": self.last_refresh_error or (
+                self._refresher.last_error if self._refresher else None
+            ),
+        }
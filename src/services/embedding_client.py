@@ -1,12 +1,26 @@
 """
 Azure OpenAI Embedding Client for text embeddings.
 Following FHS architecture principles.
+
+Embeddings are requested as base64 (``encoding_format=base64``) and decoded
+straight into float32 NumPy arrays with ``np.frombuffer``, instead of parsing
+thousands of JSON floats per text into Python lists.
+
+text-embedding-3 models are Matryoshka-trained: a shorter vector (the
+``dimensions`` request parameter, or the leading components renormalized)
+keeps most of the retrieval quality at a fraction of the size.
 """
+import base64
 import logging
 
 import httpx
+import numpy as np
 from pydantic import BaseModel
 
+from src.core.rate_limit import estimate_tokens, get_deployment_limiter
+from src.core.retry import parse_retry_after
+from src.core.tracing import traced
+
 
 class EmbeddingResponse(BaseModel):
     """Response model for embedding API."""
@@ -14,19 +28,57 @@ class EmbeddingResponse(BaseModel):
     index: int
 
 
+def decode_embedding(value: str | list[float]) -> np.ndarray:
+    """
+    Decode one embedding from the API response into a float32 array.
+    
+    Args:
+        value: Base64 string of little-endian float32s, or a list of floats
+            (when the endpoint ignores ``encoding_format``)
+    
+    Returns:
+        1-D float32 array
+    """
+    if isinstance(value, str):
+        return np.frombuffer(base64.b64decode(value), dtype="<f4")
+    return np.asarray(value, dtype=np.float32)
+
+
+def truncate_embedding(vector: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Matryoshka truncation: keep the first ``dimensions`` components and
+    L2-renormalize (cosine scores stay comparable).
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    if not dimensions or vector.shape[-1] <= dimensions:
+        return vector
+    head = vector[..., :dimensions]
+    norm = np.linalg.norm(head, axis=-1, keepdims=True)
+    return head / np.where(norm == 0, 1.0, norm)
+
+
 class AzureEmbeddingClient:
     """Azure OpenAI client for text embeddings."""
     
-    def __init__(self, endpoint: str, api_key: str):
+    def __init__(self, endpoint: str, api_key: str, encoding_format: str = "base64",
+                 dimensions: int | None = None, quota_tpm: int = 0, quota_rpm: int = 0):
         """
         Initialize Azure Embedding client
         
         Args:
             endpoint: Azure OpenAI Embedding endpoint URL
             api_key: API key
+            encoding_format: "base64" (binary float32) or "float" (JSON numbers)
+            dimensions: Output dimensions for text-embedding-3 models (None = model default)
+            quota_tpm: Deployment tokens per minute (0 = no client-side limit)
+            quota_rpm: Deployment requests per minute (0 = no client-side limit)
         """
         self.endpoint = endpoint.rstrip('/')
         self.api_key = api_key
+        self.encoding_format = encoding_format
+        self.dimensions = dimensions or None
+        # Quota is shared by all clients of the same deployment URL
+        self.limiter = get_deployment_limiter(self.endpoint.split("?")[0], quota_tpm, quota_rpm)
         
         # Set up HTTP client
         self.client = httpx.AsyncClient(
@@ -41,7 +93,8 @@ class AzureEmbeddingClient:
         # Set up logging
         self.logger = logging.getLogger(self.__class__.__name__)
     
-    async def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+    @traced("embedding")
+    async def create_embeddings(self, texts: list[str]) -> list[np.ndarray]:
         """
         Create embeddings for a list of texts.
         
@@ -49,7 +102,7 @@ class AzureEmbeddingClient:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors
             
         Raises:
             Exception: API call failed
@@ -65,21 +118,36 @@ class AzureEmbeddingClient:
         payload = {
             "input": cleaned_texts
         }
+        if self.encoding_format != "float":
+            payload["encoding_format"] = self.encoding_format
+        if self.dimensions:
+            payload["dimensions"] = self.dimensions
         
         self.logger.info(f"Creating embeddings for {len(cleaned_texts)} texts")
         
+        cost = sum(estimate_tokens(text) for text in cleaned_texts)
         try:
-            response = await self.client.post(
-                self.endpoint,
-                json=payload
-            )
+            charged = (await self.limiter.acquire(cost)).tokens
+            try:
+                response = await self.client.post(
+                    self.endpoint,
+                    json=payload
+                )
+            except httpx.RequestError:
+                self.limiter.release(charged)
+                raise
             
+            if response.status_code == 429:
+                self.limiter.on_throttled(parse_retry_after(response.headers))
+            elif response.status_code >= 500:
+                self.limiter.release(charged)
             if response.status_code != 200:
                 error_detail = response.text or f"HTTP {response.status_code}"
                 self.logger.error(f"Embedding API error: {error_detail}")
                 raise Exception(f"Embedding API error ({response.status_code}): {error_detail}")
             
             result = response.json()
+            self.limiter.reconcile(charged, result.get("usage", {}).get("total_tokens"), response.headers)
             
             # Extract embeddings from response
             embeddings_data = result.get("data", [])
@@ -87,8 +155,11 @@ class AzureEmbeddingClient:
             # Sort by index to ensure correct order
             embeddings_data.sort(key=lambda x: x.get("index", 0))
             
-            # Extract embedding vectors
-            embeddings = [item.get("embedding", []) for item in embeddings_data]
+            # Decode embedding vectors (base64 -> float32 buffer)
+            embeddings = [decode_embedding(item.get("embedding", [])) for item in embeddings_data]
+            if self.dimensions:
+                # Deployments that ignore `dimensions` return full-size vectors
+                embeddings = [truncate_embedding(e, self.dimensions) for e in embeddings]
             
             self.logger.info(f"Successfully created {len(embeddings)} embeddings")
             
@@ -98,7 +169,7 @@ class AzureEmbeddingClient:
             self.logger.error(f"Error creating embeddings: {e}")
             raise
     
-    async def create_embedding(self, text: str) -> list[float]:
+    async def create_embedding(self, text: str) -> np.ndarray | list:
         """
         Create embedding for a single text.
         
@@ -153,7 +224,10 @@ def get_azure_embedding_client() -> AzureEmbeddingClient:
     
     return AzureEmbeddingClient(
         endpoint=settings.embedding_endpoint,
-        api_key=settings.embedding_api_key
+        api_key=settings.embedding_api_key,
+        encoding_format=settings.embedding_encoding_format,
+        quota_tpm=settings.embedding_quota_tpm,
+        quota_rpm=settings.embedding_quota_rpm
     )
 
 
@@ -180,5 +254,9 @@ def get_course_embedding_client() -> AzureEmbeddingClient:
     
     return AzureEmbeddingClient(
         endpoint=settings.course_embedding_endpoint,
-        api_key=settings.course_embedding_api_key
+        api_key=settings.course_embedding_api_key,
+        encoding_format=settings.embedding_encoding_format,
+        dimensions=settings.course_embedding_dimensions,
+        quota_tpm=settings.course_embedding_quota_tpm,
+        quota_rpm=settings.course_embedding_quota_rpm
     )
\ No newline at end of file
@@ -0,0 +1,185 @@
+# flake8: noqa
+"""
+課程向量儲存模式 recall / latency 基準測試
+ETL script with CLI output - print statements are intentional
+
+在本機課程向量副本上比較各模式：維度（Matryoshka 截斷）× 儲存型別
+（float32 / halfvec(float16) / int8），以完整維度 float32 精確搜尋為基準
+計算 recall@k，並量測每次查詢的延遲（記憶體內索引）。
+
+用法:
+    # 從資料庫匯出本機副本（一次）
+    python -m src.services.etl.benchmark_vector_modes --export data/course_vectors.npy
+    # 比較模式
+    python -m src.services.etl.benchmark_vector_modes --catalog data/course_vectors.npy \\
+        --dims 3072,1536,1024,512 --storage float32,halfvec,int8
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from src.services.course_vector_index import CourseVectorIndex, as_float32
+from src.services.embedding_client import truncate_embedding
+
+STORAGE_MODES = ("float32", "halfvec", "int8")
+BYTES_PER_DIM = {"float32": 4, "halfvec": 2, "int8": 1}
+
+
+@dataclass
+class ModeResult:
+    """單一模式的結果"""
+    dimensions: int
+    storage: str
+    recall: float
+    p50_ms: float
+    p95_ms: float
+    bytes_per_vector: int
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """完整精度的 top-k（基準答案）"""
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def evaluate_mode(vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray,
+                  dimensions: int, storage: str, k: int = 10) -> ModeResult:
+    """
+    評估一種模式的 recall@k 與查詢延遲
+
+    Args:
+        vectors: 完整維度課程向量 (N, D)
+        queries: 完整維度查詢向量 (Q, D)
+        truth: exact_top_k 的基準結果 (Q, k)
+        dimensions: 截斷後維度
+        storage: "float32"、"halfvec"（float16 精度）或 "int8"
+        k: top-k
+    """
+    reduced = truncate_embedding(vectors, dimensions)
+    reduced_queries = truncate_embedding(queries, dimensions)
+    if storage == "halfvec":
+        # halfvec 以 float16 儲存：量化誤差與資料庫相同
+        reduced = reduced.astype(np.float16).astype(np.float32)
+
+    index = CourseVectorIndex(quantization="int8" if storage == "int8" else "float32")
+    index.apply([(str(i), vector, None) for i, vector in enumerate(reduced)])
+
+    hits, latencies = 0, []
+    for query, expected in zip(reduced_queries, truth, strict=True):
+        start = time.perf_counter()
+        result = index.search(query, k, threshold=-1.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({int(course_id) for course_id, _ in result} & set(expected.tolist()))
+
+    return ModeResult(
+        dimensions=dimensions,
+        storage=storage,
+        recall=hits / (len(queries) * k),
+        p50_ms=float(np.percentile(latencies, 50)),
+        p95_ms=float(np.percentile(latencies, 95)),
+        bytes_per_vector=dimensions * BYTES_PER_DIM[storage],
+    )
+
+
+def run_benchmark(vectors: np.ndarray, dims: list[int], storages: list[str],
+                  query_count: int = 200, k: int = 10, noise: float = 0.05,
+                  queries: np.ndarray | None = None, seed: int = 0) -> list[ModeResult]:
+    """比較所有 (維度, 儲存型別) 組合；未提供查詢時以加入雜訊的課程向量代替"""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if queries is None:
+        sample = vectors[rng.choice(len(vectors), size=min(query_count, len(vectors)), replace=False)]
+        queries = sample + rng.normal(scale=noise * np.abs(sample).mean(), size=sample.shape).astype(np.float32)
+    truth = exact_top_k(vectors, queries, k)
+    return [
+        evaluate_mode(vectors, queries, truth, d, storage, k)
+        for d in dims if d <= vectors.shape[1]
+        for storage in storages
+    ]
+
+
+async def export_catalog(path: str, column: str = "embedding") -> int:
+    """從資料庫匯出課程向量至 .npy（本機副本）"""
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+
+    try:
+        with open('tools/coursera_db_manager/config/postgres_connection.json') as f:
+            conn_info = json.load(f)
+    except FileNotFoundError:
+        with open('temp/postgres_connection.json') as f:
+            conn_info = json.load(f)
+
+    conn = await asyncpg.connect(
+        host=conn_info['host'],
+        database=conn_info['database'],
+        user=conn_info['user'],
+        password=conn_info['password'],
+        ssl='require'
+    )
+    try:
+        await register_vector(conn)
+        rows = await conn.fetch(
+            f"SELECT {column} AS embedding FROM courses WHERE platform = 'coursera' AND {column} IS NOT NULL"
+        )
+    finally:
+        await conn.close()
+
+    np.save(path, np.stack([as_float32(row['embedding']) for row in rows]))
+    print(f"💾 已匯出 {len(rows)} 個課程向量至 {path}")
+    return len(rows)
+
+
+def _print_results(results: list[ModeResult], k: int):
+    print(f"\n{'dims':>6} {'storage':>8} {f'recall@{k}':>10} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>7}")
+    print("-" * 52)
+    for r in results:
+        print(f"{r.dimensions:>6} {r.storage:>8} {r.recall:>10.3f} {r.p50_ms:>8.3f} {r.p95_ms:>8.3f} {r.bytes_per_vector:>7}")
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(description="Recall vs latency of course vector storage modes")
+    parser.add_argument("--export", help="Export course vectors from Postgres to this .npy file and exit")
+    parser.add_argument("--column", default="embedding")
+    parser.add_argument("--catalog", help="Local .npy copy of the course vectors")
+    parser.add_argument("--queries", help="Optional .npy of real query embeddings")
+    parser.add_argument("--dims", default="3072,1536,1024,512")
+    parser.add_argument("--storage", default=",".join(STORAGE_MODES))
+    parser.add_argument("--query-count", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.export:
+        asyncio.run(export_catalog(args.export, args.column))
+        return
+    if not args.catalog:
+        parser.error("--catalog or --export is required")
+
+    vectors = np.load(args.catalog)
+    queries = np.load(args.queries) if args.queries else None
+    results = run_benchmark(
+        vectors,
+        dims=[int(d) for d in args.dims.split(",")],
+        storages=[s.strip() for s in args.storage.split(",")],
+        query_count=args.query_count,
+        k=args.k,
+        queries=queries,
+    )
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(f"📚 {len(vectors)} 課程, {vectors.shape[1]} 維")
+        _print_results(results, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Coursera 課程批次載入（COPY + set-based upsert）
+
+轉換後的課程以 ``copy_records_to_table`` 串流寫入暫存表，再以單一
+``INSERT ... ON CONFLICT DO UPDATE`` 合併到 ``courses``，追蹤 URL 亦以一次
+``INSERT ... SELECT`` 寫入；全部在同一個交易內完成。內容未變動的課程不會被
+更新（``updated_at`` 不變，下游的增量 embedding / 快照更新也不會被觸發）。
+"""
+import json
+from collections.abc import AsyncIterable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+
+STAGING_TABLE = "course_staging"
+
+# 暫存表欄位（順序即 COPY 的欄位順序）
+STAGING_COLUMNS = (
+    "id", "platform_id", "external_id", "name", "description", "manufacturer",
+    "current_price", "original_price", "currency", "image_url", "stock_status",
+    "metadata", "original_url", "tracking_params",
+)
+
+_CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        seq bigserial,
+        id text NOT NULL,
+        platform_id text,
+        external_id text,
+        name text,
+        description text,
+        manufacturer text,
+        current_price numeric,
+        original_price numeric,
+        currency text,
+        image_url text,
+        stock_status text,
+        metadata jsonb,
+        original_url text,
+        tracking_params jsonb
+    ) ON COMMIT DROP
+"""
+
+_UPDATED_COLUMNS = (
+    "name", "description", "manufacturer", "current_price", "original_price",
+    "currency", "image_url", "stock_status",
+)
+
+# 同一批資料中重複的 id 以最後一筆為準（ON CONFLICT 不允許同一列更新兩次）
+_UPSERT_COURSES_SQL = f"""
+    INSERT INTO courses (
+        id, platform_id, external_id, name, description,
+        manufacturer, current_price, original_price,
+        currency, image_url, stock_status, metadata
+    )
+    SELECT DISTINCT ON (id)
+        id, platform_id, external_id, name, description,
+        manufacturer, current_price, original_price,
+        currency, image_url, stock_status, metadata
+    FROM {STAGING_TABLE}
+    ORDER BY id, seq DESC
+    ON CONFLICT (id) DO UPDATE SET
+        {", ".join(f"{column} = EXCLUDED.{column}" for column in _UPDATED_COLUMNS)},
+        metadata = EXCLUDED.metadata,
+        last_synced = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE ({", ".join(f"courses.{column}" for column in _UPDATED_COLUMNS)}, courses.metadata::jsonb)
+        IS DISTINCT FROM
+        ({", ".join(f"EXCLUDED.{column}" for column in _UPDATED_COLUMNS)}, EXCLUDED.metadata::jsonb)
+    RETURNING (xmax = 0) AS inserted
+"""
+
+_INSERT_TRACKING_URLS_SQL = f"""
+    INSERT INTO course_tracking_urls
+    (course_id, original_url, tracking_url, tracking_params)
+    SELECT DISTINCT ON (id) id, original_url, original_url, tracking_params
+    FROM {STAGING_TABLE}
+    WHERE original_url IS NOT NULL AND original_url != ''
+    ORDER BY id, seq DESC
+    ON CONFLICT DO NOTHING
+"""
+
+
+@dataclass
+class BulkUpsertResult:
+    """批次載入結果"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    tracking_urls: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+def course_record(course: dict[str, Any]) -> tuple:
+    """將 ETL 轉換後的課程轉為暫存表的一列（對應 STAGING_COLUMNS）"""
+    return (
+        f"{course['platform_id']}_{course['external_id']}",
+        course['platform_id'],
+        course['external_id'],
+        course['name'],
+        course['description'],
+        course['manufacturer'],
+        course['current_price'],
+        course['original_price'],
+        course['currency'],
+        course['image_url'],
+        course['stock_status'],
+        json.dumps(course['metadata']),
+        course.get('original_url') or None,
+        json.dumps(course.get('tracking_params', {})),
+    )
+
+
+async def _records(courses: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]]):
+    if isinstance(courses, AsyncIterable):
+        async for course in courses:
+            yield course_record(course)
+    else:
+        for course in courses:
+            yield course_record(course)
+
+
+async def bulk_upsert_courses(
+    conn: asyncpg.Connection,
+    courses: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]]
+) -> BulkUpsertResult:
+    """
+    以 COPY 暫存表 + 單一 upsert 載入課程
+
+    Args:
+        conn: 資料庫連線
+        courses: 轉換後的課程（可為 async iterable，邊轉換邊寫入）
+
+    Returns:
+        新增 / 更新 / 未變動的課程數與新增的追蹤 URL 數
+    """
+    async with conn.transaction():
+        await conn.execute(_CREATE_STAGING_SQL)
+        await conn.copy_records_to_table(
+            STAGING_TABLE, records=_records(courses), columns=list(STAGING_COLUMNS)
+        )
+        staged = await conn.fetchval(f"SELECT COUNT(DISTINCT id) FROM {STAGING_TABLE}")
+        rows = await conn.fetch(_UPSERT_COURSES_SQL)
+        status = await conn.execute(_INSERT_TRACKING_URLS_SQL)
+
+    inserted = sum(1 for row in rows if row['inserted'])
+    updated = len(rows) - inserted
+    return BulkUpsertResult(
+        inserted=inserted,
+        updated=updated,
+        unchanged=staged - len(rows),
+        tracking_urls=int(status.split()[-1]),
+    )
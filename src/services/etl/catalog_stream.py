@@ -0,0 +1,280 @@
+"""
+Coursera 課程目錄串流處理
+
+Impact.com 目錄以分頁抓取，各階段以有界佇列串接並同時執行：
+
+    抓取分頁 → 轉換 → 寫入資料庫 → 產生 embedding
+
+記憶體用量只與佇列長度（分頁數）有關，與目錄大小無關；總時間接近最慢的
+階段而非各階段相加。每個分頁寫入資料庫後更新分頁游標檔，中斷後重新執行會
+從下一個未寫入的分頁繼續。
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+import aiohttp
+
+from src.core.rate_limit import TokenBucket
+from src.core.retry import RetryPolicy, parse_retry_after, retry_async
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IMPACT_BASE_URL = "https://api.impact.com"
+
+
+class CatalogFeedError(Exception):
+    """目錄 API 回應錯誤"""
+
+    def __init__(self, status: int, message: str, retry_after: float | None = None):
+        super().__init__(f"Catalog API error ({status}): {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, CatalogFeedError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, aiohttp.ClientError | asyncio.TimeoutError)
+
+
+@dataclass
+class CatalogPage:
+    """目錄的一個分頁"""
+    number: int
+    total_pages: int
+    total_items: int
+    items: list[dict[str, Any]]
+
+
+class PageCursor:
+    """持久化的分頁游標（下一個要處理的分頁）"""
+
+    def __init__(self, path: str | Path | None):
+        self.path = Path(path) if path else None
+
+    def load(self) -> int:
+        """下一個要抓取的分頁（沒有游標時為 1）"""
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                return int(json.load(f).get("next_page", 1))
+        return 1
+
+    def advance(self, page: int, total_pages: int) -> None:
+        """記錄 ``page`` 已寫入資料庫"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "next_page": page + 1,
+                "total_pages": total_pages,
+                "updated_at": datetime.now().isoformat()
+            }, f)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+
+class ImpactCatalogFeed:
+    """Impact.com 目錄分頁來源（限速 + 重試）"""
+
+    def __init__(
+        self,
+        account_sid: str,
+        auth_token: str,
+        catalog_id: str,
+        base_url: str = IMPACT_BASE_URL,
+        page_size: int = 100,
+        requests_per_second: float = 2.0,
+        low_remaining: int = 100,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.catalog_id = catalog_id
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.limiter = TokenBucket(requests_per_second, capacity=1)
+        self.low_remaining = low_remaining
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=60.0,
+                                                        max_retry_after=300.0)
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/Mediapartners/{self.account_sid}/Catalogs/{self.catalog_id}/Items"
+
+    async def pages(
+        self,
+        session: aiohttp.ClientSession,
+        start_page: int = 1,
+        max_items: int | None = None
+    ) -> AsyncIterator[CatalogPage]:
+        """
+        依序產生分頁
+
+        Args:
+            session: HTTP session
+            start_page: 起始分頁（游標）
+            max_items: 最多產生的課程數（測試模式）
+        """
+        page, total_pages, produced = start_page, None, 0
+        while total_pages is None or page <= total_pages:
+            data, remaining = await retry_async(
+                lambda page=page: self._get_page(session, page), self.retry_policy, "etl.impact_catalog",
+                _is_retryable
+            )
+            total_pages = int(data.get("@numpages", 1))
+            items = data.get("Items", [])
+            if max_items is not None:
+                items = items[:max_items - produced]
+            produced += len(items)
+            yield CatalogPage(page, total_pages, int(data.get("@total", 0)), items)
+
+            if max_items is not None and produced >= max_items:
+                return
+            if remaining is not None and remaining < self.low_remaining:
+                logger.warning(f"[CatalogFeed] Rate limit nearly exhausted ({remaining} left), pausing 60s")
+                await asyncio.sleep(60)
+            page += 1
+
+    async def _get_page(self, session: aiohttp.ClientSession, page: int) -> tuple[dict, int | None]:
+        await self.limiter.acquire()
+        async with session.get(
+            self.url,
+            params={"PageSize": self.page_size, "Page": page},
+            auth=aiohttp.BasicAuth(self.account_sid, self.auth_token),
+            headers={"Accept": "application/json"},
+            timeout=aiohttp.ClientTimeout(total=60)
+        ) as response:
+            if response.status != 200:
+                raise CatalogFeedError(response.status, await response.text(),
+                                       parse_retry_after(response.headers))
+            remaining = response.headers.get("x-ratelimit-remaining-hour")
+            return await response.json(), int(remaining) if remaining else None
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def buffered(source: AsyncIterator[T], maxsize: int = 2) -> AsyncIterator[T]:
+    """
+    在背景任務中預先消費 ``source``（最多領先 ``maxsize`` 個項目）
+
+    上游的例外會在下游取用時拋出；下游提前結束時上游任務會被取消。
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def _pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+            await queue.put(_Done())
+        except Exception as e:
+            await queue.put(_Failed(e))
+        finally:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+    task = asyncio.create_task(_pump())
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, _Done):
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def stream_catalog(
+    feed: ImpactCatalogFeed,
+    session: aiohttp.ClientSession,
+    cursor: PageCursor,
+    transform: Callable[[dict[str, Any]], dict[str, Any] | None],
+    load: Callable[[list[dict[str, Any]]], Awaitable[Any]],
+    embed: Callable[[list[dict[str, Any]]], Awaitable[Any]] | None = None,
+    *,
+    queue_size: int = 2,
+    max_items: int | None = None,
+    should_stop: Callable[[], bool] = lambda: False,
+    on_page: Callable[[CatalogPage, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    以串流方式執行 抓取 → 轉換 → 寫入 →（embedding）
+
+    Args:
+        feed: 目錄來源
+        session: HTTP session
+        cursor: 分頁游標（每頁寫入後前進，全部完成後清除）
+        transform: 單一課程的轉換函數（回傳 None 表示略過）
+        load: 寫入一頁轉換後課程的函數
+        embed: 產生一頁課程 embedding 的函數（可省略）
+        queue_size: 各階段之間最多暫存的分頁數
+        max_items: 最多處理的課程數
+        should_stop: 回傳 True 時在目前分頁後停止（游標保留）
+        on_page: 每頁完成後以 (分頁, 統計) 呼叫
+
+    Returns:
+        統計資訊
+    """
+    start_page = cursor.load()
+    stats = {"start_page": start_page, "pages": 0, "fetched": 0, "transformed": 0, "completed": False}
+    if start_page > 1:
+        logger.info(f"[CatalogStream] Resuming from page {start_page}")
+
+    async def _transformed():
+        pages = buffered(feed.pages(session, start_page, max_items), queue_size)
+        async with contextlib.aclosing(pages):
+            async for page in pages:
+                courses = [course for course in map(transform, page.items) if course is not None]
+                yield page, courses
+
+    async def _loaded():
+        transformed = buffered(_transformed(), queue_size)
+        async with contextlib.aclosing(transformed):
+            async for page, courses in transformed:
+                if courses:
+                    await load(courses)
+                cursor.advance(page.number, page.total_pages)
+                yield page, courses
+
+    # 沒有 embedding 階段時，寫入直接在此任務中執行
+    stream = _loaded() if embed is None else buffered(_loaded(), queue_size)
+    async with contextlib.aclosing(stream):
+        async for page, courses in stream:
+            if embed is not None and courses:
+                await embed(courses)
+            stats["pages"] += 1
+            stats["fetched"] += len(page.items)
+            stats["transformed"] += len(courses)
+            if on_page:
+                on_page(page, dict(stats))
+            if should_stop():
+                return stats
+
+    cursor.clear()
+    stats["completed"] = True
+    return stats
@@ -14,22 +14,32 @@ from urllib.parse import parse_qs, urlparse
 import aiohttp
 import asyncpg
 
+from src.services.etl.bulk_upsert import bulk_upsert_courses
+from src.services.etl.catalog_stream import ImpactCatalogFeed, PageCursor, stream_catalog
+
 
 class CourseraETL:
     """Coursera 課程資料 ETL"""
     
-    def __init__(self):
+    def __init__(self, bulk_load: bool = True, cursor_path: str = "temp/coursera_etl_cursor.json"):
         # Impact.com API 設定
         self.base_url = "https://api.impact.com"
         self.account_sid = "IR5reNPSapi65901857xTcusvceeZxhuj1"
         self.auth_token = os.getenv("IMPACT_API_TOKEN", "fqCf-KbEjMdGzihWtHURf2~mnTCNb9jd")
         self.catalog_id = "9419"
         
+        # 批次載入（COPY + 單一 upsert）；False 時逐筆寫入
+        self.bulk_load = bulk_load
+        
+        # 分頁游標（中斷後從下一個未寫入的分頁繼續）
+        self.cursor_path = cursor_path
+        
         # 統計資訊
         self.stats = {
             "total_fetched": 0,
             "new_courses": 0,
             "updated_courses": 0,
+            "unchanged_courses": 0,
             "errors": 0,
             "start_time": None,
             "end_time": None
@@ -47,16 +57,10 @@ class CourseraETL:
             # 1. 建立同步記錄
             await self._create_sync_log(sync_log_id)
             
-            # 2. 從 API 抓取資料
-            courses = await self._fetch_all_courses()
-            
-            # 3. 轉換資料格式
-            transformed_courses = self._transform_courses(courses)
-            
-            # 4. 儲存到資料庫
-            await self._save_to_database(transformed_courses)
+            # 2. 串流處理：抓取分頁 → 轉換 → 儲存到資料庫（各階段同時進行）
+            await self._stream_catalog()
             
-            # 5. 更新同步記錄
+            # 3. 更新同步記錄
             await self._update_sync_log(sync_log_id, "completed")
             
             self.stats["end_time"] = datetime.now()
@@ -67,6 +71,7 @@ class CourseraETL:
             print(f"   抓取課程: {self.stats['total_fetched']}")
             print(f"   新增課程: {self.stats['new_courses']}")
             print(f"   更新課程: {self.stats['updated_courses']}")
+            print(f"   未變動課程: {self.stats['unchanged_courses']}")
             print(f"   錯誤數量: {self.stats['errors']}")
             
         except Exception as e:
@@ -74,109 +79,69 @@ class CourseraETL:
             await self._update_sync_log(sync_log_id, "failed", str(e))
             raise
     
-    async def _fetch_all_courses(self) -> list[dict[str, Any]]:
-        """從 Impact.com API 抓取所有課程"""
-        print("\n📥 從 Impact.com API 抓取課程...")
+    async def _stream_catalog(self):
+        """以串流方式抓取、轉換並儲存課程（不在記憶體中保留整份目錄）"""
+        print("\n📥 串流處理 Impact.com 課程目錄...")
         
-        courses = []
-        page = 1
-        total_pages = None
+        feed = ImpactCatalogFeed(self.account_sid, self.auth_token, self.catalog_id, base_url=self.base_url)
+        cursor = PageCursor(self.cursor_path)
+        conn = await self._connect()
         
-        async with aiohttp.ClientSession() as session:
-            while True:
-                url = f"{self.base_url}/Mediapartners/{self.account_sid}/Catalogs/{self.catalog_id}/Items"
-                params = {
-                    "PageSize": 100,
-                    "Page": page
-                }
-                
-                print(f"   抓取第 {page} 頁...", end="", flush=True)
-                
-                try:
-                    async with session.get(
-                        url,
-                        params=params,
-                        auth=aiohttp.BasicAuth(self.account_sid, self.auth_token),
-                        headers={"Accept": "application/json"},
-                        timeout=aiohttp.ClientTimeout(total=60)
-                    ) as response:
-                        if response.status != 200:
-                            print(f" ❌ 錯誤 {response.status}")
-                            break
-                        
-                        data = await response.json()
-                        
-                        # 第一次取得總頁數
-                        if total_pages is None:
-                            total_pages = int(data.get("@numpages", 1))
-                            total_items = int(data.get("@total", 0))
-                            print(f"\n   總共 {total_items} 個課程，{total_pages} 頁")
-                        
-                        items = data.get("Items", [])
-                        courses.extend(items)
-                        print(f" ✓ ({len(items)} 個)")
-                        
-                        # 檢查是否還有更多頁面
-                        if page >= total_pages:
-                            break
-                        
-                        page += 1
-                        
-                        # 速率限制
-                        await asyncio.sleep(0.5)
-                        
-                except Exception as e:
-                    print(f" ❌ 錯誤: {e}")
-                    self.stats["errors"] += 1
-                    break
-        
-        self.stats["total_fetched"] = len(courses)
-        print(f"\n✅ 成功抓取 {len(courses)} 個課程")
-        return courses
-    
-    def _transform_courses(self, raw_courses: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """轉換課程資料格式"""
-        print("\n🔄 轉換課程資料...")
+        def _progress(page, stats):
+            print(f"   ✓ 第 {page.number}/{page.total_pages} 頁 ({len(page.items)} 個) - 累計: {stats['fetched']}")
         
-        transformed = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                stats = await stream_catalog(
+                    feed, session, cursor,
+                    transform=self._transform_course,
+                    load=lambda courses: self._save_page(conn, courses),
+                    on_page=_progress
+                )
+        finally:
+            await conn.close()
         
-        for raw in raw_courses:
-            try:
-                # 擷取關鍵欄位
-                course = {
-                    "platform_id": "coursera",
-                    "external_id": raw.get("CatalogItemId", ""),
-                    "name": raw.get("Name", ""),
-                    "description": self._clean_description(raw.get("Description", "")),
-                    "manufacturer": raw.get("Manufacturer", ""),
-                    "current_price": self._parse_price(raw.get("CurrentPrice", "0")),
-                    "original_price": self._parse_price(raw.get("OriginalPrice", "0")),
-                    "currency": raw.get("Currency", "USD"),
-                    "image_url": raw.get("ImageUrl", ""),
-                    "stock_status": self._normalize_stock_status(raw.get("StockAvailability", "")),
-                    "original_url": raw.get("Url", ""),
-                    "metadata": {
-                        "category": raw.get("Category", ""),
-                        "sub_category": raw.get("SubCategory", ""),
-                        "mpn": raw.get("Mpn", ""),
-                        "catalog_id": raw.get("CatalogId", ""),
-                        "campaign_id": raw.get("CampaignId", ""),
-                        "id": raw.get("Id", "")
-                    }
+        self.stats["total_fetched"] += stats["fetched"]
+        if stats["start_page"] > 1:
+            print(f"   (從第 {stats['start_page']} 頁繼續)")
+        print(f"\n✅ 成功處理 {stats['fetched']} 個課程")
+    
+    def _transform_course(self, raw: dict[str, Any]) -> dict[str, Any] | None:
+        """轉換課程資料格式（失敗時回傳 None）"""
+        try:
+            # 擷取關鍵欄位
+            course = {
+                "platform_id": "coursera",
+                "external_id": raw.get("CatalogItemId", ""),
+                "name": raw.get("Name", ""),
+                "description": self._clean_description(raw.get("Description", "")),
+                "manufacturer": raw.get("Manufacturer", ""),
+                "current_price": self._parse_price(raw.get("CurrentPrice", "0")),
+                "original_price": self._parse_price(raw.get("OriginalPrice", "0")),
+                "currency": raw.get("Currency", "USD"),
+                "image_url": raw.get("ImageUrl", ""),
+                "stock_status": self._normalize_stock_status(raw.get("StockAvailability", "")),
+                "original_url": raw.get("Url", ""),
+                "metadata": {
+                    "category": raw.get("Category", ""),
+                    "sub_category": raw.get("SubCategory", ""),
+                    "mpn": raw.get("Mpn", ""),
+                    "catalog_id": raw.get("CatalogId", ""),
+                    "campaign_id": raw.get("CampaignId", ""),
+                    "id": raw.get("Id", "")
                 }
-                
-                # 處理追蹤 URL
-                if course["original_url"]:
-                    course["tracking_params"] = self._extract_tracking_params(course["original_url"])
-                
-                transformed.append(course)
-                
-            except Exception as e:
-                print(f"   ⚠️  轉換錯誤: {raw.get('Name', 'Unknown')} - {e}")
-                self.stats["errors"] += 1
-        
-        print(f"✅ 成功轉換 {len(transformed)} 個課程")
-        return transformed
+            }
+            
+            # 處理追蹤 URL
+            if course["original_url"]:
+                course["tracking_params"] = self._extract_tracking_params(course["original_url"])
+            
+            return course
+            
+        except Exception as e:
+            print(f"   ⚠️  轉換錯誤: {raw.get('Name', 'Unknown')} - {e}")
+            self.stats["errors"] += 1
+            return None
     
     def _clean_description(self, desc: str) -> str:
         """清理描述文字"""
@@ -227,35 +192,32 @@ class CourseraETL:
         except (KeyError, IndexError, ValueError):
             return {}
     
-    async def _save_to_database(self, courses: list[dict[str, Any]]):
-        """儲存課程到資料庫"""
-        print("\n💾 儲存到資料庫...")
-        
-        # 讀取連線資訊
+    async def _connect(self) -> asyncpg.Connection:
+        """建立資料庫連線"""
         with open('temp/postgres_connection.json') as f:
             conn_info = json.load(f)
         
-        # 連線到資料庫
-        conn = await asyncpg.connect(
+        return await asyncpg.connect(
             host=conn_info['host'],
             database=conn_info['database'],
             user=conn_info['user'],
             password=conn_info['password'],
             ssl='require'
         )
+    
+    async def _save_page(self, conn: asyncpg.Connection, courses: list[dict[str, Any]]):
+        """儲存一頁課程"""
+        if self.bulk_load:
+            result = await bulk_upsert_courses(conn, courses)
+            self.stats["new_courses"] += result.inserted
+            self.stats["updated_courses"] += result.updated
+            self.stats["unchanged_courses"] += result.unchanged
+            return
         
-        try:
-            # 批次處理
-            batch_size = 100
-            for i in range(0, len(courses), batch_size):
-                batch = courses[i:i + batch_size]
-                await self._save_batch(conn, batch)
-                
-                progress = (i + len(batch)) / len(courses) * 100
-                print(f"   進度: {progress:.1f}%")
-                
-        finally:
-            await conn.close()
+        # 逐筆處理
+        batch_size = 100
+        for i in range(0, len(courses), batch_size):
+            await self._save_batch(conn, courses[i:i + batch_size])
     
     async def _save_batch(self, conn: asyncpg.Connection, batch: list[dict[str, Any]]):
         """儲存一批課程"""
@@ -413,7 +375,13 @@ class CourseraETL:
 
 async def main():
     """主程式"""
-    etl = CourseraETL()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Coursera ETL')
+    parser.add_argument('--row-by-row', action='store_true', help='逐筆寫入（不使用 COPY 批次載入）')
+    args = parser.parse_args()
+    
+    etl = CourseraETL(bulk_load=not args.row_by_row)
     await etl.run()
 
 
@@ -0,0 +1,232 @@
+"""
+並行、限速的課程 embedding 產生流程
+
+- 每門課程以 (模型, 文本) 計算 content hash 存於 ``course_embeddings.content_hash``，
+  文本未變動的課程直接跳過
+- 同時保持 ``concurrency`` 個批次進行中，所有請求共用以 Azure TPM / RPM 配額
+  設定的 token bucket
+- 向量以 ``executemany`` 批次 upsert（單一寫入者，與 API 呼叫重疊進行）
+- 每批寫入後更新 checkpoint 檔，中斷後重新執行會跳過已完成的課程
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.core.rate_limit import TokenBucket
+from src.core.retry import RetryPolicy, retry_async
+from src.core.token_budget import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "text-embedding-3-large"
+MIN_TEXT_LENGTH = 10
+
+ENSURE_SCHEMA_SQL = "ALTER TABLE course_embeddings ADD COLUMN IF NOT EXISTS content_hash text"
+
+_UPSERT_EMBEDDINGS_SQL = """
+    INSERT INTO course_embeddings
+    (course_id, embedding, embedding_model, content_hash)
+    VALUES ($1, $2::vector, $3, $4)
+    ON CONFLICT (course_id) DO UPDATE
+    SET embedding = EXCLUDED.embedding,
+        embedding_model = EXCLUDED.embedding_model,
+        content_hash = EXCLUDED.content_hash,
+        created_at = CURRENT_TIMESTAMP
+"""
+
+
+def content_hash(text: str, model: str = DEFAULT_MODEL) -> str:
+    """Embedding 輸入的雜湊（包含模型，換模型時會重新產生）"""
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class EmbeddingJob:
+    """一門需要產生 embedding 的課程"""
+    course_id: str
+    text: str
+    content_hash: str
+
+
+class EmbeddingCheckpoint:
+    """已完成課程的 checkpoint 檔（course_id -> content_hash）"""
+
+    def __init__(self, path: str | Path | None):
+        self.path = Path(path) if path else None
+        self.completed: dict[str, str] = {}
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                self.completed = json.load(f).get("completed", {})
+
+    def is_done(self, job: EmbeddingJob) -> bool:
+        return self.completed.get(job.course_id) == job.content_hash
+
+    def mark(self, jobs: Sequence[EmbeddingJob]) -> None:
+        self.completed.update((job.course_id, job.content_hash) for job in jobs)
+        if self.path:
+            # 先寫暫存檔再取代，避免中斷時留下損壞的 checkpoint
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"completed": self.completed}, f)
+            os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.completed = {}
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+
+class EmbeddingPipeline:
+    """並行產生並寫入課程 embeddings"""
+
+    def __init__(
+        self,
+        client,
+        *,
+        concurrency: int = 4,
+        batch_size: int = 16,
+        tokens_per_minute: float = 350_000,
+        requests_per_minute: float | None = None,
+        model: str = DEFAULT_MODEL,
+        checkpoint_path: str | Path | None = None,
+        token_counter: TokenCounter | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        self.client = client
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = max(batch_size, 1)
+        self.model = model
+        self.token_bucket = TokenBucket.per_minute(tokens_per_minute)
+        self.request_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self.checkpoint = EmbeddingCheckpoint(checkpoint_path)
+        self.token_counter = token_counter or TokenCounter()
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=60.0)
+        self.stats = {
+            "total": 0,
+            "unchanged": 0,
+            "resumed": 0,
+            "too_short": 0,
+            "processed": 0,
+            "errors": 0,
+            "tokens": 0,
+        }
+
+    async def ensure_schema(self, conn) -> None:
+        """新增 content_hash 欄位（已存在時不變）"""
+        await conn.execute(ENSURE_SCHEMA_SQL)
+
+    def plan(self, courses: Sequence[tuple[str, str, str | None]]) -> list[EmbeddingJob]:
+        """
+        決定需要產生 embedding 的課程
+
+        Args:
+            courses: (course_id, embedding 文本, 資料庫中的 content_hash)
+
+        Returns:
+            文本有變動且尚未在 checkpoint 中完成的課程
+        """
+        jobs = []
+        for course_id, text, stored_hash in courses:
+            self.stats["total"] += 1
+            if len(text) <= MIN_TEXT_LENGTH:
+                self.stats["too_short"] += 1
+                continue
+            job = EmbeddingJob(course_id, text, content_hash(text, self.model))
+            if job.content_hash == stored_hash:
+                self.stats["unchanged"] += 1
+            elif self.checkpoint.is_done(job):
+                self.stats["resumed"] += 1
+            else:
+                jobs.append(job)
+        return jobs
+
+    async def run(
+        self,
+        conn,
+        jobs: Sequence[EmbeddingJob],
+        should_stop: Callable[[], bool] = lambda: False,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        產生並寫入 embeddings
+
+        Args:
+            conn: 已註冊 pgvector 的資料庫連線（僅由寫入者使用）
+            jobs: plan() 的結果
+            should_stop: 回傳 True 時不再開始新的批次
+            on_progress: 每批寫入後以 stats 呼叫
+
+        Returns:
+            統計資訊
+        """
+        pending: asyncio.Queue = asyncio.Queue()
+        for i in range(0, len(jobs), self.batch_size):
+            pending.put_nowait(list(jobs[i:i + self.batch_size]))
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def _worker():
+            while not should_stop():
+                try:
+                    batch = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    embeddings = await self._embed(batch)
+                except Exception as e:
+                    logger.error(f"[EmbeddingPipeline] Batch of {len(batch)} failed: {e}")
+                    self.stats["errors"] += len(batch)
+                    continue
+                await results.put((batch, embeddings))
+
+        async def _writer():
+            while (item := await results.get()) is not None:
+                batch, embeddings = item
+                try:
+                    await conn.executemany(_UPSERT_EMBEDDINGS_SQL, [
+                        (job.course_id, embedding, self.model, job.content_hash)
+                        for job, embedding in zip(batch, embeddings, strict=True)
+                    ])
+                except Exception as e:
+                    logger.error(f"[EmbeddingPipeline] Failed to save {len(batch)} embeddings: {e}")
+                    self.stats["errors"] += len(batch)
+                    continue
+                self.checkpoint.mark(batch)
+                self.stats["processed"] += len(batch)
+                if on_progress:
+                    on_progress(dict(self.stats))
+
+        writer = asyncio.create_task(_writer())
+        try:
+            await asyncio.gather(*(_worker() for _ in range(self.concurrency)))
+        finally:
+            await results.put(None)
+            await writer
+
+        if pending.empty() and not self.stats["errors"]:
+            self.checkpoint.clear()
+        return dict(self.stats)
+
+    async def _embed(self, batch: list[EmbeddingJob]) -> list:
+        """等待配額後呼叫 embedding API（含重試）"""
+        texts = [job.text for job in batch]
+        tokens = sum(self.token_counter.count(text) for text in texts)
+
+        async def _attempt():
+            await self.token_bucket.acquire(tokens)
+            if self.request_bucket:
+                await self.request_bucket.acquire()
+            embeddings = await self.client.create_embeddings(texts)
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+            return embeddings
+
+        embeddings = await retry_async(_attempt, self.retry_policy, "etl.course_embeddings")
+        self.stats["tokens"] += tokens
+        return embeddings
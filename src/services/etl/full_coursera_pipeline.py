@@ -18,12 +18,17 @@ from pgvector.asyncpg import register_vector
 
 sys.path.append('.')
 from src.services.embedding_client import get_azure_embedding_client
+from src.services.etl.bulk_upsert import bulk_upsert_courses
+from src.services.etl.catalog_stream import ImpactCatalogFeed, PageCursor, stream_catalog
+from src.services.etl.embedding_pipeline import EmbeddingPipeline
 
 
 class CourseraFullPipeline:
     """完整的 Coursera 資料處理 Pipeline"""
     
-    def __init__(self, test_mode: bool = False):
+    def __init__(self, test_mode: bool = False, bulk_load: bool = True,
+                 embedding_concurrency: int = 4, tokens_per_minute: float = 350_000,
+                 cursor_path: str = "temp/coursera_pipeline_cursor.json"):
         # Impact.com API 設定
         self.base_url = "https://api.impact.com"
         self.account_sid = "IR5reNPSapi65901857xTcusvceeZxhuj1"
@@ -33,6 +38,10 @@ class CourseraFullPipeline:
         # 模式設定
         self.test_mode = test_mode
         self.max_courses = 3 if test_mode else None  # 測試模式只處理 3 個
+        self.bulk_load = bulk_load  # COPY + 單一 upsert；False 時逐筆寫入
+        self.embedding_concurrency = embedding_concurrency
+        self.tokens_per_minute = tokens_per_minute  # Azure embedding 部署的 TPM 配額
+        self.cursor_path = cursor_path  # 分頁游標（中斷後從下一個未儲存的分頁繼續）
         
         # 統計資訊
         self.stats = {
@@ -40,6 +49,9 @@ class CourseraFullPipeline:
             "end_time": None,
             "courses_fetched": 0,
             "courses_saved": 0,
+            "courses_inserted": 0,
+            "courses_updated": 0,
+            "courses_unchanged": 0,
             "embeddings_created": 0,
             "errors": []
         }
@@ -96,21 +108,12 @@ class CourseraFullPipeline:
             if self.should_stop:
                 return
             
-            # 步驟 2: 從 API 抓取課程
-            courses = await self._fetch_courses()
-            
-            if self.should_stop or not courses:
-                return
-            
-            # 步驟 3: 儲存課程到資料庫
-            await self._save_courses(courses)
+            # 步驟 2: 串流處理：抓取分頁 → 儲存 → 產生 embeddings（各階段同時進行）
+            await self._stream_catalog()
             
             if self.should_stop:
                 return
             
-            # 步驟 4: 產生 embeddings
-            await self._generate_embeddings()
-            
             # 完成
             self.stats["end_time"] = datetime.now()
             self._print_summary()
@@ -156,117 +159,86 @@ class CourseraFullPipeline:
         finally:
             await conn.close()
     
-    async def _fetch_courses(self) -> list[dict[str, Any]]:
-        """從 Impact.com API 抓取課程"""
-        print("\n📥 從 Impact.com API 抓取課程...")
+    async def _stream_catalog(self):
+        """以串流方式抓取、儲存課程並產生 embeddings（不在記憶體中保留整份目錄）"""
+        print("\n📥 串流處理 Impact.com 課程目錄（抓取 → 儲存 → Embedding）...")
         
-        courses = []
-        page = 1
-        fetched_count = 0
+        feed = ImpactCatalogFeed(self.account_sid, self.auth_token, self.catalog_id,
+                                 base_url=self.base_url, requests_per_second=1.0)
+        cursor = PageCursor(self.cursor_path)
         
-        async with aiohttp.ClientSession() as session:
-            while not self.should_stop:
-                if self.test_mode and fetched_count >= self.max_courses:
-                    break
-                
-                url = f"{self.base_url}/Mediapartners/{self.account_sid}/Catalogs/{self.catalog_id}/Items"
-                params = {
-                    "PageSize": 100,
-                    "Page": page
-                }
-                
-                print(f"   抓取第 {page} 頁...", end="", flush=True)
-                
-                try:
-                    async with session.get(
-                        url,
-                        params=params,
-                        auth=aiohttp.BasicAuth(self.account_sid, self.auth_token),
-                        headers={"Accept": "application/json"},
-                        timeout=aiohttp.ClientTimeout(total=60)
-                    ) as response:
-                        if response.status != 200:
-                            print(f" ❌ 錯誤 {response.status}")
-                            break
-                        
-                        data = await response.json()
-                        items = data.get("Items", [])
-                        
-                        # 測試模式下只取需要的數量
-                        if self.test_mode:
-                            items = items[:self.max_courses - fetched_count]
-                        
-                        courses.extend(items)
-                        fetched_count += len(items)
-                        
-                        print(f" ✓ ({len(items)} 個) - 累計: {fetched_count}")
-                        
-                        # 檢查是否還有更多頁面
-                        total_pages = int(data.get("@numpages", 1))
-                        if page >= total_pages:
-                            break
-                        
-                        page += 1
-                        
-                        # 每 10 頁儲存進度
-                        if page % 10 == 0:
-                            self.stats["courses_fetched"] = fetched_count
-                            self._save_progress()
-                        
-                        # 速率限制和 API 限制檢查
-                        await asyncio.sleep(1.0)  # 增加延遲，更保守
-                        
-                        # 檢查 rate limit（從 response headers）
-                        remaining = response.headers.get('x-ratelimit-remaining-hour')
-                        if remaining and int(remaining) < 100:
-                            print(f"\n⚠️  API 速率限制接近上限，剩餘: {remaining}/1000")
-                            print("   暫停 60 秒...")
-                            await asyncio.sleep(60)
-                        
-                except Exception as e:
-                    print(f" ❌ 錯誤: {e}")
-                    self.stats["errors"].append(f"API fetch error: {e}")
-                    break
-        
-        self.stats["courses_fetched"] = len(courses)
-        print(f"\n✅ 成功抓取 {len(courses)} 個課程")
-        return courses
-    
-    async def _save_courses(self, courses: list[dict[str, Any]]):
-        """儲存課程到資料庫"""
-        print(f"\n💾 儲存 {len(courses)} 個課程到資料庫...")
-        
-        conn = await self._get_db_connection()
+        # 儲存與 embedding 階段同時進行，各自使用一條連線
+        load_conn = await self._get_db_connection()
+        embed_conn = await self._get_db_connection()
+        embedding_client = get_azure_embedding_client()
         
         try:
-            saved_count = 0
+            await register_vector(embed_conn)
+            pipeline = EmbeddingPipeline(
+                embedding_client,
+                concurrency=self.embedding_concurrency,
+                batch_size=16,
+                tokens_per_minute=self.tokens_per_minute,
+                checkpoint_path="temp/embedding_checkpoint.json"
+            )
+            await pipeline.ensure_schema(embed_conn)
             
-            for i, raw_course in enumerate(courses):
-                if self.should_stop:
-                    break
-                
-                try:
-                    # 轉換課程資料
-                    course = self._transform_course(raw_course)
-                    
-                    # 儲存到資料庫
-                    await self._save_single_course(conn, course)
-                    saved_count += 1
-                    
-                    # 顯示進度
-                    if (i + 1) % 10 == 0 or i == len(courses) - 1:
-                        progress = (i + 1) / len(courses) * 100
-                        print(f"   進度: {progress:.1f}% ({i + 1}/{len(courses)})")
-                        
-                except Exception as e:
-                    print(f"   ⚠️  儲存錯誤: {raw_course.get('Name', 'Unknown')} - {e}")
-                    self.stats["errors"].append(f"Save error: {e}")
+            def _progress(page, stats):
+                self.stats["courses_fetched"] = stats["fetched"]
+                print(f"   ✓ 第 {page.number}/{page.total_pages} 頁 ({len(page.items)} 個) - "
+                      f"累計: {stats['fetched']} | Embeddings: {self.stats['embeddings_created']}")
+            
+            async with aiohttp.ClientSession() as session:
+                stats = await stream_catalog(
+                    feed, session, cursor,
+                    transform=self._safe_transform,
+                    load=lambda courses: self._save_courses(load_conn, courses),
+                    embed=lambda courses: self._embed_courses(embed_conn, pipeline, courses),
+                    max_items=self.max_courses,
+                    should_stop=lambda: self.should_stop,
+                    on_page=_progress
+                )
             
-            self.stats["courses_saved"] = saved_count
-            print(f"✅ 成功儲存 {saved_count} 個課程")
+            self.stats["courses_fetched"] = stats["fetched"]
+            if stats["start_page"] > 1:
+                print(f"   (從第 {stats['start_page']} 頁繼續)")
+            print(f"\n✅ 處理 {stats['fetched']} 個課程 ({stats['pages']} 頁)")
             
+            # 補齊先前中斷時已儲存但尚未產生 embedding 的課程（未變動的會被跳過）
+            if stats["completed"] and not self.test_mode:
+                await self._embed_courses(embed_conn, pipeline)
+                
         finally:
-            await conn.close()
+            await embedding_client.close()
+            await load_conn.close()
+            await embed_conn.close()
+    
+    def _safe_transform(self, raw: dict[str, Any]) -> dict[str, Any] | None:
+        """轉換課程資料（失敗時記錄錯誤並略過）"""
+        try:
+            return self._transform_course(raw)
+        except Exception as e:
+            print(f"   ⚠️  轉換錯誤: {raw.get('Name', 'Unknown')} - {e}")
+            self.stats["errors"].append(f"Transform error: {e}")
+            return None
+    
+    async def _save_courses(self, conn: asyncpg.Connection, courses: list[dict[str, Any]]):
+        """儲存一頁轉換後的課程"""
+        if self.bulk_load:
+            result = await bulk_upsert_courses(conn, courses)
+            self.stats["courses_saved"] += result.total
+            self.stats["courses_inserted"] += result.inserted
+            self.stats["courses_updated"] += result.updated
+            self.stats["courses_unchanged"] += result.unchanged
+            return
+        
+        for course in courses:
+            try:
+                await self._save_single_course(conn, course)
+                self.stats["courses_saved"] += 1
+            except Exception as e:
+                print(f"   ⚠️  儲存錯誤: {course.get('name', 'Unknown')} - {e}")
+                self.stats["errors"].append(f"Save error: {e}")
     
     def _transform_course(self, raw: dict[str, Any]) -> dict[str, Any]:
         """轉換課程資料格式"""
@@ -369,100 +341,45 @@ class CourseraFullPipeline:
             json.dumps({})
             )
     
-    async def _generate_embeddings(self):
-        """產生 embeddings"""
-        print("\n🧮 產生課程 Embeddings...")
+    async def _embed_courses(self, conn: asyncpg.Connection, pipeline: EmbeddingPipeline,
+                             courses: list[dict[str, Any]] | None = None):
+        """產生 embeddings（並行批次、依 TPM 配額限速、跳過文本未變動的課程）"""
+        query = """
+            SELECT c.id, c.name, c.description, c.manufacturer,
+                   c.metadata->>'category' as category,
+                   ce.content_hash
+            FROM courses c
+            LEFT JOIN course_embeddings ce ON c.id = ce.course_id
+            WHERE c.platform_id = 'coursera'
+        """
+        if courses is None:
+            rows = await conn.fetch(query + " ORDER BY c.created_at")
+        else:
+            course_ids = [f"{course['platform_id']}_{course['external_id']}" for course in courses]
+            rows = await conn.fetch(query + " AND c.id = ANY($1::text[])", course_ids)
         
-        conn = await self._get_db_connection()
-        await register_vector(conn)
+        jobs = pipeline.plan([
+            (row['id'], self._embedding_text(row), row['content_hash'])
+            for row in rows
+        ])
+        if self.test_mode:
+            jobs = jobs[:self.max_courses]
+        if not jobs:
+            return
         
-        try:
-            # 取得需要產生 embedding 的課程
-            courses = await conn.fetch("""
-                SELECT c.id, c.name, c.description, c.manufacturer,
-                       c.metadata->>'category' as category
-                FROM courses c
-                LEFT JOIN course_embeddings ce ON c.id = ce.course_id
-                WHERE ce.course_id IS NULL
-                AND c.platform_id = 'coursera'
-                ORDER BY c.created_at
-                LIMIT $1
-            """, self.max_courses if self.test_mode else 10000)
-            
-            if not courses:
-                print("   ✅ 所有課程都已有 embeddings")
-                return
-            
-            print(f"   找到 {len(courses)} 個需要產生 embedding 的課程")
-            
-            # 初始化 embedding client
-            embedding_client = get_azure_embedding_client()
-            
-            try:
-                # 批次處理
-                batch_size = 5
-                for i in range(0, len(courses), batch_size):
-                    if self.should_stop:
-                        break
-                    
-                    batch = courses[i:i + batch_size]
-                    await self._process_embedding_batch(conn, embedding_client, batch)
-                    
-                    # 顯示進度
-                    progress = min((i + batch_size) / len(courses) * 100, 100)
-                    processed = min(i + batch_size, len(courses))
-                    print(f"   Embedding 進度: {progress:.1f}% ({processed}/{len(courses)})")
-                    
-                    # 速率限制
-                    await asyncio.sleep(1)
-                    
-            finally:
-                await embedding_client.close()
-                
-        finally:
-            await conn.close()
+        result = await pipeline.run(conn, jobs, should_stop=lambda: self.should_stop)
+        self.stats["embeddings_created"] = result["processed"]
+        if result["errors"]:
+            self.stats["errors"].append(f"Embedding errors: {result['errors']} courses")
     
-    async def _process_embedding_batch(self, conn: asyncpg.Connection, 
-                                     embedding_client, batch: list[Any]):
-        """處理一批 embeddings"""
-        texts = []
-        valid_courses = []
-        
-        for course in batch:
-            # 建立 embedding 文本
-            text = f"Course Title: {course['name']} | Provider: {course['manufacturer']}"
-            if course['category']:
-                text += f" | Category: {course['category']}"
-            if course['description']:
-                text += f" | Description: {course['description'][:1500]}"
-            
-            texts.append(text)
-            valid_courses.append(course)
-        
-        try:
-            # 產生 embeddings
-            embeddings = await embedding_client.create_embeddings(texts)
-            
-            # 儲存到資料庫
-            for course, embedding in zip(valid_courses, embeddings, strict=False):
-                await conn.execute("""
-                    INSERT INTO course_embeddings 
-                    (course_id, embedding, embedding_model)
-                    VALUES ($1, $2::vector, $3)
-                    ON CONFLICT (course_id) DO UPDATE
-                    SET embedding = EXCLUDED.embedding,
-                        created_at = CURRENT_TIMESTAMP
-                """,
-                course['id'],
-                embedding,
-                'text-embedding-3-large'
-                )
-                
-            self.stats["embeddings_created"] += len(valid_courses)
-            
-        except Exception as e:
-            print(f"   ⚠️  Embedding 批次錯誤: {e}")
-            self.stats["errors"].append(f"Embedding error: {e}")
+    def _embedding_text(self, course) -> str:
+        """建立 embedding 文本"""
+        text = f"Course Title: {course['name']} | Provider: {course['manufacturer']}"
+        if course['category']:
+            text += f" | Category: {course['category']}"
+        if course['description']:
+            text += f" | Description: {course['description'][:1500]}"
+        return text
     
     async def _get_db_connection(self) -> asyncpg.Connection:
         """取得資料庫連線"""
@@ -488,6 +405,9 @@ class CourseraFullPipeline:
         print(f"執行時間: {duration:.2f} 秒")
         print(f"抓取課程: {self.stats['courses_fetched']}")
         print(f"儲存課程: {self.stats['courses_saved']}")
+        if self.bulk_load:
+            print(f"  新增 / 更新 / 未變動: {self.stats['courses_inserted']} / "
+                  f"{self.stats['courses_updated']} / {self.stats['courses_unchanged']}")
         print(f"產生 Embeddings: {self.stats['embeddings_created']}")
         print(f"錯誤數量: {len(self.stats['errors'])}")
         
@@ -506,6 +426,9 @@ async def main():
     parser = argparse.ArgumentParser(description='Coursera ETL + Embedding Pipeline')
     parser.add_argument('--test', action='store_true', help='測試模式（只處理3個課程）')
     parser.add_argument('--full', action='store_true', help='完整模式（處理所有課程）')
+    parser.add_argument('--row-by-row', action='store_true', help='逐筆寫入（不使用 COPY 批次載入）')
+    parser.add_argument('--concurrency', type=int, default=4, help='同時進行的 embedding 批次數')
+    parser.add_argument('--tpm', type=float, default=350_000, help='Azure embedding 部署的 TPM 配額')
     
     args = parser.parse_args()
     
@@ -516,7 +439,12 @@ async def main():
         return
     
     # 執行 pipeline
-    pipeline = CourseraFullPipeline(test_mode=args.test)
+    pipeline = CourseraFullPipeline(
+        test_mode=args.test,
+        bulk_load=not args.row_by_row,
+        embedding_concurrency=args.concurrency,
+        tokens_per_minute=args.tpm
+    )
     await pipeline.run()
 
 
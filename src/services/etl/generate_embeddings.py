@@ -9,17 +9,24 @@ from datetime import datetime
 from typing import Any
 
 import asyncpg
-import numpy as np
+from pgvector.asyncpg import register_vector
 
 from src.core.monitoring_service import monitoring_service
 from src.services.embedding_client import get_azure_embedding_client
+from src.services.etl.embedding_pipeline import EmbeddingPipeline
 
 
 class CourseEmbeddingGenerator:
     """課程 Embedding 產生器"""
     
-    def __init__(self, batch_size: int = 16):
+    def __init__(self, batch_size: int = 16, concurrency: int = 4,
+                 tokens_per_minute: float = 350_000, requests_per_minute: float | None = None,
+                 checkpoint_path: str = "temp/embedding_checkpoint.json"):
         self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.checkpoint_path = checkpoint_path
         self.embedding_client = None
         self.stats = {
             "total_courses": 0,
@@ -36,38 +43,67 @@ class CourseEmbeddingGenerator:
         print("=" * 60)
         
         self.stats["start_time"] = datetime.now()
+        conn = await _connect()
         
         try:
-            # 取得需要產生 embedding 的課程
-            courses = await self._get_courses_without_embeddings()
+            await register_vector(conn)
+            
+            # 初始化 embedding client
+            self.embedding_client = get_azure_embedding_client()
+            pipeline = EmbeddingPipeline(
+                self.embedding_client,
+                concurrency=self.concurrency,
+                batch_size=self.batch_size,
+                tokens_per_minute=self.tokens_per_minute,
+                requests_per_minute=self.requests_per_minute,
+                checkpoint_path=self.checkpoint_path,
+            )
+            await pipeline.ensure_schema(conn)
+            
+            # 取得課程與已儲存的 content hash，只處理文本有變動的課程
+            courses = await self._get_courses(conn)
+            jobs = pipeline.plan([
+                (course["id"], self._create_embedding_text(course), course["content_hash"])
+                for course in courses
+            ])
             self.stats["total_courses"] = len(courses)
+            self.stats["skipped"] = len(courses) - len(jobs)
             
-            if not courses:
-                print("✅ 所有課程都已有 embeddings！")
+            if not jobs:
+                print("✅ 所有課程的 embeddings 都是最新的！")
                 return
             
-            print(f"📚 找到 {len(courses)} 個需要產生 embedding 的課程")
+            print(f"📚 {len(courses)} 個課程中有 {len(jobs)} 個需要產生 embedding "
+                  f"(未變動 {pipeline.stats['unchanged']}，checkpoint 已完成 {pipeline.stats['resumed']})")
+            print(f"   並行批次: {self.concurrency} × {self.batch_size}，配額: {self.tokens_per_minute:,.0f} TPM")
             
-            # 初始化 embedding client
-            self.embedding_client = get_azure_embedding_client()
+            def _progress(stats: dict[str, Any]):
+                done = stats["processed"] + stats["errors"]
+                print(f"進度: {done / len(jobs) * 100:.1f}% ({done}/{len(jobs)}) | "
+                      f"已處理: {stats['processed']} | 錯誤: {stats['errors']} | tokens: {stats['tokens']:,}")
+            
+            result = await pipeline.run(conn, jobs, on_progress=_progress)
+            self.stats["processed"] = result["processed"]
+            self.stats["errors"] = result["errors"]
             
-            # 批次處理
-            for i in range(0, len(courses), self.batch_size):
-                batch = courses[i:i + self.batch_size]
-                await self._process_batch(batch)
-                
-                # 顯示進度
-                progress = (i + len(batch)) / len(courses) * 100
-                processed = i + len(batch)
-                print(f"\n進度: {progress:.1f}% ({processed}/{len(courses)})")
-                print(f"已處理: {self.stats['processed']} | 跳過: {self.stats['skipped']} | 錯誤: {self.stats['errors']}")
-                
-                # 速率限制
-                await asyncio.sleep(1)
+            # 追蹤指標
+            monitoring_service.track_event(
+                "CourseEmbeddingGeneration",
+                {
+                    "batch_size": self.batch_size,
+                    "concurrency": self.concurrency,
+                    "processed": result["processed"],
+                    "unchanged": result["unchanged"],
+                    "errors": result["errors"],
+                    "tokens_estimated": result["tokens"],
+                    "rate_limit_wait_seconds": round(pipeline.token_bucket.waited_seconds, 2)
+                }
+            )
             
         finally:
             if self.embedding_client:
                 await self.embedding_client.close()
+            await conn.close()
             
             self.stats["end_time"] = datetime.now()
             duration = (self.stats["end_time"] - self.stats["start_time"]).total_seconds()
@@ -80,102 +116,29 @@ class CourseEmbeddingGenerator:
             print(f"   跳過: {self.stats['skipped']}")
             print(f"   錯誤: {self.stats['errors']}")
     
-    async def _get_courses_without_embeddings(self) -> list[dict[str, Any]]:
-        """取得沒有 embeddings 的課程"""
-        # 讀取連線資訊
-        with open('temp/postgres_connection.json') as f:
-            conn_info = json.load(f)
-        
-        conn = await asyncpg.connect(
-            host=conn_info['host'],
-            database=conn_info['database'],
-            user=conn_info['user'],
-            password=conn_info['password'],
-            ssl='require'
-        )
-        
-        try:
-            # 查詢沒有 embedding 的課程
-            rows = await conn.fetch("""
-                SELECT c.id, c.name, c.description, c.manufacturer, 
-                       c.metadata->>'category' as category
-                FROM courses c
-                LEFT JOIN course_embeddings ce ON c.id = ce.course_id
-                WHERE ce.course_id IS NULL
-                AND c.platform_id = 'coursera'
-                ORDER BY c.created_at
-                LIMIT 1000
-            """)
-            
-            courses = []
-            for row in rows:
-                courses.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "manufacturer": row["manufacturer"],
-                    "category": row["category"] or ""
-                })
-            
-            return courses
-            
-        finally:
-            await conn.close()
-    
-    async def _process_batch(self, batch: list[dict[str, Any]]):
-        """處理一批課程"""
-        print(f"\n🔄 處理批次 ({len(batch)} 個課程)...")
-        
-        # 準備文本
-        texts = []
-        valid_courses = []
-        
-        for course in batch:
-            # 建立用於 embedding 的文本
-            text = self._create_embedding_text(course)
-            
-            if len(text) > 10:  # 確保有足夠的內容
-                texts.append(text)
-                valid_courses.append(course)
-            else:
-                print(f"   ⚠️  跳過: {course['name'][:50]} (內容不足)")
-                self.stats["skipped"] += 1
-        
-        if not texts:
-            return
+    async def _get_courses(self, conn: asyncpg.Connection) -> list[dict[str, Any]]:
+        """取得所有課程與已儲存 embedding 的 content hash"""
+        rows = await conn.fetch("""
+            SELECT c.id, c.name, c.description, c.manufacturer, 
+                   c.metadata->>'category' as category,
+                   ce.content_hash
+            FROM courses c
+            LEFT JOIN course_embeddings ce ON c.id = ce.course_id
+            WHERE c.platform_id = 'coursera'
+            ORDER BY c.created_at
+        """)
         
-        try:
-            # 產生 embeddings
-            print(f"   🧮 產生 {len(texts)} 個 embeddings...")
-            start_time = datetime.now()
-            
-            embeddings = await self.embedding_client.create_embeddings(texts)
-            
-            duration = (datetime.now() - start_time).total_seconds()
-            print(f"   ✅ 完成！耗時: {duration:.2f} 秒")
-            
-            # 儲存到資料庫
-            await self._save_embeddings(valid_courses, embeddings)
-            
-            self.stats["processed"] += len(valid_courses)
-            
-            # 追蹤指標
-            monitoring_service.track_event(
-                "CourseEmbeddingGeneration",
-                {
-                    "batch_size": len(valid_courses),
-                    "duration_seconds": duration,
-                    "tokens_estimated": sum(len(text) // 4 for text in texts)
-                }
-            )
-            
-        except Exception as e:
-            print(f"   ❌ 批次處理錯誤: {e}")
-            self.stats["errors"] += len(batch)
-            
-            # 記錄錯誤的課程
-            for course in batch:
-                print(f"      - {course['name'][:50]}")
+        return [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "description": row["description"],
+                "manufacturer": row["manufacturer"],
+                "category": row["category"] or "",
+                "content_hash": row["content_hash"]
+            }
+            for row in rows
+        ]
     
     def _create_embedding_text(self, course: dict[str, Any]) -> str:
         """建立用於 embedding 的文本"""
@@ -205,51 +168,20 @@ class CourseEmbeddingGenerator:
                 parts.append(f"Description: {desc}")
         
         return " | ".join(parts)
+
+
+async def _connect() -> asyncpg.Connection:
+    """建立資料庫連線"""
+    with open('temp/postgres_connection.json') as f:
+        conn_info = json.load(f)
     
-    async def _save_embeddings(self, courses: list[dict[str, Any]], embeddings: list[list[float]]):
-        """儲存 embeddings 到資料庫"""
-        # 讀取連線資訊
-        with open('temp/postgres_connection.json') as f:
-            conn_info = json.load(f)
-        
-        # 需要先註冊 pgvector 類型
-        from pgvector.asyncpg import register_vector
-        
-        conn = await asyncpg.connect(
-            host=conn_info['host'],
-            database=conn_info['database'],
-            user=conn_info['user'],
-            password=conn_info['password'],
-            ssl='require'
-        )
-        
-        try:
-            # 註冊 vector 類型
-            await register_vector(conn)
-            
-            # 批次插入
-            async with conn.transaction():
-                for course, embedding in zip(courses, embeddings, strict=False):
-                    # 確保 embedding 是正確的格式
-                    embedding_array = np.array(embedding, dtype=np.float32)
-                    
-                    await conn.execute("""
-                        INSERT INTO course_embeddings 
-                        (course_id, embedding, embedding_model)
-                        VALUES ($1, $2::vector, $3)
-                        ON CONFLICT (course_id) DO UPDATE
-                        SET embedding = EXCLUDED.embedding,
-                            created_at = CURRENT_TIMESTAMP
-                    """,
-                    course['id'],
-                    embedding_array.tolist(),
-                    'text-embedding-3-large'
-                    )
-                    
-            print(f"   💾 已儲存 {len(courses)} 個 embeddings")
-            
-        finally:
-            await conn.close()
+    return await asyncpg.connect(
+        host=conn_info['host'],
+        database=conn_info['database'],
+        user=conn_info['user'],
+        password=conn_info['password'],
+        ssl='require'
+    )
 
 
 async def check_embedding_status():
@@ -305,6 +237,16 @@ async def check_embedding_status():
 
 async def main():
     """主程式"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate course embeddings')
+    parser.add_argument('--batch-size', type=int, default=16, help='每次 API 請求的課程數')
+    parser.add_argument('--concurrency', type=int, default=4, help='同時進行的批次數')
+    parser.add_argument('--tpm', type=float, default=350_000, help='Azure 部署的 tokens-per-minute 配額')
+    parser.add_argument('--rpm', type=float, default=None, help='Azure 部署的 requests-per-minute 配額')
+    parser.add_argument('--checkpoint', default='temp/embedding_checkpoint.json', help='checkpoint 檔案')
+    args = parser.parse_args()
+    
     # 檢查目前狀態
     await check_embedding_status()
     
@@ -315,7 +257,13 @@ async def main():
         return
     
     # 執行產生器
-    generator = CourseEmbeddingGenerator(batch_size=10)  # 小批次避免超時
+    generator = CourseEmbeddingGenerator(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        tokens_per_minute=args.tpm,
+        requests_per_minute=args.rpm,
+        checkpoint_path=args.checkpoint
+    )
     await generator.run()
     
     # 顯示最終狀態
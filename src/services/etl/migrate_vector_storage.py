@@ -0,0 +1,185 @@
+# flake8: noqa
+"""
+建立降維 / halfvec 課程向量欄位並回填
+ETL script with CLI output - print statements are intentional
+
+text-embedding-3 向量可做 Matryoshka 截斷：取前 N 維再 L2 正規化。
+此指令新增 `courses.<column> <type>(N)` 欄位，以批次 UPDATE 從既有
+`embedding` 欄位回填，建立同步 trigger 與 HNSW 索引
+（HNSW 上限：vector 2000 維、halfvec 4000 維）。
+
+完成後設定：
+    COURSE_VECTOR_COLUMN=<column>
+    COURSE_VECTOR_TYPE=<type>
+    COURSE_EMBEDDING_DIMENSIONS=<N>
+
+用法:
+    python -m src.services.etl.migrate_vector_storage --dimensions 1536 --type halfvec
+    python -m src.services.etl.migrate_vector_storage --dimensions 1024 --column embedding_1024 --type vector --dry-run
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+import asyncpg
+
+HNSW_MAX_DIMENSIONS = {"vector": 2000, "halfvec": 4000}
+_IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _projection(source: str, dimensions: int, vector_type: str) -> str:
+    """截斷 + 正規化的 SQL 運算式（需 pgvector >= 0.7）"""
+    return f"l2_normalize(subvector({source}, 1, {dimensions}))::{vector_type}({dimensions})"
+
+
+def build_schema_sql(column: str, vector_type: str, dimensions: int,
+                     create_index: bool = True) -> list[str]:
+    """
+    新欄位、同步 trigger 與索引的 DDL
+
+    Args:
+        column: 新欄位名稱
+        vector_type: "vector" 或 "halfvec"
+        dimensions: 截斷後維度
+        create_index: 是否建立 HNSW 索引
+
+    Returns:
+        依序執行的 SQL 陳述式
+    """
+    if not _IDENTIFIER_RE.match(column) or column == "embedding":
+        raise ValueError(f"Invalid target column: {column!r}")
+    if vector_type not in HNSW_MAX_DIMENSIONS:
+        raise ValueError(f"Unsupported vector type: {vector_type!r}")
+    if dimensions <= 0:
+        raise ValueError("dimensions must be positive")
+
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS vector",
+        f"ALTER TABLE courses ADD COLUMN IF NOT EXISTS {column} {vector_type}({dimensions})",
+        f"""
+        CREATE OR REPLACE FUNCTION sync_courses_{column}() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.embedding IS NULL THEN
+                NEW.{column} := NULL;
+            ELSE
+                NEW.{column} := {_projection('NEW.embedding', dimensions, vector_type)};
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS sync_courses_{column} ON courses",
+        f"""
+        CREATE TRIGGER sync_courses_{column}
+            BEFORE INSERT OR UPDATE OF embedding ON courses
+            FOR EACH ROW EXECUTE FUNCTION sync_courses_{column}()
+        """,
+    ]
+    if create_index:
+        if dimensions > HNSW_MAX_DIMENSIONS[vector_type]:
+            raise ValueError(
+                f"HNSW supports at most {HNSW_MAX_DIMENSIONS[vector_type]} dimensions for {vector_type}"
+            )
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_courses_{column}_hnsw "
+            f"ON courses USING hnsw ({column} {vector_type}_cosine_ops)"
+        )
+    return statements
+
+
+def build_backfill_sql(column: str, vector_type: str, dimensions: int) -> str:
+    """回填一批尚未轉換的課程（$1 = 批次大小）"""
+    return f"""
+        UPDATE courses
+        SET {column} = {_projection('embedding', dimensions, vector_type)}
+        WHERE id IN (
+            SELECT id FROM courses
+            WHERE embedding IS NOT NULL AND {column} IS NULL
+            LIMIT $1
+        )
+    """
+
+
+def _load_connection_info() -> dict:
+    try:
+        with open('tools/coursera_db_manager/config/postgres_connection.json') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        with open('temp/postgres_connection.json') as f:
+            return json.load(f)
+
+
+async def migrate(column: str, vector_type: str, dimensions: int, batch_size: int = 500,
+                  create_index: bool = True, dry_run: bool = False) -> int:
+    """執行遷移並回填，回傳回填筆數"""
+    schema_sql = build_schema_sql(column, vector_type, dimensions, create_index)
+    index_sql = schema_sql.pop() if create_index else None
+    backfill_sql = build_backfill_sql(column, vector_type, dimensions)
+
+    if dry_run:
+        for statement in schema_sql + [backfill_sql] + ([index_sql] if index_sql else []):
+            print(statement.strip() + ";\n")
+        return 0
+
+    conn_info = _load_connection_info()
+    conn = await asyncpg.connect(
+        host=conn_info['host'],
+        database=conn_info['database'],
+        user=conn_info['user'],
+        password=conn_info['password'],
+        ssl='require'
+    )
+
+    try:
+        print(f"🔧 建立欄位 courses.{column} {vector_type}({dimensions}) 與同步 trigger")
+        async with conn.transaction():
+            for statement in schema_sql:
+                await conn.execute(statement)
+
+        total = 0
+        start = time.perf_counter()
+        while True:
+            status = await conn.execute(backfill_sql, batch_size)
+            updated = int(status.split()[-1])
+            if not updated:
+                break
+            total += updated
+            print(f"   💾 已回填 {total} 筆 ({total / (time.perf_counter() - start):.0f} 筆/秒)")
+        print(f"✅ 回填完成：{total} 筆")
+
+        if index_sql:
+            # CONCURRENTLY 不能在交易中執行
+            print(f"🧭 建立 HNSW 索引 idx_courses_{column}_hnsw ...")
+            await conn.execute(index_sql)
+            print("✅ 索引建立完成")
+
+        print("\n請設定:")
+        print(f"   COURSE_VECTOR_COLUMN={column}")
+        print(f"   COURSE_VECTOR_TYPE={vector_type}")
+        print(f"   COURSE_EMBEDDING_DIMENSIONS={dimensions}")
+        return total
+
+    finally:
+        await conn.close()
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(description="Add a dimension-reduced / halfvec course vector column")
+    parser.add_argument("--dimensions", type=int, required=True, help="Target dimensions (Matryoshka truncation)")
+    parser.add_argument("--type", dest="vector_type", choices=sorted(HNSW_MAX_DIMENSIONS), default="halfvec")
+    parser.add_argument("--column", default=None, help="Target column (default: embedding_half / embedding_<N>)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--no-index", action="store_true", help="Skip the HNSW index")
+    parser.add_argument("--dry-run", action="store_true", help="Print the SQL without executing it")
+    args = parser.parse_args()
+
+    column = args.column or ("embedding_half" if args.vector_type == "halfvec" else f"embedding_{args.dimensions}")
+    asyncio.run(migrate(column, args.vector_type, args.dimensions, args.batch_size,
+                        create_index=not args.no_index, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
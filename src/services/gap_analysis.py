@@ -2,20 +2,24 @@
 Gap analysis service for analyzing differences between resume and job requirements.
 Following FHS architecture principles.
 """
-import asyncio
 import logging
-import random
 import re
 import time
 from typing import Any
 
 from src.core.config import get_settings
 from src.core.monitoring_service import monitoring_service
+from src.core.retry import RetryPolicy, RetryState, deadline_scope
+from src.core.token_budget import PromptSection, get_token_budgeter
+from src.core.tracing import span
 from src.services.openai_client import get_azure_openai_client
 from src.services.text_processing import clean_llm_output, convert_markdown_to_html
 from src.services.token_tracking_mixin import TokenTrackingMixin
 from src.services.unified_prompt_service import UnifiedPromptService
 
+# Gap analysis retries on errors and on responses with empty sections
+GAP_ANALYSIS_RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=4.0)
+
 
 def clean_and_process_lines(section_content: str | None) -> list[str]:
     """
@@ -298,143 +302,133 @@ class GapAnalysisService(TokenTrackingMixin):
         elif language.lower() != "en":
             language = "en"
         
-        # Retry configuration
-        max_attempts = 3
-        retry_delays = [2.0, 4.0, 8.0]  # Exponential backoff: 2s, 4s, 8s
-        
-        last_exception = None
+        retry = RetryState(GAP_ANALYSIS_RETRY_POLICY, "gap_analysis")
+        max_attempts = retry.max_attempts
         last_response = None
         
-        for attempt in range(max_attempts):
-            try:
-                # Log retry attempt
-                if attempt > 0:
-                    self.logger.info(f"[GAP_ANALYSIS_RETRY] Attempt {attempt + 1}/{max_attempts} for language: {language}")
-                    
-                    # Track retry in monitoring
-                    monitoring_service.track_event(
-                        "GapAnalysisRetryAttempt",
-                        {
-                            "attempt": attempt + 1,
-                            "max_attempts": max_attempts,
-                            "language": language,
-                            "reason": "empty_fields" if last_response else "error"
-                        }
-                    )
-                
-                # Call the core analysis logic
-                result = await self._analyze_gap_core(
-                    job_description=job_description,
-                    resume=resume,
-                    job_keywords=job_keywords,
-                    matched_keywords=matched_keywords,
-                    missing_keywords=missing_keywords,
-                    language=language
-                )
-                
-                # Check for empty fields
-                empty_fields = check_for_empty_fields(result)
-                
-                if empty_fields:
-                    self.logger.warning(
-                        f"[GAP_ANALYSIS_RETRY] Empty fields detected on attempt {attempt + 1}: "
-                        f"{', '.join(empty_fields)}"
-                    )
-                    
-                    # If this is not the last attempt, retry
-                    if attempt < max_attempts - 1:
-                        last_response = result
-                        
-                        # Add jitter to avoid thundering herd
-                        delay = retry_delays[attempt] * (0.5 + random.random())
-                        
-                        self.logger.info(f"[GAP_ANALYSIS_RETRY] Retrying in {delay:.1f}s due to empty fields: {', '.join(empty_fields)}")
+        # Nested client retries share this deadline instead of multiplying
+        with deadline_scope(self.settings.gap_analysis_deadline_seconds):
+            while True:
+                attempt = retry.start_attempt() - 1
+                try:
+                    # Log retry attempt
+                    if attempt > 0:
+                        self.logger.info(f"[GAP_ANALYSIS_RETRY] Attempt {attempt + 1}/{max_attempts} for language: {language}")
                         
-                        # Track empty fields retry event
+                        # Track retry in monitoring
                         monitoring_service.track_event(
-                            "GapAnalysisEmptyFieldsRetry",
+                            "GapAnalysisRetryAttempt",
                             {
                                 "attempt": attempt + 1,
-                                "empty_fields": ",".join(empty_fields),
+                                "max_attempts": max_attempts,
                                 "language": language,
-                                "delay_seconds": round(delay, 1)
+                                "reason": "empty_fields" if last_response else "error"
                             }
                         )
-                        
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        # Last attempt, log but return the result with fallbacks
-                        self.logger.error(
-                            f"[GAP_ANALYSIS_RETRY] Empty fields persist after {max_attempts} attempts: "
+                    
+                    # Call the core analysis logic
+                    result = await self._analyze_gap_core(
+                        job_description=job_description,
+                        resume=resume,
+                        job_keywords=job_keywords,
+                        matched_keywords=matched_keywords,
+                        missing_keywords=missing_keywords,
+                        language=language
+                    )
+                    
+                    # Check for empty fields
+                    empty_fields = check_for_empty_fields(result)
+                    
+                    if empty_fields:
+                        self.logger.warning(
+                            f"[GAP_ANALYSIS_RETRY] Empty fields detected on attempt {attempt + 1}: "
                             f"{', '.join(empty_fields)}"
                         )
                         
+                        # Retry while attempts and deadline allow (jittered delay)
+                        delay = retry.next_delay()
+                        if delay is not None:
+                            last_response = result
+                            
+                            self.logger.info(f"[GAP_ANALYSIS_RETRY] Retrying in {delay:.1f}s due to empty fields: {', '.join(empty_fields)}")
+                            
+                            # Track empty fields retry event
+                            monitoring_service.track_event(
+                                "GapAnalysisEmptyFieldsRetry",
+                                {
+                                    "attempt": attempt + 1,
+                                    "empty_fields": ",".join(empty_fields),
+                                    "language": language,
+                                    "delay_seconds": round(delay, 1)
+                                }
+                            )
+                            
+                            await retry.sleep(delay)
+                            continue
+                        else:
+                            # Last attempt, log but return the result with fallbacks
+                            self.logger.error(
+                                f"[GAP_ANALYSIS_RETRY] Empty fields persist after {attempt + 1} attempts: "
+                                f"{', '.join(empty_fields)}"
+                            )
+                            
+                            monitoring_service.track_event(
+                                "GapAnalysisRetryExhausted",
+                                {
+                                    "attempts": attempt + 1,
+                                    "empty_fields": ",".join(empty_fields),
+                                    "language": language
+                                }
+                            )
+                    
+                    # Success - either no empty fields or we've accepted the fallbacks
+                    if attempt > 0:
+                        self.logger.info(f"[GAP_ANALYSIS_RETRY] Success on attempt {attempt + 1}")
                         monitoring_service.track_event(
-                            "GapAnalysisRetryExhausted",
+                            "GapAnalysisRetrySuccess",
                             {
-                                "attempts": max_attempts,
-                                "empty_fields": ",".join(empty_fields),
-                                "language": language
+                                "attempts": attempt + 1,
+                                "language": language,
+                                "had_empty_fields": len(empty_fields) > 0
                             }
                         )
-                
-                # Success - either no empty fields or we've accepted the fallbacks
-                if attempt > 0:
-                    self.logger.info(f"[GAP_ANALYSIS_RETRY] Success on attempt {attempt + 1}")
-                    monitoring_service.track_event(
-                        "GapAnalysisRetrySuccess",
-                        {
-                            "attempts": attempt + 1,
-                            "language": language,
-                            "had_empty_fields": len(empty_fields) > 0
-                        }
-                    )
-                
-                return result
-                
-            except Exception as e:
-                last_exception = e
-                last_response = None
-                
-                # Log the error
-                self.logger.error(f"[GAP_ANALYSIS_RETRY] Error on attempt {attempt + 1}: {e}")
-                
-                # Check if this is a retryable error
-                error_msg = str(e).lower()
-                is_retryable = any(term in error_msg for term in [
-                    "timeout", "connection", "rate limit", "throttled",
-                    "503", "502", "504", "temporary", "network"
-                ])
-                
-                if not is_retryable or attempt == max_attempts - 1:
-                    self.logger.error(f"[GAP_ANALYSIS_RETRY] Non-retryable error or max attempts reached: {e}")
-                    monitoring_service.track_event(
-                        "GapAnalysisRetryFailure",
-                        {
-                            "attempts": attempt + 1,
-                            "error": str(e),
-                            "language": language,
-                            "retryable": is_retryable
-                        }
+                    
+                    return result
+                    
+                except Exception as e:
+                    last_response = None
+                    
+                    # Log the error
+                    self.logger.error(f"[GAP_ANALYSIS_RETRY] Error on attempt {attempt + 1}: {e}")
+                    
+                    # Check if this is a retryable error
+                    error_msg = str(e).lower()
+                    is_retryable = any(term in error_msg for term in [
+                        "timeout", "connection", "rate limit", "throttled",
+                        "503", "502", "504", "temporary", "network"
+                    ])
+                    
+                    # Errors the client already retried are not retried again
+                    delay = retry.next_delay(e) if is_retryable else None
+                    if delay is None:
+                        self.logger.error(f"[GAP_ANALYSIS_RETRY] Non-retryable error or retry budget exhausted: {e}")
+                        monitoring_service.track_event(
+                            "GapAnalysisRetryFailure",
+                            {
+                                "attempts": attempt + 1,
+                                "error": str(e),
+                                "language": language,
+                                "retryable": is_retryable
+                            }
+                        )
+                        raise
+                    
+                    self.logger.warning(
+                        f"[GAP_ANALYSIS_RETRY] Retryable error on attempt {attempt + 1}: {e}. "
+                        f"Retrying in {delay:.1f}s..."
                     )
-                    raise
-                
-                # Calculate retry delay
-                delay = retry_delays[attempt] * (0.5 + random.random())
-                
-                self.logger.warning(
-                    f"[GAP_ANALYSIS_RETRY] Retryable error on attempt {attempt + 1}: {e}. "
-                    f"Retrying in {delay:.1f}s..."
-                )
-                
-                await asyncio.sleep(delay)
-        
-        # Should not reach here
-        if last_exception:
-            raise last_exception
-        else:
-            return last_response
+                    
+                    await retry.sleep(delay)
     
     async def _analyze_gap_core(
         self,
@@ -460,14 +454,25 @@ class GapAnalysisService(TokenTrackingMixin):
             Formatted gap analysis results
         """
         
-        # Prepare prompt data
-        prompt_data = {
-            "job_description": job_description,
-            "resume": resume,
-            "job_keywords": ", ".join(job_keywords) if job_keywords else "None",
-            "matched_keywords": ", ".join(matched_keywords) if matched_keywords else "None",
-            "missing_keywords": ", ".join(missing_keywords) if missing_keywords else "None"
-        }
+        # Prepare prompt data, fitted to the input token budget
+        # (JD is trimmed before the resume; keyword lists are never cut)
+        with span("prompt_render"):
+            budget = get_token_budgeter().fit(
+                [
+                    PromptSection("job_description", job_description, priority=0, html=True),
+                    PromptSection("resume", resume, priority=1, html=True, min_tokens=1024),
+                    PromptSection("job_keywords", ", ".join(job_keywords) if job_keywords else "None", trimmable=False),
+                    PromptSection("matched_keywords", ", ".join(matched_keywords) if matched_keywords else "None", trimmable=False),
+                    PromptSection("missing_keywords", ", ".join(missing_keywords) if missing_keywords else "None", trimmable=False),
+                ],
+                self.settings.gap_analysis_input_token_budget
+            )
+        prompt_data = budget.texts
+        if budget.trimmed:
+            self.logger.warning(
+                f"Gap analysis inputs trimmed to token budget: sections={budget.trimmed}, "
+                f"tokens {budget.total_before} -> {budget.total_after}"
+            )
         
         # Get prompt from UnifiedPromptService
         # Use v1.2.0 for zh-TW to improve stability and output English skills
@@ -484,8 +489,9 @@ class GapAnalysisService(TokenTrackingMixin):
             raise ValueError(f"Gap analysis prompt not found for language: {language}")
         
         # Format prompts
-        system_prompt = prompt_config.get_system_prompt()
-        user_prompt = prompt_config.format_user_prompt(**prompt_data)
+        with span("prompt_render"):
+            system_prompt = prompt_config.get_system_prompt()
+            user_prompt = prompt_config.format_user_prompt(**prompt_data)
         
         # Get OpenAI client
         openai_client = get_azure_openai_client()
@@ -540,12 +546,14 @@ class GapAnalysisService(TokenTrackingMixin):
                     "language": language,
                     "processing_time_ms": round(llm_time * 1000, 2),
                     "prompt_length": len(system_prompt) + len(user_prompt),
-                    "response_length": len(llm_response)
+                    "response_length": len(llm_response),
+                    **budget.telemetry()
                 }
             )
             
             # Parse response
-            parsed_response = parse_gap_response(llm_response)
+            with span("parse"):
+                parsed_response = parse_gap_response(llm_response)
             
             # Debug: Check if any field is empty and log raw response
             if (not parsed_response.get('assessment') or 
@@ -4,8 +4,10 @@ Validates and cleans HTML for TinyMCE compatibility and security.
 """
 import logging
 import re
+from typing import TYPE_CHECKING
 
-from bs4 import BeautifulSoup
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +32,8 @@ class HTMLValidator:
             if not html or not html.strip():
                 raise ValueError("Empty HTML content")
             
-            # 使用 BeautifulSoup 解析 HTML
+            # 使用 BeautifulSoup 解析 HTML（第一次使用時才載入 bs4）
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html, 'html.parser')
             
             # 1. 移除不允許的標籤
@@ -57,6 +60,7 @@ class HTMLValidator:
     
     def detect_sections(self, html: str) -> dict[str, bool]:
         """檢測履歷中的各個區段"""
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         
         return {
@@ -69,7 +73,7 @@ class HTMLValidator:
             "certifications": self._has_section_h2(soup, "Certifications")
         }
     
-    def _remove_disallowed_tags(self, soup: BeautifulSoup) -> None:
+    def _remove_disallowed_tags(self, soup: "BeautifulSoup") -> None:
         """移除不允許的標籤"""
         # 先移除危險標籤及其內容（script, style 等）
         dangerous_tags = ['script', 'style', 'iframe', 'object', 'embed']
@@ -83,7 +87,7 @@ class HTMLValidator:
                 # 保留內容，只移除標籤
                 tag.unwrap()
     
-    def _clean_attributes(self, soup: BeautifulSoup) -> None:
+    def _clean_attributes(self, soup: "BeautifulSoup") -> None:
         """清理標籤屬性，只保留允許的屬性"""
         for tag in soup.find_all(True):
             # 獲取允許的屬性列表
@@ -97,7 +101,7 @@ class HTMLValidator:
                 if attr not in allowed:
                     del tag[attr]
     
-    def _remove_dangerous_content(self, soup: BeautifulSoup) -> None:
+    def _remove_dangerous_content(self, soup: "BeautifulSoup") -> None:
         """移除危險內容"""
         # 移除 script 標籤及其內容
         for script in soup.find_all('script'):
@@ -128,12 +132,12 @@ class HTMLValidator:
                 if href and href.lower().startswith('javascript:'):
                     a['href'] = '#'
     
-    def _has_section_h2(self, soup: BeautifulSoup, title: str) -> bool:
+    def _has_section_h2(self, soup: "BeautifulSoup", title: str) -> bool:
         """檢查是否有特定的 h2 標題"""
         h2_tags = soup.find_all('h2')
         return any(h2.get_text().strip() == title for h2 in h2_tags)
     
-    def _has_contact_info(self, soup: BeautifulSoup) -> bool:
+    def _has_contact_info(self, soup: "BeautifulSoup") -> bool:
         """檢測是否有聯絡資訊"""
         text_content = soup.get_text()
         contact_patterns = [
@@ -146,7 +150,7 @@ class HTMLValidator:
         ]
         return any(re.search(pattern, text_content, re.I) for pattern in contact_patterns)
     
-    def _has_summary(self, soup: BeautifulSoup) -> bool:
+    def _has_summary(self, soup: "BeautifulSoup") -> bool:
         """檢測是否有個人摘要"""
         # 檢查是否有名為 "Summary" 或 "Profile" 的 h2 標題
         summary_found = self._has_section_h2(soup, "Summary") or self._has_section_h2(soup, "Profile")
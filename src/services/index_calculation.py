@@ -7,10 +7,10 @@ import re
 import time
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 from src.core.config import get_settings
 from src.core.monitoring_service import monitoring_service
+from src.core.tracing import span
 from src.core.utils import stable_percentage_round
 from src.services.embedding_client import get_azure_embedding_client
 from src.services.text_processing import clean_html_text
@@ -132,6 +132,14 @@ def analyze_keyword_coverage(
     }
 
 
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two 1-D vectors (0.0 if either is all zeros)."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norm = float(np.linalg.norm(a)) * float(np.linalg.norm(b))
+    return float(np.dot(a, b)) / norm if norm else 0.0
+
+
 async def compute_similarity(
     resume_text: str, 
     job_description: str
@@ -182,10 +190,11 @@ async def compute_similarity(
             raise ValueError(f"Expected 2 embeddings, got {len(embeddings)}")
         
         # Calculate cosine similarity
-        resume_embedding = np.array(embeddings[0]).reshape(1, -1)
-        job_embedding = np.array(embeddings[1]).reshape(1, -1)
+        resume_embedding = np.asarray(embeddings[0], dtype=np.float32)
+        job_embedding = np.asarray(embeddings[1], dtype=np.float32)
         
-        raw_similarity = float(cosine_similarity(resume_embedding, job_embedding)[0][0])
+        with span("similarity"):
+            raw_similarity = cosine_similarity(resume_embedding, job_embedding)
         
         # Debug logging for consistency issue
         monitoring_service.track_event(
@@ -195,8 +204,8 @@ async def compute_similarity(
                 "job_desc_length": len(job_description),
                 "raw_similarity": raw_similarity,
                 "embedding_time_ms": round(embedding_time * 1000, 2),
-                "resume_embedding_sample": str(resume_embedding[0][:5].tolist()),  # First 5 values
-                "job_embedding_sample": str(job_embedding[0][:5].tolist())
+                "resume_embedding_sample": str(resume_embedding[:5].tolist()),  # First 5 values
+                "job_embedding_sample": str(job_embedding[:5].tolist())
             }
         )
         
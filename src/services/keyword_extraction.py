@@ -14,6 +14,7 @@ import time
 from datetime import datetime, timedelta
 from typing import Any
 
+from src.core.lazy_import import lazy_exports
 from src.models.keyword_extraction import KeywordExtractionRequest, StandardizedTerm
 from src.models.response import IntersectionStats, WarningInfo
 from src.services.base import BaseService
@@ -737,5 +738,7 @@ async def get_keyword_extraction_service_async(
     )
 
 
-# Create default service instance
-keyword_service = get_keyword_extraction_service()
\ No newline at end of file
+# Default service instance (created on first access)
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    "keyword_service": get_keyword_extraction_service,
+})
\ No newline at end of file
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Any
 
 from src.core.metrics.cache_metrics import cache_metrics
+from src.core.offload import run_cpu
+from src.core.tracing import span, traced
 from src.models.keyword_extraction import KeywordExtractionRequest, StandardizedTerm
 from src.models.prompt_config import LLMConfig
 from src.models.response import IntersectionStats, WarningInfo
@@ -128,6 +130,7 @@ class KeywordExtractionServiceV2(BaseService):
         cache_input = f"{job_description}|{language}|{max_keywords}|{include_standardization}|{prompt_version}"
         return hashlib.sha256(cache_input.encode('utf-8')).hexdigest()
     
+    @traced("cache_lookup")
     def _get_cached_result(self, cache_key: str) -> dict[str, Any] | None:
         """Get cached result if available."""
         if not self.enable_cache or cache_key not in self._cache:
@@ -350,6 +353,7 @@ class KeywordExtractionServiceV2(BaseService):
             self.logger.error(f"Keyword extraction failed: {str(e)}")
             raise
     
+    @traced("language_detection")
     async def _detect_and_validate_language(self, text: str, language_param: str) -> tuple[str, int]:
         """Detect and validate language with unified event tracking."""
         start_time = time.time()
@@ -368,7 +372,9 @@ class KeywordExtractionServiceV2(BaseService):
         
         try:
             # Get detailed language analysis
-            stats = self.language_detector.analyze_language_composition(text)
+            stats = await run_cpu(
+                self.language_detector.analyze_language_composition, text, size=len(text), isolated=True
+            )
             
             # Calculate percentages for tracking
             if stats.total_chars > 0:
@@ -484,11 +490,12 @@ class KeywordExtractionServiceV2(BaseService):
         """
         # 1. Get prompt and LLM config from UnifiedPromptService
         try:
-            formatted_prompt, llm_config = self.unified_prompt_service.get_prompt_with_config(
-                language=language,
-                version=prompt_version,
-                variables={"job_description": job_description}
-            )
+            with span("prompt_render"):
+                formatted_prompt, llm_config = self.unified_prompt_service.get_prompt_with_config(
+                    language=language,
+                    version=prompt_version,
+                    variables={"job_description": job_description}
+                )
         except Exception as e:
             self.logger.error(f"Failed to get prompt config for {language}/{prompt_version}: {str(e)}")
             raise ValueError(f"Prompt not available: {str(e)}")
@@ -547,9 +554,10 @@ class KeywordExtractionServiceV2(BaseService):
         # 5. Apply standardization
         standardized_terms = []
         if include_standardization:
-            standardization_result = self.multilingual_standardizer.standardize_keywords(
-                final_keywords, language
-            )
+            with span("standardize"):
+                standardization_result = self.multilingual_standardizer.standardize_keywords(
+                    final_keywords, language
+                )
             final_keywords = standardization_result.standardized_keywords
             standardized_terms = [
                 StandardizedTerm(
@@ -625,6 +633,7 @@ class KeywordExtractionServiceV2(BaseService):
             self.logger.error(f"Round {round_num} extraction failed: {str(e)}")
             raise AzureOpenAIError(f"Keyword extraction round {round_num} failed: {str(e)}")
     
+    @traced("parse")
     def _parse_keywords_from_response(self, response: str) -> list[str]:
         """Parse keywords from LLM response."""
         try:
@@ -7,14 +7,76 @@ All mappings are loaded from external YAML files for easy maintenance.
 """
 
 import logging
-import re
+from collections.abc import Mapping
 from pathlib import Path
 
-import yaml
+from src.core.standardization_index import (
+    KeywordIndex,
+    PatternRule,
+    get_index_registry,
+)
+from src.core.standardization_snapshot import (
+    DICTIONARY_FILES,
+    build_keyword_index,
+    get_snapshot_store,
+    load_pattern_rules,
+    load_yaml_dictionary,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# Position-related words that mark a keyword as a position title
+_POSITION_INDICATORS = frozenset({
+    'analyst', 'engineer', 'developer', 'manager', 'director', 
+    'specialist', 'coordinator', 'administrator', 'architect',
+    'designer', 'scientist', 'researcher', 'consultant', 'lead',
+    'supervisor', 'associate', 'assistant', 'officer', 'executive',
+    'technician', 'expert', 'advisor', 'strategist', 'planner'
+})
+
+# Level modifiers that often appear with positions
+_LEVEL_MODIFIERS = frozenset({
+    'senior', 'junior', 'lead', 'principal', 'staff', 'chief',
+    'associate', 'assistant', 'deputy', 'vice', 'head', 'team'
+})
+
+# Acronyms and specific terms with fixed casing inside position titles
+_TITLE_SPECIAL_CASES = {
+    'ai': 'AI', 'ml': 'ML', 'bi': 'BI', 'it': 'IT', 
+    'hr': 'HR', 'qa': 'QA', 'ux': 'UX', 'ui': 'UI',
+    'vp': 'VP', 'ceo': 'CEO', 'cto': 'CTO', 'cfo': 'CFO',
+    'phd': 'PhD', 'mba': 'MBA', 'sql': 'SQL', 'etl': 'ETL'
+}
+
+_TITLE_LOWERCASE_WORDS = frozenset({
+    'of', 'and', 'or', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for'
+})
+
+# Technical skills with specific casing (e.g., "javaScript" -> "JavaScript")
+_TECH_CASING = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'mongodb': 'MongoDB',
+    'postgresql': 'PostgreSQL',
+    'mysql': 'MySQL',
+    'nodejs': 'Node.js',
+    'reactjs': 'React.js',
+    'vuejs': 'Vue.js',
+    'graphql': 'GraphQL',
+    'restful': 'RESTful',
+    'linkedin': 'LinkedIn',
+    'github': 'GitHub',
+    'gitlab': 'GitLab',
+    'tensorflow': 'TensorFlow',
+    'pytorch': 'PyTorch',
+    'scikit-learn': 'Scikit-learn',
+    'jupyter': 'Jupyter',
+    'powerbi': 'Power BI',
+    'tableau': 'Tableau'
+}
+
+
 class KeywordStandardizer:
     """Service for standardizing keywords using dictionary and pattern rules."""
     
@@ -22,34 +84,77 @@ class KeywordStandardizer:
         """
         Initialize the standardizer by loading mappings from YAML files.
         
+        The default dictionaries come from the process-wide, hot-reloadable
+        standardization snapshot. Instances reading a custom directory share
+        one compiled index per set of unchanged files.
+        
         Args:
             data_dir: Directory containing YAML files. If None, uses default location.
         """
+        self._store = None
+        
         # Set data directory
         if data_dir is None:
             # Default to src/data/standardization relative to this file
             current_dir = Path(__file__).parent.parent
             self.data_dir = current_dir / "data" / "standardization"
+            self._store = get_snapshot_store()
+            self._set_index(self._store.get().keyword_index)
         else:
             self.data_dir = Path(data_dir)
-        
-        # Load all dictionaries and patterns
-        self.skill_dictionary = self._load_yaml_dictionary("skills.yaml")
-        self.position_dictionary = self._load_yaml_dictionary("positions.yaml")
-        self.tool_dictionary = self._load_yaml_dictionary("tools.yaml")
-        self.patterns = self._load_patterns("patterns.yaml")
-        
-        # Combine all dictionaries for efficient lookup
-        self.combined_dictionary = {}
-        self.combined_dictionary.update(self.skill_dictionary)
-        self.combined_dictionary.update(self.position_dictionary)
-        self.combined_dictionary.update(self.tool_dictionary)
+            self._set_index(
+                get_index_registry().get_or_build(self._index_cache_key(), self._build_index)
+            )
         
         logger.info(
             f"Initialized KeywordStandardizer with {len(self.combined_dictionary)} "
             f"dictionary entries and {len(self.patterns)} patterns from {self.data_dir}"
         )
     
+    def _index_cache_key(self) -> tuple:
+        """Key identifying the dictionary files and their modification times."""
+        mtimes = []
+        for filename in DICTIONARY_FILES:
+            try:
+                mtimes.append((self.data_dir / filename).stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return ("KeywordStandardizer", str(self.data_dir.resolve()), tuple(mtimes))
+    
+    def _build_index(self) -> KeywordIndex:
+        """Load all YAML files and compile them into a KeywordIndex."""
+        return build_keyword_index(self.data_dir)
+    
+    def _set_index(self, index: KeywordIndex):
+        """Swap in a compiled index (a single attribute assignment)."""
+        self._index = index
+    
+    def _current_index(self) -> KeywordIndex:
+        """Get the index to use, following snapshot hot reloads."""
+        if self._store is not None:
+            self._index = self._store.get().keyword_index
+        return self._index
+    
+    @property
+    def skill_dictionary(self) -> Mapping[str, str]:
+        return self._current_index().skill_dictionary
+    
+    @property
+    def position_dictionary(self) -> Mapping[str, str]:
+        return self._current_index().position_dictionary
+    
+    @property
+    def tool_dictionary(self) -> Mapping[str, str]:
+        return self._current_index().tool_dictionary
+    
+    @property
+    def combined_dictionary(self) -> Mapping[str, str]:
+        return self._current_index().combined_dictionary
+    
+    @property
+    def patterns(self) -> tuple[PatternRule, ...]:
+        return self._current_index().patterns
+    
     def _load_yaml_dictionary(self, filename: str) -> dict[str, str]:
         """
         Load a dictionary from a YAML file.
@@ -60,35 +165,9 @@ class KeywordStandardizer:
         Returns:
             Dictionary mapping original terms to standardized terms
         """
-        filepath = self.data_dir / filename
-        
-        try:
-            with open(filepath, encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            # Flatten the nested structure
-            dictionary = {}
-            if isinstance(data, dict):
-                for _category, mappings in data.items():
-                    if isinstance(mappings, dict):
-                        for original, standardized in mappings.items():
-                            # Convert to lowercase for case-insensitive matching
-                            dictionary[original.lower()] = standardized
-            
-            logger.info(f"Loaded {len(dictionary)} entries from {filename}")
-            return dictionary
-            
-        except FileNotFoundError:
-            logger.warning(f"Dictionary file not found: {filepath}")
-            return {}
-        except yaml.YAMLError as e:
-            logger.error(f"Error parsing YAML file {filename}: {e}")
-            return {}
-        except Exception as e:
-            logger.error(f"Unexpected error loading {filename}: {e}")
-            return {}
+        return load_yaml_dictionary(self.data_dir / filename)
     
-    def _load_patterns(self, filename: str) -> list[tuple[re.Pattern, str, str]]:
+    def _load_patterns(self, filename: str) -> list[PatternRule]:
         """
         Load pattern rules from a YAML file.
         
@@ -96,64 +175,26 @@ class KeywordStandardizer:
             filename: Name of the YAML file containing patterns
             
         Returns:
-            List of (compiled_pattern, replacement, pattern_type) tuples
+            List of compiled PatternRule objects (case-insensitive)
         """
-        filepath = self.data_dir / filename
-        patterns = []
-        
-        try:
-            with open(filepath, encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            if isinstance(data, dict):
-                for _category, pattern_list in data.items():
-                    if isinstance(pattern_list, list):
-                        for pattern_info in pattern_list:
-                            if isinstance(pattern_info, dict) and 'pattern' in pattern_info:
-                                try:
-                                    compiled = re.compile(
-                                        pattern_info['pattern'], 
-                                        re.IGNORECASE
-                                    )
-                                    replacement = pattern_info.get('replacement', '')
-                                    pattern_type = pattern_info.get('type', 'unknown')
-                                    patterns.append((compiled, replacement, pattern_type))
-                                except re.error as e:
-                                    logger.error(
-                                        f"Invalid regex pattern '{pattern_info['pattern']}': {e}"
-                                    )
-            
-            logger.info(f"Loaded {len(patterns)} patterns from {filename}")
-            return patterns
-            
-        except FileNotFoundError:
-            logger.warning(f"Pattern file not found: {filepath}")
-            return []
-        except yaml.YAMLError as e:
-            logger.error(f"Error parsing YAML file {filename}: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error loading {filename}: {e}")
-            return []
+        return load_pattern_rules(self.data_dir / filename)
     
     def reload_dictionaries(self):
         """
         Reload all dictionaries and patterns from YAML files.
         Useful for updating mappings without restarting the service.
+        
+        The new index is built fully before being swapped in, so concurrent
+        standardizations never observe a half-loaded state.
         """
         logger.info("Reloading all dictionaries and patterns...")
         
-        # Reload all components
-        self.skill_dictionary = self._load_yaml_dictionary("skills.yaml")
-        self.position_dictionary = self._load_yaml_dictionary("positions.yaml")
-        self.tool_dictionary = self._load_yaml_dictionary("tools.yaml")
-        self.patterns = self._load_patterns("patterns.yaml")
-        
-        # Rebuild combined dictionary
-        self.combined_dictionary = {}
-        self.combined_dictionary.update(self.skill_dictionary)
-        self.combined_dictionary.update(self.position_dictionary)
-        self.combined_dictionary.update(self.tool_dictionary)
+        if self._store is not None:
+            self._set_index(self._store.reload().keyword_index)
+        else:
+            index = self._build_index()
+            get_index_registry().replace(self._index_cache_key(), index)
+            self._set_index(index)
         
         logger.info(
             f"Reload complete: {len(self.combined_dictionary)} dictionary entries, "
@@ -220,11 +261,15 @@ class KeywordStandardizer:
         if not keyword:
             return keyword, "none", "none"
         
+        # Pin the index so a concurrent reload cannot mix two versions
+        index = self._current_index()
+        combined_dictionary = index.combined_dictionary
+        
         # Step 1: Try exact dictionary match (case-insensitive)
         lower_keyword = keyword.lower().strip()
-        if lower_keyword in self.combined_dictionary:
-            standardized = self.combined_dictionary[lower_keyword]
-            category = self._get_category(lower_keyword)
+        standardized = combined_dictionary.get(lower_keyword)
+        if standardized is not None:
+            category = self._get_category(lower_keyword, index)
             return standardized, "dictionary", category
         
         # Step 2: Apply intelligent Title Case for known patterns FIRST
@@ -235,23 +280,29 @@ class KeywordStandardizer:
         # Step 3: Apply pattern-based standardization on the title-cased version
         # Skip abbreviation expansion for position titles
         modified_keyword = title_cased_keyword
+        folded_keyword = modified_keyword.casefold()
         pattern_applied = False
         is_position_title = self._is_position_title(keyword)
         
-        for pattern, replacement, pattern_type in self.patterns:
+        for rule in index.patterns:
             # Skip abbreviation expansion for position titles (keep AI, ML, etc.)
-            if is_position_title and pattern_type == 'abbreviation':
+            if is_position_title and rule.rule_type == 'abbreviation':
+                continue
+            
+            # Literal prefilter avoids running regexes that cannot match
+            if not rule.could_match(modified_keyword, folded_keyword):
                 continue
                 
-            new_keyword = pattern.sub(replacement, modified_keyword)
+            new_keyword = rule.regex.sub(rule.replacement, modified_keyword)
             if new_keyword != modified_keyword:
                 modified_keyword = new_keyword
+                folded_keyword = modified_keyword.casefold()
                 pattern_applied = True
                 
                 # Check if pattern result exists in dictionary
-                if modified_keyword.lower() in self.combined_dictionary:
-                    standardized = self.combined_dictionary[modified_keyword.lower()]
-                    category = self._get_category(modified_keyword.lower())
+                standardized = combined_dictionary.get(modified_keyword.lower())
+                if standardized is not None:
+                    category = self._get_category(modified_keyword.lower(), index)
                     method = "title_case+pattern+dictionary" if title_case_applied else "pattern+dictionary"
                     return standardized, method, category
         
@@ -265,44 +316,32 @@ class KeywordStandardizer:
         # Step 4: No standardization needed
         return keyword, "none", "none"
     
-    def _get_category(self, keyword: str) -> str:
+    def _get_category(self, keyword: str, index: KeywordIndex | None = None) -> str:
         """Determine the category of a keyword."""
-        if keyword in self.skill_dictionary:
+        index = index or self._current_index()
+        if keyword in index.skill_dictionary:
             return "skill"
-        elif keyword in self.position_dictionary:
+        elif keyword in index.position_dictionary:
             return "position"
-        elif keyword in self.tool_dictionary:
+        elif keyword in index.tool_dictionary:
             return "tool"
         return "unknown"
     
     def _is_position_title(self, keyword: str) -> bool:
         """Check if a keyword is likely a position title."""
-        position_indicators = {
-            'analyst', 'engineer', 'developer', 'manager', 'director', 
-            'specialist', 'coordinator', 'administrator', 'architect',
-            'designer', 'scientist', 'researcher', 'consultant', 'lead',
-            'supervisor', 'associate', 'assistant', 'officer', 'executive',
-            'technician', 'expert', 'advisor', 'strategist', 'planner'
-        }
-        
-        level_modifiers = {
-            'senior', 'junior', 'lead', 'principal', 'staff', 'chief',
-            'associate', 'assistant', 'deputy', 'vice', 'head', 'team'
-        }
-        
         lower_keyword = keyword.lower()
         words = lower_keyword.split()
         
         # Check if the keyword contains position indicators
         contains_position = any(
             indicator in lower_keyword 
-            for indicator in position_indicators
+            for indicator in _POSITION_INDICATORS
         )
         
         # Check if it starts with a level modifier
         starts_with_level = (
             len(words) > 0 and 
-            words[0] in level_modifiers
+            words[0] in _LEVEL_MODIFIERS
         )
         
         return contains_position or starts_with_level
@@ -317,56 +356,21 @@ class KeywordStandardizer:
         Returns:
             Title-cased keyword if applicable, otherwise original keyword
         """
-        # Define position-related keywords that should trigger Title Case
-        position_indicators = {
-            'analyst', 'engineer', 'developer', 'manager', 'director', 
-            'specialist', 'coordinator', 'administrator', 'architect',
-            'designer', 'scientist', 'researcher', 'consultant', 'lead',
-            'supervisor', 'associate', 'assistant', 'officer', 'executive',
-            'technician', 'expert', 'advisor', 'strategist', 'planner'
-        }
-        
-        # Define level modifiers that often appear with positions
-        level_modifiers = {
-            'senior', 'junior', 'lead', 'principal', 'staff', 'chief',
-            'associate', 'assistant', 'deputy', 'vice', 'head', 'team'
-        }
-        
         # Convert to lowercase for checking
         lower_keyword = keyword.lower()
         words = lower_keyword.split()
         
-        # Check if the keyword contains position indicators
-        contains_position = any(
-            indicator in lower_keyword 
-            for indicator in position_indicators
-        )
-        
-        # Check if it starts with a level modifier
-        starts_with_level = (
-            len(words) > 0 and 
-            words[0] in level_modifiers
-        )
-        
         # Apply Title Case if it's likely a position title
-        if contains_position or starts_with_level:
-            # Special handling for acronyms and specific terms
-            special_cases = {
-                'ai': 'AI', 'ml': 'ML', 'bi': 'BI', 'it': 'IT', 
-                'hr': 'HR', 'qa': 'QA', 'ux': 'UX', 'ui': 'UI',
-                'vp': 'VP', 'ceo': 'CEO', 'cto': 'CTO', 'cfo': 'CFO',
-                'phd': 'PhD', 'mba': 'MBA', 'sql': 'SQL', 'etl': 'ETL'
-            }
-            
+        if self._is_position_title(keyword):
             # Process each word
             title_cased_words = []
             for word in words:
-                if word in special_cases:
-                    title_cased_words.append(special_cases[word])
-                elif len(word) > 3 or word in level_modifiers or word in position_indicators:
+                if word in _TITLE_SPECIAL_CASES:
+                    title_cased_words.append(_TITLE_SPECIAL_CASES[word])
+                elif len(word) > 3 or word in _LEVEL_MODIFIERS or word in _POSITION_INDICATORS:
                     # Capitalize longer words and important keywords
                     title_cased_words.append(word.capitalize())
-                elif word in ['of', 'and', 'or', 'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for']:
+                elif word in _TITLE_LOWERCASE_WORDS:
                     # Keep articles and prepositions lowercase (unless first word)
                     if len(title_cased_words) == 0:
                         title_cased_words.append(word.capitalize())
@@ -377,36 +381,8 @@ class KeywordStandardizer:
             
             return ' '.join(title_cased_words)
         
-        # For technical skills with mixed case (e.g., "javaScript" -> "JavaScript")
-        tech_patterns = {
-            'javascript': 'JavaScript',
-            'typescript': 'TypeScript',
-            'mongodb': 'MongoDB',
-            'postgresql': 'PostgreSQL',
-            'mysql': 'MySQL',
-            'nodejs': 'Node.js',
-            'reactjs': 'React.js',
-            'vuejs': 'Vue.js',
-            'graphql': 'GraphQL',
-            'restful': 'RESTful',
-            'linkedin': 'LinkedIn',
-            'github': 'GitHub',
-            'gitlab': 'GitLab',
-            'tensorflow': 'TensorFlow',
-            'pytorch': 'PyTorch',
-            'scikit-learn': 'Scikit-learn',
-            'jupyter': 'Jupyter',
-            'powerbi': 'Power BI',
-            'tableau': 'Tableau'
-        }
-        
         # Check for technical terms that need specific casing
-        for pattern, replacement in tech_patterns.items():
-            if lower_keyword == pattern:
-                return replacement
-        
-        # Return original if no rules apply
-        return keyword
+        return _TECH_CASING.get(lower_keyword, keyword)
     
     def get_statistics(self) -> dict[str, int]:
         """Get standardization statistics."""
@@ -8,6 +8,7 @@ import logging
 import time
 from typing import NamedTuple
 
+from src.core.offload import run_cpu
 from src.services.exceptions import LanguageDetectionError, UnsupportedLanguageError
 from src.services.language_detection.detector import (
     LanguageDetectionResult,
@@ -158,8 +159,8 @@ class SimplifiedLanguageDetector(LanguageDetectionService):
                     reason=f"Text too short (minimum {self.MIN_TEXT_LENGTH} characters required)"
                 )
             
-            # 2. Analyze language composition
-            stats = self.analyze_language_composition(text)
+            # 2. Analyze language composition (character scan, off the loop for long texts)
+            stats = await run_cpu(self.analyze_language_composition, text, size=len(text), isolated=True)
             
             logger.info(
                 f"Language composition: "
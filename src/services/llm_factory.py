@@ -13,6 +13,7 @@ from typing import Literal
 
 from src.core.config import get_settings
 from src.core.monitoring_service import monitoring_service
+from src.services.llm_router import LLMRouter
 from src.services.openai_client import AzureOpenAIClient, get_azure_openai_client
 from src.services.openai_client_gpt41 import (
     AzureOpenAIGPT41Client,
@@ -86,7 +87,7 @@ def get_llm_client_smart(
     api_name: str,
     request_model: str | None = None,
     headers: dict[str, str] | None = None
-) -> LLMClient:
+) -> LLMClient | LLMRouter:
     """
     Get LLM client with smart model selection (Hybrid approach).
     
@@ -98,7 +99,7 @@ def get_llm_client_smart(
         headers: HTTP headers (may contain X-LLM-Model)
     
     Returns:
-        LLM client instance
+        LLM client instance (an ``LLMRouter`` when ``llm_router_enabled``)
         
     Priority:
         1. Request parameter
@@ -142,10 +143,29 @@ def get_llm_client_smart(
     # Track model selection with source
     _track_model_selection(api_name, selected_model, source)
     
+    if settings.llm_router_enabled:
+        # 選定模型為主要部署，另一個已設定的部署作為 failover / hedge 備援
+        hedge_apis = {a.strip() for a in settings.llm_hedge_apis.split(",") if a.strip()}
+        return LLMRouter(
+            api_name,
+            primary=selected_model,
+            factories=_router_factories(),
+            hedge=api_name in hedge_apis,
+            routing=settings.llm_routing if source in ("config", "default") else "primary",
+        )
+
     # Create and return client
     return _create_client(selected_model)
 
 
+def _router_factories() -> dict[str, object]:
+    """Lazy client factories per deployment for the router."""
+    return {
+        "gpt4o-2": lambda: get_azure_openai_client(),
+        "gpt41-mini": lambda: get_gpt41_mini_client(),
+    }
+
+
 def _create_client(model: str) -> LLMClient:
     """
     Create LLM client instance based on model name.
@@ -209,6 +229,8 @@ def get_llm_info(client: LLMClient) -> dict:
     Returns:
         Dictionary with client information
     """
+    if isinstance(client, LLMRouter):
+        return {**get_llm_info(client.primary_client), "router": True, "hedging": client.hedge}
     if isinstance(client, AzureOpenAIGPT41Client):
         return {
             "model": "gpt41-mini",
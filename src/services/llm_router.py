@@ -0,0 +1,398 @@
+"""
+Resilient routing across the configured LLM deployments (gpt4o-2 / gpt41-mini).
+
+``LLMRouter`` has the client interface (``chat_completion`` /
+``complete_text`` / ``close``) and is what ``llm_factory.get_llm_client_smart``
+returns when ``settings.llm_router_enabled``:
+
+- The deployment picked by ``LLM_MODEL_*`` (or the request / header) is the
+  primary; the other configured deployment is the backup.
+- Each deployment has a circuit breaker over a sliding time window: it opens
+  when the error rate or the share of slow calls crosses its threshold,
+  rejects calls while open (the router fails over immediately instead of
+  waiting out retries), and lets one probe through after ``open_seconds``.
+- Failover replaces the clients' own retries: every deployment but the last
+  candidate is called with a single attempt (``single_attempt_scope``), so a
+  429 or 5xx moves to the backup at once instead of after a backoff.
+- Hedging (APIs in ``llm_hedge_apis``): if the primary has not answered
+  after its own recent p95 latency, the same request goes to the backup and
+  the first success wins; the slower call is cancelled.  Only the slowest
+  ~5% of calls are duplicated.
+- ``llm_routing = "latency"`` orders healthy deployments by recent latency
+  instead of always preferring the configured one.
+
+Breaker state and latency statistics are per worker and shared by all
+requests; transitions and hedges are tracked as monitoring events, and
+``router_stats()`` is exposed in ``/debug/monitoring``.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from src.core.config import get_settings
+from src.core.monitoring_service import monitoring_service
+from src.core.retry import single_attempt_scope
+from src.core.tracing import span
+from src.services.openai_client import (
+    AzureOpenAIAuthError,
+    AzureOpenAIError,
+    AzureOpenAIRateLimitError,
+    AzureOpenAIServerError,
+)
+
+logger = logging.getLogger(__name__)
+
+# 少於這個樣本數時 hedge 延遲使用上限
+_MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(AzureOpenAIServerError):
+    """The deployment's circuit breaker is open."""
+
+
+def is_caller_error(exc: BaseException) -> bool:
+    """
+    Errors caused by the request itself (bad payload, content filter, auth).
+
+    The other deployment would reject them too, so they are neither failed
+    over nor counted against the deployment's health.
+    """
+    if isinstance(exc, (ValueError, AzureOpenAIAuthError)):
+        return True
+    if isinstance(exc, AzureOpenAIError) and not isinstance(exc, AzureOpenAIRateLimitError):
+        status = exc.status_code
+        return status is not None and 400 <= status < 500 and status != 408
+    return False
+
+
+class CircuitBreaker:
+    """Error-rate / slow-call breaker over a sliding time window."""
+
+    def __init__(
+        self,
+        name: str,
+        error_rate: float = 0.5,
+        slow_call_ms: float = 15000.0,
+        slow_rate: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._calls: deque[tuple[float, bool, bool]] = deque()  # (time, failed, slow)
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def available(self) -> bool:
+        """Would a call be let through now (no state change)."""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return self._clock() - self._opened_at >= self.open_seconds
+        return not self._probe_in_flight
+
+    def allow(self) -> bool:
+        """Claim a call slot: always when closed, one probe at a time after the open period."""
+        if self.state == "open" and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition("half_open")
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+        return self.state == "closed"
+
+    def release(self) -> None:
+        """Give back a claimed slot without an outcome (the call was cancelled)."""
+        self._probe_in_flight = False
+
+    def record(self, success: bool, latency_ms: float) -> None:
+        now = self._clock()
+        slow = latency_ms >= self.slow_call_ms
+        if self.state == "half_open":
+            self._probe_in_flight = False
+            self._transition("closed" if success and not slow else "open")
+            return
+        self._calls.append((now, not success, slow))
+        self._prune(now)
+        if self.state == "closed" and len(self._calls) >= self.min_calls:
+            rates = self.rates()
+            if rates["error_rate"] >= self.error_rate or rates["slow_rate"] >= self.slow_rate:
+                self._transition("open", **rates)
+
+    def rates(self) -> dict[str, float]:
+        total = len(self._calls) or 1
+        return {
+            "error_rate": round(sum(failed for _, failed, _ in self._calls) / total, 3),
+            "slow_rate": round(sum(slow for _, _, slow in self._calls) / total, 3),
+        }
+
+    def _transition(self, state: str, **details: float) -> None:
+        previous, self.state = self.state, state
+        if state == "open":
+            self._opened_at = self._clock()
+        if state in ("open", "closed"):
+            self._calls.clear()
+        log = logger.warning if state == "open" else logger.info
+        log(f"[LLMRouter] Circuit for {self.name}: {previous} -> {state} {details or ''}")
+        monitoring_service.track_event(
+            "LLMCircuitStateChanged",
+            {"deployment": self.name, "from": previous, "to": state, **details},
+        )
+
+
+class DeploymentHealth:
+    """Breaker plus recent latency of one deployment (shared by all requests in the worker)."""
+
+    def __init__(self, name: str):
+        settings = get_settings()
+        self.name = name
+        self.breaker = CircuitBreaker(
+            name,
+            error_rate=settings.llm_breaker_error_rate,
+            slow_call_ms=settings.llm_breaker_slow_call_ms,
+            min_calls=settings.llm_breaker_min_calls,
+            window_seconds=settings.llm_breaker_window_seconds,
+            open_seconds=settings.llm_breaker_open_seconds,
+        )
+        self.latencies_ms: deque[float] = deque(maxlen=200)
+        self.ewma_ms: float | None = None
+        self.calls = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.ewma_ms = latency_ms if self.ewma_ms is None else 0.8 * self.ewma_ms + 0.2 * latency_ms
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this deployment before hedging: its recent p-th percentile, clamped."""
+        settings = get_settings()
+        low, high = settings.llm_hedge_min_delay_ms, settings.llm_hedge_max_delay_ms
+        if len(self.latencies_ms) < _MIN_LATENCY_SAMPLES:
+            return high / 1000
+        return min(max(self.percentile(settings.llm_hedge_percentile), low), high) / 1000
+
+    def stats(self) -> dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "state": self.breaker.state,
+            **self.breaker.rates(),
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_p50_ms": round(p50, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95, 1) if p95 is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+_health: dict[str, DeploymentHealth] = {}
+
+
+def get_deployment_health(name: str) -> DeploymentHealth:
+    health = _health.get(name)
+    if health is None:
+        health = _health[name] = DeploymentHealth(name)
+    return health
+
+
+def router_stats() -> dict[str, Any]:
+    return {name: health.stats() for name, health in _health.items()}
+
+
+class LLMRouter:
+    """Client-compatible router with failover, circuit breakers and optional hedging."""
+
+    def __init__(
+        self,
+        api_name: str,
+        primary: str,
+        factories: dict[str, Callable[[], Any]],
+        hedge: bool = False,
+        routing: str = "primary",
+    ):
+        self.api_name = api_name
+        self.primary = primary if primary in factories else next(iter(factories))
+        self.factories = factories
+        self.hedge = hedge
+        self.routing = routing
+        self._clients: dict[str, Any] = {}
+        self._unavailable: set[str] = set()
+
+    @property
+    def primary_client(self) -> Any:
+        for model in self._candidates():
+            client = self._client(model)
+            if client is not None:
+                return client
+        raise AzureOpenAIServerError("No LLM deployment is configured")
+
+    def _client(self, model: str) -> Any:
+        if model in self._unavailable:
+            return None
+        client = self._clients.get(model)
+        if client is None:
+            try:
+                client = self._clients[model] = self.factories[model]()
+            except Exception as e:
+                # 未設定的部署（例如缺少 API key）不參與路由
+                logger.warning(f"[LLMRouter] {model} unavailable: {e}")
+                self._unavailable.add(model)
+                return None
+        return client
+
+    def _candidates(self) -> list[str]:
+        models = [self.primary] + [m for m in self.factories if m != self.primary]
+        if self.routing == "latency":
+            # 穩定排序：沒有樣本的部署視為最快（先探索），同分時維持主要部署優先
+            models.sort(key=lambda m: get_deployment_health(m).ewma_ms or 0.0)
+        return [m for m in models if m not in self._unavailable]
+
+    def _order(self) -> list[str]:
+        return [m for m in self._candidates() if get_deployment_health(m).breaker.available()]
+
+    async def _call(self, model: str, kwargs: dict[str, Any], retry: bool = True) -> dict[str, Any]:
+        """Call one deployment; ``retry=False`` when another deployment can take over."""
+        client = self._client(model)
+        if client is None:
+            raise AzureOpenAIServerError(f"LLM deployment {model} is not configured")
+        health = get_deployment_health(model)
+        if not health.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for LLM deployment {model}")
+        health.calls += 1
+        start = time.perf_counter()
+        try:
+            with single_attempt_scope(not retry):
+                response = await client.chat_completion(**kwargs)
+        except asyncio.CancelledError:
+            health.breaker.release()
+            raise
+        except Exception as e:
+            if is_caller_error(e):
+                health.breaker.release()
+                raise
+            health.errors += 1
+            health.breaker.record(False, (time.perf_counter() - start) * 1000)
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+        health.observe(latency_ms)
+        health.breaker.record(True, latency_ms)
+        return response
+
+    async def chat_completion(self, messages: list[dict[str, str]], stream: bool = False, **kwargs):
+        order = self._order()
+        if not order:
+            raise CircuitOpenError("All LLM deployments are unavailable (circuits open)")
+        if stream:
+            # 串流回應不做 hedge / 中途切換
+            return await self._client(order[0]).chat_completion(messages=messages, stream=True, **kwargs)
+
+        kwargs = {"messages": messages, **kwargs}
+        with span("llm_route", api=self.api_name) as route:
+            if self.hedge and len(order) > 1:
+                model, response, hedged = await self._hedged(order, kwargs)
+            else:
+                (model, response), hedged = await self._failover(order, kwargs), False
+            route.attributes.update(deployment=model, hedged=hedged)
+
+        monitoring_service.track_event(
+            "LLMRouted",
+            {
+                "api_name": self.api_name,
+                "primary": order[0],
+                "deployment": model,
+                "failover": model != order[0] and not hedged,
+                "hedged": hedged,
+                "latency_ms": round(route.duration_ms, 2),
+            },
+        )
+        return response
+
+    async def _failover(self, order: list[str], kwargs: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        last_error: Exception | None = None
+        for i, model in enumerate(order):
+            try:
+                return model, await self._call(model, kwargs, retry=i == len(order) - 1)
+            except Exception as e:
+                if is_caller_error(e):
+                    raise
+                last_error = e
+                logger.warning(f"[LLMRouter] {model} failed for {self.api_name}: {e}")
+        raise last_error
+
+    async def _hedged(self, order: list[str], kwargs: dict[str, Any]) -> tuple[str, dict[str, Any], bool]:
+        primary, backup = order[0], order[1]
+        first = asyncio.create_task(self._call(primary, kwargs, retry=False))
+        done, _ = await asyncio.wait({first}, timeout=get_deployment_health(primary).hedge_delay())
+        if done:
+            if first.exception() is None:
+                return primary, first.result(), False
+            if is_caller_error(first.exception()):
+                raise first.exception()
+            logger.warning(f"[LLMRouter] {primary} failed for {self.api_name}: {first.exception()}")
+            model, response = await self._failover(order[1:], kwargs)
+            return model, response, False
+
+        # 主要部署超過其 p95 仍未回應：同時送往備援部署，取先成功者
+        get_deployment_health(primary).hedges += 1
+        tasks = {first: primary, asyncio.create_task(self._call(backup, kwargs)): backup}
+        pending = set(tasks)
+        errors: dict[str, BaseException] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        model = tasks[task]
+                        if model == backup:
+                            get_deployment_health(primary).hedge_wins += 1
+                        return model, task.result(), True
+                    if is_caller_error(task.exception()):
+                        raise task.exception()
+                    errors[tasks[task]] = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors.get(primary) or next(iter(errors.values()))
+
+    async def complete_text(self, prompt: str, temperature: float = 0.0, max_tokens: int = 1000, **kwargs) -> str:
+        response = await self.chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        if isinstance(response, dict):
+            choices = response.get("choices", [])
+            if choices:
+                return choices[0].get("message", {}).get("content", "").strip()
+        return ""
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
@@ -2,18 +2,41 @@
 Azure OpenAI Client for GPT-4o-2 model integration.
 Following FHS architecture principles.
 """
-import asyncio
 import json
 import logging
+import time
 from collections.abc import AsyncGenerator
 from typing import Any
 
 import httpx
 
+from src.core.rate_limit import (
+    DeploymentLimiter,
+    QuotaExceededError,
+    estimate_chat_tokens,
+    get_deployment_limiter,
+)
+from src.core.retry import (
+    RetryPolicy,
+    RetryState,
+    attempt_timeout,
+    mark_exhausted,
+    parse_retry_after,
+)
+from src.core.tracing import record_span, span
+
+# 連線逾時與讀取逾時（秒）
+CONNECT_TIMEOUT = 30.0
+READ_TIMEOUT = 60.0
+
 
 class AzureOpenAIError(Exception):
     """Base exception for Azure OpenAI client errors."""
-    pass
+    
+    def __init__(self, message: str = "", retry_after: float | None = None, status_code: int | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after  # 伺服器建議的重試等待秒數（Retry-After）
+        self.status_code = status_code  # HTTP 狀態碼（有回應時）
 
 
 class AzureOpenAIRateLimitError(AzureOpenAIError):
@@ -21,6 +44,11 @@ class AzureOpenAIRateLimitError(AzureOpenAIError):
     pass
 
 
+class AzureOpenAITimeoutError(AzureOpenAIError):
+    """Exception for request timeouts (retries exhausted)."""
+    pass
+
+
 class AzureOpenAIAuthError(AzureOpenAIError):
     """Exception for authentication errors (401, 403)."""
     pass
@@ -31,10 +59,27 @@ class AzureOpenAIServerError(AzureOpenAIError):
     pass
 
 
+async def acquire_quota(limiter: DeploymentLimiter, tokens: float) -> float:
+    """
+    Reserve deployment quota before an attempt.
+
+    A call that would wait longer than its priority allows fails as a 429
+    that outer retry layers do not retry.
+
+    Returns:
+        Tokens charged, for ``limiter.reconcile`` / ``limiter.release``
+    """
+    try:
+        return (await limiter.acquire(tokens)).tokens
+    except QuotaExceededError as e:
+        raise mark_exhausted(AzureOpenAIRateLimitError(str(e), retry_after=e.retry_after)) from e
+
+
 class AzureOpenAIClient:
     """Azure OpenAI client for GPT-4o-2 model integration."""
     
-    def __init__(self, endpoint: str, api_key: str, api_version: str = "2024-02-15-preview"):
+    def __init__(self, endpoint: str, api_key: str, api_version: str = "2024-02-15-preview",
+                 quota_tpm: int = 0, quota_rpm: int = 0):
         """
         初始化 Azure OpenAI 客戶端
         
@@ -42,15 +87,19 @@ class AzureOpenAIClient:
             endpoint: Azure OpenAI 端點 URL
             api_key: API 金鑰
             api_version: API 版本
+            quota_tpm: 部署的 TPM 配額（0 = 不在客戶端限流）
+            quota_rpm: 部署的 RPM 配額（0 = 不在客戶端限流）
         """
         self.endpoint = endpoint.rstrip('/')
         self.api_key = api_key
         self.api_version = api_version
         self.deployment_id = "gpt-4o-2"  # 固定使用 GPT-4o-2 模型
+        # 同一部署的所有客戶端共用配額
+        self.limiter = get_deployment_limiter(self.deployment_id, quota_tpm, quota_rpm)
         
         # 設置 HTTP 客戶端
         self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, read=60.0),  # 30s 連接超時，60s 讀取超時
+            timeout=httpx.Timeout(CONNECT_TIMEOUT, read=READ_TIMEOUT),  # 30s 連接超時，60s 讀取超時
             headers={
                 "api-key": self.api_key,
                 "Content-Type": "application/json",
@@ -61,9 +110,9 @@ class AzureOpenAIClient:
         # 設置日誌
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # 重試配置
+        # 重試配置（共用重試引擎：Retry-After、去相關抖動、請求期限）
         self.max_retries = 3
-        self.retry_delays = [1, 2, 4]  # 指數退避: 1s, 2s, 4s
+        self.retry_policy = RetryPolicy(max_attempts=self.max_retries, base_delay=1.0)
     
     async def chat_completion(
         self, 
@@ -122,7 +171,7 @@ class AzureOpenAIClient:
         
         if stream:
             return self._chat_completion_stream(url, payload, params)
-        else:
+        with span("llm", deployment=self.deployment_id):
             return await self._chat_completion_non_stream(url, payload, params)
     
     async def _chat_completion_non_stream(
@@ -132,18 +181,24 @@ class AzureOpenAIClient:
         params: dict[str, str]
     ) -> dict[str, Any]:
         """處理 non-streaming 請求"""
-        for attempt in range(self.max_retries):
+        retry = RetryState(self.retry_policy, f"azure_openai.{self.deployment_id}")
+        cost = estimate_chat_tokens(payload["messages"], payload["max_tokens"])
+        while True:
+            charged = await acquire_quota(self.limiter, cost)
+            retry.start_attempt()
             try:
                 response = await self.client.post(
                     url,
                     json=payload,
-                    params=params
+                    params=params,
+                    timeout=self._attempt_timeout()
                 )
                 
                 # 檢查回應狀態
-                await self._handle_response_errors(response, attempt)
+                await self._handle_response_errors(response, retry.attempt - 1)
                 
                 result = response.json()
+                self.limiter.reconcile(charged, result.get("usage", {}).get("total_tokens"), response.headers)
                 
                 self.logger.info(
                     f"Azure OpenAI request successful: "
@@ -173,13 +228,11 @@ class AzureOpenAIClient:
                 return result
                 
             except (AzureOpenAIRateLimitError, AzureOpenAIServerError) as e:
-                if attempt < self.max_retries - 1:
-                    delay = self.retry_delays[attempt]
-                    self.logger.warning(
-                        f"Request failed (attempt {attempt + 1}/{self.max_retries}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    await asyncio.sleep(delay)
+                if isinstance(e, AzureOpenAIRateLimitError):
+                    self.limiter.on_throttled(e.retry_after)
+                else:
+                    self.limiter.release(charged)
+                if await retry.backoff(e):
                     continue
                 raise
             
@@ -188,10 +241,9 @@ class AzureOpenAIClient:
                 raise
             
             except Exception as e:
+                self.limiter.release(charged)
                 self.logger.error(f"Unexpected error in Azure OpenAI request: {e}")
                 raise AzureOpenAIError(f"Request failed: {str(e)}") from e
-        
-        raise AzureOpenAIError("Max retries exceeded")
     
     async def _chat_completion_stream(
         self, 
@@ -200,17 +252,25 @@ class AzureOpenAIClient:
         params: dict[str, str]
     ) -> AsyncGenerator[dict[str, Any], None]:
         """處理 streaming 請求"""
-        for attempt in range(self.max_retries):
+        started_ns = time.perf_counter_ns()
+        retry = RetryState(self.retry_policy, f"azure_openai.{self.deployment_id}.stream")
+        cost = estimate_chat_tokens(payload["messages"], payload["max_tokens"])
+        while True:
+            charged = await acquire_quota(self.limiter, cost)
+            retry.start_attempt()
             try:
                 async with self.client.stream(
                     "POST",
                     url,
                     json=payload,
-                    params=params
+                    params=params,
+                    timeout=self._attempt_timeout()
                 ) as response:
                     
                     # 檢查回應狀態
-                    await self._handle_response_errors(response, attempt)
+                    if response.status_code != 200:
+                        await response.aread()  # 讀取錯誤內容以解析訊息與 Retry-After
+                    await self._handle_response_errors(response, retry.attempt - 1)
                     
                     self.logger.info("Starting Azure OpenAI streaming response")
                     
@@ -225,6 +285,7 @@ class AzureOpenAIClient:
                             
                             if data == "[DONE]":
                                 self.logger.info("Azure OpenAI streaming completed")
+                                record_span("llm", started_ns, deployment=self.deployment_id, stream=True)
                                 return
                             
                             try:
@@ -237,21 +298,21 @@ class AzureOpenAIClient:
                 return  # 成功完成，退出重試循環
                 
             except (AzureOpenAIRateLimitError, AzureOpenAIServerError) as e:
-                if attempt < self.max_retries - 1:
-                    delay = self.retry_delays[attempt]
-                    self.logger.warning(
-                        f"Streaming request failed (attempt {attempt + 1}/{self.max_retries}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    await asyncio.sleep(delay)
+                if isinstance(e, AzureOpenAIRateLimitError):
+                    self.limiter.on_throttled(e.retry_after)
+                else:
+                    self.limiter.release(charged)
+                if await retry.backoff(e):
                     continue
                 raise
             
             except Exception as e:
                 self.logger.error(f"Unexpected error in Azure OpenAI streaming: {e}")
                 raise AzureOpenAIError(f"Streaming request failed: {str(e)}") from e
-        
-        raise AzureOpenAIError("Max retries exceeded for streaming request")
+    
+    def _attempt_timeout(self) -> httpx.Timeout:
+        """單次請求逾時，不超過目前請求期限的剩餘時間"""
+        return httpx.Timeout(attempt_timeout(CONNECT_TIMEOUT), read=attempt_timeout(READ_TIMEOUT))
     
     async def _handle_response_errors(self, response: httpx.Response, attempt: int):
         """處理 HTTP 回應錯誤"""
@@ -272,17 +333,21 @@ class AzureOpenAIClient:
             raise AzureOpenAIAuthError(f"Permission denied: {error_detail}")
         
         elif response.status_code == 429:
-            # 檢查是否有 Retry-After header
-            retry_after = response.headers.get("Retry-After")
-            if retry_after:
+            # 檢查是否有 Retry-After header（由重試引擎遵循）
+            retry_after = parse_retry_after(response.headers)
+            if retry_after is not None:
                 self.logger.warning(f"Rate limit hit, Retry-After: {retry_after}s")
-            raise AzureOpenAIRateLimitError(f"Rate limit exceeded: {error_detail}")
+            raise AzureOpenAIRateLimitError(f"Rate limit exceeded: {error_detail}", retry_after=retry_after)
         
         elif 500 <= response.status_code < 600:
-            raise AzureOpenAIServerError(f"Server error ({response.status_code}): {error_detail}")
+            raise AzureOpenAIServerError(
+                f"Server error ({response.status_code}): {error_detail}",
+                retry_after=parse_retry_after(response.headers)
+            )
         
         else:
-            raise AzureOpenAIError(f"API error ({response.status_code}): {error_detail}")
+            raise AzureOpenAIError(f"API error ({response.status_code}): {error_detail}",
+                                   status_code=response.status_code)
     
     async def complete_text(
         self,
@@ -365,9 +430,14 @@ def get_azure_openai_client() -> AzureOpenAIClient:
     if not api_key:
         raise ValueError("AZURE_OPENAI_API_KEY or LLM2_API_KEY environment variable is required")
     
+    from src.core.config import get_settings
+    
+    settings = get_settings()
     return AzureOpenAIClient(
         endpoint=endpoint,
-        api_key=api_key
+        api_key=api_key,
+        quota_tpm=settings.gpt4o_quota_tpm,
+        quota_rpm=settings.gpt4o_quota_rpm
     )
 
 
@@ -2,18 +2,38 @@
 Azure OpenAI Client for GPT-4.1 mini model integration.
 Optimized for high performance with Japan East deployment.
 """
-import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from typing import Any
 
 import httpx
 
+from src.core.rate_limit import estimate_chat_tokens, get_deployment_limiter
+from src.core.retry import (
+    RetryPolicy,
+    RetryState,
+    attempt_timeout,
+    mark_exhausted,
+    parse_retry_after,
+)
+from src.core.tracing import span
+from src.services.openai_client import (
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    AzureOpenAIAuthError,
+    AzureOpenAIError,
+    AzureOpenAIRateLimitError,
+    AzureOpenAIServerError,
+    AzureOpenAITimeoutError,
+    acquire_quota,
+)
+
 
 class AzureOpenAIGPT41Client:
     """Azure OpenAI client for GPT-4.1 mini model integration."""
     
-    def __init__(self, endpoint: str, api_key: str, deployment_name: str, api_version: str = "2025-01-01-preview"):
+    def __init__(self, endpoint: str, api_key: str, deployment_name: str, api_version: str = "2025-01-01-preview",
+                 quota_tpm: int = 0, quota_rpm: int = 0):
         """
         初始化 Azure OpenAI GPT-4.1 mini 客戶端
         
@@ -22,15 +42,19 @@ class AzureOpenAIGPT41Client:
             api_key: API 金鑰
             deployment_name: 部署名稱 (e.g., gpt-4-1-mini-japaneast)
             api_version: API 版本
+            quota_tpm: 部署的 TPM 配額（0 = 不在客戶端限流）
+            quota_rpm: 部署的 RPM 配額（0 = 不在客戶端限流）
         """
         self.endpoint = endpoint.rstrip('/')
         self.api_key = api_key
         self.deployment_name = deployment_name
         self.api_version = api_version
+        # 同一部署的所有客戶端共用配額
+        self.limiter = get_deployment_limiter(deployment_name, quota_tpm, quota_rpm)
         
         # 設置 HTTP 客戶端
         self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, read=60.0),  # 30s 連接超時，60s 讀取超時
+            timeout=httpx.Timeout(CONNECT_TIMEOUT, read=READ_TIMEOUT),  # 30s 連接超時，60s 讀取超時
             headers={
                 "api-key": self.api_key,
                 "Content-Type": "application/json",
@@ -41,9 +65,9 @@ class AzureOpenAIGPT41Client:
         # 設置日誌
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # 重試配置
+        # 重試配置（共用重試引擎：Retry-After、去相關抖動、請求期限）
         self.max_retries = 3
-        self.retry_delays = [1, 2, 4]  # 指數退避: 1s, 2s, 4s
+        self.retry_policy = RetryPolicy(max_attempts=self.max_retries, base_delay=1.0)
     
     async def chat_completion(
         self, 
@@ -91,42 +115,53 @@ class AzureOpenAIGPT41Client:
         
         if stream:
             return self._stream_chat_completion(url, request_params)
-        else:
+        with span("llm", deployment=self.deployment_name):
             return await self._non_stream_chat_completion(url, request_params)
     
     async def _non_stream_chat_completion(self, url: str, request_params: dict[str, Any]) -> dict[str, Any]:
         """處理非串流模式的請求"""
-        for attempt in range(self.max_retries):
+        retry = RetryState(self.retry_policy, f"azure_openai.{self.deployment_name}")
+        cost = estimate_chat_tokens(request_params["messages"], request_params["max_tokens"])
+        while True:
+            charged = await acquire_quota(self.limiter, cost)
+            retry.start_attempt()
             try:
-                response = await self.client.post(url, json=request_params)
+                response = await self.client.post(
+                    url,
+                    json=request_params,
+                    timeout=httpx.Timeout(attempt_timeout(CONNECT_TIMEOUT), read=attempt_timeout(READ_TIMEOUT))
+                )
                 
                 if response.status_code == 200:
-                    return response.json()
+                    result = response.json()
+                    self.limiter.reconcile(charged, result.get("usage", {}).get("total_tokens"), response.headers)
+                    return result
                 
                 # 處理錯誤
-                await self._handle_response_errors(response, attempt)
+                await self._handle_response_errors(response, retry.attempt - 1)
+                
+            except (AzureOpenAIRateLimitError, AzureOpenAIServerError) as e:
+                if isinstance(e, AzureOpenAIRateLimitError):
+                    self.limiter.on_throttled(e.retry_after)
+                else:
+                    self.limiter.release(charged)
+                if not await retry.backoff(e):
+                    raise
                 
             except httpx.TimeoutException as e:
-                self.logger.warning(f"Request timeout (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt == self.max_retries - 1:
-                    raise Exception(f"Request timeout after {self.max_retries} attempts") from e
+                self.limiter.release(charged)
+                self.logger.warning(f"Request timeout (attempt {retry.attempt}/{self.max_retries}): {e}")
+                if not await retry.backoff(e):
+                    # 已在此層重試完畢：標記後外層（GapAnalysisService 等）不再重試
+                    raise mark_exhausted(
+                        AzureOpenAITimeoutError(f"Request timeout after {retry.attempt} attempts")
+                    ) from e
                 
             except httpx.RequestError as e:
-                self.logger.error(f"Request error (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt == self.max_retries - 1:
-                    raise Exception(f"Request failed: {str(e)}") from e
-            
-            except Exception:
-                if attempt == self.max_retries - 1:
-                    raise
-                
-            # 重試延遲
-            if attempt < self.max_retries - 1:
-                delay = self.retry_delays[min(attempt, len(self.retry_delays) - 1)]
-                self.logger.info(f"Retrying in {delay}s...")
-                await asyncio.sleep(delay)
-        
-        raise Exception("Max retries exceeded")
+                self.limiter.release(charged)
+                self.logger.error(f"Request error (attempt {retry.attempt}/{self.max_retries}): {e}")
+                if not await retry.backoff(e):
+                    raise mark_exhausted(AzureOpenAIError(f"Request failed: {str(e)}")) from e
     
     async def _stream_chat_completion(self, url: str, request_params: dict[str, Any]) -> AsyncGenerator[dict[str, Any], None]:
         """處理串流模式的請求"""
@@ -146,23 +181,27 @@ class AzureOpenAIGPT41Client:
             error_detail = response.text or f"HTTP {response.status_code}"
         
         if response.status_code == 401:
-            raise Exception(f"Authentication failed: {error_detail}")
+            raise AzureOpenAIAuthError(f"Authentication failed: {error_detail}")
         
         elif response.status_code == 403:
-            raise Exception(f"Permission denied: {error_detail}")
+            raise AzureOpenAIAuthError(f"Permission denied: {error_detail}")
         
         elif response.status_code == 429:
-            # 檢查是否有 Retry-After header
-            retry_after = response.headers.get("Retry-After")
-            if retry_after:
+            # 檢查是否有 Retry-After header（由重試引擎遵循）
+            retry_after = parse_retry_after(response.headers)
+            if retry_after is not None:
                 self.logger.warning(f"Rate limit hit, Retry-After: {retry_after}s")
-            raise Exception(f"Rate limit exceeded: {error_detail}")
+            raise AzureOpenAIRateLimitError(f"Rate limit exceeded: {error_detail}", retry_after=retry_after)
         
         elif 500 <= response.status_code < 600:
-            raise Exception(f"Server error ({response.status_code}): {error_detail}")
+            raise AzureOpenAIServerError(
+                f"Server error ({response.status_code}): {error_detail}",
+                retry_after=parse_retry_after(response.headers)
+            )
         
         else:
-            raise Exception(f"API error ({response.status_code}): {error_detail}")
+            raise AzureOpenAIError(f"API error ({response.status_code}): {error_detail}",
+                                   status_code=response.status_code)
     
     async def complete_text(
         self,
@@ -247,7 +286,9 @@ def get_gpt41_mini_client() -> AzureOpenAIGPT41Client:
         endpoint=settings.gpt41_mini_japaneast_endpoint,
         api_key=settings.gpt41_mini_japaneast_api_key,
         deployment_name=settings.gpt41_mini_japaneast_deployment,
-        api_version=settings.gpt41_mini_japaneast_api_version
+        api_version=settings.gpt41_mini_japaneast_api_version,
+        quota_tpm=settings.gpt41_mini_quota_tpm,
+        quota_rpm=settings.gpt41_mini_quota_rpm
     )
 
 
@@ -2,13 +2,15 @@
 Resume Format Service.
 Main service for formatting OCR text into structured HTML resumes.
 """
-import asyncio
 import logging
 import re
 from datetime import datetime
 from typing import Any
 
 from src.core.monitoring_service import monitoring_service
+from src.core.offload import run_cpu
+from src.core.retry import RetryPolicy, RetryState
+from src.core.tracing import span
 from src.models.resume_format import (
     CorrectionsMade,
     ResumeFormatData,
@@ -59,7 +61,7 @@ class ResumeFormatService(TokenTrackingMixin):
         try:
             # 1. 預處理 OCR 文字
             logger.info("Starting OCR text preprocessing")
-            cleaned_text = self.text_processor.preprocess_ocr_text(ocr_text)
+            cleaned_text = await run_cpu(self.text_processor.preprocess_ocr_text, ocr_text, size=len(ocr_text))
             
             # 2. 準備 LLM 輸入
             # OCR 輸出格式：第一行是逗號分隔的 types，第二行是逗號分隔的內容
@@ -72,11 +74,16 @@ class ResumeFormatService(TokenTrackingMixin):
             
             # 4. 文字後處理（OCR 錯誤修正等）
             logger.info("Post-processing HTML content")
-            processed_html = self.text_processor.postprocess_html(formatted_html)
-            
-            # 5. HTML 驗證和清理
-            logger.info("Validating and cleaning HTML")
-            validated_html = self.html_validator.validate_and_clean(processed_html)
+            with span("html_postprocess"):
+                processed_html = await run_cpu(
+                    self.text_processor.postprocess_html, formatted_html, size=len(formatted_html)
+                )
+                
+                # 5. HTML 驗證和清理
+                logger.info("Validating and cleaning HTML")
+                validated_html = await run_cpu(
+                    self.html_validator.validate_and_clean, processed_html, size=len(processed_html)
+                )
             
             # 6. 檢測區段
             sections_detected = self._detect_sections(validated_html)
@@ -147,9 +154,13 @@ class ResumeFormatService(TokenTrackingMixin):
         max_retries: int = 3
     ) -> str:
         """使用重試機制呼叫 LLM"""
-        retry_delays = [2.0, 4.0, 8.0]
+        retry = RetryState(
+            RetryPolicy(max_attempts=max_retries, base_delay=1.0, max_delay=4.0),
+            "resume_format.llm"
+        )
         
-        for attempt in range(max_retries):
+        while True:
+            attempt = retry.start_attempt() - 1
             try:
                 # 使用 UnifiedPromptService 獲取 prompt 和配置
                 full_prompt, llm_config = self.prompt_service.get_prompt_with_config(
@@ -162,9 +173,10 @@ class ResumeFormatService(TokenTrackingMixin):
                 # UnifiedPromptService 會將 system 和 user prompts 結合
                 # 我們需要分離它們以符合 chat_completion 的格式
                 logger.info(f"Getting prompt config for task: {self.prompt_service.TASK_PATH}")
-                prompt_config = self.prompt_service.get_prompt_config("en", "1.0.0")
-                system_prompt = prompt_config.get_system_prompt()
-                user_prompt = prompt_config.format_user_prompt(**llm_input)
+                with span("prompt_render"):
+                    prompt_config = self.prompt_service.get_prompt_config("en", "1.0.0")
+                    system_prompt = prompt_config.get_system_prompt()
+                    user_prompt = prompt_config.format_user_prompt(**llm_input)
                 
                 logger.info(f"Prompt config loaded - system: {len(system_prompt) if system_prompt else 0} chars, user template exists: {hasattr(prompt_config, 'user_prompt')}")
                 
@@ -235,11 +247,9 @@ class ResumeFormatService(TokenTrackingMixin):
                     "error_message": str(e)
                 })
                 
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delays[attempt])
-                else:
+                if not await retry.backoff(e):
                     raise LLMServiceError(
-                        f"LLM formatting failed after {max_retries} attempts: {str(e)}"
+                        f"LLM formatting failed after {attempt + 1} attempts: {str(e)}"
                     )
     
     def _detect_sections(self, html: str) -> SectionsDetected:
@@ -2,7 +2,6 @@
 Resume Tailoring Service for optimizing resumes based on gap analysis.
 """
 
-import asyncio
 import json
 import logging
 import re
@@ -13,7 +12,11 @@ from ..core.html_processor import HTMLProcessor
 from ..core.language_handler import LanguageHandler
 from ..core.marker_fixer import MarkerFixer
 from ..core.monitoring_service import monitoring_service
+from ..core.offload import run_cpu
+from ..core.retry import RetryPolicy, RetryState
 from ..core.star_formatter import STARFormatter
+from ..core.token_budget import PromptSection, get_token_budgeter
+from ..core.tracing import span, traced
 from ..models.api.resume_tailoring import (
     CoverageDetails,
     CoverageStats,
@@ -94,16 +97,17 @@ class ResumeTailoringService:
         })
         
         try:
-            # Validate inputs
-            self._validate_inputs(job_description, original_resume, language)
-            
-            # Build tailoring context
-            context = self._build_context(
+            # Validate inputs and build tailoring context (HTML parsing, off the loop for large inputs)
+            input_size = len(job_description) + len(original_resume)
+            await run_cpu(self._validate_inputs, job_description, original_resume, language, size=input_size)
+            context = await run_cpu(
+                self._build_context,
                 job_description,
                 original_resume,
                 gap_analysis,
                 language,
-                include_markers
+                include_markers,
+                size=input_size
             )
             
             # Call LLM to optimize resume
@@ -181,12 +185,43 @@ class ResumeTailoringService:
         missing_result = standardizer.standardize_keywords(gap_analysis.missing_keywords)
         missing_keywords = missing_result.standardized_keywords
         
+        core_strengths = gap_analysis.core_strengths if isinstance(gap_analysis.core_strengths, list) else []
+        key_gaps = gap_analysis.key_gaps if isinstance(gap_analysis.key_gaps, list) else []
+        quick_improvements = gap_analysis.quick_improvements if isinstance(gap_analysis.quick_improvements, list) else []
+        
+        # Fit inputs to the token budget: the resume is rewritten by the LLM and
+        # returned, so it is passed verbatim (only counted); the JD is trimmed first
+        budget = get_token_budgeter().fit(
+            [
+                PromptSection("job_description", job_description_html, priority=0, html=True),
+                PromptSection(
+                    "original_resume", original_resume_html, html=True, trimmable=False, clean=False
+                ),
+                PromptSection(
+                    "gap_analysis",
+                    "\n".join(core_strengths + key_gaps + quick_improvements),
+                    trimmable=False
+                ),
+                PromptSection("keywords", ", ".join(covered_keywords + missing_keywords), trimmable=False),
+            ],
+            self.settings.resume_tailoring_input_token_budget
+        )
+        if budget.tokens_saved:
+            logger.info(
+                f"Tailoring input budget: tokens {budget.total_before} -> {budget.total_after}, "
+                f"trimmed={budget.trimmed}"
+            )
+            self.monitoring.track_event("ResumeTailoringInputBudget", {
+                "language": language,
+                **budget.telemetry()
+            })
+        
         return TailoringContext(
-            job_description=job_description_html,
-            original_resume=original_resume_html,
-            core_strengths=gap_analysis.core_strengths if isinstance(gap_analysis.core_strengths, list) else [],
-            key_gaps=gap_analysis.key_gaps if isinstance(gap_analysis.key_gaps, list) else [],
-            quick_improvements=gap_analysis.quick_improvements if isinstance(gap_analysis.quick_improvements, list) else [],
+            job_description=budget.texts["job_description"],
+            original_resume=budget.texts["original_resume"],
+            core_strengths=core_strengths,
+            key_gaps=key_gaps,
+            quick_improvements=quick_improvements,
             covered_keywords=covered_keywords,
             missing_keywords=missing_keywords,
             language=language,
@@ -225,13 +260,15 @@ class ResumeTailoringService:
         }
         
         # Format prompts
-        user_prompt = prompt_config.format_user_prompt(**prompt_vars)
+        with span("prompt_render"):
+            user_prompt = prompt_config.format_user_prompt(**prompt_vars)
         
         # Call LLM with retry
-        max_retries = 3
-        for attempt in range(max_retries):
+        retry = RetryState(RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=4.0), "resume_tailoring.llm")
+        while True:
+            retry.start_attempt()
             try:
-                logger.info(f"Calling LLM for resume optimization (attempt {attempt + 1})")
+                logger.info(f"Calling LLM for resume optimization (attempt {retry.attempt})")
                 
                 response = await self.llm_client.chat_completion(
                     messages=[
@@ -265,12 +302,11 @@ class ResumeTailoringService:
                     raise ValueError("No response content from LLM")
                 
             except Exception as e:
-                logger.warning(f"LLM call attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                else:
+                logger.warning(f"LLM call attempt {retry.attempt} failed: {str(e)}")
+                if not await retry.backoff(e):
                     raise
     
+    @traced("parse")
     def _parse_llm_response(self, content: str) -> dict:
         """Parse LLM response to extract optimized resume and improvements"""
         result = None
@@ -345,6 +381,7 @@ class ResumeTailoringService:
         
         return result
     
+    @traced("html_postprocess")
     async def _process_optimization_result(
         self,
         optimized_data: dict,
@@ -368,14 +405,19 @@ class ResumeTailoringService:
         # Fix incorrectly placed markers and apply keyword markers properly
         if include_markers:
             # Fix markers and apply keyword marking
-            optimized_resume = self.marker_fixer.fix_and_enhance_markers(
+            optimized_resume = await run_cpu(
+                self.marker_fixer.fix_and_enhance_markers,
                 optimized_resume,
                 keywords=gap_analysis.missing_keywords,
-                original_keywords=gap_analysis.covered_keywords
+                original_keywords=gap_analysis.covered_keywords,
+                size=len(optimized_resume),
+                isolated=True
             )
         
         # Count markers if included
-        marker_counts = self.html_processor.count_markers(optimized_resume)
+        marker_counts = await run_cpu(
+            self.html_processor.count_markers, optimized_resume, size=len(optimized_resume), isolated=True
+        )
         
         # Statistics are now calculated via visual markers and coverage
         
@@ -443,7 +485,9 @@ class ResumeTailoringService:
         
         # Remove markers if not requested
         if not include_markers:
-            optimized_resume = self.html_processor.remove_markers(optimized_resume)
+            optimized_resume = await run_cpu(
+                self.html_processor.remove_markers, optimized_resume, size=len(optimized_resume), isolated=True
+            )
         
         return TailoringResult(
             resume=optimized_resume,
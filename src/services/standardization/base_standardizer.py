@@ -6,9 +6,19 @@ Provides common functionality for all language-specific standardizers.
 import logging
 import re
 from abc import ABC, abstractmethod
+from pathlib import Path
+
+from ...core.standardization_index import (
+    EMPTY_INDEX,
+    StandardizationIndex,
+    compile_index,
+    get_index_registry,
+)
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
 
 class StandardizationResult:
     """Result of keyword standardization process."""
@@ -70,6 +80,52 @@ class BaseStandardizer(ABC):
         self.config_path = config_path
         self.config = None
         self._load_config()
+        self._index = self._get_shared_index()
+    
+    def _index_cache_key(self) -> tuple | None:
+        """
+        Key identifying the config source for index sharing across instances.
+        
+        Returns:
+            Hashable key, or None if the index should not be shared
+        """
+        if not self.config_path:
+            return None
+        try:
+            mtime_ns = Path(self.config_path).stat().st_mtime_ns
+        except OSError:
+            return None
+        return (type(self).__name__, str(Path(self.config_path).resolve()), mtime_ns)
+    
+    def _get_shared_index(self) -> StandardizationIndex:
+        """Get the compiled index for the current config, sharing it when possible."""
+        if self.config is None:
+            return EMPTY_INDEX
+        
+        key = self._index_cache_key()
+        if key is None:
+            return compile_index(self.config)
+        
+        config = self.config
+        return get_index_registry().get_or_build(key, lambda: compile_index(config))
+    
+    def _current_index(self) -> StandardizationIndex:
+        """Get the index to use for the next standardization. Can be overridden."""
+        return self._index
+    
+    def reload_config(self):
+        """
+        Reload configuration and swap in a freshly compiled index.
+        
+        In-flight standardizations keep using the index they started with.
+        """
+        self._load_config()
+        index = compile_index(self.config) if self.config is not None else EMPTY_INDEX
+        key = self._index_cache_key()
+        if key is not None and self.config is not None:
+            get_index_registry().replace(key, index)
+        self._index = index
+        logger.info(f"Reloaded standardization index for {self.get_supported_language()}")
     
     @abstractmethod
     def _load_config(self):
@@ -96,17 +152,20 @@ class BaseStandardizer(ABC):
         
         logger.info(f"Starting standardization for {len(keywords)} keywords")
         
+        # Pin the index so a concurrent reload cannot mix two configs
+        index = self._current_index()
+        
         # 1. Clean and normalize input
         cleaned_keywords = self._clean_keywords(keywords)
         
         # 2. Apply exclusion rules
-        filtered_keywords, excluded = self._apply_exclusion_rules(cleaned_keywords)
+        filtered_keywords, excluded = self._apply_exclusion_rules(cleaned_keywords, index)
         
         # 3. Apply standardization mappings
-        standardized, mappings = self._apply_standardization_mappings(filtered_keywords)
+        standardized, mappings = self._apply_standardization_mappings(filtered_keywords, index)
         
         # 4. Apply pattern rules
-        final_keywords, pattern_mappings = self._apply_pattern_rules(standardized)
+        final_keywords, pattern_mappings = self._apply_pattern_rules(standardized, index)
         
         # 5. Remove duplicates while preserving order
         final_keywords = self._remove_duplicates(final_keywords)
@@ -163,69 +222,59 @@ class BaseStandardizer(ABC):
             Normalized keyword
         """
         # Default normalization: strip and collapse whitespace
-        return re.sub(r'\s+', ' ', keyword.strip())
+        return _WHITESPACE_RE.sub(' ', keyword.strip())
     
-    def _apply_exclusion_rules(self, keywords: list[str]) -> tuple[list[str], list[str]]:
+    def _apply_exclusion_rules(self, keywords: list[str],
+                               index: StandardizationIndex | None = None) -> tuple[list[str], list[str]]:
         """
         Apply exclusion rules to filter out unwanted keywords.
         
         Args:
             keywords: Keywords to filter
+            index: Compiled index to use (defaults to the current one)
             
         Returns:
             Tuple of (filtered_keywords, excluded_keywords)
         """
-        if not self.config or 'exclusion_rules' not in self.config:
+        index = index or self._current_index()
+        if not index.has_exclusions:
             return keywords, []
         
         filtered = []
         excluded = []
         
-        exclusion_patterns = [
-            re.compile(rule['pattern']) 
-            for rule in self.config['exclusion_rules']
-        ]
-        
         for keyword in keywords:
-            should_exclude = False
-            
-            for pattern in exclusion_patterns:
-                if pattern.search(keyword):
-                    excluded.append(keyword)
-                    should_exclude = True
-                    break
-            
-            if not should_exclude:
+            if index.is_excluded(keyword):
+                excluded.append(keyword)
+            else:
                 filtered.append(keyword)
         
         logger.debug(f"Excluded {len(excluded)} keywords by exclusion rules")
         return filtered, excluded
     
-    def _apply_standardization_mappings(self, keywords: list[str]) -> tuple[list[str], list[dict[str, str]]]:
+    def _apply_standardization_mappings(self, keywords: list[str],
+                                        index: StandardizationIndex | None = None) -> tuple[list[str], list[dict[str, str]]]:
         """
         Apply direct standardization mappings.
         
         Args:
             keywords: Keywords to standardize
+            index: Compiled index to use (defaults to the current one)
             
         Returns:
             Tuple of (standardized_keywords, mappings_applied)
         """
-        if not self.config or 'categories' not in self.config:
+        index = index or self._current_index()
+        mapping_dict = index.mappings
+        if not mapping_dict:
             return keywords, []
         
         standardized = []
         mappings = []
         
-        # Build mapping dictionary from all categories
-        mapping_dict = {}
-        for _category, category_data in self.config['categories'].items():
-            if 'mappings' in category_data:
-                mapping_dict.update(category_data['mappings'])
-        
         for keyword in keywords:
-            if keyword in mapping_dict:
-                standardized_term = mapping_dict[keyword]
+            standardized_term = mapping_dict.get(keyword)
+            if standardized_term is not None:
                 standardized.append(standardized_term)
                 mappings.append({
                     'original': keyword,
@@ -238,17 +287,20 @@ class BaseStandardizer(ABC):
         logger.debug(f"Applied {len(mappings)} dictionary mappings")
         return standardized, mappings
     
-    def _apply_pattern_rules(self, keywords: list[str]) -> tuple[list[str], list[dict[str, str]]]:
+    def _apply_pattern_rules(self, keywords: list[str],
+                             index: StandardizationIndex | None = None) -> tuple[list[str], list[dict[str, str]]]:
         """
         Apply pattern-based standardization rules.
         
         Args:
             keywords: Keywords to apply patterns to
+            index: Compiled index to use (defaults to the current one)
             
         Returns:
             Tuple of (standardized_keywords, pattern_mappings)
         """
-        if not self.config or 'pattern_rules' not in self.config:
+        index = index or self._current_index()
+        if not index.pattern_rules:
             return keywords, []
         
         standardized = []
@@ -257,11 +309,8 @@ class BaseStandardizer(ABC):
         for keyword in keywords:
             original_keyword = keyword
             
-            for rule in self.config['pattern_rules']:
-                pattern = rule['pattern']
-                replacement = rule['replacement']
-                
-                new_keyword = re.sub(pattern, replacement, keyword)
+            for rule in index.pattern_rules:
+                new_keyword = rule.apply(keyword)
                 if new_keyword != keyword:
                     keyword = new_keyword
                     mappings.append({
@@ -8,10 +8,42 @@ import logging
 import re
 from pathlib import Path
 
+from ...core.standardization_index import EMPTY_INDEX, StandardizationIndex
+from ...core.standardization_snapshot import (
+    StandardizationSnapshot,
+    get_snapshot_store,
+)
 from .base_standardizer import BaseStandardizer
 
 logger = logging.getLogger(__name__)
 
+# Chinese punctuation that shouldn't be in keywords
+_PUNCTUATION_TABLE = str.maketrans('', '', '，。！？：；「」『』（）【】')
+
+# Common English terms and their standard casing
+_ENGLISH_NORMALIZATIONS = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'nodejs': 'Node.js',
+    'reactjs': 'React',
+    'vuejs': 'Vue.js',
+    'angularjs': 'Angular',
+    'github': 'GitHub',
+    'restful': 'RESTful',
+    'graphql': 'GraphQL',
+    'mongodb': 'MongoDB',
+    'postgresql': 'PostgreSQL',
+    'mysql': 'MySQL'
+}
+_ENGLISH_TERMS_RE = re.compile(
+    '|'.join(re.escape(term) for term in sorted(_ENGLISH_NORMALIZATIONS, key=len, reverse=True)),
+    re.ASCII | re.IGNORECASE  # ASCII 大小寫：'ſ'、'ı' 等不會比對到（否則 .lower() 後不是字典的鍵）
+)
+_ASCII_LETTER_RE = re.compile(r'[A-Za-z]')
+_CJK_THEN_LATIN_RE = re.compile(r'([\u4e00-\u9fff])([A-Za-z])')
+_LATIN_THEN_CJK_RE = re.compile(r'([A-Za-z])([\u4e00-\u9fff])')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 
 class TraditionalChineseStandardizer(BaseStandardizer):
     """
@@ -30,9 +62,14 @@ class TraditionalChineseStandardizer(BaseStandardizer):
         """
         Initialize Traditional Chinese standardizer.
         
+        Without an explicit path the config comes from the process-wide,
+        hot-reloadable standardization snapshot.
+        
         Args:
             config_path: Path to Traditional Chinese standardization config
         """
+        self._store = get_snapshot_store() if config_path is None else None
+        self._snapshot: StandardizationSnapshot | None = None
         super().__init__(config_path or self.DEFAULT_CONFIG_PATH)
     
     def get_supported_language(self) -> str:
@@ -41,6 +78,10 @@ class TraditionalChineseStandardizer(BaseStandardizer):
     
     def _load_config(self):
         """Load Traditional Chinese standardization configuration."""
+        if self._store is not None:
+            self._adopt_snapshot(self._store.get())
+            return
+        
         try:
             config_path = Path(self.config_path)
             
@@ -64,6 +105,45 @@ class TraditionalChineseStandardizer(BaseStandardizer):
             logger.error(f"Failed to load Traditional Chinese config: {str(e)}")
             self.config = None
     
+    def _adopt_snapshot(self, snapshot: StandardizationSnapshot):
+        """Use the config and compiled index of a (new) snapshot."""
+        self._snapshot = snapshot
+        self.config = snapshot.zh_tw_config
+        
+        if self.config is None:
+            self._index = EMPTY_INDEX
+            return
+        
+        if not self._validate_config():
+            logger.error("Invalid Traditional Chinese standardization config")
+            self.config = None
+            self._index = EMPTY_INDEX
+            return
+        
+        self._index = snapshot.zh_tw_index
+    
+    def _get_shared_index(self) -> StandardizationIndex:
+        """Snapshot-backed instances already hold the snapshot's index."""
+        if self._store is not None:
+            return self._index
+        return super()._get_shared_index()
+    
+    def _current_index(self) -> StandardizationIndex:
+        """Get the index to use, following snapshot hot reloads."""
+        if self._store is not None:
+            snapshot = self._store.get()
+            if snapshot is not self._snapshot:
+                self._adopt_snapshot(snapshot)
+        return self._index
+    
+    def reload_config(self):
+        """Reload configuration (forces a snapshot reload when snapshot-backed)."""
+        if self._store is None:
+            super().reload_config()
+            return
+        self._adopt_snapshot(self._store.reload())
+        logger.info("Reloaded Traditional Chinese standardization snapshot")
+    
     def _validate_config(self) -> bool:
         """
         Validate the loaded configuration structure.
@@ -117,27 +197,7 @@ class TraditionalChineseStandardizer(BaseStandardizer):
             Normalized keyword
         """
         # Remove common Chinese punctuation that shouldn't be in keywords
-        punctuation_map = {
-            '，': '',
-            '。': '',
-            '！': '',
-            '？': '',
-            '：': '',
-            '；': '',
-            '「': '',
-            '」': '',
-            '『': '',
-            '』': '',
-            '（': '',
-            '）': '',
-            '【': '',
-            '】': ''
-        }
-        
-        for chinese_punct, replacement in punctuation_map.items():
-            keyword = keyword.replace(chinese_punct, replacement)
-        
-        return keyword.strip()
+        return keyword.translate(_PUNCTUATION_TABLE).strip()
     
     def _normalize_english_terms(self, keyword: str) -> str:
         """
@@ -149,32 +209,15 @@ class TraditionalChineseStandardizer(BaseStandardizer):
         Returns:
             Normalized keyword
         """
-        # Standardize common English terms
-        english_normalizations = {
-            'javascript': 'JavaScript',
-            'typescript': 'TypeScript',
-            'nodejs': 'Node.js',
-            'reactjs': 'React',
-            'vuejs': 'Vue.js',
-            'angularjs': 'Angular',
-            'github': 'GitHub',
-            'restful': 'RESTful',
-            'graphql': 'GraphQL',
-            'mongodb': 'MongoDB',
-            'postgresql': 'PostgreSQL',
-            'mysql': 'MySQL'
-        }
-        
-        for incorrect, correct in english_normalizations.items():
-            # Case-insensitive replacement
-            keyword = re.sub(
-                re.escape(incorrect), 
-                correct, 
-                keyword, 
-                flags=re.IGNORECASE
-            )
-        
-        return keyword
+        # Pure Chinese keywords cannot contain any of the English terms
+        if not _ASCII_LETTER_RE.search(keyword):
+            return keyword
+        
+        # Single case-insensitive pass over all terms
+        return _ENGLISH_TERMS_RE.sub(
+            lambda match: _ENGLISH_NORMALIZATIONS[match.group(0).lower()],
+            keyword
+        )
     
     def _normalize_mixed_content(self, keyword: str) -> str:
         """
@@ -188,11 +231,11 @@ class TraditionalChineseStandardizer(BaseStandardizer):
         """
         # Add space between Chinese and English if needed
         # This helps with proper tokenization
-        keyword = re.sub(r'([\u4e00-\u9fff])([A-Za-z])', r'\1 \2', keyword)
-        keyword = re.sub(r'([A-Za-z])([\u4e00-\u9fff])', r'\1 \2', keyword)
+        keyword = _CJK_THEN_LATIN_RE.sub(r'\1 \2', keyword)
+        keyword = _LATIN_THEN_CJK_RE.sub(r'\1 \2', keyword)
         
         # Collapse multiple spaces
-        keyword = re.sub(r'\s+', ' ', keyword)
+        keyword = _WHITESPACE_RE.sub(' ', keyword)
         
         return keyword.strip()
     
@@ -321,7 +364,7 @@ class TraditionalChineseStandardizer(BaseStandardizer):
         if not self.config:
             return {"available": False}
         
-        metadata = self.config.get('metadata', {})
+        metadata = dict(self.config.get('metadata', {}))
         metadata.update({
             "available": True,
             "language": self.get_supported_language(),
@@ -6,8 +6,6 @@ Provides functions for HTML sanitization, text extraction, and content validatio
 import html
 import re
 
-from bs4 import BeautifulSoup
-
 
 def clean_html_text(html_text: str) -> str:
     """
@@ -188,6 +186,9 @@ def validate_html_for_tinymce(html_content: str) -> str:
         # Completely remove dangerous tags and their content
         content = remove_dangerous_content(html_content)
         
+        # bs4 is imported on first use (keeps it out of app import)
+        from bs4 import BeautifulSoup
+
         # Use BeautifulSoup to extract body content
         soup = BeautifulSoup(content, 'html.parser')
         
@@ -3,8 +3,8 @@ Unified Prompt Service for managing prompts and LLM configurations.
 Combines multilingual support with YAML-based configuration management.
 """
 import logging
-from pathlib import Path
 
+from src.core.prompt_registry import filename_for, normalize_version
 from src.core.simple_prompt_manager import SimplePromptManager
 from src.models.prompt_config import LLMConfig, PromptConfig
 
@@ -29,6 +29,9 @@ class UnifiedPromptService:
         """
         Initialize the unified prompt service.
         
+        Prompt files are parsed once per process by the shared PromptRegistry,
+        so constructing a service per request is cheap.
+        
         Args:
             prompts_base_dir: Base directory for prompts (default: src/prompts)
             task_path: Task-specific path (default: keyword_extraction)
@@ -36,15 +39,24 @@ class UnifiedPromptService:
         if prompts_base_dir is None:
             prompts_base_dir = "src/prompts"
         self.simple_prompt_manager = SimplePromptManager(prompts_base_dir)
-        self._cache = {}  # Cache for loaded configs
+        self.registry = self.simple_prompt_manager.registry
         # Allow overriding the default task path
         if task_path:
             self.TASK_PATH = task_path
         
-        logger.info(
+        logger.debug(
             f"Initialized UnifiedPromptService with languages: {self.SUPPORTED_LANGUAGES}"
         )
     
+    def _resolve_version(self, language: str, version: str) -> str:
+        """Resolve 'latest' to the highest version available for a language."""
+        if version != "latest":
+            return normalize_version(version)
+        latest = self.registry.latest_version(self.TASK_PATH, language)
+        if latest is None:
+            raise ValueError(f"No versioned prompts found for language '{language}'")
+        return latest
+    
     def get_prompt_with_config(
         self, 
         language: str, 
@@ -63,8 +75,7 @@ class UnifiedPromptService:
             Tuple of (formatted_prompt, llm_config)
             
         Raises:
-            ValueError: If language is not supported
-            FileNotFoundError: If prompt file doesn't exist
+            ValueError: If language is not supported or the version is not available
         """
         if language not in self.SUPPORTED_LANGUAGES:
             raise ValueError(
@@ -72,40 +83,15 @@ class UnifiedPromptService:
                 f"Supported: {self.SUPPORTED_LANGUAGES}"
             )
         
-        # Create filename with language suffix
-        if version == "latest":
-            # For "latest", need to find the highest version for this language
-            available_versions = self.list_versions(language)
-            if not available_versions or len(available_versions) <= 1:  # Only "latest" in list
-                raise ValueError(f"No versioned prompts found for language '{language}'")
-            # Get the highest numeric version (skip "latest")
-            numeric_versions = [v for v in available_versions if v != "latest"]
-            version = max(numeric_versions)
-        
-        # Add 'v' prefix if not already present
-        version_str = version if version.startswith('v') else f"v{version}"
-        filename = f"{version_str}-{language}.yaml"
-        
-        # Check cache first
-        cache_key = f"{language}-{version}"
-        if cache_key not in self._cache:
-            try:
-                # Load prompt configuration from YAML with language-specific filename
-                prompt_config = self.simple_prompt_manager.load_prompt_config_by_filename(
-                    self.TASK_PATH, filename
-                )
-                self._cache[cache_key] = prompt_config
-                logger.info(
-                    f"Loaded prompt config: language={language}, version={version}"
-                )
-            except FileNotFoundError as e:
-                logger.error(f"Prompt file not found: {e}")
-                raise ValueError(
-                    f"Version '{version}' not available for language '{language}'. "
-                    f"Available: {self.list_versions(language)}"
-                )
-        else:
-            prompt_config = self._cache[cache_key]
+        version = self._resolve_version(language, version)
+        try:
+            prompt_config = self.get_prompt_config(language, version)
+        except FileNotFoundError as e:
+            logger.error(f"Prompt file not found: {e}")
+            raise ValueError(
+                f"Version '{version}' not available for language '{language}'. "
+                f"Available: {self.list_versions(language)}"
+            )
         
         # Format the prompt with variables
         if variables:
@@ -134,21 +120,13 @@ class UnifiedPromptService:
             
         Returns:
             PromptConfig object
+            
+        Raises:
+            ValueError: If no versions exist for the language
+            FileNotFoundError: If the requested version doesn't exist
         """
-        # Use the same logic as get_prompt_with_config
-        if version == "latest":
-            available_versions = self.list_versions(language)
-            if not available_versions or len(available_versions) <= 1:
-                raise ValueError(f"No versioned prompts found for language '{language}'")
-            numeric_versions = [v for v in available_versions if v != "latest"]
-            version = max(numeric_versions)
-        
-        # Add 'v' prefix if not already present
-        version_str = version if version.startswith('v') else f"v{version}"
-        filename = f"{version_str}-{language}.yaml"
-        return self.simple_prompt_manager.load_prompt_config_by_filename(
-            self.TASK_PATH, filename
-        )
+        version = self._resolve_version(language, version)
+        return self.registry.get_config(self.TASK_PATH, filename_for(version, language))
     
     def list_versions(self, language: str) -> list[str]:
         """
@@ -158,34 +136,14 @@ class UnifiedPromptService:
             language: Language code
             
         Returns:
-            List of available versions
+            List of available versions ('latest' first, then newest to oldest)
         """
         if language not in self.SUPPORTED_LANGUAGES:
             return []
         
-        # Scan the task directory for files with language suffix
-        task_dir = Path(self.simple_prompt_manager.prompts_dir) / self.TASK_PATH
-        if not task_dir.exists():
-            return []
-        
-        versions = []
-        pattern = f"*-{language}.yaml"
-        for file in task_dir.glob(pattern):
-            # Extract version from filename (v1.3.0-zh-TW.yaml -> 1.3.0)
-            filename = file.stem  # Remove .yaml
-            if '-' in filename:
-                version = filename.split('-')[0]  # Get part before first dash
-                if version.startswith('v'):
-                    version = version[1:]  # Remove 'v' prefix
-                versions.append(version)
-        
-        # Sort versions in descending order
+        versions = self.registry.list_versions(self.TASK_PATH, language)
         if versions:
-            versions.sort(reverse=True, key=lambda v: tuple(map(int, v.split('.'))))
-            # Always include 'latest' as an option
-            if 'latest' not in versions:
-                versions.insert(0, 'latest')
-        
+            versions.insert(0, 'latest')
         return versions
     
     def get_active_version(self, language: str) -> str | None:
@@ -201,15 +159,10 @@ class UnifiedPromptService:
         if language not in self.SUPPORTED_LANGUAGES:
             return None
         
-        # Check each version to find the one marked as "active"
-        available_versions = self.list_versions(language)
-        if not available_versions:
-            return None
+        versions = self.registry.list_versions(self.TASK_PATH, language)
         
         # Look for version marked as "active" in metadata
-        for version in available_versions:
-            if version == "latest":
-                continue
+        for version in versions:
             try:
                 config = self.get_prompt_config(language, version)
                 if config.metadata.status == "active":
@@ -218,16 +171,12 @@ class UnifiedPromptService:
                 logger.warning(f"Error checking version {version}: {e}")
                 continue
         
-        # If no active version found, return the highest numeric version
-        numeric_versions = [v for v in available_versions if v != "latest"]
-        if numeric_versions:
-            return max(numeric_versions)
-        
-        return None
+        # If no active version found, return the highest version
+        return versions[0] if versions else None
     
     def clear_cache(self):
-        """Clear the internal cache."""
-        self._cache.clear()
+        """Rescan prompt files (configs are cached in the shared registry)."""
+        self.registry.reload()
         logger.info("Cleared UnifiedPromptService cache")
     
     def get_llm_config_for_version(
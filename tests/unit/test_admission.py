@@ -0,0 +1,145 @@
+"""Test per-endpoint admission control and load shedding"""
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from src.core import admission
+from src.core.admission import AdmissionGate, OverloadedError, parse_limits
+from src.middleware.admission_middleware import AdmissionMiddleware
+
+
+@pytest.mark.asyncio
+async def test_gate_serves_high_priority_first_and_sheds_on_estimate():
+    """測試名額釋放時高優先權先取得，預估等待超過預算時立即拒絕"""
+    gate = AdmissionGate("/api/v1/tailor-resume", limit=1, default_service_seconds=1.0)
+    assert await gate.acquire("high", max_wait=0) == 0
+
+    order = []
+
+    async def waiter(priority):
+        await gate.acquire(priority, max_wait=5)
+        order.append(priority)
+
+    low = asyncio.create_task(waiter("low"))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(waiter("high"))
+    await asyncio.sleep(0)
+    assert gate.queue_depth == 2
+    assert gate.estimated_wait("high") == pytest.approx(2.0)  # 佇列中 high 一位 + 自己
+
+    with pytest.raises(OverloadedError) as exc:
+        await gate.acquire("low", max_wait=1.5)
+    assert exc.value.retry_after == pytest.approx(3.0)
+
+    gate.release(0.5)
+    await high
+    gate.release(0.5)
+    await low
+    assert order == ["high", "low"]
+    assert gate.in_flight == 1 and gate.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_gives_back_slot():
+    """測試排隊逾時的請求離開佇列，名額不會遺失"""
+    gate = AdmissionGate("g", limit=1, default_service_seconds=0.01)
+    await gate.acquire()
+    with pytest.raises(OverloadedError):
+        await gate.acquire(max_wait=0.05)
+    assert gate.queue_depth == 0 and gate.stats()["timed_out"] == 1
+
+    gate.release()
+    assert gate.in_flight == 0
+    assert await gate.acquire(max_wait=0) == 0
+
+
+def test_parse_limits_ignores_invalid_entries():
+    """測試解析 admission_limits 設定"""
+    assert parse_limits("/a=2, /b=x,/c=0,/d = 3,") == {"/a": 2, "/d": 3}
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_slow_endpoint_but_not_fast_one():
+    """測試慢端點滿載時回 503 + Retry-After，未設限的快速端點不受影響"""
+    release = asyncio.Event()
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.post("/api/v1/tailor-resume")
+    async def tailor():
+        await release.wait()
+        return {"ok": True}
+
+    @app.post("/api/v1/courses/search")
+    async def search():
+        return {"ok": True}
+
+    with patch.object(admission, "_controller", None), \
+            patch("src.core.config.settings.admission_limits", "/api/v1/tailor-resume=1"), \
+            patch("src.core.config.settings.admission_default_service_seconds", 6.0), \
+            patch("src.core.monitoring_service.monitoring_service.track_event") as track:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/api/v1/tailor-resume"))
+            await asyncio.sleep(0.05)
+
+            shed = await client.post("/api/v1/tailor-resume", headers={"X-Client-Timeout-Ms": "8000"})
+            assert shed.status_code == 503
+            assert shed.headers["Retry-After"] == "6"
+            assert shed.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+            assert (await client.post("/api/v1/courses/search")).status_code == 200
+
+            release.set()
+            assert (await first).status_code == 200
+
+        assert track.call_args[0][0] == "RequestShed"
+        stats = admission.get_admission_controller().stats()["/api/v1/tailor-resume"]
+        assert stats["admitted"] == 1 and stats["rejected"] == 1 and stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_low_priority_header_queues_behind_interactive_requests():
+    """測試同一端點上 X-Priority: low 的請求與一般請求排在同一佇列，一般請求先取得名額"""
+    from src.middleware.monitoring_middleware import MonitoringMiddleware
+
+    release = asyncio.Event()
+    order = []
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware)
+    app.add_middleware(MonitoringMiddleware)
+
+    @app.post("/api/v1/tailor-resume")
+    async def tailor(request: Request):
+        order.append(request.headers["X-Test-Id"])
+        await release.wait()
+        return {"ok": True}
+
+    with patch.object(admission, "_controller", None), \
+            patch("src.core.config.settings.admission_limits", "/api/v1/tailor-resume=1"), \
+            patch("src.core.config.settings.admission_default_service_seconds", 0.1), \
+            patch("src.core.config.settings.tracing_enabled", False), \
+            patch("src.core.monitoring_service.monitoring_service.track_event"):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            def post(test_id, **headers):
+                return asyncio.create_task(
+                    client.post("/api/v1/tailor-resume", headers={"X-Test-Id": test_id, **headers})
+                )
+
+            running = post("running")
+            await asyncio.sleep(0.05)
+            background = post("background", **{"X-Priority": "low"})
+            await asyncio.sleep(0.05)
+            interactive = post("interactive")
+            await asyncio.sleep(0.05)
+            gate = admission.get_admission_controller().gate_for("/api/v1/tailor-resume")
+            assert gate.queue_depth == 2
+
+            release.set()
+            responses = await asyncio.gather(running, background, interactive)
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert order == ["running", "interactive", "background"]
@@ -0,0 +1,117 @@
+"""Test the Azure Functions ASGI bridge"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI, Request
+
+from src.core.asgi_bridge import ASGIBridge
+
+
+def _app(events: list):
+    @asynccontextmanager
+    async def lifespan(app):
+        events.append("startup")
+        yield {"pool": "ready"}
+        events.append("shutdown")
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post("/echo/{name}")
+    async def echo(name: str, request: Request):
+        return {
+            "name": name,
+            "q": request.query_params.get("q"),
+            "body": (await request.body()).decode(),
+            "pool": request.state.pool,
+            "header": request.headers.get("x-test"),
+        }
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_lifespan_runs_once_and_state_reaches_requests():
+    """測試 lifespan 只在第一個請求前執行一次，且 state 傳到請求"""
+    events = []
+    bridge = ASGIBridge(_app(events))
+
+    responses = await asyncio.gather(*(
+        bridge.handle("POST", f"https://example.com/echo/a?q={i}", {"X-Test": "yes"}, b"hello")
+        for i in range(3)
+    ))
+
+    assert events == ["startup"]
+    assert [r.status for r in responses] == [200, 200, 200]
+    assert b'"pool":"ready"' in responses[0].body
+    assert b'"body":"hello"' in responses[0].body
+    assert b'"header":"yes"' in responses[0].body
+    assert responses[0].headers["content-type"] == "application/json"
+
+    await bridge.shutdown()
+    assert events == ["startup", "shutdown"]
+    assert bridge.stats()["lifespan"] == "stopped"
+
+
+@pytest.mark.asyncio
+async def test_app_without_lifespan_is_still_served():
+    """測試不支援 lifespan 的 ASGI app 仍可正常處理請求"""
+    async def raw_app(scope, receive, send):
+        if scope["type"] != "http":
+            raise RuntimeError("only http")
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"x-a", b"1")]})
+        await send({"type": "http.response.body", "body": b"ab", "more_body": True})
+        await send({"type": "http.response.body", "body": b"cd"})
+
+    bridge = ASGIBridge(raw_app)
+    response = await bridge.handle("GET", "http://localhost/x", {}, b"")
+
+    assert (response.status, response.body, response.headers) == (201, b"abcd", {"x-a": "1"})
+    assert bridge.stats()["lifespan"] == "unsupported"
+
+
+@pytest.mark.asyncio
+async def test_receive_after_body_waits_for_disconnect():
+    """測試送完 body 後 receive 會在回應完成時回傳 http.disconnect（不會忙碌迴圈）"""
+    seen = []
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            raise RuntimeError("no lifespan")
+        seen.append(await receive())
+        watcher = asyncio.create_task(receive())
+        await asyncio.sleep(0)
+        assert not watcher.done()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+        seen.append(await watcher)
+
+    bridge = ASGIBridge(app)
+    response = await bridge.handle("POST", "https://h/", {}, b"payload")
+
+    assert response.body == b"ok"
+    assert seen == [
+        {"type": "http.request", "body": b"payload", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_single_chunk_body_is_not_copied_and_overhead_is_tracked():
+    """測試單一區塊的回應不會複製，且記錄 bridge overhead"""
+    payload = b"x" * 1024
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            raise RuntimeError("no lifespan")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": payload})
+
+    bridge = ASGIBridge(app)
+    response = await bridge.handle("GET", "https://h/", {}, b"")
+
+    assert response.body is payload
+    assert response.overhead_ms >= 0 and response.app_ms >= 0
+    stats = bridge.stats()
+    assert stats["requests"] == 1
+    assert stats["overhead_ms_max"] >= stats["overhead_ms_avg"] >= 0
@@ -0,0 +1,150 @@
+"""Test streaming, resumable Coursera catalog fetch"""
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.services.etl.catalog_stream import (
+    ImpactCatalogFeed,
+    PageCursor,
+    buffered,
+    stream_catalog,
+)
+
+PAGES = 3
+PAGE_SIZE = 2
+
+
+@pytest_asyncio.fixture
+async def feed_server():
+    """本機 Impact.com 目錄替身（3 頁、每頁 2 個課程）"""
+    requests = []
+    failures = {}
+
+    async def items(request):
+        page = int(request.query["Page"])
+        requests.append(page)
+        if failures.get(page):
+            failures[page] -= 1
+            return web.Response(status=503, text="busy", headers={"Retry-After": "0"})
+        return web.json_response({
+            "@numpages": str(PAGES),
+            "@total": str(PAGES * PAGE_SIZE),
+            "Items": [
+                {"CatalogItemId": f"p{page}-{i}", "Name": f"Course {page}-{i}"}
+                for i in range(PAGE_SIZE)
+            ],
+        }, headers={"x-ratelimit-remaining-hour": "900"})
+
+    app = web.Application()
+    app.router.add_get("/Mediapartners/sid/Catalogs/9419/Items", items)
+    server = TestServer(app)
+    await server.start_server()
+    server.requests = requests
+    server.failures = failures
+    yield server
+    await server.close()
+
+
+def _feed(server):
+    return ImpactCatalogFeed("sid", "token", "9419", base_url=str(server.make_url("")),
+                             requests_per_second=1000)
+
+
+def _transform(raw):
+    return {"external_id": raw["CatalogItemId"]}
+
+
+@pytest.mark.asyncio
+async def test_stream_runs_all_stages_and_clears_cursor(feed_server, tmp_path):
+    """測試串流依序抓取、轉換、寫入並產生 embedding，完成後清除游標"""
+    cursor = PageCursor(tmp_path / "cursor.json")
+    loaded, embedded = [], []
+
+    async def load(courses):
+        loaded.extend(c["external_id"] for c in courses)
+
+    async def embed(courses):
+        embedded.extend(c["external_id"] for c in courses)
+
+    async with aiohttp.ClientSession() as session:
+        stats = await stream_catalog(_feed(feed_server), session, cursor, _transform, load, embed)
+
+    assert stats["pages"] == PAGES and stats["fetched"] == PAGES * PAGE_SIZE
+    assert stats["completed"] is True
+    assert loaded == embedded == [f"p{p}-{i}" for p in range(1, PAGES + 1) for i in range(PAGE_SIZE)]
+    assert feed_server.requests == [1, 2, 3]
+    assert not (tmp_path / "cursor.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_resume_from_cursor_after_crash(feed_server, tmp_path):
+    """測試寫入中斷後，重新執行從下一個未寫入的分頁繼續"""
+    cursor = PageCursor(tmp_path / "cursor.json")
+    loaded = []
+
+    async def crashing_load(courses):
+        if courses[0]["external_id"].startswith("p3"):
+            raise ConnectionError("db gone")
+        loaded.extend(c["external_id"] for c in courses)
+
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(ConnectionError):
+            await stream_catalog(_feed(feed_server), session, cursor, _transform, crashing_load)
+        assert json.loads((tmp_path / "cursor.json").read_text())["next_page"] == 3
+
+        feed_server.requests.clear()
+        stats = await stream_catalog(
+            _feed(feed_server), session, cursor, _transform,
+            AsyncMock(side_effect=lambda courses: loaded.extend(c["external_id"] for c in courses))
+        )
+
+    assert stats["start_page"] == 3
+    assert feed_server.requests == [3]
+    assert loaded == [f"p{p}-{i}" for p in range(1, PAGES + 1) for i in range(PAGE_SIZE)]
+
+
+@pytest.mark.asyncio
+async def test_feed_retries_server_errors_and_limits_items(feed_server, monkeypatch):
+    """測試 5xx 回應會重試，並可限制課程數（測試模式）"""
+    monkeypatch.setattr("src.core.retry.asyncio.sleep", AsyncMock())
+    feed_server.failures[1] = 1
+
+    async with aiohttp.ClientSession() as session:
+        pages = [page async for page in _feed(feed_server).pages(session, max_items=3)]
+
+    assert [len(page.items) for page in pages] == [2, 1]
+    assert feed_server.requests == [1, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_buffered_stage_is_bounded_and_propagates_errors():
+    """測試階段間佇列有上限，且上游例外會傳到下游"""
+    produced = 0
+
+    async def source():
+        nonlocal produced
+        for i in range(100):
+            produced += 1
+            yield i
+
+    consumed = 0
+    async for _ in buffered(source(), maxsize=2):
+        consumed += 1
+        await asyncio.sleep(0)
+        assert produced - consumed <= 3
+        if consumed == 5:
+            break
+
+    async def failing():
+        yield 1
+        raise ValueError("feed broke")
+
+    with pytest.raises(ValueError, match="feed broke"):
+        async for _ in buffered(failing()):
+            pass
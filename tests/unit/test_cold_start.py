@@ -0,0 +1,95 @@
+"""Test the cold-start benchmark and lazy imports"""
+import types
+
+import pytest
+
+from src.core.cold_start import (
+    ColdStartReport,
+    check_budget,
+    measure_cold_start,
+    parse_importtime,
+)
+from src.core.lazy_import import lazy_exports
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:      2000 |       2120 | json
+import time:      5000 |      90000 |     numpy
+import time:      1000 |      95000 |   src.services.index_calculation
+"""
+
+
+def _report(**overrides):
+    data = {
+        "import_ms": 800.0,
+        "startup_ms": 50.0,
+        "first_request_ms": 120.0,
+        "first_request_status": 200,
+        "second_request_ms": 2.0,
+        "loaded_modules": ["fastapi", "src"],
+    }
+    data.update(overrides)
+    return ColdStartReport(**data)
+
+
+def test_parse_importtime():
+    """測試解析 -X importtime 輸出（略過標題列，保留巢狀深度）"""
+    records = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert [r.module for r in records] == ["_json", "json", "numpy", "src.services.index_calculation"]
+    assert [r.depth for r in records] == [1, 0, 2, 1]
+    assert records[2].self_us == 5000 and records[2].cumulative_us == 90000
+
+    report = _report(imports=records)
+    assert report.top_imports(1)[0].module == "src.services.index_calculation"
+    assert report.top_imports(1, by="self_us")[0].module == "numpy"
+
+
+def test_check_budget():
+    """測試超出匯入時間、首個請求時間或載入禁用模組時回報違規"""
+    assert check_budget(_report()) == []
+
+    violations = check_budget(
+        _report(import_ms=3000.0, first_request_ms=2000.0, loaded_modules=["sklearn", "fastapi"])
+    )
+    assert len(violations) == 3
+    assert any("sklearn" in v for v in violations)
+
+    assert check_budget(_report(import_ms=3000.0), {"max_import_ms": 5000.0}) == []
+
+
+def test_lazy_exports_import_on_first_access():
+    """測試延遲匯出在第一次存取時才載入並快取"""
+    module = types.ModuleType("fake_pkg")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "service"
+
+    module.__getattr__, module.__dir__ = lazy_exports("fake_pkg", module.__dict__, {
+        "service": factory,
+        "JSONDecoder": "json",
+    })
+
+    assert "service" in dir(module) and calls == []
+    assert module.service == "service"
+    assert module.service == "service"
+    assert calls == [1]
+
+    import json
+    assert module.JSONDecoder is json.JSONDecoder
+    with pytest.raises(AttributeError):
+        _ = module.missing
+
+
+@pytest.mark.timeout(120)
+def test_app_cold_start_within_budget():
+    """測試 import src.main 不會載入重量級模組，且第一個請求成功（CI 防回歸）"""
+    report = measure_cold_start()
+
+    assert report.first_request_status == 200
+    assert report.imports, "importtime output should be parsed"
+    # 計時在測試環境中不穩定，這裡只檢查禁用模組
+    assert check_budget(report, {"max_import_ms": float("inf"), "max_first_request_ms": float("inf")}) == []
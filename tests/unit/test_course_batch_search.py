@@ -0,0 +1,111 @@
+"""Test batch course search"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.models.course_search import CourseBatchSearchRequest
+from src.services.course_metadata import CourseMetadataStore
+from src.services.course_search import CourseSearchService
+from src.services.course_vector_index import CourseVectorIndex
+
+
+def test_batch_request_validation():
+    """測試批次請求驗證"""
+    request = CourseBatchSearchRequest(queries=[{"skill_name": " Python "}], limit=20)
+    assert request.queries[0].skill_name == "Python"
+    assert request.limit == 10
+
+    with pytest.raises(ValueError, match="queries cannot be empty"):
+        CourseBatchSearchRequest(queries=[])
+    with pytest.raises(ValueError, match="too many queries"):
+        CourseBatchSearchRequest(queries=[{"skill_name": f"s{i}"} for i in range(21)])
+    with pytest.raises(ValueError, match="skill_name cannot be empty"):
+        CourseBatchSearchRequest(queries=[{"skill_name": " "}])
+
+
+@pytest.fixture
+def service():
+    """建立使用記憶體索引的服務"""
+    # c0/c1 接近 x 軸、c2 接近 y 軸
+    vectors = np.array([[1, 0.1, 0], [1, 0.2, 0], [0.1, 1, 0]], dtype=np.float32)
+    index = CourseVectorIndex()
+    index.apply([(f"c{i}", vector, "AI") for i, vector in enumerate(vectors)])
+    store = CourseMetadataStore()
+    store.apply([
+        {"id": f"c{i}", "name": f"Course {i}", "description": "", "provider": "Google",
+         "provider_standardized": "Google", "provider_logo_url": "", "current_price": 0,
+         "currency": "USD", "image_url": "", "tracking_url": "", "course_type": "course",
+         "category": "AI", "updated_at": None}
+        for i in range(len(vectors))
+    ])
+    service = CourseSearchService()
+    service.vector_index = index
+    service.metadata_store = store
+    service._connection_pool = MagicMock()
+    service.embedding_client = MagicMock()
+    service.embedding_client.create_embeddings = AsyncMock(
+        return_value=[[1, 0, 0], [1, 0.3, 0]]
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_once_and_dedupes(service):
+    """測試批次搜尋只呼叫一次 embedding，並可跨技能去重"""
+    queries = [("Python", ""), ("Data", "analysis"), ("Python", "")]
+    with patch.object(service, "initialize", AsyncMock()):
+        plain = await service.search_courses_batch(queries, limit=2, similarity_threshold=0.5)
+        deduped = await service.search_courses_batch(
+            queries, limit=2, similarity_threshold=0.5, dedupe=True
+        )
+
+    # 重複的查詢文字只產生一次 embedding
+    service.embedding_client.create_embeddings.assert_called_with(["Python", "Data analysis"])
+    assert service.embedding_client.create_embeddings.call_count == 2
+    service._connection_pool.acquire.assert_not_called()
+
+    assert plain.success
+    assert [[r.id for r in item.data.results] for item in plain.data.items] == [
+        ["c0", "c1"], ["c1", "c0"], ["c0", "c1"]
+    ]
+    assert deduped.data.deduplicated
+    assert [[r.id for r in item.data.results] for item in deduped.data.items] == [
+        ["c0", "c1"], [], []
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_error_response(service):
+    """測試批次搜尋失敗時回傳錯誤格式"""
+    service.embedding_client.create_embeddings = AsyncMock(return_value=[])
+    with patch.object(service, "initialize", AsyncMock()), \
+         patch("asyncio.sleep", AsyncMock()), \
+         patch("src.services.course_search.get_settings") as mock_settings:
+        mock_settings.return_value.course_search_deadline_seconds = 0
+        response = await service.search_courses_batch([("Python", "")])
+
+    assert not response.success
+    assert response.error.code == "EMBEDDING_GENERATION_FAILED"
+
+
+@pytest.mark.asyncio
+async def test_pgvector_batch_casts_each_query_vector_once():
+    """測試 pgvector 批次查詢在 CTE 中只轉型一次查詢向量"""
+    service = CourseSearchService()
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"ord": 2, "id": "c1", "similarity_score": 0.9}])
+    service._connection_pool = MagicMock()
+    service._connection_pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    service._connection_pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    service.metadata_store = MagicMock(ready=True)
+    service._hydrate_per_query = AsyncMock(side_effect=lambda hits: hits)
+
+    hits = await service._execute_vector_search_batch(
+        [np.array([0.5, 0.25], dtype=np.float32), np.array([1.0, 0.0], dtype=np.float32)], 5, 0.3
+    )
+
+    sql, vectors, threshold, limit = conn.fetch.call_args[0]
+    assert sql.count("::vector") == 1 and "q.embedding::" not in sql
+    assert vectors == ["[0.5,0.25]", "[1.0,0.0]"] and (threshold, limit) == (0.3, 5)
+    assert hits == [[], [("c1", 0.9)]]
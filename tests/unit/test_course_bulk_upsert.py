@@ -0,0 +1,64 @@
+"""Test COPY-based bulk course upsert"""
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.etl.bulk_upsert import (
+    _UPSERT_COURSES_SQL,
+    STAGING_COLUMNS,
+    bulk_upsert_courses,
+    course_record,
+)
+
+
+def _course(external_id, url="https://imp.i384100.net/p/1/2/3?prodsku=x"):
+    return {
+        "platform_id": "coursera", "external_id": external_id, "name": f"Course {external_id}",
+        "description": "desc", "manufacturer": "Google", "current_price": 49.0,
+        "original_price": 49.0, "currency": "USD", "image_url": "", "stock_status": "in_stock",
+        "original_url": url, "metadata": {"category": "AI"}, "tracking_params": {"prodsku": "x"},
+    }
+
+
+def test_course_record_matches_staging_columns():
+    """測試暫存表資料列與欄位順序一致"""
+    record = course_record(_course("abc", url=""))
+    assert len(record) == len(STAGING_COLUMNS)
+    row = dict(zip(STAGING_COLUMNS, record, strict=True))
+    assert row["id"] == "coursera_abc"
+    assert json.loads(row["metadata"]) == {"category": "AI"}
+    assert row["original_url"] is None
+
+
+def test_upsert_skips_unchanged_rows():
+    """測試 upsert 只更新內容有變動的課程並回報新增列"""
+    assert "IS DISTINCT FROM" in _UPSERT_COURSES_SQL
+    assert "DISTINCT ON (id)" in _UPSERT_COURSES_SQL
+    assert "RETURNING (xmax = 0) AS inserted" in _UPSERT_COURSES_SQL
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_streams_records_and_counts_rows():
+    """測試以單一交易 COPY 課程並統計新增 / 更新 / 未變動"""
+    copied = []
+
+    async def copy_records_to_table(table, *, records, columns):
+        async for record in records:
+            copied.append(record)
+
+    conn = MagicMock()
+    conn.transaction.return_value.__aenter__ = AsyncMock()
+    conn.transaction.return_value.__aexit__ = AsyncMock(return_value=False)
+    conn.execute = AsyncMock(side_effect=["CREATE TABLE", "INSERT 0 2"])
+    conn.copy_records_to_table = AsyncMock(side_effect=copy_records_to_table)
+    conn.fetchval = AsyncMock(return_value=4)
+    conn.fetch = AsyncMock(return_value=[{"inserted": True}, {"inserted": False}])
+
+    result = await bulk_upsert_courses(conn, (_course(str(i)) for i in range(4)))
+
+    assert [record[0] for record in copied] == [f"coursera_{i}" for i in range(4)]
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 2)
+    assert result.tracking_urls == 2
+    assert result.total == 4
+    conn.transaction.assert_called_once()
@@ -1,7 +1,18 @@
 """Test Course Cache Service"""
+import asyncio
 import time
+from collections import Counter
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
 
-from src.services.course_cache import CourseSearchCache
+import pytest
+
+from src.services.course_cache import (
+    CourseSearchCache,
+    load_request_counts,
+    save_request_counts,
+)
+from src.services.course_search import CourseSearchService
 
 
 def test_cache_basic_operations():
@@ -72,4 +83,110 @@ def test_cache_key_consistency():
     
     # 不同輸入應該產生不同鍵值
     key3 = cache.get_cache_key("Python", "web development", "Tech", 0.7)
-    assert key1 != key3
\ No newline at end of file
+    assert key1 != key3
+
+def _expire(cache, key, seconds):
+    """將快取項目的時間往前推"""
+    data, timestamp = cache.cache[key]
+    cache.cache[key] = (data, timestamp - timedelta(seconds=seconds))
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serves_old_result_and_refreshes():
+    """測試過期資料立即回傳，並於背景單一請求更新"""
+    cache = CourseSearchCache(ttl_seconds=10, stale_seconds=60)
+    fetch = AsyncMock(side_effect=[{"v": 1}, {"v": 2}])
+
+    assert await cache.get_or_fetch("k", fetch) == ({"v": 1}, "miss")
+    assert await cache.get_or_fetch("k", fetch) == ({"v": 1}, "hit")
+
+    _expire(cache, "k", 20)
+    results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+    assert results == [({"v": 1}, "stale")] * 5
+
+    await asyncio.sleep(0)
+    assert fetch.await_count == 2  # 背景只更新一次
+    assert await cache.get_or_fetch("k", fetch) == ({"v": 2}, "hit")
+
+
+@pytest.mark.asyncio
+async def test_single_flight_on_miss():
+    """測試同一鍵值的並行未命中只查詢一次"""
+    cache = CourseSearchCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"v": calls}
+
+    results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+
+    assert calls == 1
+    assert all(data == {"v": 1} for data, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_stale_if_error_window():
+    """測試更新失敗時在 stale_if_error 視窗內回傳舊結果，超過則拋出錯誤"""
+    cache = CourseSearchCache(ttl_seconds=10, stale_seconds=0, stale_if_error_seconds=100)
+    cache.set("k", {"v": 1})
+    failing = AsyncMock(side_effect=ConnectionError("db down"))
+
+    _expire(cache, "k", 50)
+    assert await cache.get_or_fetch("k", failing) == ({"v": 1}, "stale_error")
+    assert cache.stats()["stale_error"] == 1
+
+    _expire(cache, "k", 100)
+    with pytest.raises(ConnectionError):
+        await cache.get_or_fetch("k", failing)
+
+
+@pytest.mark.asyncio
+async def test_service_serves_stale_on_search_failure():
+    """測試課程搜尋失敗時回傳快取中的舊結果，並可預熱快取"""
+    service = CourseSearchService()
+    service.cache = CourseSearchCache(ttl_seconds=10, stale_seconds=0, stale_if_error_seconds=100)
+    course = {"id": "c1", "name": "Python", "description": "", "provider": "Google",
+              "provider_standardized": "Google", "provider_logo_url": "", "price": 0.0,
+              "currency": "USD", "image_url": "", "affiliate_url": "", "course_type": "course",
+              "similarity_score": 0.9}
+
+    with patch.object(service, "_search_with_retry",
+                      AsyncMock(side_effect=[[course], RuntimeError("timeout")])), \
+         patch("src.services.course_search.monitoring_service"):
+        assert await service.warm_cache(["Python", "Python"]) == 1
+        key = service.cache.get_cache_key("Python", "", "", 0.3, limit=5)
+        _expire(service.cache, key, 50)
+
+        response = await service.search_courses_v2("Python")
+
+    assert response.success is True
+    assert response.data.results[0].id == "c1"
+
+
+@pytest.mark.asyncio
+async def test_warm_skills_come_from_recorded_requests(tmp_path):
+    """測試預熱清單取自記錄的查詢次數（設定的技能優先），並於關閉時保存查詢次數"""
+    path = tmp_path / "request_counts.json"
+    save_request_counts(path, Counter({"SQL": 8, "Excel": 2}))
+
+    service = CourseSearchService()
+    with patch("src.core.config.settings.course_cache_request_counts_path", str(path)), \
+         patch("src.core.config.settings.course_cache_warm_skills", "Leadership"), \
+         patch("src.core.config.settings.course_cache_warm_top_n", 2), \
+         patch.object(service, "_search_with_retry", AsyncMock(return_value=[])), \
+         patch("src.services.course_search.monitoring_service"):
+        assert service.warm_skills() == ["Leadership", "SQL", "Excel"]
+        assert await service.warm_cache_from_requests() == 3
+
+        for _ in range(3):
+            await service.search_courses_v2("Python")
+        # 每次查詢都計入（含未命中），預熱的查詢不計入
+        assert service.cache.skill_requests == Counter({"Python": 3})
+        service.save_request_counts()
+
+    # 既有次數減半後加上本次查詢
+    assert load_request_counts(path) == Counter({"SQL": 4.0, "Python": 3.0, "Excel": 1.0})
+    assert not service.cache.skill_requests
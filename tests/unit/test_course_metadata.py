@@ -0,0 +1,92 @@
+"""Test course metadata snapshot"""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.course_metadata import DESCRIPTION_PREVIEW_CHARS, CourseMetadataStore
+from src.services.course_search import CourseSearchService
+
+
+def _row(course_id, category="AI", description="", updated_at=None):
+    return {
+        "id": course_id, "name": course_id, "description": description, "provider": "Google",
+        "provider_standardized": None, "provider_logo_url": None, "current_price": 49,
+        "currency": "USD", "image_url": "", "tracking_url": None, "course_type": "course",
+        "category": category, "updated_at": updated_at,
+    }
+
+
+def _pool(conn):
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool
+
+
+def test_snapshot_keeps_compact_rows_and_category_counts():
+    """測試快照保存截斷後的描述與熱門分類統計"""
+    store = CourseMetadataStore(category_limit=2)
+    store.apply([
+        _row("c1", "AI", "x" * 800),
+        _row("c2", "AI"),
+        _row("c3", "Business"),
+        _row("c4", "Law"),
+        _row("c5", "Business"),
+        _row("c6", "AI"),
+        _row("c7", None),
+    ])
+
+    courses, missing = store.courses_for([("c1", 0.9), ("c9", 0.8), ("c2", 0.7)])
+
+    assert [c["id"] for c in courses] == ["c1", "c2"]
+    assert missing == ["c9"]
+    assert courses[0]["description"] == "x" * DESCRIPTION_PREVIEW_CHARS + "..."
+    assert courses[0]["similarity_score"] == 0.9
+    assert courses[0]["price"] == 49.0 and courses[0]["affiliate_url"] == ""
+    assert store.popular_categories() == [
+        {"name": "AI", "course_count": 3},
+        {"name": "Business", "course_count": 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental_and_drops_deleted():
+    """測試增量更新只取變動的課程並移除已刪除課程"""
+    t1, t2 = datetime(2025, 1, 1), datetime(2025, 1, 2)
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=[
+        [_row("c1", "AI", updated_at=t1), _row("c2", "Law", updated_at=t1)],  # 首次完整載入
+        [_row("c3", "AI", updated_at=t2)], [{"id": "c1"}, {"id": "c3"}],       # 增量 + 存活 id
+    ])
+    store = CourseMetadataStore()
+
+    assert await store.refresh(_pool(conn)) == 2
+    assert await store.refresh(_pool(conn)) == 1
+
+    assert set(store.snapshot.courses) == {"c1", "c3"}
+    assert store.popular_categories() == [{"name": "AI", "course_count": 2}]
+    assert store.snapshot.watermark == t2
+    incremental_query, watermark = conn.fetch.call_args_list[1].args
+    assert "updated_at > $1" in incremental_query and watermark == t1
+
+
+@pytest.mark.asyncio
+async def test_service_serves_categories_and_metadata_from_snapshot():
+    """測試快照就緒後熱門分類不查詢資料庫，缺少的課程才依主鍵補查"""
+    service = CourseSearchService()
+    service.metadata_store = CourseMetadataStore()
+    service.metadata_store.apply([_row("c1", "AI"), _row("c2", "AI")])
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[_row("c3")])
+    service._connection_pool = _pool(conn)
+    service.initialize = AsyncMock()
+
+    assert await service.get_popular_categories() == [{"name": "AI", "course_count": 2}]
+    conn.fetch.assert_not_called()
+
+    courses = await service._hydrate([("c3", 0.9), ("c1", 0.8)])
+
+    assert [c["id"] for c in courses] == ["c3", "c1"]
+    assert courses[0]["similarity_score"] == 0.9
+    assert conn.fetch.call_args.args[1] == ["c3"]
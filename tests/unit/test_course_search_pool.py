@@ -0,0 +1,67 @@
+"""Test course search connection pool and SQL caching"""
+import re
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services import course_search
+from src.services.course_search import (
+    CourseSearchService,
+    _search_courses_sql,
+    _vector_search_v2_sql,
+)
+
+
+def _max_placeholder(sql: str) -> int:
+    return max(int(n) for n in re.findall(r"\$(\d+)", sql))
+
+
+def test_sql_is_cached_per_filter_shape():
+    """測試 SQL 依過濾形狀快取，且參數位置正確"""
+    sql = _search_courses_sql(("provider", "max_price"), 2)
+    assert _search_courses_sql(("provider", "max_price"), 2) is sql
+    assert "c.price <= $4" in sql
+    assert "c.category IN ($5,$6)" in sql
+    assert _max_placeholder(sql) == 7  # embedding, threshold, 2 filters, 2 categories, limit
+
+    assert _vector_search_v2_sql(0) is _vector_search_v2_sql(0)
+    assert _max_placeholder(_vector_search_v2_sql(3)) == 6
+
+
+@pytest.mark.asyncio
+async def test_pool_registers_vector_once_per_connection():
+    """測試連線池以 init hook 註冊 pgvector，並使用設定的池大小"""
+    service = CourseSearchService()
+    service.embedding_client = MagicMock()
+    service._conn_info = {"host": "h", "database": "d", "user": "u", "password": "p"}
+
+    with patch("src.services.course_search.asyncpg.create_pool", AsyncMock()) as create_pool, \
+         patch("src.services.course_search.get_settings") as mock_settings:
+        mock_settings.return_value.course_db_pool_min_size = 2
+        mock_settings.return_value.course_db_pool_max_size = 8
+        mock_settings.return_value.course_search_backend = "pgvector"
+        mock_settings.return_value.course_metadata_snapshot = False
+        await service.initialize()
+
+    kwargs = create_pool.call_args.kwargs
+    assert kwargs["init"] is course_search._init_connection
+    assert (kwargs["min_size"], kwargs["max_size"]) == (2, 8)
+
+
+@pytest.mark.asyncio
+async def test_categories_use_pool():
+    """測試熱門分類查詢使用連線池而非建立新連線"""
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"category": "AI", "course_count": 3}])
+    service = CourseSearchService()
+    service.embedding_client = MagicMock()
+    service._conn_info = {}
+    service._connection_pool = MagicMock()
+    service._connection_pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    service._connection_pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("src.services.course_search.asyncpg.connect") as connect:
+        categories = await service.get_popular_categories()
+
+    connect.assert_not_called()
+    assert categories == [{"name": "AI", "course_count": 3}]
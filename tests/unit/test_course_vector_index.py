@@ -0,0 +1,235 @@
+"""Test in-process course vector index"""
+import types
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.services import course_vector_index
+from src.services.course_metadata import CourseMetadataStore
+from src.services.course_search import CourseSearchService
+from src.services.course_vector_index import CourseVectorIndex
+
+
+def _upserts(vectors, categories=None):
+    categories = categories or ["Data Science"] * len(vectors)
+    return [
+        (f"c{i}", vector, category)
+        for i, (vector, category) in enumerate(zip(vectors, categories, strict=True))
+    ]
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(50, 16)).astype(np.float32)
+
+
+def _exact(vectors, query, limit, threshold):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    order = [i for i in np.argsort(-scores) if scores[i] >= threshold][:limit]
+    return [f"c{i}" for i in order], scores
+
+
+@pytest.mark.parametrize("quantization", ["float32", "int8"])
+def test_search_matches_exact_cosine(vectors, quantization):
+    """測試索引的 top-k 與門檻結果與精確餘弦相似度一致"""
+    index = CourseVectorIndex(quantization=quantization)
+    index.apply(_upserts(vectors))
+    query = vectors[3] + 0.1
+
+    hits = index.search(query, limit=5, threshold=0.0)
+    expected, scores = _exact(vectors, query, 5, 0.0)
+
+    assert [course_id for course_id, _ in hits][0] == "c3"
+    tolerance = 1e-5 if quantization == "float32" else 2e-2
+    for course_id, score in hits:
+        assert abs(score - scores[int(course_id[1:])]) < tolerance
+    if quantization == "float32":
+        assert [course_id for course_id, _ in hits] == expected
+
+    # 門檻過濾
+    assert all(score >= 0.5 for _, score in index.search(query, limit=50, threshold=0.5))
+    if quantization == "int8":
+        assert index.snapshot.matrix.dtype == np.int8
+
+
+def test_category_filter(vectors):
+    """測試分類過濾"""
+    categories = ["AI" if i % 2 else "Business" for i in range(len(vectors))]
+    index = CourseVectorIndex()
+    index.apply(_upserts(vectors, categories))
+
+    hits = index.search(vectors[1], limit=10, threshold=-1.0, categories=["AI"])
+    assert len(hits) == 10
+    assert all(int(course_id[1:]) % 2 for course_id, _ in hits)
+    assert hits[0][0] == "c1"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert index.search(vectors[1], limit=10, threshold=-1.0, categories=["Law"]) == []
+
+
+def test_apply_is_incremental(vectors):
+    """測試增量更新：取代、刪除並保留未變動的向量"""
+    index = CourseVectorIndex()
+    index.apply(_upserts(vectors[:10]), watermark=datetime(2025, 1, 1))
+    first = index.snapshot
+
+    index.apply([("c0", vectors[20], "AI")], deleted_ids=["c1"],
+                watermark=datetime(2025, 1, 2))
+
+    assert len(index.snapshot) == 9
+    assert "c1" not in index.snapshot.ids
+    assert index.search(vectors[20], 1, 0.0)[0][0] == "c0"
+    assert index.snapshot.watermark == datetime(2025, 1, 2)
+    assert len(first) == 10  # 舊快照不受影響
+
+
+@pytest.mark.asyncio
+async def test_refresh_from_db_uses_watermark(vectors):
+    """測試從資料庫增量更新並偵測刪除"""
+    t1, t2 = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+    def row(i, updated_at):
+        return {"id": f"c{i}", "embedding": vectors[i], "category": "AI", "updated_at": updated_at}
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=[
+        [row(0, t1), row(1, t1)],                  # 首次完整載入
+        [row(2, t2)], [{"id": "c0"}, {"id": "c2"}],  # 增量 + 存活 id
+    ])
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    index = CourseVectorIndex()
+    assert await index.refresh(pool) == 2
+    assert await index.refresh(pool) == 1
+
+    assert set(index.snapshot.ids) == {"c0", "c2"}
+    assert index.snapshot.watermark == t2
+    incremental_query, watermark = conn.fetch.call_args_list[1].args
+    assert "updated_at > $1" in incremental_query and watermark == t1
+
+
+@pytest.mark.asyncio
+async def test_service_uses_index_without_database(vectors):
+    """測試啟用記憶體索引與課程資料快照時搜尋不查詢資料庫"""
+    service = CourseSearchService()
+    service.vector_index = CourseVectorIndex()
+    service.vector_index.apply(_upserts(vectors))
+    service.metadata_store = CourseMetadataStore()
+    service.metadata_store.apply([
+        {"id": f"c{i}", "name": f"c{i}", "description": "", "provider": "Google",
+         "provider_standardized": "Google", "provider_logo_url": "", "current_price": 0,
+         "currency": "USD", "image_url": "", "tracking_url": "", "course_type": "course",
+         "category": "Data Science", "updated_at": None}
+        for i in range(len(vectors))
+    ])
+    service._connection_pool = MagicMock()
+
+    courses = await service._execute_vector_search_v2(
+        embedding=list(vectors[7]), filters={}, limit=3, threshold=0.3
+    )
+
+    assert courses[0]["id"] == "c7"
+    service._connection_pool.acquire.assert_not_called()
+
+
+def test_search_many_matches_single_queries(vectors):
+    """測試批次查詢與逐筆查詢結果一致"""
+    index = CourseVectorIndex(quantization="int8")
+    index.apply(_upserts(vectors))
+    queries = vectors[[2, 9, 30]]
+
+    batched = index.search_many(queries, limit=4, threshold=0.1)
+
+    assert batched == [index.search(query, limit=4, threshold=0.1) for query in queries]
+    assert [hits[0][0] for hits in batched] == ["c2", "c9", "c30"]
+
+
+def test_int8_scores_in_row_chunks(vectors):
+    """測試 int8 矩陣分塊還原計分，結果與整體還原後計分一致"""
+    index = CourseVectorIndex(quantization="int8")
+    index.apply(_upserts(vectors))
+    snapshot = index.snapshot
+    queries = vectors[[1, 7]] / np.linalg.norm(vectors[[1, 7]], axis=1, keepdims=True)
+
+    with patch.object(course_vector_index, "_SCORE_CHUNK_ROWS", 8):
+        chunked = snapshot.scores(queries)
+        single = snapshot.scores(queries[0])
+
+    assert chunked.dtype == np.float32 and chunked.shape == (2, len(vectors))
+    np.testing.assert_allclose(chunked, queries @ snapshot.vectors().T, atol=1e-5)
+    np.testing.assert_allclose(single, chunked[0], atol=1e-6)
+
+
+class _FakeHnswIndex:
+    """以暴力搜尋模擬 hnswlib.Index（僅實作索引用到的 API）"""
+
+    builds = 0
+
+    def __init__(self, space, dim):
+        self.items: dict[int, np.ndarray] = {}
+        self.deleted: set[int] = set()
+        self.count = 0
+
+    def init_index(self, max_elements, ef_construction, M):  # noqa: N803 - hnswlib 的參數名稱
+        _FakeHnswIndex.builds += 1
+        self.max_elements = max_elements
+
+    def add_items(self, data, ids):
+        assert self.count + len(ids) <= self.max_elements
+        for vector, label in zip(data, ids, strict=True):
+            self.items[int(label)] = vector
+        self.count += len(ids)
+
+    def mark_deleted(self, label):
+        self.deleted.add(label)
+
+    def get_current_count(self):
+        return self.count
+
+    def get_max_elements(self):
+        return self.max_elements
+
+    def set_ef(self, ef):
+        pass
+
+    def knn_query(self, queries, k):
+        live = [label for label in self.items if label not in self.deleted]
+        matrix = np.stack([self.items[label] for label in live])
+        labels, distances = [], []
+        for query in np.atleast_2d(queries):
+            order = np.argsort(-(matrix @ query))[:k]
+            labels.append([live[i] for i in order])
+            distances.append([1.0 - float(matrix[i] @ query) for i in order])
+        return np.array(labels), np.array(distances)
+
+
+def test_refresh_updates_hnsw_graph_incrementally(vectors):
+    """測試更新時沿用 HNSW 圖：只加入新列並標記刪除，刪除過多時才重建"""
+    _FakeHnswIndex.builds = 0
+    fake_hnswlib = types.SimpleNamespace(Index=_FakeHnswIndex)
+    with patch.dict("sys.modules", {"hnswlib": fake_hnswlib}):
+        index = CourseVectorIndex(use_hnsw=True)
+        index.apply(_upserts(vectors[:40]))
+        graph = index.snapshot.graph
+        old = index.snapshot
+
+        index.apply([("c0", vectors[45], "AI"), ("c40", vectors[40], "AI")], deleted_ids=["c1"])
+
+        assert index.snapshot.graph is graph and _FakeHnswIndex.builds == 1
+        assert graph.count == 42 and len(graph.deleted) == 2  # c0 的舊向量與 c1
+        assert index.search(vectors[45], 1, 0.0)[0][0] == "c0"
+        assert index.search(vectors[40], 1, 0.0)[0][0] == "c40"
+        assert "c1" not in [course_id for course_id, _ in index.search(vectors[1], 40, -1.0)]
+        # 更新期間仍在使用舊快照的查詢會略過新快照加入的標籤
+        query = vectors[40] / np.linalg.norm(vectors[40])
+        stale_hits = index._search_graph(old, query[None, :], 3, -1.0)[0]
+        assert stale_hits and all(course_id != "c40" for course_id, _ in stale_hits)
+
+        index.apply(deleted_ids=[f"c{i}" for i in range(2, 12)])
+        assert _FakeHnswIndex.builds == 2 and index.snapshot.graph is not graph
+        assert index.search(vectors[20], 1, 0.0)[0][0] == "c20"
@@ -0,0 +1,51 @@
+"""Test embedding client binary transport"""
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from src.services.embedding_client import AzureEmbeddingClient, decode_embedding
+from src.services.index_calculation import cosine_similarity
+
+
+def _b64(values):
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode()
+
+
+def test_decode_embedding_base64_and_float():
+    """測試 base64 與 JSON 浮點數兩種格式皆解碼為 float32"""
+    decoded = decode_embedding(_b64([0.5, -1.25, 3.0]))
+    assert decoded.dtype == np.float32
+    assert decoded.tolist() == [0.5, -1.25, 3.0]
+
+    fallback = decode_embedding([0.5, 2.0])
+    assert fallback.dtype == np.float32
+    assert fallback.tolist() == [0.5, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_create_embeddings_requests_base64():
+    """測試請求 base64 格式並依 index 排序回傳 float32 陣列"""
+    client = AzureEmbeddingClient("https://example.com/embeddings", "key")
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"data": [
+        {"index": 1, "embedding": _b64([0.0, 1.0])},
+        {"index": 0, "embedding": _b64([1.0, 0.0])},
+    ]}
+    client.client = MagicMock()
+    client.client.post = AsyncMock(return_value=response)
+
+    embeddings = await client.create_embeddings(["a", "b"])
+
+    assert client.client.post.call_args.kwargs["json"]["encoding_format"] == "base64"
+    assert [e.tolist() for e in embeddings] == [[1.0, 0.0], [0.0, 1.0]]
+    assert all(e.dtype == np.float32 for e in embeddings)
+
+
+def test_cosine_similarity():
+    """測試餘弦相似度計算"""
+    a = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+    assert cosine_similarity(a, a) == pytest.approx(1.0, abs=1e-6)
+    assert cosine_similarity(a, -a) == pytest.approx(-1.0, abs=1e-6)
+    assert cosine_similarity(a, np.zeros(3)) == 0.0
@@ -0,0 +1,91 @@
+"""Test concurrent course embedding pipeline"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from src.services.etl.embedding_pipeline import EmbeddingPipeline, content_hash
+
+
+def _courses(count, stored=None):
+    stored = stored or {}
+    return [(f"c{i}", f"Course Title: course number {i}", stored.get(f"c{i}")) for i in range(count)]
+
+
+class SlowClient:
+    """記錄同時進行請求數的假 embedding client"""
+
+    def __init__(self, fail_on=None):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def create_embeddings(self, texts):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.fail_on and any(self.fail_on in text for text in texts):
+            raise ValueError("bad batch")
+        return [np.ones(4, dtype=np.float32) for _ in texts]
+
+
+def test_plan_skips_unchanged_and_checkpointed(tmp_path):
+    """測試文本未變動與 checkpoint 已完成的課程會被跳過"""
+    checkpoint = tmp_path / "checkpoint.json"
+    text1 = "Course Title: course number 1"
+    checkpoint.write_text(json.dumps({"completed": {"c1": content_hash(text1)}}))
+    pipeline = EmbeddingPipeline(MagicMock(), checkpoint_path=checkpoint)
+
+    stored = {"c0": content_hash("Course Title: course number 0"), "c2": "old-hash"}
+    jobs = pipeline.plan(_courses(3, stored) + [("c3", "short", None)])
+
+    assert [job.course_id for job in jobs] == ["c2"]
+    assert pipeline.stats["unchanged"] == 1
+    assert pipeline.stats["resumed"] == 1
+    assert pipeline.stats["too_short"] == 1
+    assert content_hash(text1) != content_hash(text1, model="other-model")
+
+
+@pytest.mark.asyncio
+async def test_run_keeps_batches_in_flight_and_bulk_writes(tmp_path):
+    """測試多個批次並行、以 executemany 寫入並於完成後清除 checkpoint"""
+    client = SlowClient()
+    checkpoint = tmp_path / "checkpoint.json"
+    pipeline = EmbeddingPipeline(client, concurrency=3, batch_size=2, checkpoint_path=checkpoint)
+    conn = MagicMock()
+    conn.executemany = AsyncMock()
+    progress = []
+
+    stats = await pipeline.run(conn, pipeline.plan(_courses(10)), on_progress=progress.append)
+
+    assert stats["processed"] == 10 and stats["errors"] == 0
+    assert client.max_in_flight == 3
+    assert conn.executemany.await_count == 5
+    rows = [row for call in conn.executemany.await_args_list for row in call.args[1]]
+    assert sorted(row[0] for row in rows) == sorted(f"c{i}" for i in range(10))
+    assert rows[0][3] == content_hash({c[0]: c[1] for c in _courses(10)}[rows[0][0]])
+    assert progress[-1]["processed"] == 10
+    assert not checkpoint.exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_checkpoint_for_resume(tmp_path, monkeypatch):
+    """測試批次失敗時保留 checkpoint，重新執行只處理未完成的課程"""
+    monkeypatch.setattr("src.core.retry.asyncio.sleep", AsyncMock())
+    checkpoint = tmp_path / "checkpoint.json"
+    conn = MagicMock()
+    conn.executemany = AsyncMock()
+
+    first = EmbeddingPipeline(SlowClient(fail_on="number 3"), batch_size=2, checkpoint_path=checkpoint)
+    stats = await first.run(conn, first.plan(_courses(6)))
+    assert stats["processed"] == 4 and stats["errors"] == 2
+    assert set(json.loads(checkpoint.read_text())["completed"]) == {"c0", "c1", "c4", "c5"}
+
+    second = EmbeddingPipeline(SlowClient(), batch_size=2, checkpoint_path=checkpoint)
+    jobs = second.plan(_courses(6))
+    assert [job.course_id for job in jobs] == ["c2", "c3"]
+    await second.run(conn, jobs)
+    assert not checkpoint.exists()
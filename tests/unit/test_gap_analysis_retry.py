@@ -553,4 +553,39 @@ class TestGapAnalysisRetryMechanism:
         assert not any(
             call[0][0] == "GapAnalysisRetryAttempt" 
             for call in mock_monitoring.track_event.call_args_list
-        )
\ No newline at end of file
+        )
+
+    @patch('src.services.gap_analysis.get_azure_openai_client')
+    @patch('src.services.gap_analysis.UnifiedPromptService')
+    @patch('src.services.gap_analysis.monitoring_service')
+    async def test_client_timeouts_are_not_retried_again(
+        self, mock_monitoring, mock_prompt_service, mock_get_client
+    ):
+        """測試 client 已重試完的逾時不會再被外層重試（HTTP 嘗試次數不相乘）"""
+        import httpx
+
+        from src.services.openai_client import AzureOpenAITimeoutError
+        from src.services.openai_client_gpt41 import AzureOpenAIGPT41Client
+        
+        mock_prompt_config = Mock()
+        mock_prompt_config.get_system_prompt = lambda: "System prompt"
+        mock_prompt_config.format_user_prompt = lambda **kwargs: "User prompt"
+        mock_prompt_service.return_value.get_prompt_config.return_value = mock_prompt_config
+        
+        client = AzureOpenAIGPT41Client("https://example.openai.azure.com", "key", "gpt-4-1-mini")
+        client.client.post = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+        mock_get_client.return_value = client
+        
+        with patch('asyncio.sleep', new_callable=AsyncMock):
+            service = GapAnalysisService()
+            with pytest.raises(AzureOpenAITimeoutError, match="Request timeout after 3 attempts"):
+                await service.analyze_gap(
+                    job_description="Python developer",
+                    resume="Python experience",
+                    job_keywords=["Python"],
+                    matched_keywords=["Python"],
+                    missing_keywords=[],
+                    language="en"
+                )
+        
+        assert client.client.post.call_count <= client.retry_policy.max_attempts
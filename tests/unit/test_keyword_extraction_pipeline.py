@@ -156,7 +156,7 @@ class TestPromptManagement:
         service = get_unified_prompt_service()
         assert isinstance(service, UnifiedPromptService)
         assert hasattr(service, 'simple_prompt_manager')
-        assert hasattr(service, '_cache')
+        assert service.registry is service.simple_prompt_manager.registry
     
     def test_multilingual_prompt_loading(self):
         """Test loading prompts for different languages."""
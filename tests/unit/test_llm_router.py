@@ -0,0 +1,155 @@
+"""Test LLM routing: circuit breakers, failover and hedging across deployments"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services import llm_router
+from src.services.llm_router import CircuitBreaker, LLMRouter, get_deployment_health
+from src.services.openai_client import AzureOpenAIClient, AzureOpenAIError
+
+
+class FakeClient:
+    def __init__(self, name: str, delay: float = 0.0, fail: bool | Exception = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.fail, Exception):
+            raise self.fail
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return {"choices": [{"message": {"content": f" {self.name} "}}]}
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _fresh_health():
+    llm_router._health.clear()
+    with patch("src.core.monitoring_service.monitoring_service.track_event"):
+        yield
+    llm_router._health.clear()
+
+
+def _router(primary: FakeClient, backup: FakeClient, hedge: bool = False) -> LLMRouter:
+    return LLMRouter(
+        "keywords",
+        primary=primary.name,
+        factories={primary.name: lambda: primary, backup.name: lambda: backup},
+        hedge=hedge,
+    )
+
+
+def test_breaker_opens_on_error_rate_and_recovers_after_probe():
+    """測試錯誤率超過門檻時斷路、冷卻後只放行一個探測請求，成功即復原"""
+    now = [0.0]
+    breaker = CircuitBreaker("gpt4o-2", error_rate=0.5, min_calls=4, open_seconds=30, clock=lambda: now[0])
+    for ok in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(ok, 100)
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 31
+    assert breaker.available() and breaker.allow()
+    assert breaker.state == "half_open" and not breaker.allow()
+    breaker.record(True, 100)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_failover_and_open_circuit_skip_unhealthy_deployment():
+    """測試主要部署失敗時改用備援，斷路後不再呼叫主要部署"""
+    primary, backup = FakeClient("gpt41-mini", fail=True), FakeClient("gpt4o-2")
+    router = _router(primary, backup)
+    with patch("src.core.config.settings.llm_breaker_min_calls", 3):
+        for _ in range(5):
+            assert await router.complete_text("jd") == "gpt4o-2"
+
+    assert primary.calls == 3
+    assert get_deployment_health("gpt41-mini").breaker.state == "open"
+    assert llm_router.router_stats()["gpt41-mini"]["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_caller_error_neither_fails_over_nor_opens_circuit():
+    """測試 400 等請求本身的錯誤直接回傳，不切換部署也不計入斷路器錯誤率"""
+    bad_request = AzureOpenAIError("API error (400): content filter", status_code=400)
+    primary, backup = FakeClient("gpt41-mini", fail=bad_request), FakeClient("gpt4o-2")
+    for hedge in (False, True):
+        router = _router(primary, backup, hedge=hedge)
+        with patch("src.core.config.settings.llm_breaker_min_calls", 3):
+            for _ in range(6):
+                with pytest.raises(AzureOpenAIError) as exc:
+                    await router.complete_text("jd")
+                assert exc.value is bad_request
+
+    assert primary.calls == 12 and backup.calls == 0
+    assert get_deployment_health("gpt41-mini").breaker.state == "closed"
+    assert llm_router.router_stats()["gpt41-mini"]["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_throttled_primary_fails_over_without_client_backoff():
+    """測試主要部署 429 時直接改用備援，不先在 client 內等待 Retry-After 重試"""
+    primary = AzureOpenAIClient("https://example.openai.azure.com", "key")
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "5"}, text="busy")
+    throttled.json.return_value = {"error": {"message": "rate limited"}}
+    primary.client.post = AsyncMock(return_value=throttled)
+    backup = FakeClient("gpt4o-2")
+    router = LLMRouter(
+        "keywords",
+        primary="gpt41-mini",
+        factories={"gpt41-mini": lambda: primary, "gpt4o-2": lambda: backup},
+    )
+
+    with patch("src.core.retry.RetryState.sleep", AsyncMock()) as sleep:
+        assert await router.complete_text("jd") == "gpt4o-2"
+
+    sleep.assert_not_awaited()
+    assert primary.client.post.call_count == 1 and backup.calls == 1
+    await primary.close()
+
+
+@pytest.mark.asyncio
+async def test_hedge_to_backup_after_primary_percentile():
+    """測試主要部署超過其近期 p95 未回應時送往備援，採用先完成者並取消較慢的呼叫"""
+    primary, backup = FakeClient("gpt41-mini", delay=0.01), FakeClient("gpt4o-2", delay=0.01)
+    router = _router(primary, backup, hedge=True)
+    with patch("src.core.config.settings.llm_hedge_min_delay_ms", 0.0):
+        for _ in range(llm_router._MIN_LATENCY_SAMPLES):
+            assert await router.complete_text("jd") == "gpt41-mini"
+        assert backup.calls == 0
+
+        primary.delay = 1.0
+        assert await router.complete_text("jd") == "gpt4o-2"
+        await asyncio.sleep(0)
+
+    assert primary.cancelled == 1
+    stats = llm_router.router_stats()["gpt41-mini"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_factory_returns_router_with_configured_primary():
+    """測試 get_llm_client_smart 依 LLM_MODEL_* 設定回傳以該模型為主要部署的 router"""
+    from src.services.llm_factory import get_llm_client_smart
+
+    with patch("src.core.config.settings.llm_model_keywords", "gpt41-mini"):
+        router = get_llm_client_smart("keywords")
+    assert isinstance(router, LLMRouter)
+    assert router.primary == "gpt41-mini" and router.hedge
+
+    with patch("src.core.config.settings.llm_router_enabled", False), \
+            patch("src.services.llm_factory._create_client", return_value="direct"):
+        assert get_llm_client_smart("gap_analysis") == "direct"
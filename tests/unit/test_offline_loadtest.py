@@ -0,0 +1,153 @@
+"""Test the offline load testing suite (mock Azure OpenAI, in-memory catalog, runner)"""
+import random
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.loadtest.mock_openai import (
+    LatencyModel,
+    MockAzureOpenAI,
+    RouteConfig,
+    embed_text,
+)
+from src.loadtest.runner import (
+    InProcessTarget,
+    Sample,
+    compare_reports,
+    parse_server_timing,
+    percentile,
+    run_scenario,
+    summarize,
+)
+from src.loadtest.scenarios import SCENARIOS
+from src.services.embedding_client import AzureEmbeddingClient
+from src.services.openai_client import AzureOpenAIClient, AzureOpenAIRateLimitError
+
+
+@pytest_asyncio.fixture
+async def mock_server():
+    mock = MockAzureOpenAI(seed=1)
+    await mock.start()
+    yield mock
+    await mock.stop()
+
+
+def test_latency_model_parsing_and_sampling():
+    """測試延遲分佈規格解析與取樣"""
+    rng = random.Random(0)
+    assert LatencyModel.parse("fixed:50").sample(rng) == 50
+    uniform = LatencyModel.parse("uniform:10:20")
+    assert all(10 <= uniform.sample(rng) <= 20 for _ in range(100))
+    lognormal = LatencyModel.parse("lognormal:800:0.4")
+    samples = sorted(lognormal.sample(rng) for _ in range(2001))
+    assert 700 < samples[1000] < 900  # 中位數約為 median
+    assert str(lognormal) == "lognormal:800:0.4"
+
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1")
+
+
+@pytest.mark.asyncio
+async def test_mock_speaks_chat_wire_format(mock_server):
+    """測試 app 的 Azure OpenAI 客戶端可直接對 mock 呼叫（一般與串流）"""
+    client = AzureOpenAIClient(mock_server.url, "key")
+    try:
+        messages = [{"role": "user", "content": "Return the keywords as JSON"}]
+        response = await client.chat_completion(messages=messages)
+        assert '"keywords"' in response["choices"][0]["message"]["content"]
+        assert response["usage"]["total_tokens"] > 0
+
+        chunks = [chunk async for chunk in await client.chat_completion(messages=messages, stream=True)]
+        streamed = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+        assert streamed == response["choices"][0]["message"]["content"]
+    finally:
+        await client.close()
+
+    assert mock_server.stats["chat"].calls == 2
+
+
+@pytest.mark.asyncio
+async def test_mock_injects_429_with_retry_after(mock_server):
+    """測試 429 注入帶 Retry-After，客戶端以重試引擎處理"""
+    mock_server.routes["chat"] = RouteConfig(error_rate_429=1.0, retry_after=0.01)
+    client = AzureOpenAIClient(mock_server.url, "key")
+    client.retry_policy = client.retry_policy.__class__(max_attempts=2, base_delay=0.01)
+    try:
+        with pytest.raises(AzureOpenAIRateLimitError):
+            await client.chat_completion(messages=[{"role": "user", "content": "hi"}])
+    finally:
+        await client.close()
+
+    assert mock_server.stats["chat"].throttled == 2
+
+
+@pytest.mark.asyncio
+async def test_mock_embeddings_are_deterministic_base64(mock_server):
+    """測試 embeddings 以 base64 傳輸且與 embed_text 一致（共享詞彙的文字較相似）"""
+    url = f"{mock_server.url}/openai/deployments/text-embedding-3-small/embeddings?api-version=2023-05-15"
+    client = AzureEmbeddingClient(url, "key")
+    try:
+        python, kube = await client.create_embeddings(["Python programming", "Kubernetes clusters"])
+    finally:
+        await client.close()
+
+    assert python.dtype == np.float32 and python.shape == (1536,)
+    np.testing.assert_allclose(python, embed_text("Python programming", 1536), rtol=1e-6)
+    course = embed_text("Applied Python with SQL", 1536)
+    assert float(course @ python) > float(course @ kube)
+
+
+def test_report_statistics_and_regressions():
+    """測試百分位數、Server-Timing 解析與基準比較"""
+    assert percentile([], 50) is None
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile(list(range(101)), 99) == 99
+    assert parse_server_timing('db;dur=12.5, llm;desc="chat";dur=800, cache') == {"db": 12.5, "llm": 800.0}
+
+    scenario = SCENARIOS["course-search"]
+    samples = [Sample(latency_ms=100 + i, status=200, server_ms=90 + i, stages={"llm": 50}) for i in range(10)]
+    samples.append(Sample(latency_ms=5, status=599, success=False, error="ClientError"))
+    result = summarize(scenario, 4, samples, 2.0, {"chat": {"calls": 22, "latency_ms_total": 1100.0}})
+    assert result["errors"] == 1 and result["exceptions"] == {"ClientError": 1}
+    assert result["throughput_rps"] == 5.5
+    assert result["stages"]["outside_app"]["p50"] == 10
+    assert result["stages"]["llm"]["p95"] == 50
+    assert result["upstream"]["chat"]["calls_per_request"] == 2
+
+    baseline = {"results": [result]}
+    slower = {**result, "latency_ms": {**result["latency_ms"], "p95": result["latency_ms"]["p95"] * 1.5}}
+    assert compare_reports(baseline, {"results": [result]}) == []
+    regressions = compare_reports(baseline, {"results": [slower]})
+    assert len(regressions) == 1 and "p95" in regressions[0]
+
+
+@pytest.mark.asyncio
+async def test_course_search_scenario_runs_in_process(mock_server):
+    """測試以記憶體課程目錄與 mock embeddings 在程序內跑完課程搜尋情境"""
+    from src.core import readiness as readiness_module
+    from src.loadtest.course_store import build_course_search_service
+    from src.main import create_app
+    from src.services.course_search_singleton import CourseSearchSingleton
+
+    url = f"{mock_server.url}/openai/deployments/text-embedding-3-small/embeddings?api-version=2023-05-15"
+    with patch.object(readiness_module, "_readiness", None), \
+            patch("src.main.settings.startup_warm_llm_endpoints", False), \
+            patch("src.core.config.settings.course_embedding_endpoint", url), \
+            patch("src.core.config.settings.course_embedding_api_key", "key"), \
+            patch("src.core.config.settings.course_cache_warm_skills", ""), \
+            patch.object(CourseSearchSingleton, "_instance", build_course_search_service(count=200)):
+        service = CourseSearchSingleton._instance
+        hits = (await service.search_courses_v2("Kubernetes", limit=3)).data.results
+        assert hits and all("Kubernetes" in course.name for course in hits)
+
+        target = InProcessTarget(create_app())
+        try:
+            result = await run_scenario(target, SCENARIOS["course-search"], 4, 12, warmup=2, mock=mock_server)
+        finally:
+            await target.close()
+
+    assert result["errors"] == 0 and result["requests"] == 12
+    assert result["upstream"]["embeddings"]["calls_per_request"] == 1
+    assert result["stages"]["server"]["p50"] > 0
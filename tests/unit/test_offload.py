@@ -0,0 +1,78 @@
+"""Test CPU offload of large inputs and the event loop lag monitor"""
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.core.loop_monitor import LoopLagMonitor
+from src.core.offload import run_cpu, shutdown_cpu_pools
+from src.core.tracing import end_trace, span, start_trace
+
+
+def _where(text: str) -> tuple[int, int]:
+    with span("html_postprocess"):
+        return os.getpid(), threading.get_ident()
+
+
+def _blocking_telemetry_flush() -> None:
+    time.sleep(0.25)
+
+
+@pytest.fixture(autouse=True)
+def _pools():
+    yield
+    shutdown_cpu_pools()
+
+
+@pytest.mark.asyncio
+async def test_small_inputs_run_inline_large_inputs_in_pool():
+    """測試小輸入在事件迴圈執行、大輸入交給執行緒池且保留 tracing context"""
+    loop_thread = threading.get_ident()
+    with patch("src.core.config.settings.cpu_offload_min_chars", 100):
+        assert (await run_cpu(_where, "x" * 10, size=10))[1] == loop_thread
+
+        trace, token = start_trace("offload")
+        try:
+            pid, thread = await run_cpu(_where, "x" * 500, size=500)
+        finally:
+            end_trace(token)
+        assert pid == os.getpid() and thread != loop_thread
+        assert [s.name for s in trace.spans] == ["html_postprocess"]
+
+        with patch("src.core.config.settings.cpu_offload_mode", "off"):
+            assert (await run_cpu(_where, "x" * 500, size=500))[1] == loop_thread
+
+
+@pytest.mark.asyncio
+async def test_process_mode_only_takes_isolated_calls():
+    """測試 process 模式只將 isolated 呼叫送往行程池"""
+    with patch("src.core.config.settings.cpu_offload_mode", "process"), \
+            patch("src.core.config.settings.cpu_offload_workers", 1):
+        pid, _ = await run_cpu(_where, "x", isolated=True)
+        assert pid != os.getpid()
+        pid, thread = await run_cpu(_where, "x")
+        assert pid == os.getpid() and thread != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_blocking_callback():
+    """測試 lag 監控記錄阻塞事件迴圈的呼叫與時間"""
+    monitor = LoopLagMonitor(interval=0.02, block_threshold_ms=100)
+    with patch("src.core.monitoring_service.monitoring_service.track_event") as track:
+        monitor.start()
+        await asyncio.sleep(0.1)
+        _blocking_telemetry_flush()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    assert monitor.blocked_count == 1
+    stall = monitor.stalls[0]
+    assert stall["lag_ms"] >= 200
+    assert "_blocking_telemetry_flush" in stall["blocked_in"]
+    track.assert_called_once_with("EventLoopBlocked", stall)
+
+    stats = monitor.stats()
+    assert not stats["running"] and stats["lag_ms"]["max"] >= 200
@@ -0,0 +1,150 @@
+"""Test the sampling profiler (stack samples, loop lag, slow callbacks, endpoints)"""
+import asyncio
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.profiler import (
+    IDLE_FRAME,
+    Profile,
+    ProfilerBusyError,
+    ProfilerService,
+    SamplingProfiler,
+)
+
+
+def _blocking_flush(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_profiler_catches_blocking_call_on_loop():
+    """測試在事件迴圈上的阻塞呼叫被記為 slow callback 並附上取樣堆疊"""
+    profiler = SamplingProfiler(interval=0.002, slow_callback_ms=80)
+    profiler.start()
+    await asyncio.sleep(0.05)
+    _blocking_flush(0.2)
+    await asyncio.sleep(0.05)
+    profile = await profiler.stop()
+
+    assert profile.samples > 20
+    assert max(profile.lags_ms) >= 150
+    assert len(profile.slow_callbacks) == 1
+    stall = profile.slow_callbacks[0]
+    assert stall["lag_ms"] >= 150
+    assert "_blocking_flush" in stall["stacks"][0]["stack"]
+    assert "_blocking_flush" in profile.top_functions(1)[0]["function"]
+    assert profile.idle_ratio > 0
+
+
+def test_idle_detected_under_uvloop():
+    """測試 uvloop（C 實作的迴圈）閒置時記為 idle，而非迴圈啟動函式的自身時間"""
+    uvloop = pytest.importorskip("uvloop")
+
+    async def session():
+        profiler = SamplingProfiler(interval=0.002, slow_callback_ms=1000)
+        profiler.start()
+        await asyncio.sleep(0.15)
+        _blocking_flush(0.05)
+        await asyncio.sleep(0.05)
+        return await profiler.stop()
+
+    profile = uvloop.run(session())
+
+    assert 0.4 < profile.idle_ratio < 1.0
+    assert "_blocking_flush" in profile.top_functions(1)[0]["function"]
+
+
+def test_profile_exports():
+    """測試 collapsed stacks 與 speedscope 輸出格式"""
+    profile = Profile(interval=0.005)
+    profile.stacks[("main (app.py:1)", "handler (api.py:10)", "dumps (json.py:5)")] = 3
+    profile.stacks[("main (app.py:1)", "handler (api.py:10)")] = 1
+    profile.stacks[(IDLE_FRAME,)] = 6
+
+    lines = profile.collapsed().splitlines()
+    assert lines[0] == f"{IDLE_FRAME} 6"
+    assert "main (app.py:1);handler (api.py:10);dumps (json.py:5) 3" in lines
+    assert profile.idle_ratio == 0.6
+
+    top = profile.top_functions()
+    assert top[0] == {"function": "dumps (json.py:5)", "self_samples": 3, "self_pct": 75.0, "total_pct": 75.0}
+
+    speedscope = profile.speedscope("test")
+    frames = [f["name"] for f in speedscope["shared"]["frames"]]
+    sampled = speedscope["profiles"][0]
+    assert sampled["type"] == "sampled" and len(sampled["samples"]) == 3
+    assert sum(sampled["weights"]) == 50.0
+    assert [frames[i] for i in sampled["samples"][1]][-1] == "dumps (json.py:5)"
+
+
+@pytest.mark.asyncio
+async def test_one_session_per_worker():
+    """測試同一 worker 同時只允許一個分析工作階段"""
+    service = ProfilerService(keep=1)
+    async with service.session(0.005, 100):
+        with pytest.raises(ProfilerBusyError):
+            await service.profile_for(0.01, 0.005, 100)
+    assert not service.active
+
+    service.keep("a", Profile(0.005))
+    service.keep("b", Profile(0.005))
+    assert service.get("a") is None and service.get("b") is not None
+
+
+def test_profile_endpoints_require_token():
+    """測試分析端點需要 token，並支援以 X-Profile 分析單一請求"""
+    from src.core import profiler as profiler_module
+    from src.main import create_app
+
+    client = TestClient(create_app())
+    assert client.post("/debug/profile", params={"seconds": 0.05}).status_code == 404
+
+    with patch("src.core.config.settings.profiler_token", "s3cret"), \
+            patch.object(profiler_module, "_service", ProfilerService()):
+        assert client.post("/debug/profile", params={"seconds": 0.05},
+                           headers={"X-Profiler-Token": "wrong"}).status_code == 403
+
+        token = {"X-Profiler-Token": "s3cret"}
+        report = client.post("/debug/profile", params={"seconds": 0.05, "interval_ms": 2}, headers=token)
+        assert report.status_code == 200
+        assert report.json()["data"]["samples"] > 0
+        assert client.post("/debug/profile", params={"seconds": 3600}, headers=token).status_code == 400
+
+        response = client.get("/health", headers={**token, "X-Profile": "1", "X-Correlation-ID": "prof-1"})
+        assert response.headers["X-Profile-ID"] == "prof-1"
+        collapsed = client.get("/debug/profile/prof-1", params={"output": "collapsed"}, headers=token)
+        assert collapsed.status_code == 200 and collapsed.headers["content-type"].startswith("text/plain")
+        speedscope = client.get("/debug/profile/prof-1", params={"output": "speedscope"}, headers=token)
+        assert speedscope.json()["profiles"][0]["type"] == "sampled"
+        assert client.get("/debug/profile/missing", headers=token).status_code == 404
+
+        # 沒有 token 的 X-Profile 不啟動分析
+        assert "X-Profile-ID" not in client.get("/health", headers={"X-Profile": "1"}).headers
+
+
+def test_stall_report_tolerates_concurrent_samples():
+    """測試取樣執行緒持續寫入時產生 slow callback 報告不會因 deque 變動而失敗"""
+    profiler = SamplingProfiler()
+    stop = threading.Event()
+
+    def _append():
+        while not stop.is_set():
+            profiler._timeline.append((time.perf_counter_ns(), ("worker",)))
+
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    writer = threading.Thread(target=_append)
+    writer.start()
+    try:
+        for _ in range(200):
+            profiler._record_stall(0, time.perf_counter_ns(), 150.0)
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(switch)
+    assert len(profiler.profile.slow_callbacks) == 200
@@ -0,0 +1,105 @@
+"""Test process-wide prompt registry"""
+import pytest
+import yaml
+
+from src.core.prompt_registry import PromptRegistry, get_prompt_registry
+from src.core.prompt_template import PromptTemplate
+from src.services.unified_prompt_service import UnifiedPromptService
+
+
+def _write_prompt(task_dir, filename, version, user="Analyze: {job_description}",
+                  status="active"):
+    task_dir.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": version,
+        "metadata": {"status": status},
+        "prompts": {"system": "You are helpful.", "user": user},
+    }
+    (task_dir / filename).write_text(yaml.safe_dump(data), encoding="utf-8")
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """建立暫存 prompts 目錄"""
+    task_dir = tmp_path / "demo"
+    _write_prompt(task_dir, "v1.2.0-en.yaml", "1.2.0")
+    _write_prompt(task_dir, "v1.10.0-en.yaml", "1.10.0", status="testing")
+    _write_prompt(task_dir, "v1.0.0-zh-TW.yaml", "1.0.0")
+    _write_prompt(task_dir, "v1.0.0.yaml", "1.0.0")
+    return tmp_path
+
+
+def test_template_matches_str_format():
+    """測試預先切分的模板與 str.format 輸出一致"""
+    source = "JD: {job_description}\n{{literal}} {resume} end"
+    template = PromptTemplate.compile(source)
+    variables = {"job_description": "Python", "resume": 42}
+
+    assert template.segments is not None
+    assert template.variables == {"job_description", "resume"}
+    assert template.format(variables) == source.format(**variables)
+
+    with pytest.raises(ValueError, match="Missing required variable"):
+        template.format({"job_description": "x"})
+
+    # 格式規格等進階語法改用 str.format
+    fallback = PromptTemplate.compile("{score:.2f}")
+    assert fallback.segments is None
+    assert fallback.format({"score": 0.5}) == "0.50"
+
+
+def test_registry_indexes_task_language_version(prompts_dir):
+    """測試依任務、語言、版本建立索引"""
+    registry = PromptRegistry(prompts_dir)
+
+    assert registry.list_versions("demo", "en") == ["1.10.0", "1.2.0"]
+    assert registry.latest_version("demo", "en") == "1.10.0"  # 語意版本排序
+    assert registry.list_versions("demo", "zh-TW") == ["1.0.0"]
+    assert registry.list_versions("demo") == ["1.0.0"]
+    assert registry.resolve("demo", "v1.2.0", "en").version == "1.2.0"
+
+    with pytest.raises(FileNotFoundError):
+        registry.resolve("demo", "9.9.9", "en")
+    with pytest.raises(FileNotFoundError):
+        registry.resolve("missing")
+
+
+def test_registry_scans_once(prompts_dir):
+    """測試未啟用監看時只掃描一次"""
+    registry = PromptRegistry(prompts_dir)
+    config = registry.resolve("demo", "1.2.0", "en")
+
+    _write_prompt(prompts_dir / "demo", "v2.0.0-en.yaml", "2.0.0")
+    assert registry.resolve("demo", "1.2.0", "en") is config
+    assert registry.latest_version("demo", "en") == "1.10.0"
+
+    registry.reload()
+    assert registry.latest_version("demo", "en") == "2.0.0"
+    assert registry.reload_count == 1
+
+
+def test_registry_watches_files(prompts_dir):
+    """測試啟用監看時偵測新檔案"""
+    registry = PromptRegistry(prompts_dir, check_interval=0)
+    first = registry.catalog()
+    assert registry.catalog() is first
+
+    _write_prompt(prompts_dir / "demo", "v2.0.0-en.yaml", "2.0.0")
+    assert registry.latest_version("demo", "en") == "2.0.0"
+
+
+def test_unified_service_uses_shared_registry(prompts_dir):
+    """測試每次建立服務共用同一份已解析設定"""
+    first = UnifiedPromptService(str(prompts_dir), task_path="demo")
+    second = UnifiedPromptService(str(prompts_dir), task_path="demo")
+
+    assert first.registry is second.registry is get_prompt_registry(prompts_dir)
+    assert first.get_prompt_config("en") is second.get_prompt_config("en")
+    assert first.list_versions("en") == ["latest", "1.10.0", "1.2.0"]
+    assert first.get_active_version("en") == "1.2.0"
+
+    prompt, _ = first.get_prompt_with_config("en", variables={"job_description": "JD"})
+    assert prompt == "You are helpful.\n\nAnalyze: JD"
+
+    with pytest.raises(ValueError):
+        first.get_prompt_with_config("en", version="9.9.9")
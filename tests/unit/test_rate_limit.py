@@ -0,0 +1,154 @@
+"""Test async token bucket"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.rate_limit import (
+    DeploymentLimiter,
+    QuotaExceededError,
+    TokenBucket,
+    estimate_chat_tokens,
+    priority_scope,
+)
+from src.core.retry import is_exhausted
+from src.services.openai_client import AzureOpenAIClient, AzureOpenAIRateLimitError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_up_to_capacity():
+    """測試 token 依速率補充且不超過容量"""
+    clock = FakeClock()
+    bucket = TokenBucket.per_minute(600, clock=clock)  # 10 tokens/秒
+
+    assert bucket.try_acquire(600)
+    assert not bucket.try_acquire(1)
+
+    clock.now = 3.0
+    assert bucket.available == pytest.approx(30)
+    clock.now = 1000.0
+    assert bucket.available == 600
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_deficit():
+    """測試 token 不足時等待補足所需的時間"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=10, clock=clock)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock.now += delay
+
+    with patch("src.core.rate_limit.asyncio.sleep", fake_sleep):
+        assert await bucket.acquire(10) == 0
+        assert await bucket.acquire(5) == pytest.approx(0.5)
+        # 超過容量的請求以容量計算，仍可被服務
+        assert await bucket.acquire(50) == pytest.approx(1.0)
+
+    assert sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+    assert bucket.waited_seconds == pytest.approx(1.5)
+
+
+def test_limiter_reconciles_usage_and_server_remaining():
+    """測試依實際 usage 退回多預留的 token，並以 x-ratelimit-remaining-* 標頭下修可用量"""
+    clock = FakeClock()
+    limiter = DeploymentLimiter("gpt-4o-2", tpm=60000, rpm=600, clock=clock)  # 10 秒突發：10000 tokens / 100 requests
+    assert limiter.tokens.try_acquire(3000)
+
+    limiter.reconcile(3000, used=1000)
+    assert limiter.tokens.available == pytest.approx(9000)
+
+    limiter.reconcile(0, headers={"x-ratelimit-remaining-tokens": "4000", "x-ratelimit-remaining-requests": "3"})
+    assert limiter.tokens.available == pytest.approx(4000)
+    assert limiter.requests.available == pytest.approx(3)
+
+    limiter.on_throttled(retry_after=2)
+    assert limiter.estimated_wait(1000) == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_credits_only_what_was_charged():
+    """測試超過容量的預留只扣除容量，對帳時以實際扣除量計算退回的 token"""
+    limiter = DeploymentLimiter("gpt-4o-2", tpm=6000, clock=FakeClock())  # 容量 1000
+
+    reservation = await limiter.acquire(5000)
+    assert reservation.tokens == 1000 and limiter.tokens.available == 0
+
+    limiter.reconcile(reservation.tokens, used=300)
+    assert limiter.tokens.available == pytest.approx(700)
+
+    limiter.release((await limiter.acquire(400)).tokens)
+    assert limiter.tokens.available == pytest.approx(700)
+
+
+@pytest.mark.asyncio
+async def test_client_gives_back_quota_of_failed_attempts(monkeypatch):
+    """測試 5xx 失敗的嘗試退回預留的 token，重試不會因自己的預留而排隊"""
+    monkeypatch.setattr("src.core.retry.asyncio.sleep", AsyncMock())
+    client = AzureOpenAIClient("https://example.openai.azure.com", "key", quota_tpm=600)  # 容量 100
+    failed = MagicMock(status_code=503, headers={}, text="busy")
+    failed.json.return_value = {"error": {"message": "busy"}}
+    ok = MagicMock(status_code=200, headers={})
+    ok.json.return_value = {"choices": [{"message": {"content": "ok"}}], "usage": {"total_tokens": 20}}
+    client.client.post = AsyncMock(side_effect=[failed, failed, ok])
+
+    with patch("src.core.config.settings.llm_quota_max_wait_seconds", 0.0):
+        await client.chat_completion([{"role": "user", "content": "hi"}], max_tokens=60)
+
+    assert client.client.post.call_count == 3
+    assert client.limiter.tokens.available == pytest.approx(80, abs=1)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_low_priority_fails_fast_high_priority_queues():
+    """測試配額不足時低優先權立即失敗，高優先權排隊等待並記錄等待時間"""
+    clock = FakeClock()
+    limiter = DeploymentLimiter("gpt-4o-2", tpm=6000, clock=clock)  # 100 tokens/秒，容量 1000
+
+    async def fake_sleep(delay):
+        clock.now += delay
+
+    assert estimate_chat_tokens([{"role": "user", "content": "x" * 400}], 500) == 605
+    with patch("src.core.rate_limit.asyncio.sleep", fake_sleep), \
+            patch("src.core.config.settings.llm_quota_low_priority_max_wait_seconds", 0.5):
+        assert (await limiter.acquire(1000)).waited == 0
+        with priority_scope("low"), pytest.raises(QuotaExceededError) as exc:
+            await limiter.acquire(200)
+        assert exc.value.retry_after == pytest.approx(2.0)
+        assert (await limiter.acquire(200)).waited == pytest.approx(2.0)
+
+    stats = limiter.stats()
+    assert stats["acquired"] == 2 and stats["rejected"] == 1
+    assert stats["max_wait_ms"] == pytest.approx(2000) and stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_client_quota_rejection_is_not_retried():
+    """測試客戶端配額拒絕以 429 回報、不送出請求也不再重試"""
+    client = AzureOpenAIClient("https://example.openai.azure.com", "key", quota_tpm=600)
+    client.client.post = AsyncMock()
+    client.limiter.tokens.limit_to(0)
+
+    with patch("src.core.config.settings.llm_quota_max_wait_seconds", 1.0), \
+            pytest.raises(AzureOpenAIRateLimitError) as exc:
+        await client.chat_completion([{"role": "user", "content": "hi"}], max_tokens=50)
+
+    assert is_exhausted(exc.value)
+    client.client.post.assert_not_called()
+
+    response = MagicMock(status_code=200, headers={"x-ratelimit-remaining-tokens": "80"})
+    response.json.return_value = {"choices": [{"message": {"content": "ok"}}], "usage": {"total_tokens": 10}}
+    client.client.post = AsyncMock(return_value=response)
+    client.limiter.tokens.adjust(100)
+    await client.chat_completion([{"role": "user", "content": "hi"}], max_tokens=50)
+    assert client.limiter.tokens.available == pytest.approx(80, abs=1)
+    await client.close()
@@ -0,0 +1,167 @@
+"""Test startup warm-up, readiness / liveness and the standalone server launcher"""
+import asyncio
+import signal
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.readiness import Readiness, drain_on_signal, warm_endpoints
+from src.serve import APP_FACTORY, gunicorn_argv, main, uvicorn_options
+
+
+@pytest.mark.asyncio
+async def test_ready_after_critical_steps_succeed():
+    """測試關鍵暖機步驟成功且啟動完成後才就緒；非關鍵失敗只標記 degraded"""
+    readiness = Readiness()
+    readiness.register_check("cache", lambda: {"status": "ok", "size": 3})
+
+    assert (await readiness.check())[0] is False  # 啟動尚未完成
+
+    await readiness.run_step("prompts", lambda: None)
+
+    async def unreachable():
+        raise ConnectionError("db down")
+
+    step = await readiness.run_step("course_search", unreachable, critical=False)
+    assert step.status == "error" and step.error == "db down"
+    readiness.startup_complete = True
+
+    ready, details = await readiness.check()
+    assert ready is True
+    assert details["degraded"] is True
+    assert details["checks"]["cache"] == {"status": "ok", "size": 3}
+
+    readiness.draining = True
+    ready, details = await readiness.check()
+    assert ready is False and details["status"] == "draining"
+
+
+@pytest.mark.asyncio
+async def test_critical_failures_and_slow_checks_block_readiness():
+    """測試關鍵步驟失敗或關鍵檢查逾時時不就緒"""
+    readiness = Readiness()
+    readiness.startup_complete = True
+
+    def broken():
+        raise RuntimeError("no snapshot")
+
+    await readiness.run_step("standardization", broken)
+    ready, details = await readiness.check()
+    assert ready is False
+    assert details["warmup"]["standardization"]["status"] == "error"
+
+    readiness = Readiness()
+    readiness.startup_complete = True
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {"status": "ok"}
+
+    readiness.register_check("pool", slow, critical=True)
+    ready, details = await readiness.check(timeout=0.01)
+    assert ready is False
+    assert "timed out" in details["checks"]["pool"]["error"]
+
+    live = await readiness.liveness()
+    assert live["status"] == "alive" and live["loop_latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_sigterm_reports_draining_before_server_shutdown():
+    """測試收到 SIGTERM 立即回報 draining，延遲後才交給伺服器原本的處理函式"""
+    readiness = Readiness()
+    readiness.startup_complete = True
+    forwarded = []
+    original = signal.signal(signal.SIGUSR1, lambda signum, frame: forwarded.append(signum))
+    try:
+        restore = drain_on_signal(readiness, 0.05, signals=(signal.SIGUSR1,))
+        signal.raise_signal(signal.SIGUSR1)
+        ready, details = await readiness.check()
+        assert ready is False and details["status"] == "draining"
+        assert forwarded == []
+
+        await asyncio.sleep(0.1)
+        assert forwarded == [signal.SIGUSR1]
+
+        restore()
+        signal.raise_signal(signal.SIGUSR1)
+        assert forwarded == [signal.SIGUSR1, signal.SIGUSR1]
+    finally:
+        signal.signal(signal.SIGUSR1, original)
+
+
+@pytest.mark.asyncio
+async def test_warm_endpoints_skips_empty_urls():
+    """測試沒有端點時 LLM 連線暖機直接完成"""
+    assert await warm_endpoints(["", None]) == {}
+
+
+def test_health_probes_run_lifespan_warmup():
+    """測試 app lifespan 執行暖機後 /health/ready 回傳就緒，/health/live 可用"""
+    from src.core import readiness as readiness_module
+    from src.main import create_app
+
+    with patch.object(readiness_module, "_readiness", None), \
+            patch("src.main.settings.startup_warm_course_search", False), \
+            patch("src.main.settings.startup_warm_llm_endpoints", False), \
+            TestClient(create_app()) as client:
+        ready = client.get("/health/ready")
+        live = client.get("/health/live")
+
+    assert ready.status_code == 200
+    data = ready.json()["data"]
+    assert data["status"] == "ready"
+    assert set(data["warmup"]) == {"prompts", "standardization"}
+    assert data["checks"]["course_search"] == {"status": "disabled"}
+    assert live.status_code == 200 and live.json()["data"]["status"] == "alive"
+
+
+def test_lifespan_warms_course_cache_and_saves_request_counts():
+    """測試 app lifespan 在課程搜尋服務就緒後於背景預熱快取，關閉時保存查詢次數"""
+    from src.core import readiness as readiness_module
+    from src.main import create_app
+    from src.services.course_search_singleton import CourseSearchSingleton
+
+    service = MagicMock()
+    service.warm_cache_from_requests = AsyncMock(return_value=3)
+    service.health = AsyncMock(return_value={"status": "ok"})
+    service.close = AsyncMock()
+
+    with patch.object(readiness_module, "_readiness", None), \
+            patch.object(CourseSearchSingleton, "_instance", service), \
+            patch("src.main.settings.startup_warm_llm_endpoints", False), \
+            TestClient(create_app()) as client:
+        deadline = time.monotonic() + 5
+        while "course_cache" not in client.get("/health/ready").json()["data"]["warmup"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        warmup = client.get("/health/ready").json()["data"]["warmup"]
+
+    assert warmup["course_search"]["status"] == "ok"
+    assert warmup["course_cache"]["status"] == "ok"
+    service.warm_cache_from_requests.assert_awaited_once()
+    service.save_request_counts.assert_called_once()
+    service.close.assert_awaited_once()
+
+
+def test_server_launch_options():
+    """測試 uvicorn / gunicorn 啟動參數"""
+    parser_args = type("Args", (), {
+        "host": None, "port": 9000, "workers": 3, "reload": False,
+        "log_level": "info", "access_log": False,
+    })()
+
+    options = uvicorn_options(parser_args)
+    assert options["factory"] is True and options["lifespan"] == "on"
+    assert options["port"] == 9000 and options["workers"] == 3
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+
+    argv = gunicorn_argv(parser_args)
+    assert argv[:3] == ["gunicorn", "--config", "gunicorn.conf.py"]
+    assert argv[-1] == f"{APP_FACTORY}()"
+    assert "--workers" in argv and argv[argv.index("--workers") + 1] == "3"
+
+    with pytest.raises(SystemExit):
+        main(["--server", "gunicorn", "--reload"])
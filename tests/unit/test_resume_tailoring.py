@@ -59,6 +59,8 @@ def mock_dependencies():
         mock_html_instance = Mock()
         mock_html_instance.parse_resume.return_value = Mock(sections={}, has_summary=True, total_sections=3)
         mock_html_instance.validate_html_structure.return_value = (True, None)
+        mock_html_instance.normalize_to_html.side_effect = lambda x: x
+        mock_html_instance.standardize_section_titles.side_effect = lambda x: x
         mock_html_instance.count_markers.return_value = {
             "strength": 2, "keyword": 3, "placeholder": 1, "new": 0, "improvement": 2
         }
@@ -325,6 +327,18 @@ class TestResumeTailoringService:
         assert result.resume == "<h1>Optimized</h1>"
         assert service.llm_client.chat_completion.call_count == 3
     
+    def test_original_resume_is_passed_verbatim(self, mock_dependencies, sample_gap_analysis):
+        """Test the resume reaches the prompt unchanged (bullets repeated across jobs are kept)"""
+        resume = (
+            '<h3>Job A</h3><ul><li style="color:red">Led team of 5</li></ul>'
+            '<h3>Job B</h3><ul><li>Led team of 5</li></ul>'
+        )
+        service = ResumeTailoringService()
+        context = service._build_context(
+            "<p>Senior engineer with Python</p>", resume, sample_gap_analysis, "en", True
+        )
+        assert context.original_resume == resume
+    
     def test_parse_llm_response_valid_json(self, mock_dependencies):
         """Test parsing valid JSON LLM response"""
         service = ResumeTailoringService()
@@ -0,0 +1,111 @@
+"""Test shared retry/backoff engine"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.core.retry import (
+    RetryPolicy,
+    RetryState,
+    deadline_scope,
+    get_retry_stats,
+    is_exhausted,
+    parse_retry_after,
+    remaining_time,
+    reset_retry_stats,
+    retry_async,
+)
+from src.services.openai_client import AzureOpenAIRateLimitError
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    """每個測試前重置計數器"""
+    reset_retry_stats()
+    yield
+    reset_retry_stats()
+
+
+def test_parse_retry_after():
+    """測試解析 Retry-After 標頭"""
+    assert parse_retry_after({"Retry-After": "7"}) == 7.0
+    assert parse_retry_after({"retry-after-ms": "1500", "Retry-After": "7"}) == 1.5
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+
+
+def test_decorrelated_jitter_bounds():
+    """測試去相關抖動延遲範圍"""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    previous = None
+    for _ in range(50):
+        delay = policy.next_delay(previous)
+        assert 1.0 <= delay <= 5.0
+        previous = delay
+    assert policy.next_delay(None, retry_after=4.5) >= 4.5
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honored():
+    """測試遵循伺服器建議的等待時間"""
+    calls = AsyncMock(side_effect=[AzureOpenAIRateLimitError("429", retry_after=3.0), "ok"])
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        result = await retry_async(calls, RetryPolicy(base_delay=0.1, max_delay=0.2), "test.op")
+
+    assert result == "ok"
+    assert mock_sleep.await_args.args[0] >= 3.0
+    assert get_retry_stats()["test.op"]["retry_after_honored"] == 1
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_fails_fast():
+    """測試過長的 Retry-After 直接失敗"""
+    calls = AsyncMock(side_effect=AzureOpenAIRateLimitError("429", retry_after=120.0))
+    with pytest.raises(AzureOpenAIRateLimitError) as exc_info:
+        await retry_async(calls, RetryPolicy(max_retry_after=30.0), "test.op")
+
+    assert calls.await_count == 1
+    assert is_exhausted(exc_info.value)
+    assert get_retry_stats()["test.op"]["retry_after_too_long"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_error_not_retried_by_outer_layer():
+    """測試內層已用盡重試的錯誤不會被外層再次重試"""
+    inner = AsyncMock(side_effect=ConnectionError("boom"))
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+
+    async def outer_call():
+        return await retry_async(inner, policy, "inner")
+
+    with patch("asyncio.sleep", new_callable=AsyncMock), pytest.raises(ConnectionError):
+        await retry_async(outer_call, policy, "outer")
+
+    assert inner.await_count == 3  # 不是 3 x 3
+    assert get_retry_stats()["outer"]["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_shared_across_layers():
+    """測試巢狀層共用請求期限"""
+    with deadline_scope(10.0):
+        outer_remaining = remaining_time()
+        with deadline_scope(60.0):  # 內層不能延長期限
+            assert remaining_time() <= outer_remaining
+
+    assert remaining_time() is None
+
+    retry = RetryState(RetryPolicy(base_delay=1.0), "test.deadline")
+    retry.start_attempt()
+    with deadline_scope(0.5):
+        assert not await retry.backoff(ConnectionError("slow"))
+    assert get_retry_stats()["test.deadline"]["deadline_exceeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_raise_immediately():
+    """測試不可重試的錯誤立即拋出"""
+    calls = AsyncMock(side_effect=ValueError("bad input"))
+    with pytest.raises(ValueError):
+        await retry_async(calls, RetryPolicy(), "test.op", retry_on=(ConnectionError,))
+    assert calls.await_count == 1
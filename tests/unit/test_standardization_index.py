@@ -0,0 +1,96 @@
+"""Test precompiled standardization index"""
+import json
+import re
+
+from src.core.standardization_index import (
+    EMPTY_INDEX,
+    PatternRule,
+    compile_index,
+    extract_literal_prefilter,
+)
+from src.services.keyword_standardizer import KeywordStandardizer
+from src.services.standardization import TraditionalChineseStandardizer
+
+
+def test_literal_prefilter_extraction():
+    """測試字面前置過濾字串擷取"""
+    assert extract_literal_prefilter(r"\s+skills?$", re.IGNORECASE) == "skill"
+    assert extract_literal_prefilter(r"^SQL\s+Server", re.IGNORECASE) == "server"
+    assert extract_literal_prefilter(r"^SQL\s+Server") == "Server"
+    # 頂層分支或非 ASCII 字面不產生前置過濾
+    assert extract_literal_prefilter(r"foo|bar") is None
+    assert extract_literal_prefilter(r"(.+)工程師") is None
+
+
+def test_pattern_rule_prefilter_skips_regex():
+    """測試前置過濾與 re.sub 結果一致"""
+    rule = PatternRule.compile(r"\s+programming$", "", "suffix_removal", re.IGNORECASE)
+    assert rule.prefilter == "programming"
+    assert rule.apply("Python Programming") == "Python"
+    assert not rule.could_match("Python")
+    assert rule.apply("Python") == "Python"
+
+
+def test_compile_index():
+    """測試設定檔編譯為索引"""
+    config = {
+        "version": "1.2.3",
+        "categories": {
+            "a": {"mappings": {"py": "Python"}},
+            "b": {"mappings": {"js": "JavaScript"}},
+        },
+        "exclusion_rules": [{"pattern": r"^\d+$"}, {"pattern": "^test"}],
+        "pattern_rules": [{"pattern": r"\s+skills$", "replacement": ""}],
+    }
+    index = compile_index(config)
+
+    assert dict(index.mappings) == {"py": "Python", "js": "JavaScript"}
+    assert index.exclusion_regex is not None
+    assert index.is_excluded("123")
+    assert index.is_excluded("testing")
+    assert not index.is_excluded("Python")
+    assert index.pattern_rules[0].apply("Python skills") == "Python"
+    assert index.version == "1.2.3"
+    assert compile_index(None) is EMPTY_INDEX
+
+
+def test_exclusions_with_groups_fall_back_to_individual_patterns():
+    """測試含群組的排除規則不合併"""
+    index = compile_index({"exclusion_rules": [{"pattern": r"(a)\1"}, {"pattern": "^x"}]})
+    assert index.exclusion_regex is None
+    assert index.is_excluded("baab")
+    assert index.is_excluded("xyz")
+    assert not index.is_excluded("abc")
+
+
+def test_index_shared_across_instances():
+    """測試相同設定來源共用同一索引"""
+    assert KeywordStandardizer()._index is KeywordStandardizer()._index
+    assert TraditionalChineseStandardizer()._index is TraditionalChineseStandardizer()._index
+
+
+def test_reload_swaps_index(tmp_path):
+    """測試重新載入時原子替換索引"""
+    config_path = tmp_path / "terms.json"
+    config = {"version": "1", "language": "zh-TW",
+              "categories": {"c": {"mappings": {"舊": "old"}}}}
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+
+    standardizer = TraditionalChineseStandardizer(str(config_path))
+    old_index = standardizer._index
+    assert standardizer.standardize_keywords(["舊"]).standardized_keywords == ["old"]
+
+    config["categories"]["c"]["mappings"] = {"舊": "new"}
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    standardizer.reload_config()
+
+    assert standardizer._index is not old_index
+    assert standardizer.standardize_keywords(["舊"]).standardized_keywords == ["new"]
+
+
+def test_english_terms_ignore_unicode_case_folding():
+    """測試 ſ、ı、İ 等 Unicode 大小寫折疊字元不會比對到英文詞彙（不拋出 KeyError）"""
+    standardizer = TraditionalChineseStandardizer()
+    assert standardizer._normalize_english_terms("github 與 MYSQL") == "GitHub 與 MySQL"
+    for text in ("gıthub", "myſql", "GİTHUB"):
+        assert standardizer._normalize_english_terms(text) == text
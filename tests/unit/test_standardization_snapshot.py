@@ -0,0 +1,88 @@
+"""Test standardization dictionary snapshot"""
+import shutil
+
+import pytest
+
+from src.core.standardization_snapshot import (
+    DEFAULT_DATA_DIR,
+    SOURCE_FILES,
+    SnapshotError,
+    SnapshotStore,
+    build_snapshot,
+    read_snapshot,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """複製字典來源檔到暫存目錄"""
+    for filename in SOURCE_FILES:
+        shutil.copy2(DEFAULT_DATA_DIR / filename, tmp_path / filename)
+    return tmp_path
+
+
+def test_snapshot_roundtrip(data_dir):
+    """測試快照寫入與讀取"""
+    path, checksum = build_snapshot(data_dir)
+    payload, loaded_checksum = read_snapshot(path)
+
+    assert loaded_checksum == checksum
+    assert payload["en"]["skills"]
+    assert payload["zh-TW"]["language"] == "zh-TW"
+    assert set(payload["sources"]) == set(SOURCE_FILES)
+
+
+def test_corrupt_snapshot_detected(data_dir):
+    """測試損毀快照會被偵測"""
+    path, _ = build_snapshot(data_dir)
+    raw = bytearray(path.read_bytes())
+    raw[-1] ^= 0xFF
+    path.write_bytes(bytes(raw))
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+
+
+def test_store_loads_snapshot_and_matches_sources(data_dir):
+    """測試快照與來源編譯結果一致"""
+    from_sources = SnapshotStore(data_dir=data_dir).get()
+    assert from_sources.origin == "sources"
+
+    build_snapshot(data_dir)
+    from_snapshot = SnapshotStore(data_dir=data_dir).get()
+    assert from_snapshot.origin == "snapshot"
+
+    assert dict(from_snapshot.keyword_index.combined_dictionary) == dict(
+        from_sources.keyword_index.combined_dictionary
+    )
+    assert [r.regex.pattern for r in from_snapshot.keyword_index.patterns] == [
+        r.regex.pattern for r in from_sources.keyword_index.patterns
+    ]
+
+
+def test_stale_snapshot_falls_back_to_sources(data_dir):
+    """測試來源檔變更後不使用過期快照"""
+    build_snapshot(data_dir)
+    with open(data_dir / "skills.yaml", "a", encoding="utf-8") as f:
+        f.write("\nextra_category:\n  zzz snapshot test: ZZZ\n")
+
+    snapshot = SnapshotStore(data_dir=data_dir).get()
+    assert snapshot.origin == "sources"
+    assert snapshot.keyword_index.combined_dictionary["zzz snapshot test"] == "ZZZ"
+
+
+def test_store_hot_reload(data_dir):
+    """測試檔案變更後熱重載"""
+    store = SnapshotStore(data_dir=data_dir, check_interval=0)
+    first = store.get()
+    assert store.get() is first  # 未變更時沿用
+
+    with open(data_dir / "tools.yaml", "a", encoding="utf-8") as f:
+        f.write("\nextra_tools:\n  zzz reload tool: ZZZ Tool\n")
+    build_snapshot(data_dir)
+
+    second = store.get()
+    assert second is not first
+    assert second.origin == "snapshot"
+    assert second.keyword_index.combined_dictionary["zzz reload tool"] == "ZZZ Tool"
+    assert store.stats()["reload_count"] == 1
@@ -0,0 +1,109 @@
+"""Test token-aware prompt input budgeting"""
+import hashlib
+from unittest.mock import patch
+
+from src.core.token_budget import (
+    TRUNCATION_MARKER,
+    PromptSection,
+    TokenBudgeter,
+    TokenCounter,
+    dedupe_bullets,
+    strip_html_boilerplate,
+)
+
+
+def _budgeter(tmp_path):
+    # 不存在的快取目錄：不會在測試中下載編碼檔
+    return TokenBudgeter(TokenCounter(cache_dir=tmp_path / "missing"))
+
+
+def test_strip_html_boilerplate():
+    """測試移除 HTML 樣板內容"""
+    html = (
+        "<!DOCTYPE html><html><head><style>p {color: red}</style></head><body>"
+        "<!-- comment --><h2 style=\"margin:0\" data-id=\"1\">Experience</h2>"
+        "<p class=\"opt-new\">Built&nbsp;APIs</p>\n  <p> </p><script>x()</script></body></html>"
+    )
+    assert strip_html_boilerplate(html) == (
+        "<h2>Experience</h2><p class=\"opt-new\">Built APIs</p>"
+    )
+
+
+def test_dedupe_bullets():
+    """測試移除重複的條列項目"""
+    html = "<ul><li>Led team</li><li><strong>Led</strong> team</li><li>Shipped</li></ul>"
+    assert dedupe_bullets(html) == "<ul><li>Led team</li><li>Shipped</li></ul>"
+
+    text = "Skills\n- Python\n- SQL\n* python\nPython"
+    assert dedupe_bullets(text) == "Skills\n- Python\n- SQL\nPython"
+
+
+def test_dedupe_bullets_keeps_nested_lists_intact():
+    """測試巢狀清單只比對最內層項目，外層項目的結構不被切斷"""
+    html = (
+        "<ul><li>Acme<ul><li>Led team</li><li>Led team</li></ul></li>"
+        "<li>Globex<ol><li>Shipped</li></ol></li><li>Shipped</li></ul>"
+    )
+    assert dedupe_bullets(html) == (
+        "<ul><li>Acme<ul><li>Led team</li></ul></li>"
+        "<li>Globex<ol><li>Shipped</li></ol></li></ul>"
+    )
+
+
+def test_verbatim_section_is_only_counted(tmp_path):
+    """測試 clean=False 的區段原樣保留（跨職位重複的條列與樣式屬性都不移除）"""
+    resume = (
+        '<h3>Job A</h3><ul><li style="color:red">Led team of 5</li></ul>'
+        "<h3>Job B</h3><ul><li>Led team of 5</li></ul>"
+    )
+    result = _budgeter(tmp_path).fit(
+        [PromptSection("original_resume", resume, html=True, trimmable=False, clean=False)], 10000
+    )
+    assert result.texts["original_resume"] == resume
+    assert result.tokens_before == result.tokens_after
+
+
+def test_counter_requires_cached_file_for_its_encoding(tmp_path, monkeypatch):
+    """測試快取目錄只有其他檔案時改用估算，不在請求路徑下載編碼檔"""
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    (tmp_path / "unrelated").write_text("x")
+    with patch("tiktoken.get_encoding", return_value="encoding") as get_encoding:
+        assert TokenCounter("o200k_base").backend == "estimate"
+        get_encoding.assert_not_called()
+
+        url = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+        (tmp_path / hashlib.sha1(url.encode()).hexdigest()).write_text("x")
+        assert TokenCounter("o200k_base").backend == "tiktoken"
+
+
+def test_fit_within_budget_keeps_text(tmp_path):
+    """測試未超出預算時不裁切"""
+    result = _budgeter(tmp_path).fit(
+        [PromptSection("jd", "Python developer"), PromptSection("resume", "Five years of Python")],
+        budget=1000,
+    )
+    assert result.texts == {"jd": "Python developer", "resume": "Five years of Python"}
+    assert result.trimmed == []
+    assert result.tokens_saved == 0
+
+
+def test_fit_trims_lowest_priority_first(tmp_path):
+    """測試超出預算時先裁切低優先區段"""
+    budgeter = _budgeter(tmp_path)
+    jd = "<p>" + " ".join(f"requirement{i}" for i in range(2000)) + "</p>"
+    resume = "<p>" + " ".join(f"achievement{i}" for i in range(500)) + "</p>"
+    result = budgeter.fit(
+        [
+            PromptSection("jd", jd, priority=0, html=True, min_tokens=100),
+            PromptSection("resume", resume, priority=1, html=True, trimmable=False),
+        ],
+        budget=budgeter.counter.count(resume) + 200,
+    )
+
+    assert result.trimmed == ["jd"]
+    assert result.texts["resume"] == resume
+    assert result.texts["jd"].endswith(TRUNCATION_MARKER)
+    assert "<p>" not in result.texts["jd"]
+    assert result.total_after <= result.budget
+    assert result.tokens_saved > 0
+    assert result.telemetry()["input_tokens_saved"] == result.tokens_saved
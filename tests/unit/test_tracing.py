@@ -0,0 +1,139 @@
+"""Test per-request stage tracing (spans, Server-Timing, trace buffer, middleware)"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.tracing import (
+    TraceRecorder,
+    current_trace,
+    end_trace,
+    record_span,
+    span,
+    stage_ms,
+    start_trace,
+    traced,
+)
+
+
+def test_spans_nest_and_sum_per_stage():
+    """測試巢狀 span 的父子關係與各階段加總"""
+    trace, token = start_trace("abc", "POST /x")
+    try:
+        with span("validation"):
+            pass
+        with span("llm", deployment="gpt-4o") as outer:
+            with span("parse"):
+                time.sleep(0.002)
+            with span("parse"):
+                pass
+        record_span("embedding", time.perf_counter_ns() - 3_000_000)
+    finally:
+        end_trace(token)
+
+    assert current_trace() is None
+    names = [s.name for s in trace.spans]
+    assert names == ["validation", "llm", "parse", "parse", "embedding"]
+    assert trace.spans[2].parent == 1 and trace.spans[1].parent is None
+    assert outer.attributes == {"deployment": "gpt-4o"}
+    assert outer.duration_ms >= 2
+
+    totals = trace.stage_totals()
+    assert totals["parse"]["count"] == 2 and totals["parse"]["ms"] >= 2
+    assert totals["embedding"]["ms"] >= 3
+
+    header = trace.server_timing()
+    assert header.startswith("validation;dur=")
+    assert 'parse;dur=' in header and 'desc="x2"' in header
+    assert header.endswith(f"total;dur={trace.duration_ms:.1f}")
+
+    exported = trace.to_dict()
+    assert exported["trace_id"] == "abc" and len(exported["spans"]) == 5
+    assert exported["spans"][1]["attributes"] == {"deployment": "gpt-4o"}
+
+
+def test_span_without_trace_only_times():
+    """測試沒有進行中的 trace 時 span 仍可計時但不記錄"""
+    with span("validation") as s:
+        time.sleep(0.001)
+    assert s.duration_ms >= 1
+    assert stage_ms("validation") == 0.0
+    record_span("llm", time.perf_counter_ns())  # no-op
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_get_their_own_parent():
+    """測試 asyncio.gather 並行的階段各自掛在正確的父 span 下"""
+    @traced("llm")
+    async def call(round_num: int) -> int:
+        await asyncio.sleep(0.001)
+        with span("parse"):
+            return round_num
+
+    trace, token = start_trace("t1")
+    try:
+        with span("keyword_extraction"):
+            assert await asyncio.gather(call(1), call(2)) == [1, 2]
+    finally:
+        end_trace(token)
+
+    llm_indexes = [i for i, s in enumerate(trace.spans) if s.name == "llm"]
+    assert len(llm_indexes) == 2
+    assert all(trace.spans[i].parent == 0 for i in llm_indexes)
+    parse_parents = sorted(s.parent for s in trace.spans if s.name == "parse")
+    assert parse_parents == llm_indexes
+
+
+def test_span_marks_errors():
+    """測試 span 內發生例外時記錄錯誤類型"""
+    trace, token = start_trace("err")
+    try:
+        with pytest.raises(ValueError), span("parse"):
+            raise ValueError("bad json")
+    finally:
+        end_trace(token)
+    assert trace.spans[0].attributes["error"] == "ValueError"
+
+
+def test_recorder_keeps_recent_and_summarizes():
+    """測試 trace 緩衝區的容量、查詢與摘要"""
+    recorder = TraceRecorder(size=2)
+    for i in range(3):
+        trace, token = start_trace(f"id-{i}", "POST /api/v1/x")
+        with span("llm"):
+            pass
+        end_trace(token)
+        recorder.add(trace)
+
+    assert recorder.get("id-0") is None
+    assert [t.trace_id for t in recorder.recent()] == ["id-2", "id-1"]
+    assert recorder.recent(min_ms=60_000) == []
+    summary = recorder.summary()["POST /api/v1/x"]
+    assert summary["requests"] == 2 and "llm" in summary["stages_mean_ms"]
+
+
+def test_middleware_adds_server_timing_and_exports_trace():
+    """測試中介層以 correlation ID 建立 trace、回傳 X-Server-Timing 並可由 /debug/traces 查詢"""
+    from src.core import tracing as tracing_module
+    from src.main import create_app
+
+    headers = {"X-Correlation-ID": "trace-test-1", "Origin": "https://airesumeadvisor.com"}
+    with patch.object(tracing_module, "_recorder", TraceRecorder(10)):
+        client = TestClient(create_app())
+        response = client.get("/health", headers=headers)
+        assert response.headers["X-Correlation-ID"] == "trace-test-1"
+        assert "security_check;dur=" in response.headers["X-Server-Timing"]
+        assert "total;dur=" in response.headers["X-Server-Timing"]
+
+        exported = client.get("/debug/traces/trace-test-1").json()["data"]
+        assert exported["name"] == "GET /health"
+        assert exported["attributes"]["status_code"] == 200
+        assert client.get("/debug/traces/missing").status_code == 404
+        listing = client.get("/debug/traces", params={"limit": 5}).json()["data"]
+        assert "GET /health" in listing["summary"]
+
+        with patch("src.core.config.settings.tracing_enabled", False):
+            untraced = client.get("/health", headers=headers)
+        assert "X-Server-Timing" not in untraced.headers
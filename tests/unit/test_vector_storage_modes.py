@@ -0,0 +1,67 @@
+"""Test dimension-reduced and halfvec course vector modes"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.services.course_search import _retarget, _vector_search_v2_sql, vector_target
+from src.services.embedding_client import truncate_embedding
+from src.services.etl.benchmark_vector_modes import run_benchmark
+from src.services.etl.migrate_vector_storage import build_backfill_sql, build_schema_sql
+
+
+def test_truncate_embedding_renormalizes():
+    """測試 Matryoshka 截斷後重新正規化"""
+    vector = np.array([3.0, 4.0, 12.0], dtype=np.float32)
+    truncated = truncate_embedding(vector, 2)
+    assert truncated.tolist() == pytest.approx([0.6, 0.8])
+    assert len(truncate_embedding(vector, 0)) == 3  # 0 = 不截斷
+
+    batch = truncate_embedding(np.ones((4, 8), dtype=np.float32), 4)
+    assert batch.shape == (4, 4)
+    assert np.allclose(np.linalg.norm(batch, axis=1), 1.0)
+
+
+def test_search_sql_targets_halfvec_column():
+    """測試搜尋 SQL 使用設定的 halfvec 欄位"""
+    sql = _vector_search_v2_sql(1, ("embedding_half", "halfvec"))
+    assert "c.embedding_half <=> $1::halfvec" in sql
+    assert "c.embedding " not in sql and "::vector" not in sql
+    assert _retarget("SELECT 1", ("embedding", "vector")) == "SELECT 1"
+
+    with patch("src.services.course_search.get_settings") as mock_settings:
+        mock_settings.return_value.course_vector_column = "embedding; DROP TABLE courses"
+        mock_settings.return_value.course_vector_type = "vector"
+        with pytest.raises(ValueError, match="Invalid course_vector_column"):
+            vector_target()
+
+
+def test_migration_sql():
+    """測試遷移 SQL 與 HNSW 維度限制"""
+    statements = build_schema_sql("embedding_half", "halfvec", 1536)
+    assert "ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536)" in statements[1]
+    assert "halfvec_cosine_ops" in statements[-1]
+    assert "l2_normalize(subvector(embedding, 1, 1536))::halfvec(1536)" in build_backfill_sql(
+        "embedding_half", "halfvec", 1536
+    )
+
+    with pytest.raises(ValueError, match="at most 2000"):
+        build_schema_sql("embedding_3072", "vector", 3072)
+    assert len(build_schema_sql("embedding_3072", "vector", 3072, create_index=False)) == 5
+    with pytest.raises(ValueError, match="Invalid target column"):
+        build_schema_sql("embedding", "halfvec", 1536)
+
+
+def test_benchmark_reports_recall():
+    """測試基準測試計算 recall"""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(300, 64)).astype(np.float32)
+
+    results = {(r.dimensions, r.storage): r for r in run_benchmark(
+        vectors, dims=[64, 16], storages=["float32", "halfvec", "int8"], query_count=20, k=5
+    )}
+
+    assert results[(64, "float32")].recall == pytest.approx(1.0)
+    assert results[(64, "halfvec")].recall > 0.9
+    assert results[(16, "float32")].recall < results[(64, "float32")].recall
+    assert results[(16, "halfvec")].bytes_per_vector == 32
@@ -94,6 +94,12 @@ CREATE INDEX idx_course_type_standard ON courses(course_type_standard);
 -- 向量搜尋（如果使用 ivfflat，但 3072 維度可能太大）
 -- CREATE INDEX idx_courses_embedding ON courses USING ivfflat (embedding vector_cosine_ops);
 
+-- 降維 halfvec 欄位（可索引：halfvec HNSW 上限 4000 維、vector 2000 維）
+-- 由 python -m src.services.etl.migrate_vector_storage --dimensions 1536 --type halfvec 建立、
+-- 回填並以 trigger 與 embedding 同步，再設定 COURSE_VECTOR_COLUMN=embedding_half、COURSE_VECTOR_TYPE=halfvec
+-- ALTER TABLE courses ADD COLUMN embedding_half halfvec(1536);
+-- CREATE INDEX idx_courses_embedding_half_hnsw ON courses USING hnsw (embedding_half halfvec_cosine_ops);
+
 -- 5. 建立更新時間的觸發器
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$